@@ -6,6 +6,7 @@ app_name = "dashboard"
 urlpatterns = [
     # Class-based view URL
     path("", views.DashboardView.as_view(), name="dashboard"),
+    path("cache/", views.CacheStatsView.as_view(), name="cache_stats"),
     # Alternatively, you can use the function-based view
     # path('', views.dashboard_view, name='dashboard'),
 ]
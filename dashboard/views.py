@@ -1,12 +1,21 @@
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views import View
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Q, F, ExpressionWrapper, fields
+from django.db.models import Count, Q, F, ExpressionWrapper, Sum, fields
 from django.utils import timezone
 from datetime import timedelta
 
-from test_protocols.models import ProtocolRun, TestProtocol, TestSuite
+from test_protocols.models import (
+    ProtocolRun,
+    ProtocolRunRollup,
+    TestProtocol,
+    TestSuite,
+)
 from projects.models import Project
+from utils.cache import cache_stats, cached, listing_namespace
 
 
 class DashboardView(LoginRequiredMixin, ListView):
@@ -29,6 +38,8 @@ class DashboardView(LoginRequiredMixin, ListView):
             "protocol__suite",
             "protocol__suite__project",
         ).order_by("-started_at")
+        # The same filters on the rollups count the runs listed, for the paginator
+        self.rollups = ProtocolRunRollup.objects.all()
 
         # Apply filters from query parameters
         project_id = self.request.GET.get("project")
@@ -38,12 +49,15 @@ class DashboardView(LoginRequiredMixin, ListView):
 
         if project_id:
             queryset = queryset.filter(protocol__suite__project_id=project_id)
+            self.rollups = self.rollups.filter(project_id=project_id)
 
         if status:
             queryset = queryset.filter(status=status)
+            self.rollups = self.rollups.filter(status=status)
 
         if result:
             queryset = queryset.filter(result_status=result)
+            self.rollups = self.rollups.filter(result_status=result)
 
         if date_str:
             try:
@@ -67,38 +81,78 @@ class DashboardView(LoginRequiredMixin, ListView):
                 queryset = queryset.filter(
                     started_at__gte=start_date, started_at__lt=end_date
                 )
+                self.rollups = self.rollups.filter(day=start_date.date())
             except (ValueError, IndexError):
                 # Invalid date format, ignore the filter
                 pass
 
         return queryset
 
+    def get_paginator(self, queryset, per_page, **kwargs):
+        paginator = super().get_paginator(queryset, per_page, **kwargs)
+        # Read from the rollups instead of counting the run history
+        paginator.count = self.rollups.aggregate(total=Sum("count"))["total"] or 0
+        return paginator
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get statistics for summary cards
-        context["total_runs"] = ProtocolRun.objects.count()
-        context["running_protocols"] = ProtocolRun.objects.filter(
-            status="running"
-        ).count()
-        context["failed_runs"] = ProtocolRun.objects.filter(
-            Q(status="failed") | Q(result_status="fail")
-        ).count()
+        # Get statistics for summary cards, from the run counts per status and
+        # result of the selected project (see test_protocols.rollups)
+        rollups = ProtocolRunRollup.objects.order_by()
+        project_id = self.request.GET.get("project")
+        if project_id:
+            rollups = rollups.filter(project_id=project_id)
+        counts = {
+            (status, result_status): total
+            for status, result_status, total in rollups.values_list(
+                "status", "result_status"
+            ).annotate(total=Sum("count"))
+        }
+
+        context["total_runs"] = sum(counts.values())
+        context["running_protocols"] = sum(
+            total for (status, _), total in counts.items() if status == "running"
+        )
+        context["failed_runs"] = sum(
+            total
+            for (status, result_status), total in counts.items()
+            if status == "failed" or result_status == "fail"
+        )
 
         # Calculate success rate
-        completed_runs = ProtocolRun.objects.filter(status="completed").count()
+        completed_runs = sum(
+            total for (status, _), total in counts.items() if status == "completed"
+        )
         if completed_runs > 0:
-            success_runs = ProtocolRun.objects.filter(
-                status="completed", result_status="pass"
-            ).count()
+            success_runs = counts.get(("completed", "pass"), 0)
             context["success_rate"] = round((success_runs / completed_runs) * 100)
         else:
             context["success_rate"] = 0
 
         # Get projects for filter dropdown
-        context["projects"] = Project.objects.all()
+        context["projects"] = cached(
+            "dashboard_projects",
+            [],
+            [listing_namespace(Project)],
+            lambda: list(Project.objects.all()),
+        )
+        context["recent_activities"] = cached(
+            "dashboard_activities",
+            [],
+            [
+                listing_namespace(ProtocolRun),
+                listing_namespace(TestProtocol),
+                listing_namespace(TestSuite),
+            ],
+            self.get_recent_activities,
+        )
+        return context
 
-        # Get recent activities
+    def get_recent_activities(self):
+        """
+        Get recent activities
+        """
         # In a real implementation, this would be fetched from a dedicated activity log model
         # For now, we'll simulate it by getting recent runs with activity type
         recent_runs = ProtocolRun.objects.select_related("protocol").order_by(
@@ -143,6 +197,19 @@ class DashboardView(LoginRequiredMixin, ListView):
 
         # Sort activities by timestamp
         activities.sort(key=lambda x: x["timestamp"], reverse=True)
-        context["recent_activities"] = activities[:15]  # Limit to 15 activities
+        return activities[:15]  # Limit to 15 activities
 
-        return context
+
+class CacheStatsView(LoginRequiredMixin, View):
+    """
+    Hits and misses of the cached values served by this process (see
+    utils.cache)
+    """
+
+    def get(self, request):
+        return JsonResponse(
+            {
+                "backend": settings.CACHES["default"]["BACKEND"],
+                "values": cache_stats(),
+            }
+        )
@@ -0,0 +1,155 @@
+# environments/services.py
+import logging
+import threading
+from collections import OrderedDict
+from uuid import UUID
+
+from django.core.cache import cache
+
+from environments.models import Environment
+
+logger = logging.getLogger(__name__)
+
+# Resolved values are kept for the most recent (project, suite run) scopes only
+MAX_CACHED_SCOPES = 64
+
+_resolved_values = OrderedDict()
+_resolved_values_lock = threading.Lock()
+
+
+def _version_key(project_id):
+    return f"environments:version:{project_id}"
+
+
+def get_project_version(project_id):
+    """
+    Get the version of the environments of a project.
+    The version changes every time one of its Environment rows is saved or deleted.
+    """
+    return cache.get(_version_key(project_id), 0)
+
+
+def invalidate_project_environments(project_id):
+    """
+    Drop the resolved environment values cached for a project.
+
+    Args:
+        project_id: The ID of the project whose environments changed
+    """
+    try:
+        cache.incr(_version_key(project_id))
+    except ValueError:
+        cache.set(_version_key(project_id), 1, None)
+
+    with _resolved_values_lock:
+        for scope_key in [key for key in _resolved_values if key[0] == project_id]:
+            del _resolved_values[scope_key]
+
+
+def _parse_reference(value):
+    """Return the UUID referenced by a config value, or None if it is not a reference."""
+    if not isinstance(value, str):
+        return None
+    try:
+        return UUID(value)
+    except ValueError:
+        return None
+
+
+class EnvironmentResolver:
+    """
+    Replaces Environment references (UUIDs) in connection config data with
+    their decrypted values.
+
+    All references of a config are fetched with a single query. When a scope
+    (e.g. a suite run ID) is given, decrypted values are cached per project and
+    reused by every resolver sharing that scope in this process, until an
+    Environment of the project is saved or deleted.
+    """
+
+    def __init__(self, project_id, scope=None):
+        """
+        Args:
+            project_id: The ID of the project the environments belong to
+            scope: Optional key the cached values are shared under
+        """
+        self.project_id = project_id
+        self.scope = scope
+        self._values = self._get_scope_values()
+
+    def resolve(self, config_data):
+        """
+        Resolve the Environment references of a config.
+
+        Args:
+            config_data: Config data, references may be nested in dicts and lists
+
+        Returns:
+            A new config with every known reference replaced by its value.
+            References that do not exist or resolve to an empty value are kept.
+        """
+        references = set()
+        self._collect_references(config_data, references)
+        self._load(references - self._values.keys())
+        return self._substitute(config_data)
+
+    def _collect_references(self, value, references):
+        if isinstance(value, dict):
+            for item in value.values():
+                self._collect_references(item, references)
+        elif isinstance(value, list):
+            for item in value:
+                self._collect_references(item, references)
+        else:
+            reference = _parse_reference(value)
+            if reference is not None:
+                references.add(reference)
+
+    def _substitute(self, value):
+        if isinstance(value, dict):
+            return {key: self._substitute(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._substitute(item) for item in value]
+
+        reference = _parse_reference(value)
+        if reference is not None and self._values.get(reference):
+            return self._values[reference]
+        return value
+
+    def _load(self, references):
+        """Fetch and decrypt the references that are not resolved yet."""
+        if not references:
+            return
+
+        environments = Environment.objects.filter(
+            pk__in=references, project_id=self.project_id
+        )
+        for environment in environments:
+            self._values[environment.pk] = environment.get_actual_value()
+
+        # Remember misses too, so that plain UUID values are not looked up again
+        for reference in references:
+            self._values.setdefault(reference, None)
+
+        logger.debug(
+            f"Resolved {len(references)} environment references for project {self.project_id}"
+        )
+
+    def _get_scope_values(self):
+        """Get the values cached for the scope, or a fresh dict without a scope."""
+        if self.scope is None:
+            return {}
+
+        scope_key = (self.project_id, str(self.scope))
+        version = get_project_version(self.project_id)
+        with _resolved_values_lock:
+            cached = _resolved_values.get(scope_key)
+            if cached is not None and cached[0] == version:
+                _resolved_values.move_to_end(scope_key)
+                return cached[1]
+
+            values = {}
+            _resolved_values[scope_key] = (version, values)
+            while len(_resolved_values) > MAX_CACHED_SCOPES:
+                _resolved_values.popitem(last=False)
+            return values
@@ -0,0 +1,16 @@
+# environments/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from environments.models import Environment
+from environments.services import invalidate_project_environments
+from utils.cache import register_cached_model
+
+register_cached_model(Environment, parents=("project",))
+
+
+@receiver(post_save, sender=Environment)
+@receiver(post_delete, sender=Environment)
+def environment_changed(sender, instance, **kwargs):
+    """Invalidate the resolved values of the project when a variable changes."""
+    invalidate_project_environments(instance.project_id)
@@ -1,3 +1,75 @@
+from uuid import uuid4
+
 from django.test import TestCase
 
-# Create your tests here.
+from environments.services import EnvironmentResolver
+from projects.models import Project
+from utils.fixtures import ProtocolFixtures
+
+
+class EnvironmentResolverTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.host = self.create_environment("HOST", "db.internal")
+        self.password = self.create_environment("PASSWORD", "hunter2", "secret")
+
+    def test_resolves_nested_references_in_one_query(self):
+        config_data = {
+            "host": str(self.host.pk),
+            "options": {"password": str(self.password.pk)},
+            "hosts": [str(self.host.pk), "replica.internal"],
+            "port": 5432,
+        }
+
+        with self.assertNumQueries(1):
+            resolved = EnvironmentResolver(self.project.pk).resolve(config_data)
+        self.assertEqual(
+            resolved,
+            {
+                "host": "db.internal",
+                "options": {"password": "hunter2"},
+                "hosts": ["db.internal", "replica.internal"],
+                "port": 5432,
+            },
+        )
+        self.assertEqual(config_data["host"], str(self.host.pk))
+
+    def test_unknown_references_are_kept_and_not_looked_up_again(self):
+        unknown = str(uuid4())
+        resolver = EnvironmentResolver(self.project.pk)
+
+        self.assertEqual(resolver.resolve({"id": unknown}), {"id": unknown})
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve({"id": unknown}), {"id": unknown})
+
+    def test_environments_of_other_projects_are_not_resolved(self):
+        other_project = Project.objects.create(name="Other", owner=self.user)
+        other = self.create_environment("HOST", "elsewhere", project=other_project)
+
+        resolved = EnvironmentResolver(self.project.pk).resolve({"host": str(other.pk)})
+        self.assertEqual(resolved, {"host": str(other.pk)})
+
+    def test_resolvers_of_a_scope_share_the_values(self):
+        scope = uuid4()
+        config_data = {"host": str(self.host.pk)}
+        EnvironmentResolver(self.project.pk, scope=scope).resolve(config_data)
+
+        with self.assertNumQueries(0):
+            resolved = EnvironmentResolver(self.project.pk, scope=scope).resolve(
+                config_data
+            )
+        self.assertEqual(resolved, {"host": "db.internal"})
+        with self.assertNumQueries(1):
+            EnvironmentResolver(self.project.pk, scope=uuid4()).resolve(config_data)
+
+    def test_saving_an_environment_drops_the_shared_values(self):
+        scope = uuid4()
+        config_data = {"host": str(self.host.pk)}
+        EnvironmentResolver(self.project.pk, scope=scope).resolve(config_data)
+
+        self.host.set_value("db2.internal")
+        self.host.save()
+        resolved = EnvironmentResolver(self.project.pk, scope=scope).resolve(
+            config_data
+        )
+        self.assertEqual(resolved, {"host": "db2.internal"})
@@ -97,6 +97,26 @@ DATABASES = {
     }
 }
 
+# Cache, see utils.cache
+# Redis URL of the cache shared by all web and worker processes. Each process
+# keeps its own in-memory cache when empty, such as in development and tests
+CACHE_REDIS_URL = config("CACHE_REDIS_URL", default="")
+# Seconds a cached value is kept, invalidation makes most of them stale sooner
+CACHE_TIMEOUT = config("CACHE_TIMEOUT", default=300, cast=int)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pangolin",
+        "TIMEOUT": CACHE_TIMEOUT,
+        "KEY_PREFIX": "pangolin",
+    }
+}
+if CACHE_REDIS_URL:
+    CACHES["default"].update(
+        BACKEND="django.core.cache.backends.redis.RedisCache",
+        LOCATION=CACHE_REDIS_URL,
+    )
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -159,3 +179,114 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+
+# Test suite execution
+# Maximum number of protocols of one suite running at once in parallel mode
+SUITE_MAX_CONCURRENCY = config("SUITE_MAX_CONCURRENCY", default=10, cast=int)
+# Number of recent runs of a protocol used to estimate its duration
+PLANNING_HISTORY_WINDOW = config("PLANNING_HISTORY_WINDOW", default=20, cast=int)
+# Duration in seconds assumed for protocols that never ran when no other
+# protocol of the suite has run either
+PLANNING_DEFAULT_DURATION = config("PLANNING_DEFAULT_DURATION", default=60, cast=float)
+# Maximum number of independent steps of one protocol executing at once
+PROTOCOL_STEP_CONCURRENCY = config("PROTOCOL_STEP_CONCURRENCY", default=4, cast=int)
+# Number of executed steps waiting for verification (and verified steps waiting
+# to be written) before a protocol run stops executing more steps
+PROTOCOL_PIPELINE_QUEUE_SIZE = config(
+    "PROTOCOL_PIPELINE_QUEUE_SIZE", default=16, cast=int
+)
+# Maximum number of verification results written per INSERT
+VERIFICATION_RESULT_BATCH_SIZE = config(
+    "VERIFICATION_RESULT_BATCH_SIZE", default=500, cast=int
+)
+# Number of protocol runs created per INSERT, and handed over per message, when
+# many protocols are launched at once
+BULK_LAUNCH_BATCH_SIZE = config("BULK_LAUNCH_BATCH_SIZE", default=1000, cast=int)
+
+# Run deadlines
+# Seconds a protocol run may take, overridable by the "run_timeout" of its
+# connection config data. Steps may have a shorter timeout of their own
+PROTOCOL_RUN_TIMEOUT = config("PROTOCOL_RUN_TIMEOUT", default=1800, cast=float)
+# Seconds a suite run may take, the protocols still running then time out
+SUITE_RUN_TIMEOUT = config("SUITE_RUN_TIMEOUT", default=7200, cast=float)
+# Seconds past its deadline after which a run that never finished, such as
+# when its worker died, is marked as timed out by reap_stale_runs
+STALE_RUN_GRACE = config("STALE_RUN_GRACE", default=300, cast=float)
+
+# Dashboard rollups of the protocol runs, see test_protocols.rollups
+# Seconds between two recounts of the rollups from the runs
+RUN_ROLLUP_RECONCILE_INTERVAL = config(
+    "RUN_ROLLUP_RECONCILE_INTERVAL", default=3600, cast=float
+)
+# Number of days recounted, up to today, 0 for every day
+RUN_ROLLUP_RECONCILE_DAYS = config("RUN_ROLLUP_RECONCILE_DAYS", default=7, cast=int)
+
+# Run trends, see test_protocols.trends
+# Number of partial rows of each trend period, about the number of workers
+# finishing runs at once
+RUN_TREND_SHARDS = config("RUN_TREND_SHARDS", default=8, cast=int)
+
+CELERY_BEAT_SCHEDULE = {
+    "reap-stale-runs": {
+        "task": "test_protocols.tasks.reap_stale_runs",
+        "schedule": STALE_RUN_GRACE,
+        "options": {"queue": "suite_queue"},
+    },
+    "reconcile-protocol-run-rollups": {
+        "task": "test_protocols.tasks.reconcile_protocol_run_rollups",
+        "schedule": RUN_ROLLUP_RECONCILE_INTERVAL,
+        "options": {"queue": "suite_queue"},
+    },
+}
+
+# Scheduling of protocol runs, see test_protocols.scheduling
+# Number of batch protocol runs running at once across all projects, shared
+# between projects in proportion to their scheduling weight
+SCHEDULER_BATCH_CAPACITY = config("SCHEDULER_BATCH_CAPACITY", default=32, cast=int)
+# Seconds before a batch run over its project's share asks for admission again
+SCHEDULER_ADMISSION_RETRY_DELAY = config(
+    "SCHEDULER_ADMISSION_RETRY_DELAY", default=5, cast=float
+)
+# Seconds of admitted runs used for the queue wait times
+SCHEDULER_STATS_WINDOW = config("SCHEDULER_STATS_WINDOW", default=3600, cast=int)
+
+# Connection pooling
+# Maximum number of open connections per target host in one worker process
+CONNECTION_POOL_MAX_PER_HOST = config(
+    "CONNECTION_POOL_MAX_PER_HOST", default=4, cast=int
+)
+# Seconds after which an idle pooled connection is closed
+CONNECTION_POOL_IDLE_TTL = config("CONNECTION_POOL_IDLE_TTL", default=300, cast=float)
+# Seconds to wait for a free connection slot before failing the run
+CONNECTION_POOL_CHECKOUT_TIMEOUT = config(
+    "CONNECTION_POOL_CHECKOUT_TIMEOUT", default=60, cast=float
+)
+
+# Rate limiting of the operations on each target, see ConnectionConfig "rate_limit"
+# Redis URL of the store shared by all workers, each worker process keeps its
+# own limits when empty
+RATE_LIMIT_REDIS_URL = config("RATE_LIMIT_REDIS_URL", default="")
+# Seconds to wait for the rate limits of a target before failing the operation
+RATE_LIMIT_TIMEOUT = config("RATE_LIMIT_TIMEOUT", default=60, cast=float)
+
+# Circuit breaking of targets failing to accept connections
+# Redis URL of the store shared by all workers, defaults to the rate limit store
+CIRCUIT_BREAKER_REDIS_URL = config(
+    "CIRCUIT_BREAKER_REDIS_URL", default=RATE_LIMIT_REDIS_URL
+)
+# Failed connection attempts in a row after which connects to a target fail at once
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = config(
+    "CIRCUIT_BREAKER_FAILURE_THRESHOLD", default=5, cast=int
+)
+# Seconds before a trial connect is let through to a target with an open circuit
+CIRCUIT_BREAKER_RESET_TIMEOUT = config(
+    "CIRCUIT_BREAKER_RESET_TIMEOUT", default=60, cast=float
+)
+
+# API connections
+# Maximum number of concurrent requests of one protocol on async API connections
+API_MAX_IN_FLIGHT = config("API_MAX_IN_FLIGHT", default=10, cast=int)
+
+# SSH connections
+# Maximum number of channels open at once on a batched SSH connection
+SSH_MAX_CHANNELS = config("SSH_MAX_CHANNELS", default=8, cast=int)
@@ -68,7 +68,7 @@ class APIConnection(BaseConnection):
 
             # 3. Test connection with HEAD request
             self._response = self._session.head(
-                self.config.host, timeout=self.config.timeout
+                self.config.host, timeout=self._timeout(self.config.timeout)
             )
 
             # 4. Check response and store session if successful
@@ -221,7 +221,7 @@ class APIConnection(BaseConnection):
             json=data,
             params=params,
             headers=headers,
-            timeout=self.config.timeout,
+            timeout=self._timeout(self.config.timeout),
         )
         end_time = datetime.now()
 
@@ -0,0 +1,258 @@
+"""Asynchronous API Connection Implementation for Pangolin SDK.
+
+This module provides an API connection backed by an asyncio HTTP client, so
+that independent requests can be sent concurrently over a shared pool of
+keep-alive (and, when available, HTTP/2) connections.
+"""
+
+import asyncio
+import importlib.util
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from pangolin_sdk.configs.api import APIConfig, AuthMethod
+from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import (
+    APIConnectionError,
+    APIExecutionError,
+    DeadlineExceededError,
+    RateLimitTimeoutError,
+)
+
+# HTTP/2 needs the optional h2 package
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_MAX_IN_FLIGHT = 10
+
+
+class AsyncAPIConnection(BaseConnection):
+    """API connection sending requests with an asyncio HTTP client.
+
+    The connection owns a private event loop, so it can be driven from
+    synchronous code: ``execute`` sends one request, ``execute_many`` sends a
+    batch of independent requests concurrently, with at most
+    ``max_in_flight`` of them outstanding at once. Unlike APIConnection, no
+    probe request is sent when connecting.
+
+    Attributes:
+        config (APIConfig): Configuration for API connection.
+        max_in_flight (int): Default limit of concurrent requests in a batch.
+        _client (Optional[httpx.AsyncClient]): HTTP client for API requests.
+        _loop (Optional[asyncio.AbstractEventLoop]): Loop driving the client.
+    """
+
+    supports_batch_execution = True
+
+    def __init__(
+        self, config: APIConfig, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    ) -> None:
+        """
+        Initialize async API connection.
+
+        Args:
+            config (APIConfig): Configuration for API connection.
+            max_in_flight (int): Default limit of concurrent requests in a batch.
+        """
+        super().__init__(config)
+        self.config = config
+        self.max_in_flight = max_in_flight
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_request_time: Optional[datetime] = None
+        self._logger = logging.getLogger(__name__)
+
+    def _connect_impl(self) -> httpx.AsyncClient:
+        """
+        Create the HTTP client with headers, authentication and connection limits.
+
+        Returns:
+            httpx.AsyncClient: Configured HTTP client.
+
+        Raises:
+            APIConnectionError: If the client cannot be created.
+        """
+        try:
+            headers = dict(self.config.default_headers)
+            headers.update(self.config.options.get("headers", {}))
+            headers.update(self.config.get_auth_headers() or {})
+
+            auth = None
+            if self.config.auth_method == AuthMethod.DIGEST:
+                auth = httpx.DigestAuth(self.config.username, self.config.password)
+
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+
+            self._client = httpx.AsyncClient(
+                headers=headers,
+                auth=auth,
+                http2=HTTP2_AVAILABLE,
+                verify=self.config.ssl_verify,
+                timeout=self.config.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight,
+                ),
+            )
+            return self._client
+
+        except (httpx.HTTPError, ValueError) as e:
+            error = APIConnectionError(message=f"Failed to create API client: {e}")
+            self._logger.error("API connection error: %s", str(error))
+            raise error from e
+
+    def _disconnect_impl(self) -> None:
+        """
+        Close the HTTP client and its event loop.
+        """
+        try:
+            if self._client is not None and self._loop is not None:
+                self._loop.run_until_complete(self._client.aclose())
+        finally:
+            self._client = None
+            if self._loop is not None:
+                self._loop.close()
+                self._loop = None
+
+    def _execute_impl(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Execute a single API request.
+
+        Args:
+            *args: Positional arguments (unused).
+            **kwargs: Request configuration, see APIConnection._execute_impl.
+
+        Returns:
+            Dict[str, Any]: Request result with response details.
+
+        Raises:
+            APIExecutionError: If the request fails.
+        """
+        if self._client is None:
+            self.connect()
+        return self._loop.run_until_complete(self._request(**kwargs))
+
+    def execute_many(
+        self, requests: List[Dict[str, Any]], max_in_flight: Optional[int] = None
+    ) -> List[Optional[Any]]:
+        """
+        Send independent requests concurrently.
+
+        Args:
+            requests (List[Dict[str, Any]]): Keyword arguments of each request.
+            max_in_flight (int, optional): Limit of concurrent requests,
+                defaults to the limit of the connection.
+
+        Returns:
+            List[Optional[Any]]: Result of each request in request order,
+            None for the requests that failed.
+        """
+        if self.status != ConnectionStatus.CONNECTED:
+            self.connect()
+
+        try:
+            with self._rate_limited(len(requests)) as slots:
+                max_in_flight = max_in_flight or self.max_in_flight
+                if slots is not None:
+                    max_in_flight = min(max_in_flight, slots)
+                outcomes = self._loop.run_until_complete(
+                    self._gather(requests, max_in_flight)
+                )
+        except RateLimitTimeoutError as e:
+            # None of the requests was sent
+            outcomes = [e] * len(requests)
+
+        results = []
+        for outcome in outcomes:
+            if isinstance(
+                outcome,
+                (APIExecutionError, DeadlineExceededError, RateLimitTimeoutError),
+            ):
+                outcome = self._deadline_error(outcome)
+                self.metrics.total_errors += 1
+                self._record_error(outcome)
+                self._logger.error("Execution failed: %s", str(outcome))
+                results.append(None)
+            else:
+                self.results.append(outcome)
+                results.append(outcome)
+
+        self._last_result = results[-1] if results else None
+        return results
+
+    def is_healthy(self) -> bool:
+        """Check the HTTP client is still open."""
+        return (
+            super().is_healthy()
+            and self._client is not None
+            and not self._client.is_closed
+        )
+
+    async def _gather(
+        self, requests: List[Dict[str, Any]], max_in_flight: int
+    ) -> List[Any]:
+        """Send the requests with at most max_in_flight outstanding at once."""
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def send(kwargs: Dict[str, Any]) -> Any:
+            async with semaphore:
+                try:
+                    return await self._request(**kwargs)
+                except (APIExecutionError, DeadlineExceededError) as e:
+                    return e
+
+        return await asyncio.gather(*(send(kwargs) for kwargs in requests))
+
+    async def _request(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Perform one API request.
+
+        Returns:
+            Dict with request result details.
+
+        Raises:
+            APIExecutionError: If the request fails or returns an error status.
+        """
+        method = kwargs.get("method", "GET").upper()
+        url = self.config.get_full_url(kwargs.get("endpoint", ""))
+        start_time = datetime.now()
+
+        try:
+            response = await self._client.request(
+                method=method,
+                url=url,
+                json=kwargs.get("data"),
+                params=kwargs.get("params"),
+                headers=kwargs.get("headers"),
+                timeout=self._timeout(self.config.timeout),
+            )
+        except httpx.HTTPError as e:
+            raise APIExecutionError(message=f"API request failed: {e}") from e
+        end_time = datetime.now()
+
+        if response.status_code >= 400:
+            raise APIExecutionError(
+                message=f"API request failed with status {response.status_code}",
+                status_code=response.status_code,
+                response={"url": str(response.url), "text": response.text},
+            )
+
+        result = {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "elapsed_ms": (end_time - start_time).total_seconds() * 1000,
+            "url": str(response.url),
+            "method": method,
+            "http_version": response.http_version,
+        }
+        try:
+            result["data"] = response.json()
+        except ValueError:
+            result["data"] = response.text
+
+        self._last_request_time = end_time
+        return result
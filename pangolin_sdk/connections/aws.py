@@ -9,6 +9,7 @@ from typing import Any, Dict, Optional
 
 import boto3
 from botocore.client import BaseClient
+from botocore.config import Config as BotoConfig
 from botocore.exceptions import BotoCoreError, ClientError
 
 from pangolin_sdk.configs.aws import AWSConnectionConfig
@@ -98,6 +99,12 @@ class AWSConnection(BaseConnection[BaseClient]):
         if self.config.api_version:
             kwargs["api_version"] = self.config.api_version
 
+        if self.deadline is not None:
+            # The client keeps these timeouts, so they are bounded by the
+            # deadline as of the connect
+            timeout = self._timeout(self.config.timeout)
+            kwargs["config"] = BotoConfig(connect_timeout=timeout, read_timeout=timeout)
+
         return kwargs
 
     def _create_aws_session(self) -> boto3.Session:
@@ -9,17 +9,35 @@ import random
 import time
 import uuid
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Any, Dict, Generic, List, Optional, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    TypeVar,
+)
 
 from pangolin_sdk.configs.base import ConnectionConfig
+from pangolin_sdk.connections.deadline import Deadline
 from pangolin_sdk.constants import ConnectionStatus
 from pangolin_sdk.exceptions import (
     BaseConnectionError as ConnectionError,
     BaseExecutionError as ExecutionError,
+    CircuitOpenError,
+    DeadlineExceededError,
+    RateLimitTimeoutError,
 )
 
+if TYPE_CHECKING:
+    from pangolin_sdk.connections.breaker import CircuitGuard
+
 # Generic type for connection objects
 T = TypeVar("T")
 
@@ -46,6 +64,9 @@ class BaseConnection(ABC, Generic[T]):
     retry logic, error tracking, and performance metrics.
     """
 
+    # Whether execute_many runs the requests concurrently
+    supports_batch_execution: bool = False
+
     def __init__(self, config: ConnectionConfig) -> None:
         """Initialize the base connection.
 
@@ -62,6 +83,16 @@ class BaseConnection(ABC, Generic[T]):
         self._last_error: Optional[Any] = None
         self._last_result: Optional[Any] = None
         self._connection: Optional[T] = None
+        # Called with the cost of each connect and execution, returns the
+        # context the operation runs in (see connections.ratelimit.RateLimiter)
+        self.rate_limiter: Optional[Callable[[int], ContextManager[Optional[int]]]] = (
+            None
+        )
+        # Circuit of the target, checked before each connection attempt
+        # (see connections.breaker.CircuitBreaker)
+        self.circuit_breaker: Optional["CircuitGuard"] = None
+        # Time by which connects and executions must be done, None for no limit
+        self.deadline: Optional[Deadline] = None
 
     def _setup_logger(self, *args: Any) -> logging.Logger:
         """Set up logging for the connection.
@@ -131,6 +162,10 @@ class BaseConnection(ABC, Generic[T]):
     def connect(self) -> Optional[T]:
         """Establish connection with retry logic.
 
+        Attempts stop as soon as the circuit breaker of the target is open,
+        leaving the connection in the CIRCUIT_OPEN status, and are not
+        retried once the deadline leaves no time for the retry delay.
+
         Returns:
             Optional[T]: Established connection object or None if failed.
         """
@@ -142,6 +177,16 @@ class BaseConnection(ABC, Generic[T]):
         last_error: Optional[ConnectionError] = None
 
         while retry_count <= self.config.max_retries:
+            if self.circuit_breaker is not None and not self.circuit_breaker.allow():
+                self.status = ConnectionStatus.CIRCUIT_OPEN
+                error = CircuitOpenError(
+                    message="Circuit open, the target is failing to accept connections",
+                    details={"circuit": self.circuit_breaker.key},
+                )
+                self._record_error(error)
+                self._logger.error(str(error))
+                return None
+
             try:
                 self._logger.info(
                     "Attempting connection %d/%d",
@@ -151,7 +196,8 @@ class BaseConnection(ABC, Generic[T]):
                 start_time = datetime.utcnow()
 
                 # Attempt to establish connection
-                _connection = self._connect_impl()
+                with self._rate_limited():
+                    _connection = self._connect_impl()
 
                 if _connection is not None:
                     self.status = ConnectionStatus.CONNECTED
@@ -161,6 +207,8 @@ class BaseConnection(ABC, Generic[T]):
                     connection_time = (datetime.utcnow() - start_time).total_seconds()
                     self._update_avg_connection_time(connection_time)
                     self._logger.info("Connection established successfully")
+                    if self.circuit_breaker is not None:
+                        self.circuit_breaker.record_success()
                     return _connection
 
             except ConnectionError as e:
@@ -168,9 +216,22 @@ class BaseConnection(ABC, Generic[T]):
                 self.metrics.failed_connections += 1
                 self.metrics.total_errors += 1
                 self._record_error(e)
+                # Running out of our own time or rate limits says nothing about the target
+                if self.circuit_breaker is not None and not isinstance(
+                    e, (RateLimitTimeoutError, DeadlineExceededError)
+                ):
+                    self.circuit_breaker.record_failure()
+                if isinstance(e, DeadlineExceededError):
+                    break
 
                 if retry_count < self.config.max_retries:
                     retry_delay = self._calculate_retry_delay(retry_count)
+                    remaining = self.deadline.remaining() if self.deadline else None
+                    if remaining is not None and retry_delay >= remaining:
+                        self._logger.warning(
+                            "Connection failed, no time left to retry: %s", str(e)
+                        )
+                        break
                     self._logger.warning(
                         "Connection failed, retrying in %0.2fs: %s", retry_delay, str(e)
                     )
@@ -197,16 +258,43 @@ class BaseConnection(ABC, Generic[T]):
             self.connect()
 
         try:
-            result = self._execute_impl(*args, **kwargs)
+            with self._rate_limited():
+                if self.deadline is not None:
+                    self.deadline.check("execution")
+                result = self._execute_impl(*args, **kwargs)
             self.results.append(result)
             self._last_result = result
             self._logger.info("Execution performed successfully")
-        except ExecutionError as e:
+        except (ExecutionError, RateLimitTimeoutError) as e:
+            e = self._deadline_error(e)
             self.metrics.total_errors += 1
             self._record_error(e)
             self._logger.error("Execution failed: %s", str(e))
             self.disconnect()
 
+    def execute_many(
+        self, requests: List[Dict[str, Any]], max_in_flight: Optional[int] = None
+    ) -> List[Optional[Any]]:
+        """Execute several independent requests.
+
+        The default implementation runs them one after the other; connections
+        with ``supports_batch_execution`` run them concurrently.
+
+        Args:
+            requests (List[Dict[str, Any]]): Keyword arguments of each request.
+            max_in_flight (int, optional): Limit of concurrent requests.
+
+        Returns:
+            List[Optional[Any]]: Result of each request in request order,
+            None for the requests that failed.
+        """
+        results = []
+        for kwargs in requests:
+            self._last_result = None
+            self.execute(**kwargs)
+            results.append(self._last_result)
+        return results
+
     def disconnect(self) -> None:
         """Disconnect from the resource."""
         self._logger.info("Disconnecting from the resource...")
@@ -229,6 +317,80 @@ class BaseConnection(ABC, Generic[T]):
             self._record_error(e)
             self._logger.error("Disconnection failed: %s", str(e))
 
+    def is_healthy(self) -> bool:
+        """Check whether an established connection is still usable.
+
+        Subclasses should override this with a cheap round trip to the
+        resource when one is available.
+
+        Returns:
+            bool: True if the connection can be reused.
+        """
+        return (
+            self.status == ConnectionStatus.CONNECTED and self._connection is not None
+        )
+
+    def reset(self) -> None:
+        """Clear per-use state so the connection can be reused by another caller."""
+        self.results = []
+        self._last_result = None
+        self._last_error = None
+
+    def _timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Get the timeout of a call to the resource, bounded by the deadline.
+
+        Args:
+            default (float, optional): Timeout of the call without deadline.
+
+        Returns:
+            Optional[float]: Timeout in seconds, None for no timeout.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+        """
+        if self.deadline is None:
+            return default
+        return self.deadline.timeout(default)
+
+    def _deadline_error(self, error: ConnectionError) -> ConnectionError:
+        """Report an execution failing once the deadline has passed as a timeout.
+
+        Calls bounded by the deadline fail with errors of their own, such as
+        a read timeout or a rate limit wait. Those are turned into a
+        DeadlineExceededError.
+
+        Args:
+            error (ConnectionError): Error raised by the execution.
+
+        Returns:
+            ConnectionError: The error to record.
+        """
+        if (
+            self.deadline is None
+            or not self.deadline.expired
+            or isinstance(error, DeadlineExceededError)
+        ):
+            return error
+        return DeadlineExceededError(
+            message=f"Deadline exceeded, execution timed out: {error.message}",
+            details=error.details,
+        )
+
+    def _rate_limited(self, cost: int = 1) -> ContextManager[Optional[int]]:
+        """Get the context an operation on the resource runs in.
+
+        Args:
+            cost (int): Number of operations, such as the requests of a batch.
+
+        Returns:
+            ContextManager[Optional[int]]: Context enforcing the rate limits, if
+            any. It yields the number of operations of a batch that may run at
+            once, None for no limit.
+        """
+        if self.rate_limiter is None:
+            return nullcontext()
+        return self.rate_limiter(cost)
+
     def get_connection(self) -> Optional[T]:
         """Get the current connection object.
 
@@ -0,0 +1,328 @@
+"""Circuit Breaker Module for Pangolin SDK.
+
+This module stops connections from retrying targets that are down. Each
+connection target has a circuit: after ``failure_threshold`` failed connection
+attempts in a row the circuit opens, and connects to the target fail at once
+instead of retrying. Once ``reset_timeout`` seconds have passed, a single
+trial connect is let through (half-open): it closes the circuit if it
+succeeds and opens it again otherwise. With a shared store, the circuits are
+shared by every worker process.
+"""
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+import redis
+from redis.exceptions import WatchError
+
+from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.connections.pool import connection_fingerprint
+from pangolin_sdk.constants import CircuitState
+
+# A circuit record, as stored
+Record = Dict[str, Any]
+
+
+def _new_record() -> Record:
+    return {
+        "state": CircuitState.CLOSED.value,
+        "failures": 0,
+        "opened_at": None,
+        "trial_started_at": None,
+        "times_opened": 0,
+        "rejected": 0,
+    }
+
+
+class CircuitBreakerStore(ABC):
+    """Backing store of the circuit records."""
+
+    @abstractmethod
+    def now(self) -> float:
+        """Get the current time of the store, in seconds since the epoch."""
+
+    @abstractmethod
+    def update(self, key: str, change: Callable[[Record], bool]) -> Record:
+        """Atomically read and change the record of a circuit.
+
+        Args:
+            key (str): Circuit key.
+            change (Callable[[Record], bool]): Changes the record in place and
+                returns whether it changed. May be called more than once.
+
+        Returns:
+            Record: The record after the change.
+        """
+
+    @abstractmethod
+    def records(self) -> Dict[str, Record]:
+        """Get the record of every known circuit.
+
+        Returns:
+            Dict[str, Record]: Circuit key -> record.
+        """
+
+
+class LocalCircuitBreakerStore(CircuitBreakerStore):
+    """Store keeping the circuits in memory, shared by the threads of a process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._records: Dict[str, Record] = {}
+
+    def now(self) -> float:
+        return time.time()
+
+    def update(self, key: str, change: Callable[[Record], bool]) -> Record:
+        with self._lock:
+            record = self._records.get(key) or _new_record()
+            if change(record):
+                self._records[key] = record
+            return dict(record)
+
+    def records(self) -> Dict[str, Record]:
+        with self._lock:
+            return {key: dict(record) for key, record in self._records.items()}
+
+
+class RedisCircuitBreakerStore(CircuitBreakerStore):
+    """Store keeping the circuits in Redis, shared by every process using it.
+
+    Only plain Redis commands and transactions are used, so the store works
+    against any Redis compatible server or client stand-in.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        prefix: str = "pangolin:circuit:",
+        record_ttl: int = 86400,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            client: Redis client, such as a redis.Redis instance.
+            prefix (str): Prefix of the keys written by the store.
+            record_ttl (int): Seconds a circuit nobody connects through is kept.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.record_ttl = record_ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisCircuitBreakerStore":
+        """Create a store connected to the Redis server at ``url``."""
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def now(self) -> float:
+        seconds, microseconds = self.client.time()
+        return seconds + microseconds / 1_000_000
+
+    def update(self, key: str, change: Callable[[Record], bool]) -> Record:
+        record_key = f"{self.prefix}{key}"
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(record_key)
+                    stored = pipe.get(record_key)
+                    record = json.loads(stored) if stored else _new_record()
+                    if not change(record):
+                        pipe.unwatch()
+                        return record
+                    pipe.multi()
+                    pipe.set(record_key, json.dumps(record), ex=self.record_ttl)
+                    pipe.execute()
+                    return record
+                except WatchError:
+                    # Another process changed the circuit meanwhile, try again
+                    continue
+
+    def records(self) -> Dict[str, Record]:
+        records = {}
+        for record_key in self.client.scan_iter(match=f"{self.prefix}*"):
+            if isinstance(record_key, bytes):
+                record_key = record_key.decode("utf-8")
+            stored = self.client.get(record_key)
+            if stored:
+                records[record_key[len(self.prefix) :]] = json.loads(stored)
+        return records
+
+
+class CircuitBreaker:
+    """Opens the circuit of connection targets that keep failing to connect."""
+
+    def __init__(
+        self,
+        store: Optional[CircuitBreakerStore] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        key_secret: Optional[bytes] = None,
+    ) -> None:
+        """Initialize the circuit breaker.
+
+        Args:
+            store (CircuitBreakerStore, optional): Backing store, defaults to a
+                LocalCircuitBreakerStore.
+            failure_threshold (int): Failed connection attempts in a row that
+                open the circuit of a target.
+            reset_timeout (float): Seconds a circuit stays open before a trial
+                connect is let through. A trial that does not report back
+                within that time is given up on and another one is let through.
+            key_secret (bytes, optional): Key of the HMAC of the connection
+                configuration in circuit keys, which end up in the store, the
+                logs and get_info (see connection_fingerprint).
+        """
+        self.store = store or LocalCircuitBreakerStore()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.key_secret = key_secret
+        self._logger = logging.getLogger("pangolin.connection.breaker")
+
+    def attach(self, connection: BaseConnection) -> BaseConnection:
+        """Guard the connects of a connection with the circuit of its target.
+
+        Args:
+            connection (BaseConnection): Connection to guard.
+
+        Returns:
+            BaseConnection: The connection.
+        """
+        connection.circuit_breaker = CircuitGuard(
+            self, connection_fingerprint(connection, self.key_secret)
+        )
+        return connection
+
+    def allow(self, key: str) -> bool:
+        """Check whether a connection attempt to a target may go through.
+
+        Args:
+            key (str): Circuit key of the target.
+
+        Returns:
+            bool: False while the circuit is open.
+        """
+        now = self.store.now()
+        allowed = False
+
+        def change(record: Record) -> bool:
+            nonlocal allowed
+            state = CircuitState(record["state"])
+            if state == CircuitState.CLOSED:
+                allowed = True
+                return False
+            if state == CircuitState.OPEN:
+                allowed = now - record["opened_at"] >= self.reset_timeout
+            else:
+                # Half-open: only one trial at a time
+                allowed = now - record["trial_started_at"] >= self.reset_timeout
+            if allowed:
+                record["state"] = CircuitState.HALF_OPEN.value
+                record["trial_started_at"] = now
+            else:
+                record["rejected"] += 1
+            return True
+
+        self.store.update(key, change)
+        return allowed
+
+    def record_success(self, key: str) -> None:
+        """Close the circuit of a target after a successful connection attempt.
+
+        Args:
+            key (str): Circuit key of the target.
+        """
+
+        def change(record: Record) -> bool:
+            if record["state"] == CircuitState.CLOSED.value and not record["failures"]:
+                return False
+            if record["state"] != CircuitState.CLOSED.value:
+                self._logger.info("Circuit of %s closed", key)
+            record.update(
+                state=CircuitState.CLOSED.value,
+                failures=0,
+                opened_at=None,
+                trial_started_at=None,
+            )
+            return True
+
+        self.store.update(key, change)
+
+    def record_failure(self, key: str) -> None:
+        """Count a failed connection attempt, opening the circuit if needed.
+
+        Args:
+            key (str): Circuit key of the target.
+        """
+        now = self.store.now()
+
+        def change(record: Record) -> bool:
+            record["failures"] += 1
+            if record["state"] == CircuitState.HALF_OPEN.value or (
+                record["state"] == CircuitState.CLOSED.value
+                and record["failures"] >= self.failure_threshold
+            ):
+                record.update(
+                    state=CircuitState.OPEN.value,
+                    opened_at=now,
+                    trial_started_at=None,
+                    times_opened=record["times_opened"] + 1,
+                )
+                self._logger.warning(
+                    "Circuit of %s opened after %d failed connection attempts",
+                    key,
+                    record["failures"],
+                )
+            return True
+
+        self.store.update(key, change)
+
+    def get_info(self) -> Dict[str, Dict[str, Any]]:
+        """Get the state and counters of every known circuit.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Circuit key -> state, failures in a row,
+            opening time, number of times opened and of rejected connects.
+        """
+        return self.store.records()
+
+
+def describe_circuit_key(key: str) -> Dict[str, str]:
+    """Split a circuit key into the parts that identify its target.
+
+    Args:
+        key (str): Circuit key, a connection fingerprint.
+
+    Returns:
+        Dict[str, str]: Connection type, host:port target and an opaque ID
+        telling apart the circuits of different configurations of a target.
+    """
+    target, _, config_hash = key.rpartition(":")
+    connection_type, _, host_port = target.partition(":")
+    return {
+        "id": config_hash[:16],
+        "connection_type": connection_type,
+        "target": host_port,
+    }
+
+
+class CircuitGuard:
+    """The circuit of one target, as seen by the connections to it."""
+
+    __slots__ = ("breaker", "key")
+
+    def __init__(self, breaker: CircuitBreaker, key: str) -> None:
+        self.breaker = breaker
+        self.key = key
+
+    def allow(self) -> bool:
+        return self.breaker.allow(self.key)
+
+    def record_success(self) -> None:
+        self.breaker.record_success(self.key)
+
+    def record_failure(self) -> None:
+        self.breaker.record_failure(self.key)
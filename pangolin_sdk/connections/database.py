@@ -1,7 +1,10 @@
 """Simple Database Connection Implementation for Pangolin SDK."""
 
+import math
 from collections import OrderedDict
-from typing import Any, Dict, List, Optional, Tuple, Union
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from urllib.parse import quote_plus
 
 from sqlalchemy import create_engine, text
@@ -10,8 +13,27 @@ from sqlalchemy.orm import sessionmaker
 
 from pangolin_sdk.configs.database import DatabaseConnectionConfig
 from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.connections.results import ColumnarResult, RowStream
+from pangolin_sdk.constants import DatabaseType
 from pangolin_sdk.exceptions import DatabaseConnectionError, DatabaseQueryError
 
+# Rows fetched per round trip when a query result is streamed
+DEFAULT_STREAM_BATCH_SIZE = 1000
+
+# Statement bounding the run time of the queries that follow, in milliseconds
+STATEMENT_TIMEOUT_SQL = {
+    DatabaseType.POSTGRESQL: "SET LOCAL statement_timeout = {milliseconds}",
+    DatabaseType.MYSQL: "SET SESSION max_execution_time = {milliseconds}",
+}
+
+# Statement restoring the timeout once the query is done, for timeouts that
+# would otherwise outlive it on the pooled connection. SET LOCAL ends with
+# the transaction.
+STATEMENT_TIMEOUT_RESET_SQL = {
+    DatabaseType.MYSQL: "SET SESSION max_execution_time = DEFAULT",
+}
+
 
 class DatabaseConnection(BaseConnection[Tuple[Any, Any]]):
     """Simple database connection implementation."""
@@ -109,13 +131,19 @@ class DatabaseConnection(BaseConnection[Tuple[Any, Any]]):
         """
         try:
             # Get connection string
-            connect_args = {}
+            connect_args = dict(self.config.options)
+            for key in ("connect_timeout", "timeout"):
+                if key in connect_args:
+                    # Drivers take whole seconds, and 0 means no timeout
+                    connect_args[key] = max(
+                        1, math.ceil(self._timeout(connect_args[key]))
+                    )
             self._encode_credentials()
             connection_string = self._get_connection_string()
             self._engine = create_engine(
                 connection_string,
                 echo=self.config.options["echo"],
-                connect_args=self.config.options,
+                connect_args=connect_args,
             )
             with self._engine.connect() as connection:
                 connection.execute(text("SELECT 1"))
@@ -130,6 +158,55 @@ class DatabaseConnection(BaseConnection[Tuple[Any, Any]]):
             )
             raise error
 
+    @contextmanager
+    def _statement_timeout(
+        self, connection: Any, deadline: Optional[Deadline]
+    ) -> Iterator[None]:
+        """Make the server cancel the queries run within once the deadline passes.
+
+        Args:
+            connection: Connection (or session) the queries run on.
+            deadline (Deadline, optional): Deadline of the queries.
+        """
+        statement = STATEMENT_TIMEOUT_SQL.get(self.config.database_type)
+        timeout = None
+        if deadline is not None and statement is not None:
+            timeout = deadline.timeout()
+        if timeout is None:
+            yield
+            return
+
+        milliseconds = max(1, math.ceil(timeout * 1000))
+        connection.execute(text(statement.format(milliseconds=milliseconds)))
+        try:
+            yield
+        finally:
+            reset = STATEMENT_TIMEOUT_RESET_SQL.get(self.config.database_type)
+            if reset is not None:
+                connection.execute(text(reset))
+
+    @contextmanager
+    def _streaming(
+        self, connection: Any, deadline: Optional[Deadline]
+    ) -> Iterator[None]:
+        """Run a streamed query under the limits of a direct execution.
+
+        The stream opens a connection of its own each time it is consumed,
+        so the rate limits, deadline and statement timeout apply then, for
+        as long as its rows are fetched. The deadline is the one of the
+        execution that returned the stream, as the stream may be consumed
+        once the connection works for another caller.
+
+        Args:
+            connection: Dedicated connection of the stream.
+            deadline (Deadline, optional): Deadline of the execution.
+        """
+        with self._rate_limited():
+            if deadline is not None:
+                deadline.check("execution")
+            with self._statement_timeout(connection, deadline):
+                yield
+
     def _execute_impl(self, *args, **kwargs) -> List[OrderedDict[str, Any]]:
         """
         Execute a query and return results as a list of ordered dictionaries.
@@ -137,16 +214,22 @@ class DatabaseConnection(BaseConnection[Tuple[Any, Any]]):
         Parameters:
             sql (str): The SQL query to execute.
             params (dict, optional): Optional parameters to pass to the query.
+            stream (bool, optional): Return a RowStream that fetches the rows in
+                batches with a server-side cursor instead of loading them all.
+            batch_size (int, optional): Rows fetched per batch when streaming.
+            columnar (bool, optional): Return a ColumnarResult holding one
+                array per column instead of a list of rows.
 
         Returns:
-            List[OrderedDict]: A list of rows as ordered dictionaries with column names as keys.
+            List[OrderedDict]: A list of rows as ordered dictionaries with column names as keys,
+                a RowStream over them when streaming, or a ColumnarResult.
 
         Raises:
             DatabaseQueryError: If the query execution fails.
         """
         try:
             # Log the query
-            sql = args[0]
+            sql = kwargs.get("sql", args[0] if args else None)
             params = kwargs.get("params")
             if self._session is None:
                 self.connect()
@@ -154,29 +237,61 @@ class DatabaseConnection(BaseConnection[Tuple[Any, Any]]):
             if params:
                 self._logger.info(f"With parameters: {params}")
 
-            # Execute query
-            result = self._session.execute(text(sql), params)
-
-            # Check if the result returns rows
-            if result.returns_rows:
-                # Convert the result to a list of OrderedDicts
-                rows_as_ordered_dicts = [
-                    dict(zip(result.keys(), row)) for row in result.fetchall()
-                ]
-                # Log success
-                self._logger.info(
-                    f"Query executed successfully, {len(rows_as_ordered_dicts)} rows returned."
+            if kwargs.get("stream"):
+                # The query runs lazily, each time the stream is consumed
+                return RowStream(
+                    self._engine,
+                    sql,
+                    params,
+                    batch_size=kwargs.get("batch_size", DEFAULT_STREAM_BATCH_SIZE),
+                    prepare=partial(self._streaming, deadline=self.deadline),
                 )
-                return rows_as_ordered_dicts
-            else:
+
+            # Execute query, fetching its rows before the timeout is lifted
+            with self._statement_timeout(self._session, self.deadline):
+                result = self._session.execute(text(sql), params)
+                if not result.returns_rows:
+                    rows = None
+                elif kwargs.get("columnar"):
+                    rows = ColumnarResult.from_rows(list(result.keys()), result)
+                else:
+                    # Convert the result to a list of OrderedDicts
+                    keys = list(result.keys())
+                    rows = [dict(zip(keys, row)) for row in result]
+
+            if rows is None:
                 # Log success for commands that do not return rows
                 self._logger.info("Query executed successfully, no rows returned.")
                 return []
+            self._logger.info(
+                f"Query executed successfully, {len(rows)} rows returned."
+            )
+            return rows
         except Exception as e:
             raise DatabaseQueryError(
-                message=str(e), query=args[0], params=kwargs.get("params")
+                message=str(e),
+                query=kwargs.get("sql", args[0] if args else None),
+                params=kwargs.get("params"),
             )
 
+    def is_healthy(self) -> bool:
+        """Check the database is still reachable with a lightweight query."""
+        if not super().is_healthy() or self._session is None:
+            return False
+        try:
+            self._session.execute(text("SELECT 1"))
+            return True
+        except SQLAlchemyError as e:
+            self._logger.warning(f"Database health check failed: {e}")
+            self._session.rollback()
+            return False
+
+    def reset(self) -> None:
+        """Clear results and end any transaction left open by the last caller."""
+        super().reset()
+        if self._session is not None:
+            self._session.rollback()
+
     def _disconnect_impl(self):
         """Close database connection."""
         if self._engine:
@@ -0,0 +1,97 @@
+"""Deadline Module for Pangolin SDK.
+
+This module provides the deadline an operation must finish by. A deadline is
+created for a whole run and handed down to the connections it uses, which
+shorten their connect, retry and execution timeouts so that no call outlives
+it. Deadlines are absolute wall-clock times, so they can be passed on to
+other processes.
+"""
+
+import time
+from typing import Optional
+
+from pangolin_sdk.exceptions import DeadlineExceededError
+
+
+class Deadline:
+    """Point in time by which an operation must be done."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: Optional[float] = None) -> None:
+        """Initialize the deadline.
+
+        Args:
+            expires_at (float, optional): Epoch timestamp of the deadline,
+                None for no deadline.
+        """
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: Optional[float]) -> "Deadline":
+        """Create a deadline ``seconds`` from now, no deadline if None."""
+        return cls(None if seconds is None else time.time() + seconds)
+
+    def shorten(self, seconds: Optional[float]) -> "Deadline":
+        """Get the earliest of this deadline and ``seconds`` from now.
+
+        Args:
+            seconds (float, optional): Budget of a part of the operation,
+                such as one step of a run. None keeps this deadline.
+
+        Returns:
+            Deadline: The shortened deadline.
+        """
+        if seconds is None:
+            return self
+        other = time.time() + seconds
+        if self.expires_at is None or other < self.expires_at:
+            return Deadline(other)
+        return self
+
+    def remaining(self) -> Optional[float]:
+        """Get the seconds left before the deadline, None without deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Get the timeout of a call, so that it ends by the deadline.
+
+        Args:
+            default (float, optional): Timeout of the call without deadline.
+
+        Returns:
+            Optional[float]: The shortest of ``default`` and the time left,
+            None if neither limits the call.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+        """
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return remaining if default is None else min(default, remaining)
+
+    def check(self, operation: str = "operation") -> None:
+        """Fail if the deadline has passed.
+
+        Args:
+            operation (str): What was running, for the error message.
+
+        Raises:
+            DeadlineExceededError: If the deadline has passed.
+        """
+        if self.expired:
+            raise DeadlineExceededError(
+                message=f"Deadline exceeded, {operation} timed out",
+                details={"expires_at": self.expires_at},
+            )
+
+    def __repr__(self) -> str:
+        return f"Deadline(expires_at={self.expires_at!r})"
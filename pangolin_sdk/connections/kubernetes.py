@@ -224,6 +224,7 @@ class KubernetesConnection(BaseConnection[ApiClient]):
 
             # Build arguments
             method_args = self._build_method_args(action, namespace, name, body)
+            method_args["_request_timeout"] = self._timeout(self.config.timeout)
 
             # Execute the method
             result = method(**method_args)
@@ -0,0 +1,367 @@
+"""Connection Pool Module for Pangolin SDK.
+
+This module provides a process-wide pool of established connections, so that
+callers targeting the same service lease an already connected instance
+instead of paying the connection setup cost again.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Dict, Iterator, List, Optional
+
+from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import ConnectionPoolTimeoutError
+
+# Settings of a connection chosen by the caller rather than by its target.
+# They are not part of the fingerprint, so a leased connection takes them
+# from the candidate of the caller.
+CALLER_SETTINGS = (
+    "rate_limiter",
+    "deadline",
+    "circuit_breaker",
+    "supports_batch_execution",
+    "max_channels",
+    "max_in_flight",
+)
+
+
+def connection_fingerprint(
+    connection: BaseConnection, secret: Optional[bytes] = None
+) -> str:
+    """Build a normalized fingerprint of the target a connection points to.
+
+    Two connections with the same fingerprint are interchangeable. The
+    fingerprint is made of the connection type, host and port plus a hash of
+    every other configuration value (credentials, database, options...). The
+    configuration name is ignored, as it is unique per caller.
+
+    Args:
+        connection (BaseConnection): Connection to fingerprint.
+        secret (bytes, optional): Key of an HMAC used as the hash, for
+            fingerprints stored or shown outside the process. A plain hash of
+            the configuration lets anyone test guesses of the credentials.
+
+    Returns:
+        str: Fingerprint of the connection target.
+    """
+    values = {
+        config_field.name: getattr(connection.config, config_field.name)
+        for config_field in fields(connection.config)
+        if config_field.name != "name"
+    }
+    host = values.pop("host", None)
+    port = values.pop("port", None)
+    payload = json.dumps(values, sort_keys=True, default=str).encode("utf-8")
+    if secret is None:
+        credentials_hash = hashlib.sha256(payload).hexdigest()
+    else:
+        credentials_hash = hmac.new(secret, payload, hashlib.sha256).hexdigest()
+    return f"{type(connection).__name__}:{host}:{port}:{credentials_hash}"
+
+
+def connection_host_key(connection: BaseConnection) -> str:
+    """Build the key used to cap the number of connections per host.
+
+    Args:
+        connection (BaseConnection): Connection to build the key for.
+
+    Returns:
+        str: Host key of the connection target.
+    """
+    return f"{connection.config.host}:{getattr(connection.config, 'port', None)}"
+
+
+@dataclass
+class PooledConnection:
+    """A connection owned by the pool."""
+
+    connection: BaseConnection
+    fingerprint: str
+    host_key: str
+    created_at: float
+    last_used_at: float
+    lease_count: int = 0
+
+
+@dataclass
+class ConnectionPoolStats:
+    """Counters describing how the pool has been used."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    failed_health_checks: int = 0
+    timeouts: int = 0
+
+
+class ConnectionPool:
+    """Thread-safe pool of connections keyed on their target fingerprint.
+
+    Connections are health checked when they are checked out, evicted once
+    they have been idle for longer than ``idle_ttl`` seconds, and at most
+    ``max_per_host`` connections (idle or leased) are kept open per host.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 4,
+        idle_ttl: float = 300.0,
+        checkout_timeout: float = 60.0,
+    ) -> None:
+        """Initialize the connection pool.
+
+        Args:
+            max_per_host (int): Maximum number of open connections per host.
+            idle_ttl (float): Seconds after which an idle connection is closed.
+            checkout_timeout (float): Seconds to wait for a free slot on a host.
+        """
+        self.max_per_host = max_per_host
+        self.idle_ttl = idle_ttl
+        self.checkout_timeout = checkout_timeout
+        self.stats = ConnectionPoolStats()
+        self._idle: Dict[str, List[PooledConnection]] = {}
+        self._open_per_host: Dict[str, int] = {}
+        self._condition = threading.Condition()
+        self._logger = logging.getLogger("pangolin.connection.pool")
+
+    @contextmanager
+    def lease(self, connection: BaseConnection) -> Iterator[BaseConnection]:
+        """Lease a connected instance for the target of ``connection``.
+
+        If an idle, healthy connection with the same fingerprint exists it is
+        handed out in place of ``connection``, with the CALLER_SETTINGS of
+        ``connection`` (rate limiter, deadline, circuit breaker and batch
+        settings), and ``connection`` is dropped unused. Otherwise
+        ``connection`` is connected and becomes part of the pool. Callers
+        must check the status of the leased connection, as a connection that
+        failed to connect is handed out as well.
+
+        Args:
+            connection (BaseConnection): Unconnected candidate connection.
+
+        Yields:
+            BaseConnection: The leased connection.
+
+        Raises:
+            ConnectionPoolTimeoutError: If no slot frees up on the host in time.
+        """
+        pooled = self.acquire(connection)
+        try:
+            yield pooled.connection
+        finally:
+            self.release(pooled)
+
+    def acquire(self, connection: BaseConnection) -> PooledConnection:
+        """Check a connection out of the pool.
+
+        Args:
+            connection (BaseConnection): Unconnected candidate connection.
+
+        Returns:
+            PooledConnection: The checked out connection.
+
+        Raises:
+            ConnectionPoolTimeoutError: If no slot frees up on the host in time.
+        """
+        fingerprint = connection_fingerprint(connection)
+        host_key = connection_host_key(connection)
+        deadline = time.monotonic() + self.checkout_timeout
+
+        while True:
+            pooled = None
+            expired: List[PooledConnection] = []
+            with self._condition:
+                expired.extend(self._pop_expired())
+                idle = self._idle.get(fingerprint)
+                if idle:
+                    pooled = idle.pop()
+                elif self._open_per_host.get(host_key, 0) < self.max_per_host:
+                    self._open_per_host[host_key] = (
+                        self._open_per_host.get(host_key, 0) + 1
+                    )
+                else:
+                    # Free the slot of an idle connection to another target on this host
+                    victim = self._pop_idle_for_host(host_key)
+                    if victim is None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats.timeouts += 1
+                            raise ConnectionPoolTimeoutError(
+                                message=f"Timed out waiting for a connection slot on {host_key}",
+                                details={"max_per_host": self.max_per_host},
+                            )
+                        self._condition.wait(remaining)
+                        continue
+                    self.stats.evictions += 1
+                    expired.append(victim)
+
+            self._close(expired)
+
+            if pooled is None:
+                self.stats.misses += 1
+                try:
+                    connection.connect()
+                except BaseException:
+                    with self._condition:
+                        self._decrement_host(host_key)
+                        self._condition.notify_all()
+                    raise
+                now = time.monotonic()
+                return PooledConnection(
+                    connection=connection,
+                    fingerprint=fingerprint,
+                    host_key=host_key,
+                    created_at=now,
+                    last_used_at=now,
+                    lease_count=1,
+                )
+
+            if self._is_healthy(pooled.connection):
+                self.stats.hits += 1
+                pooled.lease_count += 1
+                pooled.last_used_at = time.monotonic()
+                # The limits, deadline and batch settings of the caller
+                # apply to the connection it leases
+                for name in CALLER_SETTINGS:
+                    if hasattr(connection, name):
+                        setattr(pooled.connection, name, getattr(connection, name))
+                return pooled
+
+            self.stats.failed_health_checks += 1
+            self._discard(pooled)
+
+    def release(self, pooled: PooledConnection) -> None:
+        """Return a leased connection to the pool.
+
+        Connections that are no longer connected are closed instead.
+
+        Args:
+            pooled (PooledConnection): Connection to return.
+        """
+        connection = pooled.connection
+        if connection.get_status() != ConnectionStatus.CONNECTED:
+            self._discard(pooled)
+            return
+
+        try:
+            connection.reset()
+        except Exception as e:
+            self._logger.warning("Failed to reset pooled connection: %s", str(e))
+            self._discard(pooled)
+            return
+
+        pooled.last_used_at = time.monotonic()
+        with self._condition:
+            self._idle.setdefault(pooled.fingerprint, []).append(pooled)
+            self._condition.notify_all()
+
+    def evict_idle(self) -> int:
+        """Close every connection that has been idle for longer than the TTL.
+
+        Returns:
+            int: Number of closed connections.
+        """
+        with self._condition:
+            expired = self._pop_expired()
+        self._close(expired)
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Close every idle connection of the pool."""
+        with self._condition:
+            idle = [pooled for entries in self._idle.values() for pooled in entries]
+            for pooled in idle:
+                self._decrement_host(pooled.host_key)
+            self._idle.clear()
+            self._condition.notify_all()
+        self._close(idle)
+
+    def get_info(self) -> Dict[str, object]:
+        """Get pool usage information.
+
+        Returns:
+            Dict[str, object]: Pool counters and open connections per host.
+        """
+        with self._condition:
+            return {
+                "idle": sum(len(entries) for entries in self._idle.values()),
+                "open_per_host": dict(self._open_per_host),
+                "hits": self.stats.hits,
+                "misses": self.stats.misses,
+                "evictions": self.stats.evictions,
+                "failed_health_checks": self.stats.failed_health_checks,
+                "timeouts": self.stats.timeouts,
+            }
+
+    def _is_healthy(self, connection: BaseConnection) -> bool:
+        """Run the health check of a connection, treating errors as unhealthy."""
+        try:
+            return connection.is_healthy()
+        except Exception as e:
+            self._logger.warning("Pooled connection health check failed: %s", str(e))
+            return False
+
+    def _pop_expired(self) -> List[PooledConnection]:
+        """Remove idle connections past their TTL. Must hold the lock."""
+        now = time.monotonic()
+        expired = []
+        for fingerprint, entries in list(self._idle.items()):
+            alive = [e for e in entries if now - e.last_used_at < self.idle_ttl]
+            expired.extend(e for e in entries if now - e.last_used_at >= self.idle_ttl)
+            if alive:
+                self._idle[fingerprint] = alive
+            else:
+                del self._idle[fingerprint]
+        for pooled in expired:
+            self._decrement_host(pooled.host_key)
+        self.stats.evictions += len(expired)
+        return expired
+
+    def _pop_idle_for_host(self, host_key: str) -> Optional[PooledConnection]:
+        """Remove the least recently used idle connection of a host. Must hold the lock.
+
+        The host slot of the removed connection is kept for the caller.
+        """
+        candidates = [
+            (pooled.last_used_at, fingerprint, index)
+            for fingerprint, entries in self._idle.items()
+            for index, pooled in enumerate(entries)
+            if pooled.host_key == host_key
+        ]
+        if not candidates:
+            return None
+        _, fingerprint, index = min(candidates)
+        pooled = self._idle[fingerprint].pop(index)
+        if not self._idle[fingerprint]:
+            del self._idle[fingerprint]
+        return pooled
+
+    def _decrement_host(self, host_key: str) -> None:
+        """Release the slot of a host. Must hold the lock."""
+        remaining = self._open_per_host.get(host_key, 0) - 1
+        if remaining > 0:
+            self._open_per_host[host_key] = remaining
+        else:
+            self._open_per_host.pop(host_key, None)
+
+    def _discard(self, pooled: PooledConnection) -> None:
+        """Close a connection that left the pool and release its host slot."""
+        with self._condition:
+            self._decrement_host(pooled.host_key)
+            self._condition.notify_all()
+        self._close([pooled])
+
+    def _close(self, entries: List[PooledConnection]) -> None:
+        """Disconnect connections outside of the pool lock."""
+        for pooled in entries:
+            try:
+                pooled.connection.disconnect()
+            except Exception as e:
+                self._logger.warning("Error closing pooled connection: %s", str(e))
@@ -0,0 +1,381 @@
+"""Rate Limiting Module for Pangolin SDK.
+
+This module limits how hard connections hit the services they target. A
+token bucket caps the rate of operations (connection attempts and
+executions) and a semaphore caps how many of them run at once. Limits are
+keyed by target host, so every connection to a host shares them. With a
+shared store, they also hold across worker processes and machines.
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import redis
+from redis.exceptions import WatchError
+
+from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.connections.pool import connection_host_key
+from pangolin_sdk.exceptions import RateLimitTimeoutError
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """Limits applied to the operations on a target.
+
+    Attributes:
+        rate (float, optional): Operations started per second, unlimited if None.
+        burst (int, optional): Operations that may start at once after an idle
+            period, defaults to the rate rounded up.
+        max_concurrent (int, optional): Operations running at once, unlimited if None.
+        per_connection_type (bool): Keep separate limits for each connection
+            type on a host, instead of one set of limits for the whole host.
+    """
+
+    rate: Optional[float] = None
+    burst: Optional[int] = None
+    max_concurrent: Optional[int] = None
+    per_connection_type: bool = False
+
+    def __post_init__(self) -> None:
+        for name in ("rate", "burst", "max_concurrent"):
+            value = getattr(self, name)
+            if value is not None and value <= 0:
+                raise ValueError(f"Rate limit {name} must be positive, got {value}")
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional["RateLimit"]:
+        """Build limits from a configuration mapping.
+
+        Args:
+            data (Dict[str, Any], optional): Mapping with any of the attributes.
+
+        Returns:
+            Optional[RateLimit]: The limits, None if no limit is configured.
+
+        Raises:
+            ValueError: If the mapping has unknown keys or invalid values.
+        """
+        if not data:
+            return None
+        known = {field.name for field in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(
+                f"Unknown rate limit settings: {', '.join(sorted(unknown))}"
+            )
+        rate_limit = cls(**data)
+        return rate_limit if rate_limit.enabled else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate is not None or self.max_concurrent is not None
+
+    @property
+    def capacity(self) -> int:
+        """Size of the token bucket."""
+        return self.burst or max(1, math.ceil(self.rate or 1))
+
+
+def rate_limit_key(
+    connection: BaseConnection, per_connection_type: bool = False
+) -> str:
+    """Build the key the limits of a connection are shared under.
+
+    Args:
+        connection (BaseConnection): Connection to build the key for.
+        per_connection_type (bool): Include the connection type in the key.
+
+    Returns:
+        str: Rate limit key of the connection target.
+    """
+    host_key = connection_host_key(connection)
+    if per_connection_type:
+        return f"{type(connection).__name__}:{host_key}"
+    return host_key
+
+
+class RateLimitStore(ABC):
+    """Backing store of the token buckets and semaphores."""
+
+    @abstractmethod
+    def take_tokens(self, key: str, rate: float, capacity: int, cost: int) -> float:
+        """Take tokens from a bucket if it holds enough of them.
+
+        Args:
+            key (str): Bucket key.
+            rate (float): Tokens added to the bucket per second.
+            capacity (int): Maximum number of tokens in the bucket.
+            cost (int): Number of tokens to take, at most the capacity.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of
+            seconds until the bucket holds enough tokens.
+        """
+
+    @abstractmethod
+    def acquire_slot(self, key: str, limit: int, holder: str, ttl: float) -> bool:
+        """Take a slot of a semaphore if one is free.
+
+        Args:
+            key (str): Semaphore key.
+            limit (int): Number of slots of the semaphore.
+            holder (str): Unique identifier of the slot holder.
+            ttl (float): Seconds after which the slot is freed if the holder
+                never releases it, such as when its process dies.
+
+        Returns:
+            bool: Whether the slot was taken.
+        """
+
+    @abstractmethod
+    def release_slot(self, key: str, holder: str) -> None:
+        """Free the slot of a holder.
+
+        Args:
+            key (str): Semaphore key.
+            holder (str): Identifier the slot was acquired with.
+        """
+
+
+def _refill(
+    tokens: float, updated_at: float, now: float, rate: float, capacity: int
+) -> float:
+    """Number of tokens in a bucket after refilling it up to now."""
+    return min(capacity, tokens + max(0.0, now - updated_at) * rate)
+
+
+class LocalRateLimitStore(RateLimitStore):
+    """Store keeping the limits in memory, shared by the threads of a process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._slots: Dict[str, Dict[str, float]] = {}
+
+    def take_tokens(self, key: str, rate: float, capacity: int, cost: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated_at, now, rate, capacity)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (cost - tokens) / rate
+
+    def acquire_slot(self, key: str, limit: int, holder: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            slots = {
+                other: expires_at
+                for other, expires_at in self._slots.get(key, {}).items()
+                if expires_at > now
+            }
+            if len(slots) >= limit:
+                self._slots[key] = slots
+                return False
+            slots[holder] = now + ttl
+            self._slots[key] = slots
+            return True
+
+    def release_slot(self, key: str, holder: str) -> None:
+        with self._lock:
+            self._slots.get(key, {}).pop(holder, None)
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Store keeping the limits in Redis, shared by every process using it.
+
+    Only plain Redis commands and transactions are used, so the store works
+    against any Redis compatible server or client stand-in. Times come from
+    the Redis server clock, so that the clocks of the workers do not matter.
+    """
+
+    def __init__(self, client: Any, prefix: str = "pangolin:ratelimit:") -> None:
+        """Initialize the store.
+
+        Args:
+            client: Redis client, such as a redis.Redis instance.
+            prefix (str): Prefix of the keys written by the store.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisRateLimitStore":
+        """Create a store connected to the Redis server at ``url``."""
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def _now(self) -> float:
+        seconds, microseconds = self.client.time()
+        return seconds + microseconds / 1_000_000
+
+    def take_tokens(self, key: str, rate: float, capacity: int, cost: int) -> float:
+        bucket_key = f"{self.prefix}bucket:{key}"
+        # A bucket left alone for that long is full again, it can be dropped
+        ttl = max(1, math.ceil(capacity / rate))
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(bucket_key)
+                    now = self._now()
+                    stored_tokens, stored_at = pipe.hmget(
+                        bucket_key, "tokens", "updated_at"
+                    )
+                    tokens = (
+                        _refill(
+                            float(stored_tokens), float(stored_at), now, rate, capacity
+                        )
+                        if stored_tokens is not None
+                        else capacity
+                    )
+                    wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+                    if not wait:
+                        tokens -= cost
+                    pipe.multi()
+                    pipe.hset(bucket_key, mapping={"tokens": tokens, "updated_at": now})
+                    pipe.expire(bucket_key, ttl)
+                    pipe.execute()
+                    return wait
+                except WatchError:
+                    # Another process used the bucket meanwhile, try again
+                    continue
+
+    def acquire_slot(self, key: str, limit: int, holder: str, ttl: float) -> bool:
+        slots_key = f"{self.prefix}slots:{key}"
+        now = self._now()
+        with self.client.pipeline() as pipe:
+            pipe.zremrangebyscore(slots_key, "-inf", now)
+            pipe.zadd(slots_key, {holder: now + ttl})
+            pipe.zcard(slots_key)
+            pipe.expire(slots_key, math.ceil(ttl))
+            taken = pipe.execute()[2]
+        if taken > limit:
+            self.client.zrem(slots_key, holder)
+            return False
+        return True
+
+    def release_slot(self, key: str, holder: str) -> None:
+        self.client.zrem(f"{self.prefix}slots:{key}", holder)
+
+
+class RateLimiter:
+    """Enforces rate limits on connections, using a RateLimitStore."""
+
+    def __init__(
+        self,
+        store: Optional[RateLimitStore] = None,
+        timeout: float = 60.0,
+        slot_ttl: float = 600.0,
+        poll_interval: float = 0.05,
+    ) -> None:
+        """Initialize the rate limiter.
+
+        Args:
+            store (RateLimitStore, optional): Backing store, defaults to a
+                LocalRateLimitStore.
+            timeout (float): Seconds to wait for the limits to allow an operation.
+            slot_ttl (float): Seconds after which a concurrency slot that was
+                never released is freed.
+            poll_interval (float): Seconds between two attempts at a full semaphore.
+        """
+        self.store = store or LocalRateLimitStore()
+        self.timeout = timeout
+        self.slot_ttl = slot_ttl
+        self.poll_interval = poll_interval
+        self._logger = logging.getLogger("pangolin.connection.ratelimit")
+
+    def attach(
+        self, connection: BaseConnection, rate_limit: Optional[RateLimit]
+    ) -> BaseConnection:
+        """Enforce limits on the connects and executions of a connection.
+
+        Args:
+            connection (BaseConnection): Connection to limit.
+            rate_limit (RateLimit, optional): Limits to apply, None to remove them.
+
+        Returns:
+            BaseConnection: The connection.
+        """
+        if rate_limit is None:
+            connection.rate_limiter = None
+            return connection
+        key = rate_limit_key(connection, rate_limit.per_connection_type)
+        connection.rate_limiter = lambda cost=1: self.limit(key, rate_limit, cost)
+        return connection
+
+    @contextmanager
+    def limit(
+        self, key: str, rate_limit: RateLimit, cost: int = 1
+    ) -> Iterator[Optional[int]]:
+        """Wait until the limits of a key allow an operation, for its duration.
+
+        A batch pays one token per operation, taking them in chunks of at
+        most the bucket capacity. It holds one concurrency slot per operation
+        it may run at once: one slot is waited for, more are taken only if
+        they are free.
+
+        Args:
+            key (str): Rate limit key of the target.
+            rate_limit (RateLimit): Limits of the target.
+            cost (int): Number of operations, such as the requests of a batch.
+
+        Yields:
+            Optional[int]: Number of operations that may run at once, None
+            without concurrency limit.
+
+        Raises:
+            RateLimitTimeoutError: If the limits do not allow the operation in time.
+        """
+        deadline = time.monotonic() + self.timeout
+        holders = []
+        if rate_limit.max_concurrent is not None:
+            holder = str(uuid.uuid4())
+            while not self.store.acquire_slot(
+                key, rate_limit.max_concurrent, holder, self.slot_ttl
+            ):
+                # Jitter keeps the waiting workers from retrying in lockstep
+                self._sleep(deadline, key, self.poll_interval * (0.5 + random.random()))
+            holders.append(holder)
+            # Waiting for more would let batches hold slots waiting on each other
+            while len(holders) < min(cost, rate_limit.max_concurrent):
+                holder = str(uuid.uuid4())
+                if not self.store.acquire_slot(
+                    key, rate_limit.max_concurrent, holder, self.slot_ttl
+                ):
+                    break
+                holders.append(holder)
+
+        try:
+            if rate_limit.rate is not None:
+                unpaid = cost
+                while unpaid > 0:
+                    chunk = min(unpaid, rate_limit.capacity)
+                    wait = self.store.take_tokens(
+                        key, rate_limit.rate, rate_limit.capacity, chunk
+                    )
+                    if wait:
+                        self._sleep(deadline, key, wait)
+                        continue
+                    unpaid -= chunk
+            yield len(holders) if holders else None
+        finally:
+            for holder in holders:
+                self.store.release_slot(key, holder)
+
+    def _sleep(self, deadline: float, key: str, seconds: float) -> None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RateLimitTimeoutError(
+                message=f"Timed out waiting for the rate limit of {key}",
+                details={"timeout": self.timeout},
+            )
+        time.sleep(min(seconds, remaining))
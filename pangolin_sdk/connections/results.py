@@ -0,0 +1,377 @@
+"""Result Types Module for Pangolin SDK.
+
+This module provides result containers returned by connections when a caller
+asks for something other than a fully materialized list of rows.
+"""
+
+import queue
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+)
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from pangolin_sdk.exceptions import BaseConnectionError, DatabaseQueryError
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, columns fall back to typed arrays
+    np = None
+
+T = TypeVar("T")
+
+# Marks the end of a shared pass over a stream
+_END = object()
+
+
+class RowStream:
+    """Re-iterable stream over the rows of a query.
+
+    Rows are fetched through a server-side cursor in batches of ``batch_size``
+    and converted to dictionaries one batch at a time, so the full result set
+    is never held in memory. The query runs when the stream is iterated, and
+    every new iteration runs it again; consumers that only need part of the
+    result (e.g. the first matching row) stop the query early. Several
+    consumers of the rows share a single run of the query with ``fan_out``.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        prepare: Optional[Callable[[Connection], ContextManager[None]]] = None,
+    ) -> None:
+        """Initialize the row stream.
+
+        Args:
+            engine (Engine): Engine used to open a dedicated connection.
+            sql (str): The SQL query to execute.
+            params (dict, optional): Parameters to pass to the query.
+            batch_size (int): Number of rows fetched per round trip.
+            prepare (Callable, optional): Called with the dedicated connection
+                each time the query runs, returns the context the query and
+                the fetching of its rows run in (e.g. rate and time limits).
+        """
+        self.engine = engine
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.prepare = prepare
+        self.columns: Optional[List[str]] = None
+        self.row_count: Optional[int] = None
+
+    def iter_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        """Run the query and yield its rows in batches.
+
+        Yields:
+            List[Dict[str, Any]]: Up to ``batch_size`` rows keyed by column name.
+
+        Raises:
+            DatabaseQueryError: If the query or the fetching of its rows fails.
+        """
+        try:
+            with self.engine.connect() as connection, self._prepared(connection):
+                result = connection.execution_options(
+                    stream_results=True, yield_per=self.batch_size
+                ).execute(text(self.sql), self.params)
+
+                if not result.returns_rows:
+                    self.columns = []
+                    self.row_count = 0
+                    return
+
+                keys = list(result.keys())
+                self.columns = keys
+                row_count = 0
+                for partition in result.partitions(self.batch_size):
+                    row_count += len(partition)
+                    yield [dict(zip(keys, row)) for row in partition]
+                # Only a complete pass tells how many rows the query returns
+                self.row_count = row_count
+        except SQLAlchemyError as e:
+            raise DatabaseQueryError(message=str(e), query=self.sql, params=self.params)
+
+    def _prepared(self, connection: Connection) -> ContextManager[None]:
+        """Get the context the query runs in on the dedicated connection."""
+        if self.prepare is None:
+            return nullcontext()
+        return self.prepare(connection)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the rows of the query one at a time."""
+        for batch in self.iter_batches():
+            yield from batch
+
+    def count(self) -> int:
+        """Count the rows of the query, running it if the count is not known yet.
+
+        Returns:
+            int: Number of rows returned by the query.
+        """
+        if self.row_count is None:
+            for _ in self.iter_batches():
+                pass
+        return self.row_count
+
+    def to_columnar(self) -> "ColumnarResult":
+        """Run the query once and keep its rows, column by column.
+
+        Returns:
+            ColumnarResult: Every row of the query.
+        """
+        columns: Dict[str, List[Any]] = {}
+        for batch in self.iter_batches():
+            if not columns:
+                columns = {key: [] for key in self.columns}
+            for key, values in columns.items():
+                values.extend(row[key] for row in batch)
+        if not columns:
+            columns = {key: [] for key in self.columns or []}
+        return ColumnarResult(
+            {key: _build_column(values) for key, values in columns.items()}
+        )
+
+    def fan_out(
+        self, consumers: Sequence[Callable[["RowStream"], T]], max_pending: int = 2
+    ) -> List[T]:
+        """Run the query once and hand its rows to several consumers.
+
+        Each consumer runs on a thread of its own, with a view of the stream.
+        The first pass over a view reads the batches of one shared run of the
+        query, through a queue of at most ``max_pending`` batches, so the rows
+        are neither fetched once per consumer nor all held in memory. A
+        consumer that stops reading early is no longer fed, and the query
+        stops once every consumer has. Later passes over a view run the query
+        again, like any RowStream.
+
+        Args:
+            consumers (Sequence[Callable]): Callables taking the stream.
+            max_pending (int): Batches queued for a consumer before the query
+                waits for it.
+
+        Returns:
+            List: What each consumer returned, in consumer order.
+
+        Raises:
+            Exception: The first error raised by a consumer. Errors of the
+                query are raised in the consumers reading it.
+        """
+        if len(consumers) < 2:
+            return [consumer(self) for consumer in consumers]
+
+        views = [_SharedPassView(self, max_pending) for _ in consumers]
+        with ThreadPoolExecutor(
+            max_workers=len(consumers), thread_name_prefix="row-stream"
+        ) as executor:
+            futures = [
+                executor.submit(consumer, view)
+                for consumer, view in zip(consumers, views)
+            ]
+            readers = list(zip(views, futures))
+            end: Any = _END
+            try:
+                for batch in self.iter_batches():
+                    readers = [
+                        (view, future)
+                        for view, future in readers
+                        if view.put(batch, future)
+                    ]
+                    if not readers:
+                        break
+            except (Exception, BaseConnectionError) as e:
+                end = e
+            finally:
+                # Readers waiting for batches would keep the executor open
+                for view, future in readers:
+                    view.put(end, future)
+            return [future.result() for future in futures]
+
+    def describe(self) -> Dict[str, Any]:
+        """Summarize the stream without running the query.
+
+        Returns:
+            Dict[str, Any]: JSON serializable description of the stream.
+        """
+        return {
+            "query": self.sql,
+            "columns": self.columns,
+            "row_count": self.row_count,
+            "batch_size": self.batch_size,
+        }
+
+
+class _SharedPassView(RowStream):
+    """View of a RowStream whose first pass reads a shared run of its query.
+
+    Fed with the batches of the run by RowStream.fan_out.
+    """
+
+    def __init__(self, stream: RowStream, max_pending: int) -> None:
+        super().__init__(
+            stream.engine,
+            stream.sql,
+            stream.params,
+            batch_size=stream.batch_size,
+            prepare=stream.prepare,
+        )
+        self.stream = stream
+        self.batches: "queue.Queue[Any]" = queue.Queue(maxsize=max_pending)
+        self.shared = True
+        self.closed = False
+
+    def put(self, item: Any, future: Future) -> bool:
+        """Hand a batch, the end of the run or its error to the consumer.
+
+        Args:
+            item: The batch, _END or the error of the query.
+            future (Future): Future of the consumer reading the view.
+
+        Returns:
+            bool: False if the consumer no longer reads the shared pass.
+        """
+        while not (self.closed or future.done()):
+            try:
+                self.batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def iter_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        if not self.shared:
+            yield from super().iter_batches()
+            return
+        self.shared = False
+        try:
+            while True:
+                item = self.batches.get()
+                if item is _END:
+                    self.columns = self.stream.columns
+                    self.row_count = self.stream.row_count
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                self.columns = self.stream.columns
+                yield item
+        finally:
+            self.closed = True
+
+
+def _build_column(values: List[Any]) -> Any:
+    """Store the values of a column in the most compact container available.
+
+    Args:
+        values (List[Any]): Values of the column, in row order.
+
+    Returns:
+        Any: A NumPy array when NumPy is installed, a typed ``array`` for
+        all-int or all-float columns without it, and a list otherwise.
+    """
+    if np is not None:
+        column = np.asarray(values)
+        # Mixed values (e.g. None among numbers) end up as strings or objects
+        if column.dtype.kind in "biuf" or column.dtype == object:
+            return column
+        return np.asarray(values, dtype=object)
+
+    if values and all(type(value) is int for value in values):
+        try:
+            return array("q", values)
+        except OverflowError:
+            return values
+    if values and all(type(value) is float for value in values):
+        return array("d", values)
+    return values
+
+
+class ColumnarResult:
+    """Query result stored column by column.
+
+    Each column holds its values in a NumPy array (or a typed array when
+    NumPy is not installed), which lets verifiers check millions of values
+    with vectorized operations instead of walking a list of dictionaries.
+    """
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        """Initialize the columnar result.
+
+        Args:
+            columns (Dict[str, Any]): Column values keyed by column name,
+                all of the same length.
+        """
+        self.columns = columns
+        self.column_names: List[str] = list(columns)
+        self.row_count: int = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_rows(
+        cls, keys: Sequence[str], rows: Iterable[Sequence[Any]]
+    ) -> "ColumnarResult":
+        """Build a columnar result from row tuples.
+
+        Args:
+            keys (Sequence[str]): Column names.
+            rows (Iterable[Sequence[Any]]): Rows, with values in ``keys`` order.
+
+        Returns:
+            ColumnarResult: The result transposed into columns.
+        """
+        values = [list(column) for column in zip(*rows)] or [[] for _ in keys]
+        return cls({key: _build_column(column) for key, column in zip(keys, values)})
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def column(self, name: str) -> Any:
+        """Get the values of a column.
+
+        Args:
+            name (str): Column name.
+
+        Returns:
+            Any: The column values.
+        """
+        return self.columns[name]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the rows as dictionaries keyed by column name."""
+        columns = [self._to_list(self.columns[name]) for name in self.column_names]
+        for row in zip(*columns):
+            yield dict(zip(self.column_names, row))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """Convert the result back to a list of rows.
+
+        Returns:
+            List[Dict[str, Any]]: Rows keyed by column name.
+        """
+        return list(self)
+
+    def describe(self) -> Dict[str, Any]:
+        """Summarize the result without listing its values.
+
+        Returns:
+            Dict[str, Any]: JSON serializable description of the result.
+        """
+        return {"columns": self.column_names, "row_count": self.row_count}
+
+    @staticmethod
+    def _to_list(column: Any) -> List[Any]:
+        """Convert a column to a list of plain Python values."""
+        return column.tolist() if hasattr(column, "tolist") else list(column)
@@ -4,14 +4,65 @@ This module provides an SSHConnection class for establishing and managing
 SSH connections with various authentication methods.
 """
 
-from typing import Any, Tuple, Optional
+from collections import deque
+from typing import Any, Dict, List, Tuple, Optional
 import logging
+import select
+import time
 import paramiko
 
 from pangolin_sdk.configs.ssh import SSHAuthMethod, SSHConnectionConfig
 from pangolin_sdk.connections.base import BaseConnection, T
 from pangolin_sdk.constants import ConnectionStatus
-from pangolin_sdk.exceptions import SSHConnectionError, SSHExecutionError
+from pangolin_sdk.exceptions import (
+    DeadlineExceededError,
+    RateLimitTimeoutError,
+    SSHConnectionError,
+    SSHExecutionError,
+)
+
+# Bytes read from a channel stream at once
+READ_CHUNK_SIZE = 32768
+# Stay under the default OpenSSH MaxSessions of 10 channels per connection
+DEFAULT_MAX_CHANNELS = 8
+
+
+class SSHCommandResult(str):
+    """Standard output of a command, with its exit code, stderr and timing.
+
+    The result is the stdout string itself, so verifiers that expect the
+    output of a command keep working unchanged.
+    """
+
+    def __new__(
+        cls,
+        stdout: str,
+        command: str,
+        stderr: str = "",
+        exit_code: Optional[int] = None,
+        duration_ms: float = 0.0,
+    ) -> "SSHCommandResult":
+        result = super().__new__(cls, stdout)
+        result.command = command
+        result.stderr = stderr
+        result.exit_code = exit_code
+        result.duration_ms = duration_ms
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the result to a dictionary.
+
+        Returns:
+            Dict[str, Any]: Command, streams, exit code and duration.
+        """
+        return {
+            "command": self.command,
+            "stdout": str(self),
+            "stderr": self.stderr,
+            "exit_code": self.exit_code,
+            "duration_ms": self.duration_ms,
+        }
 
 
 class SSHConnection(BaseConnection[Tuple[Any, Any]]):
@@ -25,15 +76,25 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
         stderr (Optional[str]): Standard error stream.
     """
 
-    def __init__(self, config: SSHConnectionConfig):
+    def __init__(
+        self,
+        config: SSHConnectionConfig,
+        batch_execution: bool = False,
+        max_channels: int = DEFAULT_MAX_CHANNELS,
+    ):
         """
         Initialize SSH connection.
 
         Args:
             config (SSHConnectionConfig): Configuration for the SSH connection.
+            batch_execution (bool): Whether callers may run independent commands
+                concurrently with execute_many.
+            max_channels (int): Maximum number of channels open at once in a batch.
         """
         self.config = config
         super().__init__(config)
+        self.supports_batch_execution = batch_execution
+        self.max_channels = max_channels
         self._client: Optional[paramiko.SSHClient] = None
         self.stdin: Optional[Any] = None
         self.stdout: Optional[str] = None
@@ -89,7 +150,7 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
             port=self.config.port,
             username=self.config.username,
             password=self.config.password,
-            timeout=self.config.timeout,
+            timeout=self._timeout(self.config.timeout),
         )
 
     def _public_key_authentication(self) -> None:
@@ -104,7 +165,7 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
             port=self.config.port,
             username=self.config.username,
             pkey=self.config.pkey,
-            timeout=self.config.timeout,
+            timeout=self._timeout(self.config.timeout),
         )
 
     def _ssh_agent_authentication(self) -> None:
@@ -119,6 +180,7 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
             username=self.config.username,
             allow_agent=self.config.allow_agent,
             look_for_keys=self.config.look_for_keys,
+            timeout=self._timeout(self.config.timeout),
         )
 
     def _execute_impl(self, *args: Any, **kwargs: Any) -> Optional[str]:
@@ -126,11 +188,11 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
         Execute a command on the SSH server.
 
         Args:
-            *args: Positional arguments, first argument expected to be the command.
-            **kwargs: Additional keyword arguments.
+            *args: Positional arguments, first argument may be the command.
+            **kwargs: Keyword arguments, ``command`` takes precedence over args.
 
         Returns:
-            Optional[str]: Standard output of the command.
+            Optional[str]: Standard output of the command, as an SSHCommandResult.
 
         Raises:
             SSHExecutionError: If command execution fails.
@@ -139,33 +201,29 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
             self.connect()
 
         try:
-            if not args:
+            command = kwargs.get("command", args[0] if args else None)
+            if not command:
                 raise ValueError("No command provided for execution")
 
-            command = kwargs.get("command")
             self._logger.info(f"Executing command: {command}")
 
-            # Execute command and capture streams
-            stdin, stdout, stderr = self._client.exec_command(command)
-
-            # Read and decode streams
-            stderr_output = stderr.read().decode("utf-8").strip()
-            stdout_output = stdout.read().decode("utf-8").strip()
+            # Execute command, reading stdout and stderr together
+            result = self._run_commands([command], 1)[0]
+            stdout_output = str(result)
+            stderr_output = result.stderr
 
             # Store streams for potential later use
-            self.stdin = stdin
+            self.stdin = None
             self.stdout = stdout_output
             self.stderr = stderr_output
 
             # Check for and handle errors
-            if stderr_output:
+            error = self._stderr_error(result)
+            if error is not None:
                 self._logger.error(f"Execution failed: {stderr_output}")
-                raise SSHExecutionError(
-                    message=f"SSH Execution Error: {stderr_output}",
-                    details=self.config.get_info(),
-                )
+                raise error
 
-            return stdout_output
+            return result
 
         except Exception as e:
             error = SSHExecutionError(
@@ -173,6 +231,191 @@ class SSHConnection(BaseConnection[Tuple[Any, Any]]):
             )
             raise error
 
+    def execute_many(
+        self, requests: List[Dict[str, Any]], max_in_flight: Optional[int] = None
+    ) -> List[Optional[SSHCommandResult]]:
+        """
+        Run several commands concurrently over this connection.
+
+        Each command gets its own channel on the shared transport, with at most
+        ``max_in_flight`` channels open at once. Commands exiting with a
+        non-zero code are still returned, with their exit code set; commands
+        writing to stderr fail, as they do with execute.
+
+        Args:
+            requests (List[Dict[str, Any]]): Keyword arguments of each step,
+                with the command under ``command``.
+            max_in_flight (int, optional): Limit of open channels,
+                defaults to the limit of the connection.
+
+        Returns:
+            List[Optional[SSHCommandResult]]: Result of each command in request
+            order, None for the commands that could not be run.
+        """
+        if self.status != ConnectionStatus.CONNECTED:
+            self.connect()
+
+        commands = [kwargs.get("command") for kwargs in requests]
+        runnable = [command for command in commands if command]
+        try:
+            with self._rate_limited(len(runnable)) as slots:
+                max_channels = max_in_flight or self.max_channels
+                if slots is not None:
+                    max_channels = min(max_channels, slots)
+                outcomes = iter(self._run_commands(runnable, max_channels))
+        except (
+            DeadlineExceededError,
+            RateLimitTimeoutError,
+            paramiko.SSHException,
+            # Closed transports and sockets
+            EOFError,
+            OSError,
+            UnicodeDecodeError,
+        ) as e:
+            error = self._deadline_error(
+                e
+                if isinstance(e, (DeadlineExceededError, RateLimitTimeoutError))
+                else SSHExecutionError(
+                    message=f"SSH Execution Error: {e}",
+                    details=self.config.get_info(),
+                )
+            )
+            self.metrics.total_errors += 1
+            self._record_error(error)
+            self._logger.error("Execution failed: %s", str(error))
+            self.disconnect()
+            return [None] * len(requests)
+
+        results = []
+        for command in commands:
+            if not command:
+                self._record_error(
+                    SSHExecutionError(message="No command provided for execution")
+                )
+                results.append(None)
+                continue
+            result = next(outcomes)
+            error = self._stderr_error(result)
+            if error is not None:
+                self.metrics.total_errors += 1
+                self._record_error(error)
+                self._logger.error(f"Execution failed: {result.stderr}")
+                results.append(None)
+                continue
+            if result.exit_code != 0:
+                self._logger.warning(
+                    f"Command exited with code {result.exit_code}: {command}"
+                )
+            self.results.append(result)
+            results.append(result)
+
+        self._last_result = results[-1] if results else None
+        return results
+
+    def _stderr_error(self, result: SSHCommandResult) -> Optional[SSHExecutionError]:
+        """
+        Get the error of a command that wrote to stderr.
+
+        Args:
+            result (SSHCommandResult): Result of the command.
+
+        Returns:
+            Optional[SSHExecutionError]: The error, None if stderr is empty.
+        """
+        if not result.stderr:
+            return None
+        return SSHExecutionError(
+            message=f"SSH Execution Error: {result.stderr}",
+            details=self.config.get_info(),
+        )
+
+    def _run_commands(
+        self, commands: List[str], max_channels: int
+    ) -> List[SSHCommandResult]:
+        """
+        Run commands on their own channels, reading every stream as data arrives.
+
+        Reading stdout and stderr of all channels together avoids stalls when
+        a command fills the window of the stream that is not being read.
+
+        Args:
+            commands (List[str]): Commands to run.
+            max_channels (int): Maximum number of channels open at once.
+
+        Returns:
+            List[SSHCommandResult]: Result of each command in command order.
+
+        Raises:
+            DeadlineExceededError: If the deadline of the connection passes
+                before every command is done.
+        """
+        transport = self._client.get_transport()
+        pending = deque(enumerate(commands))
+        active: Dict[paramiko.Channel, Dict[str, Any]] = {}
+        results: List[Optional[SSHCommandResult]] = [None] * len(commands)
+
+        while pending or active:
+            while pending and len(active) < max_channels:
+                index, command = pending.popleft()
+                channel = transport.open_session(
+                    timeout=self._timeout(self.config.timeout)
+                )
+                channel.exec_command(command)
+                active[channel] = {
+                    "index": index,
+                    "command": command,
+                    "started": time.monotonic(),
+                    "stdout": [],
+                    "stderr": [],
+                }
+
+            if self.deadline is not None and self.deadline.expired:
+                # Hung commands are not waited for past the deadline
+                for channel in active:
+                    channel.close()
+                self.deadline.check("SSH command")
+
+            # Wake up when a channel has data, polling for exit statuses
+            select.select(list(active), [], [], 0.05)
+
+            for channel, state in list(active.items()):
+                while channel.recv_ready():
+                    state["stdout"].append(channel.recv(READ_CHUNK_SIZE))
+                while channel.recv_stderr_ready():
+                    state["stderr"].append(channel.recv_stderr(READ_CHUNK_SIZE))
+                if not channel.exit_status_ready():
+                    continue
+                if channel.recv_ready() or channel.recv_stderr_ready():
+                    continue
+
+                exit_code = channel.recv_exit_status()
+                channel.close()
+                del active[channel]
+                results[state["index"]] = SSHCommandResult(
+                    b"".join(state["stdout"]).decode("utf-8").strip(),
+                    command=state["command"],
+                    stderr=b"".join(state["stderr"]).decode("utf-8").strip(),
+                    exit_code=exit_code,
+                    duration_ms=(time.monotonic() - state["started"]) * 1000,
+                )
+
+        return results
+
+    def is_healthy(self) -> bool:
+        """
+        Check the SSH transport is still active.
+
+        Returns:
+            bool: True if the transport can carry new channels.
+        """
+        if not super().is_healthy() or self._client is None:
+            return False
+        transport = self._client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        transport.send_ignore()
+        return True
+
     def _disconnect_impl(self) -> None:
         """
         Disconnect from the SSH server.
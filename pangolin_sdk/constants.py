@@ -18,6 +18,17 @@ class ConnectionStatus(Enum):
     DISCONNECTING = "disconnecting"
     DISCONNECTED = "disconnected"
     ERROR = "error"
+    # Not attempted, the circuit breaker of the target is open
+    CIRCUIT_OPEN = "circuit_open"
+
+
+@unique
+class CircuitState(Enum):
+    """States of the circuit breaker of a connection target."""
+
+    CLOSED = "closed"  # Connects go through
+    OPEN = "open"  # Connects fail immediately
+    HALF_OPEN = "half_open"  # One trial connect decides whether to close again
 
 
 @unique
@@ -140,3 +140,45 @@ class SSHExecutionError(BaseExecutionError):
     """
 
     command: Optional[str] = None
+
+
+@dataclass(kw_only=True)
+class ConnectionPoolTimeoutError(BaseConnectionError):
+    """
+    Exception raised when no pooled connection slot frees up in time.
+
+    Attributes:
+        message (str): Detailed error description
+    """
+
+
+@dataclass(kw_only=True)
+class RateLimitTimeoutError(BaseConnectionError):
+    """
+    Exception raised when a rate limited target does not accept another
+    operation in time.
+
+    Attributes:
+        message (str): Detailed error description
+    """
+
+
+@dataclass(kw_only=True)
+class CircuitOpenError(BaseConnectionError):
+    """
+    Exception raised when a connect is not attempted because the circuit
+    breaker of the target is open.
+
+    Attributes:
+        message (str): Detailed error description
+    """
+
+
+@dataclass(kw_only=True)
+class DeadlineExceededError(BaseExecutionError):
+    """
+    Exception raised when an operation does not finish by its deadline.
+
+    Attributes:
+        message (str): Detailed error description
+    """
@@ -0,0 +1,133 @@
+"""Test helpers for Pangolin SDK.
+
+This module provides an in-memory connection to exercise the connection
+framework without reaching a real service, and in-memory databases to
+stream query results from.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+
+from pangolin_sdk.configs.base import ConnectionConfig
+from pangolin_sdk.connections.base import BaseConnection
+from pangolin_sdk.connections.results import RowStream
+from pangolin_sdk.exceptions import BaseConnectionError, BaseExecutionError
+
+
+def make_config(**overrides: Any) -> ConnectionConfig:
+    """Build a connection configuration that never waits between retries.
+
+    Args:
+        **overrides: Configuration values to change.
+
+    Returns:
+        ConnectionConfig: The configuration.
+    """
+    values = {
+        "name": "test",
+        "host": "service.local",
+        "max_retries": 0,
+        "retry_interval": 0,
+        "retry_jitter": False,
+    }
+    values.update(overrides)
+    return ConnectionConfig(**values)
+
+
+class FakeConnection(BaseConnection[object]):
+    """Connection to nothing, recording the calls made on it.
+
+    Attributes:
+        connect_failures (int): Number of connection attempts to fail.
+        execute_errors (List[BaseExecutionError]): Errors raised by the next
+            executions, in order.
+        healthy (bool): Result of the health check.
+        on_execute (Callable, optional): Called with the keyword arguments of
+            each execution, and may raise. What it returns, unless None, is
+            the result of the execution instead of the keyword arguments.
+    """
+
+    def __init__(self, config: Optional[ConnectionConfig] = None) -> None:
+        super().__init__(config or make_config())
+        self.connect_failures = 0
+        self.execute_errors: List[BaseExecutionError] = []
+        self.healthy = True
+        self.on_execute: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.connect_calls = 0
+        self.disconnect_calls = 0
+        self.execute_calls: List[Any] = []
+
+    def _setup_logger(self, *args: Any) -> logging.Logger:
+        return logging.getLogger(f"pangolin.tests.{self.config.name}")
+
+    def _connect_impl(self) -> object:
+        self.connect_calls += 1
+        if self.connect_failures:
+            self.connect_failures -= 1
+            raise BaseConnectionError(message="Connection refused")
+        return object()
+
+    def _disconnect_impl(self) -> None:
+        self.disconnect_calls += 1
+
+    def _execute_impl(self, *args: Any, **kwargs: Any) -> Any:
+        self.execute_calls.append(kwargs)
+        if self.execute_errors:
+            raise self.execute_errors.pop(0)
+        if self.on_execute is not None:
+            result = self.on_execute(kwargs)
+            if result is not None:
+                return result
+        return kwargs
+
+    def is_healthy(self) -> bool:
+        return self.healthy and super().is_healthy()
+
+
+def make_database(row_count: int) -> Engine:
+    """Create an in-memory SQLite database with an ``items`` table.
+
+    Args:
+        row_count (int): Number of rows of the table, with ``id`` from 0 and
+            ``name`` "item <id>".
+
+    Returns:
+        Engine: Engine whose connections all share the database.
+    """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE items (id INTEGER, name TEXT)"))
+        if row_count:
+            connection.execute(
+                text("INSERT INTO items (id, name) VALUES (:id, :name)"),
+                [{"id": index, "name": f"item {index}"} for index in range(row_count)],
+            )
+    return engine
+
+
+class CountingRowStream(RowStream):
+    """Row stream counting the queries run and the batches fetched.
+
+    Attributes:
+        queries (int): Number of times the query ran.
+        batches (int): Number of batches fetched, over every run.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.queries = 0
+        self.batches = 0
+
+    def iter_batches(self) -> Iterator[List[Dict[str, Any]]]:
+        self.queries += 1
+        for batch in super().iter_batches():
+            self.batches += 1
+            yield batch
@@ -0,0 +1,111 @@
+"""Tests of the asynchronous API connection."""
+
+import asyncio
+import functools
+import unittest
+from unittest import mock
+
+import httpx
+
+from pangolin_sdk.configs.api import APIConfig
+from pangolin_sdk.connections.async_api import AsyncAPIConnection
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.connections.ratelimit import RateLimit, RateLimiter
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import APIExecutionError, DeadlineExceededError
+
+
+class FakeService:
+    """HTTP service answering after a delay, tracking the concurrent requests."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.paths = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.paths.append(request.url.path)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if request.url.path == "/broken":
+            return httpx.Response(500, text="Internal error")
+        return httpx.Response(200, json={"path": request.url.path})
+
+
+class AsyncAPIConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.service = FakeService()
+        client = functools.partial(
+            httpx.AsyncClient, transport=httpx.MockTransport(self.service)
+        )
+        patcher = mock.patch.object(httpx, "AsyncClient", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.connection = AsyncAPIConnection(
+            APIConfig(name="api", host="https://api.local", max_retries=0),
+            max_in_flight=3,
+        )
+        self.addCleanup(self.connection.disconnect)
+
+    def requests(self, count):
+        return [{"endpoint": f"/items/{index}"} for index in range(count)]
+
+    def test_execute_many_keeps_the_request_order(self):
+        results = self.connection.execute_many(self.requests(8))
+
+        self.assertEqual(
+            [result["data"]["path"] for result in results],
+            [f"/items/{index}" for index in range(8)],
+        )
+        self.assertEqual(self.connection.get_status(), ConnectionStatus.CONNECTED)
+
+    def test_execute_many_caps_the_requests_in_flight(self):
+        self.connection.execute_many(self.requests(8))
+        self.assertEqual(self.service.max_in_flight, 3)
+
+        self.service.max_in_flight = 0
+        self.connection.execute_many(self.requests(8), max_in_flight=2)
+        self.assertEqual(self.service.max_in_flight, 2)
+
+    def test_rate_limit_slots_cap_the_requests_in_flight(self):
+        RateLimiter().attach(self.connection, RateLimit(max_concurrent=2))
+
+        self.connection.execute_many(self.requests(8))
+        self.assertEqual(self.service.max_in_flight, 2)
+
+    def test_failed_requests_do_not_fail_the_batch(self):
+        requests = self.requests(2)
+        requests.insert(1, {"endpoint": "/broken"})
+
+        with self.assertLogs("pangolin_sdk.connections.async_api", "ERROR"):
+            results = self.connection.execute_many(requests)
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2]["data"], {"path": "/items/1"})
+        self.assertEqual(len(self.connection.get_errors()), 1)
+        self.assertIsInstance(self.connection.get_errors()[0], APIExecutionError)
+
+    def test_expired_deadline_sends_no_request(self):
+        self.connection.connect()
+        self.connection.deadline = Deadline.after(-1)
+
+        with self.assertLogs("pangolin_sdk.connections.async_api", "ERROR"):
+            results = self.connection.execute_many(self.requests(3))
+        self.assertEqual(results, [None] * 3)
+        self.assertEqual(self.service.paths, [])
+        self.assertTrue(
+            all(
+                isinstance(error, DeadlineExceededError)
+                for error in self.connection.get_errors()
+            )
+        )
+
+    def test_execute_sends_a_single_request(self):
+        self.connection.execute(endpoint="/items/1", method="post")
+        self.assertEqual(self.connection.get_last_result()["method"], "POST")
+        self.assertEqual(self.service.paths, ["/items/1"])
@@ -0,0 +1,173 @@
+"""Tests of the circuit breaker."""
+
+import unittest
+
+from pangolin_sdk.connections.breaker import (
+    CircuitBreaker,
+    LocalCircuitBreakerStore,
+    describe_circuit_key,
+)
+from pangolin_sdk.constants import CircuitState, ConnectionStatus
+from pangolin_sdk.exceptions import CircuitOpenError
+from pangolin_sdk.tests.helpers import FakeConnection
+
+
+class ClockStore(LocalCircuitBreakerStore):
+    """Local store whose time only moves when told to."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.time = 1000.0
+
+    def now(self) -> float:
+        return self.time
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self):
+        self.store = ClockStore()
+        self.breaker = CircuitBreaker(
+            store=self.store, failure_threshold=3, reset_timeout=60
+        )
+
+    def record(self, key="key"):
+        return self.breaker.get_info()[key]
+
+    def open_circuit(self, key="key"):
+        with self.assertLogs("pangolin.connection.breaker", "WARNING"):
+            for _ in range(self.breaker.failure_threshold):
+                self.assertTrue(self.breaker.allow(key))
+                self.breaker.record_failure(key)
+
+    def test_opens_after_the_failure_threshold(self):
+        for _ in range(2):
+            self.assertTrue(self.breaker.allow("key"))
+            self.breaker.record_failure("key")
+        self.assertEqual(self.record()["state"], CircuitState.CLOSED.value)
+
+        with self.assertLogs("pangolin.connection.breaker", "WARNING"):
+            self.breaker.record_failure("key")
+        record = self.record()
+        self.assertEqual(record["state"], CircuitState.OPEN.value)
+        self.assertEqual(record["opened_at"], 1000.0)
+        self.assertEqual(record["times_opened"], 1)
+
+        self.assertFalse(self.breaker.allow("key"))
+        self.assertFalse(self.breaker.allow("key"))
+        self.assertEqual(self.record()["rejected"], 2)
+        # Other targets are unaffected
+        self.assertTrue(self.breaker.allow("other"))
+
+    def test_success_resets_the_failures(self):
+        self.breaker.record_failure("key")
+        self.breaker.record_failure("key")
+        self.breaker.record_success("key")
+        self.breaker.record_failure("key")
+        record = self.record()
+        self.assertEqual(record["state"], CircuitState.CLOSED.value)
+        self.assertEqual(record["failures"], 1)
+
+    def test_single_trial_once_the_reset_timeout_passed(self):
+        self.open_circuit()
+        self.store.time += 59
+        self.assertFalse(self.breaker.allow("key"))
+
+        self.store.time += 1
+        self.assertTrue(self.breaker.allow("key"))
+        self.assertEqual(self.record()["state"], CircuitState.HALF_OPEN.value)
+        self.assertFalse(self.breaker.allow("key"))
+
+    def test_successful_trial_closes_the_circuit(self):
+        self.open_circuit()
+        self.store.time += 60
+        self.assertTrue(self.breaker.allow("key"))
+
+        with self.assertLogs("pangolin.connection.breaker", "INFO"):
+            self.breaker.record_success("key")
+        record = self.record()
+        self.assertEqual(record["state"], CircuitState.CLOSED.value)
+        self.assertEqual(record["failures"], 0)
+        self.assertIsNone(record["opened_at"])
+        self.assertTrue(self.breaker.allow("key"))
+
+    def test_failed_trial_opens_the_circuit_again(self):
+        self.open_circuit()
+        self.store.time += 60
+        self.assertTrue(self.breaker.allow("key"))
+
+        with self.assertLogs("pangolin.connection.breaker", "WARNING"):
+            self.breaker.record_failure("key")
+        record = self.record()
+        self.assertEqual(record["state"], CircuitState.OPEN.value)
+        self.assertEqual(record["opened_at"], 1060.0)
+        self.assertEqual(record["times_opened"], 2)
+        self.assertFalse(self.breaker.allow("key"))
+
+    def test_trial_not_reporting_back_is_given_up_on(self):
+        self.open_circuit()
+        self.store.time += 60
+        self.assertTrue(self.breaker.allow("key"))
+
+        self.store.time += 59
+        self.assertFalse(self.breaker.allow("key"))
+        self.store.time += 1
+        self.assertTrue(self.breaker.allow("key"))
+
+
+class CircuitGuardTests(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(
+            store=ClockStore(), failure_threshold=2, reset_timeout=60
+        )
+
+    def test_connect_fails_at_once_while_the_circuit_is_open(self):
+        connection = self.breaker.attach(FakeConnection())
+        connection.connect_failures = 2
+
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            self.assertIsNone(connection.connect())
+        with self.assertLogs("pangolin.connection.breaker", "WARNING"):
+            with self.assertLogs("pangolin.tests", "ERROR"):
+                self.assertIsNone(connection.connect())
+        self.assertEqual(connection.connect_calls, 2)
+
+        # A new connection to the same target shares the circuit
+        connection = self.breaker.attach(FakeConnection())
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            self.assertIsNone(connection.connect())
+        self.assertEqual(connection.connect_calls, 0)
+        self.assertEqual(connection.status, ConnectionStatus.CIRCUIT_OPEN)
+        error = connection.get_errors()[-1]
+        self.assertIsInstance(error, CircuitOpenError)
+        self.assertEqual(error.details["circuit"], connection.circuit_breaker.key)
+
+    def test_connect_closes_the_circuit(self):
+        connection = self.breaker.attach(FakeConnection())
+        connection.connect_failures = 1
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            connection.connect()
+        self.assertEqual(
+            self.breaker.get_info()[connection.circuit_breaker.key]["failures"], 1
+        )
+
+        self.assertIsNotNone(connection.connect())
+        self.assertEqual(
+            self.breaker.get_info()[connection.circuit_breaker.key]["failures"], 0
+        )
+
+    def test_keys_hash_the_configuration_with_the_secret(self):
+        breaker = CircuitBreaker(key_secret=b"secret")
+        key = breaker.attach(FakeConnection()).circuit_breaker.key
+        unkeyed = self.breaker.attach(FakeConnection()).circuit_breaker.key
+
+        self.assertNotEqual(key, unkeyed)
+        _, _, digest = key.rpartition(":")
+        self.assertEqual(len(digest), 64)
+        self.assertEqual(
+            describe_circuit_key(key),
+            {
+                "id": digest[:16],
+                "connection_type": "FakeConnection",
+                "target": "service.local:None",
+            },
+        )
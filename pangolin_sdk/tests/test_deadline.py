@@ -0,0 +1,167 @@
+"""Tests of the run deadlines."""
+
+import logging
+import unittest
+from unittest import mock
+
+from pangolin_sdk.configs.database import DatabaseConnectionConfig
+from pangolin_sdk.connections.database import DatabaseConnection
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.constants import ConnectionStatus, DatabaseType
+from pangolin_sdk.exceptions import BaseExecutionError, DeadlineExceededError
+from pangolin_sdk.tests.helpers import FakeConnection, make_config
+
+
+class DeadlineTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_after(self):
+        self.assertEqual(Deadline.after(30).expires_at, 1030.0)
+        self.assertIsNone(Deadline.after(None).expires_at)
+
+    def test_shorten(self):
+        deadline = Deadline(1060.0)
+        self.assertIs(deadline.shorten(None), deadline)
+        self.assertEqual(deadline.shorten(30).expires_at, 1030.0)
+        self.assertIs(deadline.shorten(90), deadline)
+        self.assertEqual(Deadline().shorten(90).expires_at, 1090.0)
+        self.assertIsNone(Deadline().shorten(None).expires_at)
+
+    def test_remaining(self):
+        deadline = Deadline(1060.0)
+        self.assertEqual(deadline.remaining(), 60.0)
+        self.assertFalse(deadline.expired)
+
+        self.now = 1100.0
+        self.assertEqual(deadline.remaining(), 0.0)
+        self.assertTrue(deadline.expired)
+        self.assertIsNone(Deadline().remaining())
+        self.assertFalse(Deadline().expired)
+
+    def test_timeout(self):
+        deadline = Deadline(1060.0)
+        self.assertEqual(deadline.timeout(), 60.0)
+        self.assertEqual(deadline.timeout(10), 10)
+        self.assertEqual(deadline.timeout(120), 60.0)
+        self.assertIsNone(Deadline().timeout())
+        self.assertEqual(Deadline().timeout(10), 10)
+
+        self.now = 1060.0
+        with self.assertRaises(DeadlineExceededError) as raised:
+            deadline.timeout(10)
+        self.assertEqual(raised.exception.details, {"expires_at": 1060.0})
+
+
+class ConnectionDeadlineTests(unittest.TestCase):
+    def test_execute_fails_once_the_deadline_passed(self):
+        connection = FakeConnection()
+        connection.connect()
+        connection.deadline = Deadline.after(-1)
+
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            connection.execute(query="SELECT 1")
+        self.assertEqual(connection.execute_calls, [])
+        self.assertIsInstance(connection.get_errors()[0], DeadlineExceededError)
+        self.assertEqual(connection.status, ConnectionStatus.DISCONNECTED)
+
+    def test_execution_error_past_the_deadline_is_a_timeout(self):
+        connection = FakeConnection()
+        connection.connect()
+        connection.deadline = Deadline.after(60)
+
+        def expire(kwargs):
+            connection.deadline = Deadline.after(-1)
+            raise BaseExecutionError(message="Read timed out")
+
+        connection.on_execute = expire
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            connection.execute(query="SELECT 1")
+        error = connection.get_errors()[0]
+        self.assertIsInstance(error, DeadlineExceededError)
+        self.assertIn("Read timed out", error.message)
+
+    def test_connect_does_not_retry_past_the_deadline(self):
+        connection = FakeConnection(make_config(max_retries=3, retry_interval=30))
+        connection.connect_failures = 4
+        connection.deadline = Deadline.after(10)
+
+        with mock.patch("time.sleep") as sleep:
+            with self.assertLogs("pangolin.tests", "WARNING"):
+                self.assertIsNone(connection.connect())
+        self.assertEqual(connection.connect_calls, 1)
+        sleep.assert_not_called()
+
+    def test_connect_retries_within_the_deadline(self):
+        connection = FakeConnection(make_config(max_retries=3, retry_interval=1))
+        connection.connect_failures = 2
+        connection.deadline = Deadline.after(60)
+
+        with mock.patch("time.sleep") as sleep:
+            with self.assertLogs("pangolin.tests", "WARNING"):
+                self.assertIsNotNone(connection.connect())
+        self.assertEqual(connection.connect_calls, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+
+class StatementTimeoutTests(unittest.TestCase):
+    def setUp(self):
+        # The timeout set on the server is the time left to the deadline
+        patcher = mock.patch("time.time", lambda: 1000.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connection(self, database_type):
+        connection = DatabaseConnection(
+            DatabaseConnectionConfig(
+                name="database",
+                host="db.local",
+                port=3306,
+                database="app",
+                username="tester",
+                password="secret",
+                database_type=database_type,
+            )
+        )
+        connection.deadline = Deadline.after(2.5)
+        # Keep the logs of the connection disconnecting out of the test output
+        connection._logger.setLevel(logging.WARNING)
+        return connection
+
+    def statements(self, session):
+        return [str(call.args[0]) for call in session.execute.call_args_list]
+
+    def test_mysql_timeout_is_reset_after_the_query(self):
+        connection = self.connection(DatabaseType.MYSQL)
+        session = mock.Mock()
+        with connection._statement_timeout(session, connection.deadline):
+            session.execute("SELECT 1")
+
+        statements = self.statements(session)
+        self.assertEqual(statements[0], "SET SESSION max_execution_time = 2500")
+        self.assertEqual(statements[-1], "SET SESSION max_execution_time = DEFAULT")
+
+    def test_mysql_timeout_is_reset_when_the_query_fails(self):
+        connection = self.connection(DatabaseType.MYSQL)
+        session = mock.Mock()
+        with self.assertRaises(RuntimeError):
+            with connection._statement_timeout(session, connection.deadline):
+                raise RuntimeError("Lost the connection")
+        self.assertEqual(
+            self.statements(session)[-1], "SET SESSION max_execution_time = DEFAULT"
+        )
+
+    def test_local_timeouts_are_not_reset(self):
+        connection = self.connection(DatabaseType.POSTGRESQL)
+        session = mock.Mock()
+        with connection._statement_timeout(session, connection.deadline):
+            pass
+        self.assertEqual(len(self.statements(session)), 1)
+
+        connection = self.connection(DatabaseType.MYSQL)
+        with connection._statement_timeout(session, None):
+            pass
+        self.assertEqual(len(self.statements(session)), 1)
@@ -0,0 +1,158 @@
+"""Tests of the connection pool."""
+
+import threading
+import unittest
+
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.connections.pool import ConnectionPool, connection_fingerprint
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import BaseConnectionError, ConnectionPoolTimeoutError
+from pangolin_sdk.tests.helpers import FakeConnection, make_config
+
+
+class ConnectionFingerprintTests(unittest.TestCase):
+    def test_ignores_the_config_name(self):
+        first = FakeConnection(make_config(name="first"))
+        second = FakeConnection(make_config(name="second"))
+        self.assertEqual(connection_fingerprint(first), connection_fingerprint(second))
+
+    def test_tells_credentials_apart(self):
+        first = FakeConnection(make_config(username="alice"))
+        second = FakeConnection(make_config(username="bob"))
+        self.assertNotEqual(
+            connection_fingerprint(first), connection_fingerprint(second)
+        )
+
+    def test_secret_replaces_the_plain_hash(self):
+        connection = FakeConnection()
+        plain = connection_fingerprint(connection)
+        keyed = connection_fingerprint(connection, b"secret")
+        self.assertNotEqual(plain, keyed)
+        self.assertEqual(plain.rpartition(":")[0], keyed.rpartition(":")[0])
+        self.assertEqual(keyed, connection_fingerprint(connection, b"secret"))
+
+
+class ConnectionPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_per_host=2, idle_ttl=60, checkout_timeout=0.05)
+
+    def test_checkout_reuses_an_idle_connection(self):
+        first = FakeConnection()
+        with self.pool.lease(first) as leased:
+            self.assertIs(leased, first)
+            self.assertEqual(leased.get_status(), ConnectionStatus.CONNECTED)
+
+        second = FakeConnection()
+        with self.pool.lease(second) as leased:
+            self.assertIs(leased, first)
+        self.assertEqual(second.connect_calls, 0)
+        self.assertEqual(first.connect_calls, 1)
+
+        info = self.pool.get_info()
+        self.assertEqual((info["hits"], info["misses"]), (1, 1))
+        self.assertEqual(info["idle"], 1)
+
+    def test_checkout_hands_over_the_limits_of_the_caller(self):
+        with self.pool.lease(FakeConnection()):
+            pass
+        candidate = FakeConnection()
+        candidate.rate_limiter = object()
+        candidate.deadline = Deadline.after(60)
+        candidate.circuit_breaker = object()
+        with self.pool.lease(candidate) as leased:
+            self.assertIsNot(leased, candidate)
+            self.assertIs(leased.rate_limiter, candidate.rate_limiter)
+            self.assertIs(leased.deadline, candidate.deadline)
+            self.assertIs(leased.circuit_breaker, candidate.circuit_breaker)
+
+    def test_release_resets_the_connection(self):
+        with self.pool.lease(FakeConnection()) as leased:
+            leased.execute(query="SELECT 1")
+            self.assertEqual(len(leased.get_results()), 1)
+        with self.pool.lease(FakeConnection()) as leased:
+            self.assertEqual(leased.get_results(), [])
+
+    def test_unhealthy_connection_is_replaced(self):
+        first = FakeConnection()
+        with self.pool.lease(first):
+            pass
+        first.healthy = False
+
+        second = FakeConnection()
+        with self.pool.lease(second) as leased:
+            self.assertIs(leased, second)
+        self.assertEqual(first.disconnect_calls, 1)
+        self.assertEqual(self.pool.get_info()["failed_health_checks"], 1)
+
+    def test_disconnected_connection_is_not_returned(self):
+        with self.pool.lease(FakeConnection()) as leased:
+            leased.disconnect()
+        info = self.pool.get_info()
+        self.assertEqual(info["idle"], 0)
+        self.assertEqual(info["open_per_host"], {})
+
+    def test_idle_connections_past_the_ttl_are_evicted(self):
+        first = FakeConnection()
+        with self.pool.lease(first):
+            pass
+        self.pool.idle_ttl = 0
+
+        self.assertEqual(self.pool.evict_idle(), 1)
+        self.assertEqual(first.disconnect_calls, 1)
+        info = self.pool.get_info()
+        self.assertEqual((info["idle"], info["evictions"]), (0, 1))
+        self.assertEqual(info["open_per_host"], {})
+
+    def test_per_host_cap_times_out_while_every_slot_is_leased(self):
+        with self.pool.lease(FakeConnection(make_config(username="a"))):
+            with self.pool.lease(FakeConnection(make_config(username="b"))):
+                with self.assertRaises(ConnectionPoolTimeoutError):
+                    self.pool.acquire(FakeConnection(make_config(username="c")))
+                # Other hosts are not limited by this one
+                with self.pool.lease(FakeConnection(make_config(host="other"))):
+                    pass
+        self.assertEqual(self.pool.get_info()["timeouts"], 1)
+
+    def test_per_host_cap_evicts_the_idle_connection_of_another_target(self):
+        first = FakeConnection(make_config(username="a"))
+        with self.pool.lease(first):
+            pass
+        with self.pool.lease(FakeConnection(make_config(username="b"))):
+            third = FakeConnection(make_config(username="c"))
+            with self.pool.lease(third) as leased:
+                self.assertIs(leased, third)
+        self.assertEqual(first.disconnect_calls, 1)
+        self.assertEqual(
+            self.pool.get_info()["open_per_host"], {"service.local:None": 2}
+        )
+
+    def test_checkout_waits_for_a_released_slot(self):
+        self.pool.checkout_timeout = 5
+        held = self.pool.acquire(FakeConnection(make_config(username="a")))
+        self.pool.acquire(FakeConnection(make_config(username="b")))
+        timer = threading.Timer(0.05, self.pool.release, args=(held,))
+        timer.start()
+        try:
+            pooled = self.pool.acquire(FakeConnection(make_config(username="c")))
+        finally:
+            timer.join()
+        self.assertEqual(pooled.connection.config.username, "c")
+
+    def test_failed_connect_frees_the_host_slot(self):
+        failing = FakeConnection()
+        failing.connect = self._raise_connection_error
+        with self.assertRaises(BaseConnectionError):
+            self.pool.acquire(failing)
+        self.assertEqual(self.pool.get_info()["open_per_host"], {})
+
+    def test_close_all_disconnects_the_idle_connections(self):
+        first = FakeConnection()
+        with self.pool.lease(first):
+            pass
+        self.pool.close_all()
+        self.assertEqual(first.disconnect_calls, 1)
+        self.assertEqual(self.pool.get_info()["open_per_host"], {})
+
+    @staticmethod
+    def _raise_connection_error():
+        raise BaseConnectionError(message="Connection refused")
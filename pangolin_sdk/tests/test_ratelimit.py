@@ -0,0 +1,162 @@
+"""Tests of the rate limiter."""
+
+import unittest
+from unittest import mock
+
+from pangolin_sdk.connections.ratelimit import (
+    LocalRateLimitStore,
+    RateLimit,
+    RateLimiter,
+    rate_limit_key,
+)
+from pangolin_sdk.exceptions import RateLimitTimeoutError
+from pangolin_sdk.tests.helpers import FakeConnection
+
+
+class RecordingStore(LocalRateLimitStore):
+    """Local store recording the tokens taken."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.taken = []
+
+    def take_tokens(self, key: str, rate: float, capacity: int, cost: int) -> float:
+        wait = super().take_tokens(key, rate, capacity, cost)
+        if not wait:
+            self.taken.append(cost)
+        return wait
+
+
+class RateLimitTests(unittest.TestCase):
+    def test_from_dict(self):
+        self.assertIsNone(RateLimit.from_dict(None))
+        self.assertIsNone(RateLimit.from_dict({"per_connection_type": True}))
+        self.assertEqual(
+            RateLimit.from_dict({"rate": 2.5, "max_concurrent": 3}),
+            RateLimit(rate=2.5, max_concurrent=3),
+        )
+        with self.assertRaises(ValueError):
+            RateLimit.from_dict({"rate": 1, "per_second": 2})
+        with self.assertRaises(ValueError):
+            RateLimit.from_dict({"rate": 0})
+
+    def test_capacity(self):
+        self.assertEqual(RateLimit(rate=2.5).capacity, 3)
+        self.assertEqual(RateLimit(rate=0.1).capacity, 1)
+        self.assertEqual(RateLimit(rate=2, burst=10).capacity, 10)
+
+    def test_key_is_shared_per_host(self):
+        connection = FakeConnection()
+        self.assertEqual(rate_limit_key(connection), "service.local:None")
+        self.assertEqual(
+            rate_limit_key(connection, per_connection_type=True),
+            "FakeConnection:service.local:None",
+        )
+
+
+class LocalRateLimitStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.store = LocalRateLimitStore()
+        self.now = 1000.0
+        patcher = mock.patch("time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_bucket_starts_full_and_refills_at_the_rate(self):
+        self.assertEqual(self.store.take_tokens("key", 2, 4, 4), 0)
+        self.assertEqual(self.store.take_tokens("key", 2, 4, 1), 0.5)
+
+        self.now += 1
+        self.assertEqual(self.store.take_tokens("key", 2, 4, 2), 0)
+        self.assertEqual(self.store.take_tokens("key", 2, 4, 1), 0.5)
+
+        # Never more than the capacity, however long the bucket was idle
+        self.now += 100
+        self.assertEqual(self.store.take_tokens("key", 2, 4, 4), 0)
+        self.assertGreater(self.store.take_tokens("key", 2, 4, 1), 0)
+        self.assertEqual(self.store.take_tokens("other", 2, 4, 4), 0)
+
+    def test_slots(self):
+        self.assertTrue(self.store.acquire_slot("key", 2, "a", ttl=10))
+        self.assertTrue(self.store.acquire_slot("key", 2, "b", ttl=10))
+        self.assertFalse(self.store.acquire_slot("key", 2, "c", ttl=10))
+
+        self.store.release_slot("key", "a")
+        self.assertTrue(self.store.acquire_slot("key", 2, "c", ttl=10))
+
+    def test_slots_expire_after_their_ttl(self):
+        self.assertTrue(self.store.acquire_slot("key", 1, "lost", ttl=10))
+        self.now += 10
+        self.assertTrue(self.store.acquire_slot("key", 1, "next", ttl=10))
+
+
+class RateLimiterTests(unittest.TestCase):
+    def setUp(self):
+        self.store = RecordingStore()
+        self.limiter = RateLimiter(store=self.store, timeout=0.2, poll_interval=0.01)
+
+    def test_batch_pays_its_full_cost_in_chunks(self):
+        rate_limit = RateLimit(rate=1000, burst=4)
+        with self.limiter.limit("key", rate_limit, cost=10) as slots:
+            self.assertIsNone(slots)
+        self.assertEqual(self.store.taken, [4, 4, 2])
+
+    def test_times_out_when_the_bucket_stays_empty(self):
+        rate_limit = RateLimit(rate=1)
+        with self.limiter.limit("key", rate_limit):
+            pass
+        with self.assertRaises(RateLimitTimeoutError):
+            with self.limiter.limit("key", rate_limit):
+                pass
+
+    def test_batch_holds_one_slot_per_operation_it_may_run(self):
+        rate_limit = RateLimit(max_concurrent=3)
+        with self.limiter.limit("key", rate_limit, cost=5) as slots:
+            self.assertEqual(slots, 3)
+            with self.assertRaises(RateLimitTimeoutError):
+                with self.limiter.limit("key", rate_limit):
+                    pass
+        with self.limiter.limit("key", rate_limit, cost=2) as slots:
+            self.assertEqual(slots, 2)
+
+    def test_batch_takes_only_the_free_slots(self):
+        rate_limit = RateLimit(max_concurrent=3)
+        with self.limiter.limit("key", rate_limit) as slots:
+            self.assertEqual(slots, 1)
+            with self.limiter.limit("key", rate_limit, cost=5) as slots:
+                self.assertEqual(slots, 2)
+        # Every slot was released
+        with self.limiter.limit("key", rate_limit, cost=3) as slots:
+            self.assertEqual(slots, 3)
+
+    def test_slots_are_released_when_the_operation_fails(self):
+        rate_limit = RateLimit(max_concurrent=1)
+        with self.assertRaises(RuntimeError):
+            with self.limiter.limit("key", rate_limit):
+                raise RuntimeError("Query failed")
+        with self.limiter.limit("key", rate_limit) as slots:
+            self.assertEqual(slots, 1)
+
+    def test_attach_limits_the_connects_and_executions(self):
+        connection = FakeConnection()
+        self.limiter.attach(connection, RateLimit(rate=1000, burst=10))
+
+        connection.execute(query="SELECT 1")
+        connection.execute_many([{"query": "SELECT 2"}, {"query": "SELECT 3"}])
+        # The connect, then each execution
+        self.assertEqual(self.store.taken, [1, 1, 1, 1])
+
+        self.limiter.attach(connection, None)
+        connection.execute(query="SELECT 4")
+        self.assertEqual(len(self.store.taken), 4)
+
+    def test_rate_limit_timeout_fails_the_execution(self):
+        connection = FakeConnection()
+        connection.connect()
+        self.limiter.attach(connection, RateLimit(rate=1, burst=1))
+
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            connection.execute(query="SELECT 1")
+            connection.execute(query="SELECT 2")
+        self.assertEqual(len(connection.execute_calls), 1)
+        self.assertIsInstance(connection.get_errors()[0], RateLimitTimeoutError)
@@ -0,0 +1,194 @@
+"""Tests of the streamed and columnar query results."""
+
+import unittest
+from array import array
+from contextlib import contextmanager
+from unittest import mock
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from pangolin_sdk.connections import results
+from pangolin_sdk.connections.results import ColumnarResult
+from pangolin_sdk.exceptions import DatabaseQueryError
+from pangolin_sdk.tests.helpers import CountingRowStream, make_database
+
+
+class RowStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = make_database(5)
+        self.addCleanup(self.engine.dispose)
+
+    def stream(self, sql="SELECT id, name FROM items ORDER BY id", batch_size=2):
+        return CountingRowStream(self.engine, sql, batch_size=batch_size)
+
+    def test_rows_are_fetched_in_batches(self):
+        stream = self.stream()
+        self.assertEqual(stream.describe()["row_count"], None)
+
+        batches = list(stream.iter_batches())
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(batches[0][1], {"id": 1, "name": "item 1"})
+        self.assertEqual(stream.columns, ["id", "name"])
+        self.assertEqual(stream.row_count, 5)
+
+    def test_partial_read_stops_the_query(self):
+        stream = self.stream()
+        first = next(iter(stream))
+
+        self.assertEqual(first["id"], 0)
+        self.assertEqual(stream.batches, 1)
+        # Only a complete pass counts the rows
+        self.assertIsNone(stream.row_count)
+
+    def test_each_iteration_runs_the_query_again(self):
+        stream = self.stream()
+        self.assertEqual(len(list(stream)), 5)
+        with self.engine.begin() as connection:
+            connection.execute(text("INSERT INTO items VALUES (5, 'item 5')"))
+
+        self.assertEqual(len(list(stream)), 6)
+        self.assertEqual(stream.queries, 2)
+
+    def test_count_runs_the_query_once(self):
+        stream = self.stream()
+        self.assertEqual(stream.count(), 5)
+        self.assertEqual(stream.count(), 5)
+        self.assertEqual(stream.queries, 1)
+
+    def test_statement_without_rows(self):
+        stream = self.stream("UPDATE items SET name = 'renamed'")
+        self.assertEqual(list(stream), [])
+        self.assertEqual((stream.columns, stream.row_count), ([], 0))
+
+    def test_describe_does_not_run_the_query(self):
+        stream = self.stream()
+        self.assertEqual(
+            stream.describe(),
+            {
+                "query": "SELECT id, name FROM items ORDER BY id",
+                "columns": None,
+                "row_count": None,
+                "batch_size": 2,
+            },
+        )
+        self.assertEqual(stream.queries, 0)
+
+    def test_prepare_wraps_each_run_of_the_query(self):
+        runs = []
+
+        @contextmanager
+        def prepare(connection):
+            runs.append(connection)
+            try:
+                yield
+            finally:
+                runs.append("done")
+
+        stream = CountingRowStream(
+            self.engine, "SELECT id FROM items", batch_size=2, prepare=prepare
+        )
+        self.assertEqual(runs, [])
+        list(stream)
+        next(iter(stream))
+        self.assertEqual(len(runs), 4)
+        self.assertIsInstance(runs[0], Connection)
+        self.assertEqual(runs[1::2], ["done", "done"])
+
+    def test_query_errors_are_database_query_errors(self):
+        stream = self.stream("SELECT missing FROM items")
+        with self.assertRaises(DatabaseQueryError) as raised:
+            list(stream)
+        self.assertEqual(raised.exception.query, stream.sql)
+
+    def test_to_columnar_runs_the_query_once(self):
+        stream = self.stream()
+        columnar = stream.to_columnar()
+
+        self.assertEqual(stream.queries, 1)
+        self.assertEqual(len(columnar), 5)
+        self.assertEqual(list(columnar.column("id")), [0, 1, 2, 3, 4])
+        self.assertEqual(columnar.to_rows()[1], {"id": 1, "name": "item 1"})
+
+        empty = self.stream("SELECT id FROM items WHERE id < 0").to_columnar()
+        self.assertEqual((empty.column_names, len(empty)), (["id"], 0))
+
+    def test_fan_out_reads_one_run_of_the_query(self):
+        stream = self.stream(batch_size=1)
+
+        results = stream.fan_out(
+            [
+                lambda view: [row["id"] for row in view],
+                lambda view: view.count(),
+                # Stops reading after the first row
+                lambda view: next(iter(view))["name"],
+            ]
+        )
+
+        self.assertEqual(results, [[0, 1, 2, 3, 4], 5, "item 0"])
+        self.assertEqual((stream.queries, stream.batches), (1, 5))
+
+    def test_fan_out_stops_the_query_once_no_consumer_reads(self):
+        stream = self.stream(batch_size=1)
+
+        results = stream.fan_out(
+            [lambda view: next(iter(view))["id"], lambda view: "no rows read"],
+            max_pending=1,
+        )
+
+        self.assertEqual(results, [0, "no rows read"])
+        self.assertEqual(stream.queries, 1)
+        self.assertLess(stream.batches, 5)
+
+    def test_fan_out_raises_query_errors_in_the_consumers(self):
+        stream = self.stream("SELECT missing FROM items")
+
+        def read(view):
+            try:
+                list(view)
+            except DatabaseQueryError as e:
+                return e.query
+
+        self.assertEqual(stream.fan_out([read, read]), [stream.sql] * 2)
+
+        def fail(view):
+            raise ValueError("Consumer failed")
+
+        with self.assertRaisesRegex(ValueError, "Consumer failed"):
+            self.stream().fan_out([list, fail])
+
+
+class ColumnarResultTests(unittest.TestCase):
+    def setUp(self):
+        self.result = ColumnarResult.from_rows(
+            ["id", "score", "name"], [(1, 0.5, "a"), (2, 1.5, None), (3, 2.5, "c")]
+        )
+
+    def test_rows_are_stored_column_by_column(self):
+        self.assertEqual(len(self.result), 3)
+        self.assertEqual(self.result.column_names, ["id", "score", "name"])
+        self.assertEqual(self.result.column("id").dtype.kind, "i")
+        self.assertEqual(self.result.column("score").dtype.kind, "f")
+        # Mixed values are kept as objects, None is not turned into a string
+        self.assertEqual(self.result.column("name").tolist(), ["a", None, "c"])
+
+    def test_rows_are_rebuilt_with_plain_values(self):
+        rows = self.result.to_rows()
+        self.assertEqual(rows[1], {"id": 2, "score": 1.5, "name": None})
+        self.assertIs(type(rows[0]["id"]), int)
+
+    def test_empty_result_keeps_its_columns(self):
+        result = ColumnarResult.from_rows(["id", "name"], [])
+        self.assertEqual(len(result), 0)
+        self.assertEqual(result.describe(), {"columns": ["id", "name"], "row_count": 0})
+        self.assertEqual(result.to_rows(), [])
+
+    def test_typed_arrays_without_numpy(self):
+        with mock.patch.object(results, "np", None):
+            result = ColumnarResult.from_rows(
+                ["id", "score", "name"], [(1, 0.5, "a"), (2, 1.5, "b")]
+            )
+        self.assertEqual(result.column("id"), array("q", [1, 2]))
+        self.assertEqual(result.column("score"), array("d", [0.5, 1.5]))
+        self.assertEqual(result.column("name"), ["a", "b"])
+        self.assertEqual(result.to_rows()[0], {"id": 1, "score": 0.5, "name": "a"})
@@ -0,0 +1,254 @@
+"""Tests of the SSH connection running commands over multiplexed channels."""
+
+import logging
+import unittest
+from typing import Dict, List, Optional, Tuple
+from unittest import mock
+
+from pangolin_sdk.configs.ssh import SSHConnectionConfig
+from pangolin_sdk.connections import ssh
+from pangolin_sdk.connections.pool import ConnectionPool
+from pangolin_sdk.connections.ssh import SSHCommandResult, SSHConnection
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import SSHExecutionError
+
+
+class FakeChannel:
+    """Channel running a scripted command, which exits after a number of polls."""
+
+    def __init__(self, transport: "FakeTransport") -> None:
+        self.transport = transport
+        self.stdout: List[bytes] = []
+        self.stderr: List[bytes] = []
+        self.polls = 0
+        self.exit_code = 0
+
+    def exec_command(self, command: str) -> None:
+        stdout, stderr, self.exit_code, self.polls = self.transport.script[command]
+        self.stdout = [stdout.encode("utf-8")] if stdout else []
+        self.stderr = [stderr.encode("utf-8")] if stderr else []
+
+    def recv_ready(self) -> bool:
+        return bool(self.stdout)
+
+    def recv(self, size: int) -> bytes:
+        return self.stdout.pop(0)
+
+    def recv_stderr_ready(self) -> bool:
+        return bool(self.stderr)
+
+    def recv_stderr(self, size: int) -> bytes:
+        return self.stderr.pop(0)
+
+    def exit_status_ready(self) -> bool:
+        self.polls -= 1
+        return self.polls <= 0
+
+    def recv_exit_status(self) -> int:
+        return self.exit_code
+
+    def close(self) -> None:
+        self.transport.open_channels -= 1
+
+
+class FakeTransport:
+    """Transport opening FakeChannels, tracking the channels open at once.
+
+    Attributes:
+        script (Dict[str, Tuple[str, str, int, int]]): Stdout, stderr, exit
+            code and polls before exiting of each command.
+    """
+
+    def __init__(self) -> None:
+        self.script: Dict[str, Tuple[str, str, int, int]] = {}
+        self.open_channels = 0
+        self.max_open_channels = 0
+        self.fail: Optional[BaseException] = None
+
+    def open_session(self, timeout=None) -> FakeChannel:
+        if self.fail is not None:
+            raise self.fail
+        self.open_channels += 1
+        self.max_open_channels = max(self.max_open_channels, self.open_channels)
+        return FakeChannel(self)
+
+    def is_active(self) -> bool:
+        return True
+
+    def send_ignore(self) -> None:
+        pass
+
+
+class FakeSSHClient:
+    """paramiko.SSHClient whose transport is a FakeTransport."""
+
+    transport = None
+
+    def set_missing_host_key_policy(self, policy) -> None:
+        pass
+
+    def connect(self, **kwargs) -> None:
+        pass
+
+    def get_transport(self) -> FakeTransport:
+        return self.transport
+
+    def close(self) -> None:
+        pass
+
+
+class SSHConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.transport = FakeTransport()
+        FakeSSHClient.transport = self.transport
+        for target, fake in (
+            (ssh.paramiko, {"SSHClient": FakeSSHClient}),
+            # Channels are polled instead of waited on
+            (ssh, {"select": mock.Mock()}),
+        ):
+            patcher = mock.patch.multiple(target, **fake)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.config = SSHConnectionConfig(
+            name="ssh",
+            host="server.local",
+            username="tester",
+            password="secret",
+            max_retries=0,
+        )
+        self.connection = self.ssh_connection(batch_execution=True, max_channels=2)
+        logger = self.connection._logger
+        self.addCleanup(logger.setLevel, logging.INFO)
+        self.addCleanup(self.connection.disconnect)
+
+    def ssh_connection(self, **kwargs):
+        connection = SSHConnection(self.config, **kwargs)
+        # Keep the info logs of every command out of the test output
+        connection._logger.setLevel(logging.WARNING)
+        return connection
+
+    def script(self, command, stdout="", stderr="", exit_code=0, polls=1):
+        self.transport.script[command] = (stdout, stderr, exit_code, polls)
+        return {"command": command}
+
+    def test_execute_many_keeps_the_command_order(self):
+        # Earlier commands run longer, so they finish last
+        requests = [
+            self.script(f"echo {index}", stdout=f"{index}\n", polls=6 - index)
+            for index in range(5)
+        ]
+
+        results = self.connection.execute_many(requests)
+
+        self.assertEqual(results, ["0", "1", "2", "3", "4"])
+        self.assertTrue(all(isinstance(r, SSHCommandResult) for r in results))
+        self.assertEqual(results[2].command, "echo 2")
+        self.assertEqual(self.connection.get_last_result(), "4")
+        self.assertEqual(self.connection.get_status(), ConnectionStatus.CONNECTED)
+
+    def test_execute_many_caps_the_channels_open_at_once(self):
+        requests = [self.script(f"sleep {index}", polls=3) for index in range(6)]
+
+        self.connection.execute_many(requests)
+        self.assertEqual(self.transport.max_open_channels, 2)
+        self.assertEqual(self.transport.open_channels, 0)
+
+        self.transport.max_open_channels = 0
+        self.connection.execute_many(requests, max_in_flight=4)
+        self.assertEqual(self.transport.max_open_channels, 4)
+
+    def test_non_zero_exit_codes_are_returned(self):
+        requests = [self.script("false", exit_code=1), self.script("true")]
+
+        with self.assertLogs("paramiko", "WARNING"):
+            results = self.connection.execute_many(requests)
+        self.assertEqual([result.exit_code for result in results], [1, 0])
+        self.assertEqual(
+            results[0].to_dict(),
+            {
+                "command": "false",
+                "stdout": "",
+                "stderr": "",
+                "exit_code": 1,
+                "duration_ms": results[0].duration_ms,
+            },
+        )
+
+    def test_commands_writing_to_stderr_fail(self):
+        requests = [
+            self.script("ls missing", stderr="No such file"),
+            self.script("true"),
+        ]
+
+        with self.assertLogs("paramiko", "ERROR"):
+            results = self.connection.execute_many(requests)
+        self.assertEqual(results, [None, ""])
+        error = self.connection.get_errors()[-1]
+        self.assertIsInstance(error, SSHExecutionError)
+        self.assertIn("No such file", error.message)
+
+        # A single command fails in the same way
+        with self.assertLogs("paramiko", "ERROR"):
+            self.connection.execute(command="ls missing")
+        self.assertEqual(len(self.connection.get_errors()), 2)
+        self.assertIsInstance(self.connection.get_errors()[-1], SSHExecutionError)
+
+    def test_requests_without_command_are_not_run(self):
+        results = self.connection.execute_many([{}, self.script("uptime", "up")])
+
+        self.assertEqual(results, [None, "up"])
+        self.assertIsInstance(self.connection.get_errors()[0], SSHExecutionError)
+
+    def test_transport_failure_fails_the_batch(self):
+        self.connection.connect()
+        self.transport.fail = EOFError("Transport closed")
+
+        with self.assertLogs("paramiko", "ERROR"):
+            results = self.connection.execute_many([self.script("uptime")] * 2)
+        self.assertEqual(results, [None, None])
+        self.assertEqual(self.connection.get_status(), ConnectionStatus.DISCONNECTED)
+
+        self.transport.fail = ssh.paramiko.SSHException("Channel refused")
+        with self.assertLogs("paramiko", "ERROR"):
+            results = self.connection.execute_many([self.script("uptime")])
+        self.assertEqual(results, [None])
+        error = self.connection.get_errors()[-1]
+        self.assertIsInstance(error, SSHExecutionError)
+        self.assertIn("Channel refused", error.message)
+
+    def test_programming_errors_are_not_reported_as_ssh_errors(self):
+        self.connection.connect()
+        self.transport.fail = TypeError("Unexpected argument")
+
+        with self.assertRaises(TypeError):
+            self.connection.execute_many([self.script("uptime")])
+        self.assertEqual(self.connection.get_errors(), [])
+
+    def test_execute_runs_one_command(self):
+        self.script("uptime", stdout="up 3 days\n")
+
+        self.connection.execute(command="uptime")
+        result = self.connection.get_last_result()
+        self.assertEqual(result, "up 3 days")
+        self.assertEqual(self.connection.stdout, "up 3 days")
+        self.assertEqual(result.exit_code, 0)
+
+    def test_pooled_connection_takes_the_batch_settings_of_the_caller(self):
+        # Same target and credentials, with other batch settings
+        serial = self.ssh_connection()
+        batched = self.ssh_connection(batch_execution=True, max_channels=3)
+        pool = ConnectionPool()
+        self.addCleanup(pool.close_all)
+        with pool.lease(self.connection):
+            pass
+
+        with pool.lease(serial) as leased:
+            self.assertIs(leased, self.connection)
+            self.assertFalse(leased.supports_batch_execution)
+            self.assertEqual(leased.max_channels, serial.max_channels)
+
+        with pool.lease(batched) as leased:
+            self.assertIs(leased, self.connection)
+            self.assertTrue(leased.supports_batch_execution)
+            self.assertEqual(leased.max_channels, 3)
@@ -10,6 +10,7 @@ class ProjectAdmin(admin.ModelAdmin):
     readonly_fields = ("created_at", "updated_at")
     fieldsets = (
         (None, {"fields": ("name", "description", "owner", "is_active")}),
+        ("Scheduling", {"fields": ("scheduling_weight", "max_concurrent_runs")}),
         (
             "Timestamps",
             {"classes": ("collapse",), "fields": ("created_at", "updated_at")},
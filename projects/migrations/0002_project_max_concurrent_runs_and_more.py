@@ -0,0 +1,32 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="project",
+            name="max_concurrent_runs",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Maximum number of protocol runs of this project running at once (no limit when empty)",
+                null=True,
+                verbose_name="Max Concurrent Runs",
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="scheduling_weight",
+            field=models.PositiveIntegerField(
+                default=1,
+                help_text="Share of the batch workers this project gets when projects compete for them",
+                verbose_name="Scheduling Weight",
+            ),
+        ),
+    ]
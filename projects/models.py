@@ -31,6 +31,17 @@ class Project(BaseModel):
     is_active = models.BooleanField(
         _("Active"), default=True, help_text="Whether this project is currently active"
     )
+    scheduling_weight = models.PositiveIntegerField(
+        _("Scheduling Weight"),
+        default=1,
+        help_text="Share of the batch workers this project gets when projects compete for them",
+    )
+    max_concurrent_runs = models.PositiveIntegerField(
+        _("Max Concurrent Runs"),
+        blank=True,
+        null=True,
+        help_text="Maximum number of protocol runs of this project running at once (no limit when empty)",
+    )
 
     class Meta:
         ordering = ["-updated_at"]
@@ -0,0 +1,5 @@
+# projects/signals.py
+from projects.models import Project
+from utils.cache import register_cached_model
+
+register_cached_model(Project)
@@ -1,10 +1,13 @@
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
+from django.db.models import Count
+from django.http import Http404
 from django.shortcuts import reverse
 from .models import Project
 from environments.models import Environment
 from test_protocols.models import TestProtocol, TestSuite
+from utils.cache import cached, listing_namespace, object_namespace
 
 
 class ProjectListView(ListView):
@@ -25,16 +28,47 @@ class ProjectDetailView(DetailView):
     model = Project
     template_name = "projects/project_detail.html"
 
+    def get_object(self, queryset=None):
+        pk = self.kwargs["pk"]
+        project = cached(
+            "project",
+            [pk],
+            [object_namespace(Project, pk)],
+            lambda: Project.objects.filter(pk=pk).first(),
+        )
+        if project is None:
+            raise Http404("No project found matching the query")
+        return project
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Add protocol object to context
-        # For example, get the most recent protocol:
-        project = Project.objects.get(pk=self.kwargs["pk"])
-        context["test_suites"] = TestSuite.objects.filter(project=project)
+        project = self.object
+        # Suites with their protocol counts, recounted when a protocol changes
+        context["test_suites"] = cached(
+            "project_suites",
+            [project.pk],
+            [
+                listing_namespace(TestSuite, project=project.pk),
+                listing_namespace(TestProtocol),
+            ],
+            lambda: list(
+                TestSuite.objects.filter(project=project).annotate(
+                    protocol_count=Count("protocols")
+                )
+            ),
+        )
         context["protocol"] = TestProtocol.objects.filter(
             suite__project=project
         )  # Or some other query logic
-        context["environments"] = Environment.objects.filter(project=project)
+        # The file contents are only needed to edit a variable
+        context["environments"] = cached(
+            "project_environments",
+            [project.pk],
+            [listing_namespace(Environment, project=project.pk)],
+            lambda: list(
+                Environment.objects.filter(project=project).defer("file_content")
+            ),
+        )
         return context
 
 
@@ -20,6 +20,8 @@ from .models import (
     VerificationMethod,
     ExecutionStep,
 )
+from .forms import ExecutionStepForm, TestProtocolForm
+from .services import launch_protocol_runs
 
 
 class TestProtocolInline(admin.TabularInline):
@@ -60,10 +62,6 @@ class ConnectionConfigInline(admin.StackedInline):
     can_delete = False
     fieldsets = (
         (None, {"fields": ("config_type",)}),
-        (
-            _("Connection Details"),
-            {"fields": ("host", "port", "username", "password", "secret_key")},
-        ),
         (_("Connection Settings"), {"fields": ("timeout_seconds", "retry_attempts")}),
         (
             _("Additional Configuration"),
@@ -127,12 +125,21 @@ class TestProtocolAdmin(admin.ModelAdmin):
         "last_run_status",
         "order_index",
     )
-    list_filter = ("status", "suite__project", "suite")
+    list_filter = ("status", "is_gate", "suite__project", "suite")
     search_fields = ("name", "description", "suite__name")
     fieldsets = (
-        (None, {"fields": ("suite", "name", "description", "status")}),
+        (None, {"fields": ("suite", "name", "description", "status", "is_gate")}),
+        (
+            _("Dependencies"),
+            {
+                "fields": ("depends_on",),
+                "description": "Protocols of the same suite that must complete first in parallel suite runs",
+            },
+        ),
         (_("Display Order"), {"fields": ("order_index",)}),
     )
+    form = TestProtocolForm
+    filter_horizontal = ("depends_on",)
     inlines = [ConnectionConfigInline, ExecutionStepInline, ProtocolRunInline]
     actions = ["run_protocols"]
 
@@ -181,20 +188,11 @@ class TestProtocolAdmin(admin.ModelAdmin):
 
     def run_protocols(self, request, queryset):
         """Admin action to run selected protocols"""
-        if queryset.count() > 5:
-            self.message_user(
-                request,
-                "You can only run up to 5 protocols at once.",
-                level=messages.WARNING,
-            )
-            return
-
-        # Placeholder for actual protocol execution
-        # In a real implementation, you would call your service to execute the protocols
+        run_ids = launch_protocol_runs(queryset, user=request.user)
 
         self.message_user(
             request,
-            f"Successfully started {queryset.count()} protocols.",
+            f"Successfully started {len(run_ids)} protocols.",
             level=messages.SUCCESS,
         )
 
@@ -367,9 +365,11 @@ class ExecutionStepAdmin(admin.ModelAdmin):
     list_filter = ("test_protocol__suite",)
     search_fields = ("test_protocol__name",)
     raw_id_fields = ("test_protocol",)
+    form = ExecutionStepForm
+    filter_horizontal = ("depends_on",)
 
     fieldsets = (
-        (None, {"fields": ("test_protocol", "name")}),
+        (None, {"fields": ("test_protocol", "name", "depends_on", "timeout_seconds")}),
         (
             _("Execution Parameters"),
             {
@@ -418,6 +418,7 @@ class VerificationResultAdmin(admin.ModelAdmin):
         "verification_time",
     )
     search_fields = ("verification_step__name", "message", "error_message")
+    raw_id_fields = ("protocol_run", "execution_step")
     readonly_fields = (
         "verification_time",
         "formatted_result_data",
@@ -425,7 +426,18 @@ class VerificationResultAdmin(admin.ModelAdmin):
         "formatted_expected_value",
     )
     fieldsets = (
-        (None, {"fields": ("verification_step", "success", "status")}),
+        (
+            None,
+            {
+                "fields": (
+                    "protocol_run",
+                    "execution_step",
+                    "verification_step",
+                    "success",
+                    "status",
+                )
+            },
+        ),
         (
             "Verification Details",
             {
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TestProtcolsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "test_protocols"
+
+    def ready(self):
+        import test_protocols.signals  # noqa: F401
@@ -0,0 +1,96 @@
+# test_protocols/cancellation.py
+import logging
+import time
+
+from django.utils import timezone
+
+from test_protocols.models import ProtocolRun
+from test_protocols.rollups import transition_runs
+
+logger = logging.getLogger(__name__)
+
+
+class ProtocolRunAborted(Exception):
+    """Raised inside a protocol run once the run has been aborted"""
+
+
+class ProtocolRunTimedOut(ProtocolRunAborted):
+    """Raised inside a protocol run once the run has passed its deadline"""
+
+
+def abort_suite_run(suite_run_id, reason):
+    """
+    Abort the protocol runs of a suite run that have not finished yet.
+
+    Pending runs are skipped when their task starts; running protocols notice
+    the abort between steps (see RunCancellation) and stop early.
+
+    Args:
+        suite_run_id: UUID grouping the protocol runs of the suite run
+        reason: Why the suite run is aborted, stored as the runs' error message
+
+    Returns:
+        int: Number of runs aborted
+    """
+    aborted = transition_runs(
+        ProtocolRun.objects.filter(
+            suite_run_id=suite_run_id, status__in=["pending", "running"]
+        ),
+        status="aborted",
+        error_message=reason,
+        updated_at=timezone.now(),
+    )
+    logger.warning(
+        f"Aborted {aborted} protocol runs of suite run {suite_run_id}: {reason}"
+    )
+    return aborted
+
+
+class RunCancellation:
+    """
+    Cooperative cancellation of a protocol run.
+
+    A run is cancelled when its status is set to "aborted" while it executes,
+    or once its deadline has passed. The status is read from the database at
+    most once per ``interval`` seconds.
+    """
+
+    def __init__(self, protocol_run_id, interval=1.0, deadline=None):
+        """
+        Args:
+            protocol_run_id: The ID of the ProtocolRun to watch
+            interval: Minimum number of seconds between two database checks
+            deadline: Optional Deadline of the run
+        """
+        self.protocol_run_id = protocol_run_id
+        self.interval = interval
+        self.deadline = deadline
+        self._checked_at = None
+        # Abort reason, once the run is known to be aborted
+        self.reason = None
+
+    def is_cancelled(self):
+        now = time.monotonic()
+        if self.reason is None and (
+            self._checked_at is None or now - self._checked_at >= self.interval
+        ):
+            self._checked_at = now
+            aborted = (
+                ProtocolRun.objects.filter(pk=self.protocol_run_id, status="aborted")
+                .values_list("error_message")
+                .first()
+            )
+            if aborted is not None:
+                self.reason = aborted[0] or "The protocol run was aborted"
+        return self.reason is not None
+
+    def check(self):
+        """
+        Raises:
+            ProtocolRunTimedOut: If the run has passed its deadline
+            ProtocolRunAborted: If the run has been aborted
+        """
+        if self.deadline is not None and self.deadline.expired:
+            raise ProtocolRunTimedOut("The protocol run passed its deadline")
+        if self.is_cancelled():
+            raise ProtocolRunAborted(self.reason)
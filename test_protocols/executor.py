@@ -0,0 +1,246 @@
+# test_protocols/executor.py
+import logging
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+from pangolin_sdk.constants import ConnectionStatus
+from pangolin_sdk.exceptions import BaseConnectionError, DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class StepOutcome:
+    """The result of executing one step, or why it was skipped"""
+
+    __slots__ = ("result", "skipped_reason", "timed_out")
+
+    def __init__(self, result=None, skipped_reason=None, timed_out=False):
+        self.result = result
+        self.skipped_reason = skipped_reason
+        # Whether the step ran out of time, its own or that of the run
+        self.timed_out = timed_out
+
+    @property
+    def failed(self):
+        """A step failed if it was skipped or its execution produced no result"""
+        return self.skipped_reason is not None or self.result is None
+
+
+def get_step_dependencies(execution_steps):
+    """
+    Map each step to the steps it depends on, ignoring steps of other protocols.
+
+    Args:
+        execution_steps: StepSnapshots of the protocol
+
+    Returns:
+        dict: Step ID -> list of dependency IDs, in step order
+
+    Raises:
+        ValueError: If the step dependencies form a cycle
+    """
+    step_ids = {step.pk for step in execution_steps}
+    dependencies = {
+        step.pk: [
+            dependency_id
+            for dependency_id in step.depends_on
+            if dependency_id in step_ids
+        ]
+        for step in execution_steps
+    }
+
+    # Kahn's algorithm, every step is visited unless it sits on a cycle
+    remaining = {step_id: len(parents) for step_id, parents in dependencies.items()}
+    ready = [step_id for step_id, count in remaining.items() if count == 0]
+    visited = 0
+    dependents = _get_dependents(dependencies)
+    while ready:
+        step_id = ready.pop()
+        visited += 1
+        for child_id in dependents[step_id]:
+            remaining[child_id] -= 1
+            if remaining[child_id] == 0:
+                ready.append(child_id)
+    if visited != len(dependencies):
+        raise ValueError("Circular dependency between execution steps")
+
+    return dependencies
+
+
+def _get_dependents(dependencies):
+    dependents = {step_id: [] for step_id in dependencies}
+    for step_id, parents in dependencies.items():
+        for parent_id in parents:
+            dependents[parent_id].append(step_id)
+    return dependents
+
+
+class StepGraphExecutor:
+    """
+    Executes the steps of a protocol as a dependency graph.
+
+    Steps run on a bounded thread pool as soon as the steps they depend on have
+    run, each worker using a connection of its own: the connection the run
+    already leased is used first, more are leased from the pool as the graph
+    widens. The dependents of a step whose execution failed are skipped.
+
+    Only execution happens on the worker threads; results are returned to the
+    caller, which verifies and persists them.
+    """
+
+    def __init__(
+        self,
+        execution_steps,
+        connection,
+        open_connection,
+        max_workers=1,
+        deadline=None,
+    ):
+        """
+        Args:
+            execution_steps: StepSnapshots of the protocol
+            connection: The connected connection leased for the run
+            open_connection: Callable returning a context manager that yields
+                another connection to the same target (e.g. a pool lease)
+            max_workers: Maximum number of steps executing at once
+            deadline: Optional Deadline of the run. Each step executes with it,
+                shortened to the timeout_seconds of the step
+
+        Raises:
+            ValueError: If the step dependencies form a cycle
+        """
+        self.steps = list(execution_steps)
+        self.dependencies = get_step_dependencies(self.steps)
+        self.dependents = _get_dependents(self.dependencies)
+        self.max_workers = max(1, min(max_workers, len(self.steps) or 1))
+        self.open_connection = open_connection
+        self.deadline = deadline
+
+        self._idle = queue.LifoQueue()
+        self._idle.put(connection)
+        self._opened = 1
+        self._lock = threading.Lock()
+        self._leases = ExitStack()
+
+    def run(self, tracer=None, on_outcome=None):
+        """
+        Execute every step.
+
+        Args:
+            tracer: Optional RunTracer recording an "execute" span per step
+            on_outcome: Optional callable, called with the index of each step
+                and its StepOutcome as soon as the step has run or was skipped
+
+        Returns:
+            list: A StepOutcome per step, in step order
+        """
+        steps_by_id = {step.pk: step for step in self.steps}
+        step_indexes = {step.pk: index for index, step in enumerate(self.steps)}
+        outcomes = {}
+        waiting = {
+            step_id: set(parents) for step_id, parents in self.dependencies.items()
+        }
+        ready = [step.pk for step in self.steps if not waiting[step.pk]]
+
+        with (
+            self._leases,
+            ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="protocol-step"
+            ) as pool,
+        ):
+            futures = {}
+            try:
+                while ready or futures:
+                    for step_id in ready:
+                        step = steps_by_id[step_id]
+                        futures[pool.submit(self._execute, step, tracer)] = step_id
+                    ready = []
+
+                    done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        completed = [(futures.pop(future), future.result())]
+                        while completed:
+                            step_id, outcome = completed.pop()
+                            outcomes[step_id] = outcome
+                            if on_outcome is not None:
+                                on_outcome(step_indexes[step_id], outcome)
+                            for child_id in self.dependents[step_id]:
+                                waiting[child_id].discard(step_id)
+                                if waiting[child_id]:
+                                    continue
+                                failed = [
+                                    parent_id
+                                    for parent_id in self.dependencies[child_id]
+                                    if outcomes[parent_id].failed
+                                ]
+                                if failed:
+                                    # Skip the whole branch below a failed step
+                                    names = ", ".join(
+                                        str(steps_by_id[parent_id].name or parent_id)
+                                        for parent_id in failed
+                                    )
+                                    reason = f"dependency {names} failed"
+                                    completed.append(
+                                        (child_id, StepOutcome(None, reason))
+                                    )
+                                else:
+                                    ready.append(child_id)
+            except BaseException:
+                # Do not start the queued steps, e.g. when the run is aborted
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return [outcomes[step.pk] for step in self.steps]
+
+    def _execute(self, step, tracer):
+        connection = self._checkout()
+        run_deadline = connection.deadline
+        if self.deadline is not None:
+            connection.deadline = self.deadline.shorten(step.timeout_seconds)
+        errors = len(connection.get_errors())
+        try:
+            if tracer is None:
+                result = connection.execute_many([step.kwargs])[0]
+            else:
+                with tracer.span(
+                    "execute", step=step.name, step_id=str(step.pk)
+                ) as span:
+                    result = connection.execute_many([step.kwargs])[0]
+                    span.set(success=result is not None)
+            timed_out = result is None and any(
+                isinstance(error, DeadlineExceededError)
+                for error in connection.get_errors()[errors:]
+            )
+            return StepOutcome(result, timed_out=timed_out)
+        finally:
+            connection.deadline = run_deadline
+            self._idle.put(connection)
+
+    def _checkout(self):
+        """Take an idle connection of the run, opening another one if none is free"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_open = self._opened < self.max_workers
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                lease = self.open_connection()
+                connection = lease.__enter__()
+                with self._lock:
+                    self._leases.push(lease.__exit__)
+                if connection.get_status() == ConnectionStatus.CONNECTED:
+                    return connection
+                logger.warning("Could not open another connection, sharing one")
+            except BaseConnectionError as e:
+                logger.warning(f"Could not open another connection: {str(e)}")
+
+        # Wait for a step running on another connection to finish
+        return self._idle.get()
@@ -0,0 +1,178 @@
+from django import forms
+
+from .models import ExecutionStep, TestProtocol
+
+
+class TestProtocolForm(forms.ModelForm):
+    """
+    Form for TestProtocol creation and updating, its dependencies limited to
+    the other protocols of its suite
+    """
+
+    class Meta:
+        model = TestProtocol
+        fields = [
+            "suite",
+            "name",
+            "description",
+            "status",
+            "order_index",
+            "is_gate",
+            "depends_on",
+        ]
+
+    def __init__(self, *args, suite=None, **kwargs):
+        """
+        Args:
+            suite: The suite of the protocol, when the form has no suite field
+        """
+        super().__init__(*args, **kwargs)
+        self.suite = suite
+        if "depends_on" not in self.fields:
+            return
+
+        candidates = TestProtocol.objects.select_related("suite").order_by(
+            "suite__name", "order_index", "name"
+        )
+        suite_id = self._suite_id()
+        if suite_id:
+            candidates = candidates.filter(suite_id=suite_id)
+        if self.instance.pk:
+            candidates = candidates.exclude(pk=self.instance.pk)
+        self.fields["depends_on"].queryset = candidates
+
+    def _suite_id(self):
+        if self.suite is not None:
+            return self.suite.pk
+        if "suite" in self.fields:
+            suite = self.data.get(self.add_prefix("suite")) if self.is_bound else None
+            return suite or self.initial.get("suite") or self.instance.suite_id
+        return self.instance.suite_id
+
+    def clean(self):
+        cleaned_data = super().clean()
+        dependencies = cleaned_data.get("depends_on")
+        if not dependencies:
+            return cleaned_data
+
+        suite = self.suite or cleaned_data.get("suite")
+        if suite is None and self.instance.suite_id:
+            suite = self.instance.suite
+        if suite is not None and any(
+            dependency.suite_id != suite.pk for dependency in dependencies
+        ):
+            self.add_error(
+                "depends_on", "A protocol can only depend on protocols of its suite."
+            )
+        elif self.instance.pk and self._creates_cycle(dependencies):
+            self.add_error(
+                "depends_on", "These dependencies would create a circular dependency."
+            )
+        return cleaned_data
+
+    def _creates_cycle(self, dependencies):
+        """Whether the instance is reachable from one of its new dependencies"""
+        edges = {}
+        for from_id, to_id in TestProtocol.depends_on.through.objects.filter(
+            from_testprotocol__suite_id=self.instance.suite_id
+        ).values_list("from_testprotocol_id", "to_testprotocol_id"):
+            edges.setdefault(from_id, []).append(to_id)
+
+        pending = [dependency.pk for dependency in dependencies]
+        seen = set()
+        while pending:
+            protocol_id = pending.pop()
+            if protocol_id == self.instance.pk:
+                return True
+            if protocol_id in seen:
+                continue
+            seen.add(protocol_id)
+            pending.extend(edges.get(protocol_id, ()))
+        return False
+
+
+class ExecutionStepForm(forms.ModelForm):
+    """
+    Form for ExecutionStep creation and updating, its dependencies limited to
+    the other steps of its protocol
+    """
+
+    class Meta:
+        model = ExecutionStep
+        fields = ["test_protocol", "name", "depends_on", "timeout_seconds", "kwargs"]
+
+    def __init__(self, *args, protocol=None, **kwargs):
+        """
+        Args:
+            protocol: The protocol of the step, when the form has no
+                test_protocol field
+        """
+        super().__init__(*args, **kwargs)
+        self.protocol = protocol
+        if "depends_on" not in self.fields:
+            return
+
+        candidates = ExecutionStep.objects.order_by("created_at")
+        protocol_id = self._protocol_id()
+        if protocol_id:
+            candidates = candidates.filter(test_protocol_id=protocol_id)
+        if self.instance.pk:
+            candidates = candidates.exclude(pk=self.instance.pk)
+        self.fields["depends_on"].queryset = candidates
+
+    def _protocol_id(self):
+        if self.protocol is not None:
+            return self.protocol.pk
+        if "test_protocol" in self.fields:
+            protocol = (
+                self.data.get(self.add_prefix("test_protocol"))
+                if self.is_bound
+                else None
+            )
+            return (
+                protocol
+                or self.initial.get("test_protocol")
+                or self.instance.test_protocol_id
+            )
+        return self.instance.test_protocol_id
+
+    def clean(self):
+        cleaned_data = super().clean()
+        dependencies = cleaned_data.get("depends_on")
+        if not dependencies:
+            return cleaned_data
+
+        protocol = self.protocol or cleaned_data.get("test_protocol")
+        if protocol is None and self.instance.test_protocol_id:
+            protocol = self.instance.test_protocol
+        if protocol is not None and any(
+            dependency.test_protocol_id != protocol.pk for dependency in dependencies
+        ):
+            self.add_error(
+                "depends_on", "A step can only depend on steps of its protocol."
+            )
+        elif self.instance.pk and self._creates_cycle(dependencies):
+            self.add_error(
+                "depends_on", "These dependencies would create a circular dependency."
+            )
+        return cleaned_data
+
+    def _creates_cycle(self, dependencies):
+        """Whether the instance is reachable from one of its new dependencies"""
+        edges = {}
+        for from_id, to_id in ExecutionStep.depends_on.through.objects.filter(
+            from_executionstep__test_protocol_id=self.instance.test_protocol_id
+        ).values_list("from_executionstep_id", "to_executionstep_id"):
+            edges.setdefault(from_id, []).append(to_id)
+
+        pending = [dependency.pk for dependency in dependencies]
+        seen = set()
+        while pending:
+            step_id = pending.pop()
+            if step_id == self.instance.pk:
+                return True
+            if step_id in seen:
+                continue
+            seen.add(step_id)
+            pending.extend(edges.get(step_id, ()))
+        return False
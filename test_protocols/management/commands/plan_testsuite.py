@@ -0,0 +1,82 @@
+# test_protocols/management/commands/plan_testsuite.py
+import json
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from test_protocols.models import TestSuite
+from test_protocols.planning import SuitePlan
+
+
+class Command(BaseCommand):
+    help = (
+        "Show how a parallel run of a test suite would be sharded, without running it"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "suite_id", type=str, help="The UUID of the test suite to plan"
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of protocols running at once (default: SUITE_MAX_CONCURRENCY)",
+        )
+        parser.add_argument(
+            "--window",
+            type=int,
+            help="Number of recent runs per protocol used for the estimates",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the plan as JSON"
+        )
+
+    def handle(self, *args, **options):
+        suite_id = options["suite_id"]
+
+        try:
+            # Parse the suite ID as a UUID
+            suite_id = uuid.UUID(suite_id)
+        except ValueError:
+            raise CommandError(f"Invalid test suite ID: {suite_id}")
+
+        try:
+            suite = TestSuite.objects.get(id=suite_id)
+            plan = SuitePlan(
+                suite, workers=options.get("workers"), window=options.get("window")
+            )
+        except TestSuite.DoesNotExist:
+            raise CommandError(f"Test suite with ID {suite_id} not found")
+        except ValueError as e:
+            raise CommandError(f"Failed to plan test suite: {str(e)}")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(plan.to_dict(), indent=2))
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Test suite {suite.name}: estimated {plan.estimated_median:.1f}s "
+                f"(p90 {plan.estimated_p90:.1f}s) on {plan.workers} workers"
+            )
+        )
+        for stage_index, stage in enumerate(plan.stages, start=1):
+            self.stdout.write(f"Stage {stage_index}:")
+            for shard_index, shard in enumerate(stage, start=1):
+                self.stdout.write(
+                    f"  Shard {shard_index}: {shard['median']:.1f}s "
+                    f"(p90 {shard['p90']:.1f}s)"
+                )
+                for item in shard["protocols"]:
+                    estimate = item["estimate"]
+                    self.stdout.write(
+                        f"    - {item['protocol'].name}: {estimate.median:.1f}s "
+                        f"(p90 {estimate.p90:.1f}s, {estimate.samples} runs)"
+                    )
+
+        missing = plan.protocols_without_history
+        if missing:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(missing)} protocols have no completed runs, "
+                    "their duration is a guess"
+                )
+            )
@@ -0,0 +1,29 @@
+# test_protocols/management/commands/rebuild_run_trends.py
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from test_protocols.trends import rebuild_run_trends
+
+
+class Command(BaseCommand):
+    help = "Recompute the hourly and daily run trends from the finished runs"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            type=str,
+            help="Only rebuild the periods from this date on (YYYY-MM-DD)",
+        )
+
+    def handle(self, *args, **options):
+        since = options.get("since")
+        if since:
+            try:
+                since = date.fromisoformat(since)
+            except ValueError:
+                raise CommandError(f"Invalid date: {since}")
+
+        counted = rebuild_run_trends(since)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the run trends from {counted} runs")
+        )
@@ -4,6 +4,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.models import User
 from test_protocols.models import TestSuite
 from test_protocols.services import run_test_suite
+from test_protocols.planning import SUITE_ORDERINGS
 
 
 class Command(BaseCommand):
@@ -16,6 +17,26 @@ class Command(BaseCommand):
         parser.add_argument(
             "--user", type=str, help="Username to attribute the runs to"
         )
+        parser.add_argument(
+            "--parallel",
+            action="store_true",
+            help="Dispatch the protocols onto the protocol queue in parallel",
+        )
+        parser.add_argument(
+            "--max-concurrency",
+            type=int,
+            help="Maximum number of protocols running at once in parallel mode",
+        )
+        parser.add_argument(
+            "--fail-fast",
+            action="store_true",
+            help="Abort the suite as soon as a gate protocol fails",
+        )
+        parser.add_argument(
+            "--ordering",
+            choices=SUITE_ORDERINGS,
+            help="Order in which the protocols run (default: order_index)",
+        )
 
     def handle(self, *args, **options):
         suite_id = options["suite_id"]
@@ -44,8 +65,30 @@ class Command(BaseCommand):
             suite = TestSuite.objects.get(id=suite_id)
             self.stdout.write(self.style.SUCCESS(f"Found test suite: {suite.name}"))
 
+            if options["parallel"]:
+                dispatch = run_test_suite(
+                    suite_id,
+                    user.username if user else None,
+                    parallel=True,
+                    max_concurrency=options.get("max_concurrency"),
+                    fail_fast=options["fail_fast"],
+                    ordering=options.get("ordering"),
+                )
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Dispatched {dispatch['total']} protocols in {dispatch['stages']} stages "
+                        f"(suite run {dispatch['suite_run_id']})"
+                    )
+                )
+                return
+
             # Run the test suite
-            runs = run_test_suite(suite_id, user)
+            runs = run_test_suite(
+                suite_id,
+                user,
+                fail_fast=options["fail_fast"],
+                ordering=options.get("ordering"),
+            )
 
             if runs:
                 self.stdout.write(
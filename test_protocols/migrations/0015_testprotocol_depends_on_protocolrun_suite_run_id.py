@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-17 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0014_remove_executionstep_args"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocolrun",
+            name="suite_run_id",
+            field=models.UUIDField(
+                blank=True,
+                db_index=True,
+                help_text="Groups the runs dispatched together by a parallel suite run",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="testprotocol",
+            name="depends_on",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Protocols that must complete before this one in parallel suite runs",
+                related_name="dependents",
+                to="test_protocols.testprotocol",
+            ),
+        ),
+    ]
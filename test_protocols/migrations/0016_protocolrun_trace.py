@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0015_testprotocol_depends_on_protocolrun_suite_run_id"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocolrun",
+            name="trace",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0016_protocolrun_trace"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="executionstep",
+            name="depends_on",
+            field=models.ManyToManyField(
+                blank=True,
+                help_text="Steps of the same protocol that must run before this one",
+                related_name="dependents",
+                to="test_protocols.executionstep",
+            ),
+        ),
+    ]
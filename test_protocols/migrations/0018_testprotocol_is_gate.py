@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0017_executionstep_depends_on"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testprotocol",
+            name="is_gate",
+            field=models.BooleanField(
+                default=False,
+                help_text="In fail-fast suite runs, a failure of this protocol aborts the rest of the suite",
+            ),
+        ),
+    ]
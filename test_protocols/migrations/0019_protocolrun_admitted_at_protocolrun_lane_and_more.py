@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0018_testprotocol_is_gate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocolrun",
+            name="admitted_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When a worker started the run, the time before it is spent queued",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="protocolrun",
+            name="lane",
+            field=models.CharField(
+                choices=[("interactive", "Interactive"), ("batch", "Batch")],
+                default="batch",
+                max_length=20,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="protocolrun",
+            index=models.Index(
+                fields=["status", "lane"], name="test_protoc_status_d532ea_idx"
+            ),
+        ),
+    ]
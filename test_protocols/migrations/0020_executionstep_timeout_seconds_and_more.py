@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0019_protocolrun_admitted_at_protocolrun_lane_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="executionstep",
+            name="timeout_seconds",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Seconds the step may run, bounded by the time left to the run",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="protocolrun",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("created", "Created"),
+                    ("started", "Started"),
+                    ("running", "Running"),
+                    ("completed", "Completed"),
+                    ("failed", "Failed"),
+                    ("error", "Error"),
+                    ("aborted", "Aborted"),
+                    ("timeout", "Timed Out"),
+                ],
+                default="running",
+                max_length=20,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="verificationresult",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("pass", "Pass"),
+                    ("fail", "Fail"),
+                    ("error", "Error"),
+                    ("timeout", "Timed Out"),
+                    ("skipped", "Skipped"),
+                    ("not_applicable", "Not Applicable"),
+                ],
+                default="fail",
+                help_text="Detailed status of the verification",
+                max_length=50,
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0020_executionstep_timeout_seconds_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="protocolrun",
+            name="snapshot_version",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0021_protocolrun_snapshot_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="verificationresult",
+            name="execution_step",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="The execution step whose outcome was verified",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="verification_results",
+                to="test_protocols.executionstep",
+            ),
+        ),
+        migrations.AddField(
+            model_name="verificationresult",
+            name="protocol_run",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                help_text="The protocol run that produced this result",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="verification_results",
+                to="test_protocols.protocolrun",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="verificationresult",
+            index=models.Index(
+                fields=["protocol_run", "execution_step", "verification_step"],
+                name="vresult_run_step_method_idx",
+            ),
+        ),
+    ]
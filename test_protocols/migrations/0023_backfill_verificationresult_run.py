@@ -0,0 +1,71 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:40
+
+from bisect import bisect_right
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 1000
+
+
+def backfill_runs(apps, schema_editor):
+    """Link the results recorded before 0022 to their run and step"""
+    VerificationMethod = apps.get_model("test_protocols", "VerificationMethod")
+    VerificationResult = apps.get_model("test_protocols", "VerificationResult")
+    ProtocolRun = apps.get_model("test_protocols", "ProtocolRun")
+
+    VerificationResult.objects.filter(execution_step__isnull=True).update(
+        execution_step_id=Subquery(
+            VerificationMethod.objects.filter(pk=OuterRef("verification_step_id"))
+            .order_by()
+            .values("execution_step_id")[:1]
+        )
+    )
+
+    # A result belongs to the last run of its protocol started before it
+    protocol_ids = (
+        VerificationResult.objects.filter(protocol_run__isnull=True)
+        .order_by()
+        .values_list("execution_step__test_protocol_id", flat=True)
+        .distinct()
+    )
+    for protocol_id in list(protocol_ids):
+        runs = list(
+            ProtocolRun.objects.filter(protocol_id=protocol_id)
+            .order_by("started_at")
+            .values_list("started_at", "id")
+        )
+        if not runs:
+            continue
+        started = [started_at for started_at, _ in runs]
+
+        results_by_run = {}
+        for result_id, verification_time in (
+            VerificationResult.objects.filter(
+                protocol_run__isnull=True,
+                execution_step__test_protocol_id=protocol_id,
+            )
+            .order_by()
+            .values_list("id", "verification_time")
+            .iterator(chunk_size=BATCH_SIZE)
+        ):
+            index = bisect_right(started, verification_time) - 1
+            if index >= 0:
+                results_by_run.setdefault(runs[index][1], []).append(result_id)
+
+        for run_id, result_ids in results_by_run.items():
+            for start in range(0, len(result_ids), BATCH_SIZE):
+                VerificationResult.objects.filter(
+                    pk__in=result_ids[start : start + BATCH_SIZE]
+                ).update(protocol_run_id=run_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0022_verificationresult_protocol_run"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_runs, migrations.RunPython.noop),
+    ]
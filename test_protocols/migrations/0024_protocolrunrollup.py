@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:40
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0002_project_max_concurrent_runs_and_more"),
+        ("test_protocols", "0023_backfill_verificationresult_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProtocolRunRollup",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for this record",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Timestamp when the record was created",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Timestamp when the record was last updated",
+                    ),
+                ),
+                (
+                    "day",
+                    models.DateField(
+                        help_text="Day the runs started on, in local time"
+                    ),
+                ),
+                ("status", models.CharField(max_length=20)),
+                (
+                    "result_status",
+                    models.CharField(blank=True, default="", max_length=20),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="run_rollups",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Protocol Run Rollup",
+                "verbose_name_plural": "Protocol Run Rollups",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project", "day", "status", "result_status"),
+                        name="unique_run_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
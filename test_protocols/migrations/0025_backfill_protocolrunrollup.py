@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:05
+
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    """Count the existing runs, later runs are counted as they change state"""
+    ProtocolRun = apps.get_model("test_protocols", "ProtocolRun")
+    ProtocolRunRollup = apps.get_model("test_protocols", "ProtocolRunRollup")
+
+    counts = (
+        ProtocolRun.objects.order_by()
+        .annotate(day=TruncDate("started_at"))
+        .values_list("protocol__suite__project_id", "day", "status", "result_status")
+        .annotate(count=Count("id"))
+    )
+    ProtocolRunRollup.objects.bulk_create(
+        [
+            ProtocolRunRollup(
+                project_id=project_id,
+                day=day,
+                status=status,
+                result_status=result_status or "",
+                count=count,
+            )
+            for project_id, day, status, result_status, count in counts
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0024_protocolrunrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,158 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:43
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0025_backfill_protocolrunrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRunTrend",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for this record",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Timestamp when the record was created",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Timestamp when the record was last updated",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("project", "Project"),
+                            ("suite", "Suite"),
+                            ("protocol", "Protocol"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "scope_id",
+                    models.UUIDField(help_text="ID of the project, suite or protocol"),
+                ),
+                ("period_start", models.DateTimeField()),
+                ("runs", models.PositiveIntegerField(default=0)),
+                ("passed", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                ("errors", models.PositiveIntegerField(default=0)),
+                ("timed_runs", models.PositiveIntegerField(default=0)),
+                ("duration_sum", models.FloatField(default=0.0)),
+                ("duration_min", models.FloatField(blank=True, null=True)),
+                ("duration_max", models.FloatField(blank=True, null=True)),
+                (
+                    "duration_sketch",
+                    models.JSONField(
+                        default=dict,
+                        help_text="DurationSketch of the durations, for quantiles",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Run Trend",
+                "verbose_name_plural": "Daily Run Trends",
+                "ordering": ["period_start"],
+                "abstract": False,
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "scope_id", "period_start"),
+                        name="unique_dailyruntrend_period",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlyRunTrend",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier for this record",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True,
+                        help_text="Timestamp when the record was created",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Timestamp when the record was last updated",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("project", "Project"),
+                            ("suite", "Suite"),
+                            ("protocol", "Protocol"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "scope_id",
+                    models.UUIDField(help_text="ID of the project, suite or protocol"),
+                ),
+                ("period_start", models.DateTimeField()),
+                ("runs", models.PositiveIntegerField(default=0)),
+                ("passed", models.PositiveIntegerField(default=0)),
+                ("failed", models.PositiveIntegerField(default=0)),
+                ("errors", models.PositiveIntegerField(default=0)),
+                ("timed_runs", models.PositiveIntegerField(default=0)),
+                ("duration_sum", models.FloatField(default=0.0)),
+                ("duration_min", models.FloatField(blank=True, null=True)),
+                ("duration_max", models.FloatField(blank=True, null=True)),
+                (
+                    "duration_sketch",
+                    models.JSONField(
+                        default=dict,
+                        help_text="DurationSketch of the durations, for quantiles",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Hourly Run Trend",
+                "verbose_name_plural": "Hourly Run Trends",
+                "ordering": ["period_start"],
+                "abstract": False,
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("scope", "scope_id", "period_start"),
+                        name="unique_hourlyruntrend_period",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_protocols", "0026_run_trends"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="dailyruntrend",
+            options={
+                "ordering": ["period_start", "shard"],
+                "verbose_name": "Daily Run Trend",
+                "verbose_name_plural": "Daily Run Trends",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="hourlyruntrend",
+            options={
+                "ordering": ["period_start", "shard"],
+                "verbose_name": "Hourly Run Trend",
+                "verbose_name_plural": "Hourly Run Trends",
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name="dailyruntrend",
+            name="unique_dailyruntrend_period",
+        ),
+        migrations.RemoveConstraint(
+            model_name="hourlyruntrend",
+            name="unique_hourlyruntrend_period",
+        ),
+        migrations.AddField(
+            model_name="dailyruntrend",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="hourlyruntrend",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name="dailyruntrend",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "scope_id", "period_start", "shard"),
+                name="unique_dailyruntrend_period_shard",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="hourlyruntrend",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "scope_id", "period_start", "shard"),
+                name="unique_hourlyruntrend_period_shard",
+            ),
+        ),
+    ]
@@ -5,6 +5,7 @@ from engine.models import BaseModel
 from projects.models import Project
 from environments.models import Environment
 from django.utils.translation import gettext_lazy as _
+from test_protocols.sketch import DurationSketch
 
 
 class TestSuite(BaseModel):
@@ -29,6 +30,52 @@ class TestSuite(BaseModel):
         """
         return self.protocols.filter(status="active").order_by("order_index", "name")
 
+    def get_protocol_stages(self):
+        """
+        Group the ordered protocols into stages for parallel execution.
+
+        A protocol is placed in the stage after the latest stage of any active
+        protocol of this suite it depends on. Protocols without dependencies
+        all land in the first stage, so ``order_index`` is only honoured along
+        declared dependency edges.
+
+        Returns:
+            list: Stages in execution order, each a list of protocols ordered by order_index
+
+        Raises:
+            ValueError: If the protocol dependencies form a cycle
+        """
+        protocols = list(self.get_ordered_protocols().prefetch_related("depends_on"))
+        protocols_by_id = {protocol.id: protocol for protocol in protocols}
+        levels = {}
+        visiting = set()
+
+        def get_level(protocol):
+            if protocol.id in levels:
+                return levels[protocol.id]
+            if protocol.id in visiting:
+                raise ValueError(
+                    f"Circular protocol dependency detected at '{protocol.name}'"
+                )
+            visiting.add(protocol.id)
+            parents = [
+                protocols_by_id[dependency.id]
+                for dependency in protocol.depends_on.all()
+                if dependency.id in protocols_by_id
+            ]
+            level = max((get_level(parent) + 1 for parent in parents), default=0)
+            visiting.discard(protocol.id)
+            levels[protocol.id] = level
+            return level
+
+        stages = []
+        for protocol in protocols:
+            level = get_level(protocol)
+            while len(stages) <= level:
+                stages.append([])
+            stages[level].append(protocol)
+        return stages
+
 
 class TestProtocol(BaseModel):
     STATUS_CHOICES = [
@@ -48,6 +95,18 @@ class TestProtocol(BaseModel):
     order_index = models.IntegerField(
         default=0, help_text="Custom ordering index for this protocol"
     )
+    # Protocols that must finish first when the suite runs in parallel
+    depends_on = models.ManyToManyField(
+        "self",
+        symmetrical=False,
+        blank=True,
+        related_name="dependents",
+        help_text="Protocols that must complete before this one in parallel suite runs",
+    )
+    is_gate = models.BooleanField(
+        default=False,
+        help_text="In fail-fast suite runs, a failure of this protocol aborts the rest of the suite",
+    )
 
     def __str__(self):
         return f"{self.name} ({self.suite.name})"
@@ -112,6 +171,24 @@ class ProtocolRun(BaseModel):
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(blank=True, null=True)
     executed_by = models.CharField(max_length=100, blank=True, null=True)
+    suite_run_id = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        help_text="Groups the runs dispatched together by a parallel suite run",
+    )
+
+    # Scheduling, see test_protocols.scheduling
+    LANE_CHOICES = [
+        ("interactive", "Interactive"),
+        ("batch", "Batch"),
+    ]
+    lane = models.CharField(max_length=20, choices=LANE_CHOICES, default="batch")
+    admitted_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When a worker started the run, the time before it is spent queued",
+    )
 
     # Overall status
     STATUS_CHOICES = [
@@ -122,6 +199,7 @@ class ProtocolRun(BaseModel):
         ("failed", "Failed"),
         ("error", "Error"),
         ("aborted", "Aborted"),
+        ("timeout", "Timed Out"),
     ]
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
 
@@ -142,6 +220,12 @@ class ProtocolRun(BaseModel):
     # Duration
     duration_seconds = models.FloatField(blank=True, null=True)
 
+    # Timing of each phase of the run, see test_protocols.tracing
+    trace = models.JSONField(default=dict, blank=True)
+
+    # Version of the protocol definition executed, see test_protocols.snapshot
+    snapshot_version = models.CharField(max_length=64, blank=True, null=True)
+
     def __str__(self):
         return f"{self.protocol.name} Run - {self.started_at}"
 
@@ -149,6 +233,123 @@ class ProtocolRun(BaseModel):
         verbose_name = _("Protocol Run")
         verbose_name_plural = _("Protocol Runs")
         ordering = ["-started_at"]
+        indexes = [models.Index(fields=["status", "lane"])]
+
+
+class ProtocolRunRollup(BaseModel):
+    """
+    Number of protocol runs of a project started on a day, by status and
+    result. Kept up to date as runs change state, see test_protocols.rollups
+    """
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="run_rollups"
+    )
+    day = models.DateField(help_text="Day the runs started on, in local time")
+    status = models.CharField(max_length=20)
+    # Empty for runs without a result yet
+    result_status = models.CharField(max_length=20, blank=True, default="")
+    count = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.project_id} {self.day} {self.status}/{self.result_status}: {self.count}"
+
+    class Meta:
+        verbose_name = _("Protocol Run Rollup")
+        verbose_name_plural = _("Protocol Run Rollups")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["project", "day", "status", "result_status"],
+                name="unique_run_rollup_bucket",
+            )
+        ]
+
+
+class RunTrend(BaseModel):
+    """
+    Results and durations of the runs of a project, suite or protocol that
+    started in a period, see test_protocols.trends
+    """
+
+    SCOPE_CHOICES = [
+        ("project", "Project"),
+        ("suite", "Suite"),
+        ("protocol", "Protocol"),
+    ]
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    scope_id = models.UUIDField(help_text="ID of the project, suite or protocol")
+    period_start = models.DateTimeField()
+    # Partial row of the period, each worker adds its runs to its own shard so
+    # that concurrent workers do not contend for the same row
+    shard = models.PositiveSmallIntegerField(default=0)
+
+    runs = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0)
+
+    # Durations of the runs that recorded one
+    timed_runs = models.PositiveIntegerField(default=0)
+    duration_sum = models.FloatField(default=0.0)
+    duration_min = models.FloatField(blank=True, null=True)
+    duration_max = models.FloatField(blank=True, null=True)
+    duration_sketch = models.JSONField(
+        default=dict, help_text="DurationSketch of the durations, for quantiles"
+    )
+
+    def record(self, result_status, duration=None, sketch=None):
+        """
+        Count a finished run.
+
+        Args:
+            result_status: The result of the run
+            duration: The duration of the run in seconds, if known
+            sketch: Optional DurationSketch to add the duration to instead of
+                duration_sketch, left for the caller to store
+        """
+        self.runs += 1
+        if result_status == "pass":
+            self.passed += 1
+        elif result_status == "fail":
+            self.failed += 1
+        elif result_status == "error":
+            self.errors += 1
+
+        if duration is not None:
+            self.timed_runs += 1
+            self.duration_sum += duration
+            if self.duration_min is None or duration < self.duration_min:
+                self.duration_min = duration
+            if self.duration_max is None or duration > self.duration_max:
+                self.duration_max = duration
+            if sketch is not None:
+                sketch.add(duration)
+                return
+            sketch = DurationSketch.from_dict(self.duration_sketch)
+            sketch.add(duration)
+            self.duration_sketch = sketch.to_dict()
+
+    class Meta:
+        abstract = True
+        ordering = ["period_start", "shard"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "scope_id", "period_start", "shard"],
+                name="unique_%(class)s_period_shard",
+            )
+        ]
+
+
+class HourlyRunTrend(RunTrend):
+    class Meta(RunTrend.Meta):
+        verbose_name = _("Hourly Run Trend")
+        verbose_name_plural = _("Hourly Run Trends")
+
+
+class DailyRunTrend(RunTrend):
+    class Meta(RunTrend.Meta):
+        verbose_name = _("Daily Run Trend")
+        verbose_name_plural = _("Daily Run Trends")
 
 
 VERIFICATION_METHOD_CHOICES = [
@@ -245,6 +446,19 @@ class ExecutionStep(BaseModel):
     kwargs = models.JSONField(
         default=dict, help_text=_("Keyword arguments (kwargs) as a JSON object")
     )
+    # Steps of the same protocol whose execution must finish first
+    depends_on = models.ManyToManyField(
+        "self",
+        symmetrical=False,
+        blank=True,
+        related_name="dependents",
+        help_text="Steps of the same protocol that must run before this one",
+    )
+    timeout_seconds = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Seconds the step may run, bounded by the time left to the run",
+    )
 
     class Meta:
         verbose_name = _("Execution Step")
@@ -371,6 +585,25 @@ class VerificationResult(BaseModel):
         related_name="results",
         help_text="The verification step that was performed",
     )
+    # Run and step that produced the result, indexed by the composite index
+    # below. Null for results recorded before runs were tracked.
+    protocol_run = models.ForeignKey(
+        ProtocolRun,
+        on_delete=models.CASCADE,
+        related_name="verification_results",
+        blank=True,
+        null=True,
+        db_index=False,
+        help_text="The protocol run that produced this result",
+    )
+    execution_step = models.ForeignKey(
+        ExecutionStep,
+        on_delete=models.CASCADE,
+        related_name="verification_results",
+        blank=True,
+        null=True,
+        help_text="The execution step whose outcome was verified",
+    )
 
     # Timestamp information
     verification_time = models.DateTimeField(
@@ -387,6 +620,7 @@ class VerificationResult(BaseModel):
             ("pass", "Pass"),
             ("fail", "Fail"),
             ("error", "Error"),
+            ("timeout", "Timed Out"),
             ("skipped", "Skipped"),
             ("not_applicable", "Not Applicable"),
         ],
@@ -427,6 +661,12 @@ class VerificationResult(BaseModel):
         verbose_name = "Verification Result"
         verbose_name_plural = "Verification Results"
         ordering = ["verification_time"]
+        indexes = [
+            models.Index(
+                fields=["protocol_run", "execution_step", "verification_step"],
+                name="vresult_run_step_method_idx",
+            )
+        ]
 
     def __str__(self):
         return f"Verification of '{self.verification_step.name}' - {'Passed' if self.success else 'Failed'}"
@@ -0,0 +1,270 @@
+# test_protocols/pipeline.py
+import logging
+import queue
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+
+from test_protocols.results import VerificationResultBuffer
+from test_protocols.verifiers.base import is_row_stream
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the items of a stage
+_DONE = object()
+
+
+class PipelineAborted(Exception):
+    """Raised in a stage when another stage of the pipeline failed"""
+
+
+class _StageFailure:
+    __slots__ = ("error",)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class ProtocolPipeline:
+    """
+    Runs the steps of a protocol as three stages connected by bounded queues:
+
+    - execute: runs the steps on a background thread, in any order
+    - verify: applies the verifications of each step on the calling thread,
+      in step order as soon as the steps before it have been verified
+    - persist: writes the verification results in batches on a background thread
+
+    Executing step N+1 overlaps with verifying step N and persisting step N-1.
+    A full queue blocks the stage feeding it, so a slow database or verifier
+    holds execution back instead of piling results up in memory.
+
+    Results are committed batch by batch, before the run is over; a run that
+    does not complete discards them when its final state is saved (see
+    test_protocols.results.discard_partial_results). With a results_buffer,
+    the results of the last step stay in it, for the caller to flush together
+    with the final state of the run.
+    """
+
+    def __init__(
+        self,
+        verification_plan,
+        execute_steps,
+        tracer=None,
+        queue_size=None,
+        cancellation=None,
+        protocol_run_id=None,
+        results_buffer=None,
+    ):
+        """
+        Args:
+            verification_plan: The VerificationPlan of the run
+            execute_steps: Callable running every step of the plan. It is called
+                with an on_outcome(index, StepOutcome) callback to report each step
+            tracer: Optional RunTracer recording the verify and persist spans
+            queue_size: Capacity of each queue (default: settings.PROTOCOL_PIPELINE_QUEUE_SIZE)
+            cancellation: Optional RunCancellation, checked before the first step
+                and after each step, so no more steps start once the run is aborted
+            protocol_run_id: ID of the ProtocolRun the persisted results belong to
+            results_buffer: Optional VerificationResultBuffer the results are
+                written with. The results of the last step are left in it,
+                unwritten (see VerificationResultBuffer.flush)
+        """
+        self.plan = verification_plan
+        self.execute_steps = execute_steps
+        self.tracer = tracer
+        self.cancellation = cancellation
+        self.protocol_run_id = protocol_run_id
+        self.results_buffer = results_buffer
+        queue_size = queue_size or settings.PROTOCOL_PIPELINE_QUEUE_SIZE
+        self._outcomes = queue.Queue(maxsize=queue_size)
+        self._to_persist = queue.Queue(maxsize=queue_size)
+        self._stopped = threading.Event()
+        self._persist_error = None
+        self.persisted = 0
+
+    def run(self):
+        """
+        Execute, verify and persist every step.
+
+        Returns:
+            list: The verification results, in step order
+
+        Raises:
+            Exception: The first error raised by a stage
+        """
+        executor = threading.Thread(
+            target=self._execute, name="protocol-execute", daemon=True
+        )
+        persister = threading.Thread(
+            target=self._persist, name="protocol-persist", daemon=True
+        )
+        executor.start()
+        persister.start()
+        try:
+            verification_results = self._verify()
+            self._put(self._to_persist, _DONE)
+            persister.join()
+        except PipelineAborted:
+            # Only the persist stage stops the pipeline while results are verified
+            verification_results = None
+        finally:
+            self._stopped.set()
+            executor.join()
+            persister.join()
+
+        if self._persist_error is not None:
+            raise self._persist_error
+        return verification_results
+
+    def _execute(self):
+        """Execute stage, feeds the step outcomes to the verify stage"""
+        try:
+            if self.cancellation is not None:
+                self.cancellation.check()
+            self.execute_steps(self._report_outcome)
+            self._put(self._outcomes, _DONE)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            try:
+                self._put(self._outcomes, _StageFailure(e))
+            except PipelineAborted:
+                pass
+        finally:
+            connections.close_all()
+
+    def _report_outcome(self, index, outcome):
+        self._put(self._outcomes, (index, outcome))
+        if self.cancellation is not None:
+            self.cancellation.check()
+
+    def _verify(self):
+        """Verify stage, reorders the outcomes and feeds results to the persist stage"""
+        verification_results = []
+        out_of_order = {}
+        next_index = 0
+        while next_index < len(self.plan):
+            item = self._get(self._outcomes)
+            if isinstance(item, _StageFailure):
+                raise item.error
+            if item is _DONE:
+                raise RuntimeError("Some execution steps reported no outcome")
+            index, outcome = item
+            out_of_order[index] = outcome
+
+            while next_index in out_of_order:
+                outcome = out_of_order.pop(next_index)
+                execution, verifications = self.plan.steps[next_index]
+                results = self._verify_step(execution, verifications, outcome)
+                step_results = [
+                    (verification.method, result)
+                    for verification, result in zip(verifications, results)
+                ]
+                verification_results.extend(result for _, result in step_results)
+                if step_results:
+                    last = next_index == len(self.plan) - 1
+                    self._put(self._to_persist, (execution, step_results, last))
+                next_index += 1
+
+        return verification_results
+
+    def _verify_step(self, execution, verifications, outcome):
+        """
+        Apply the verifications of a step to its outcome.
+
+        The verifications of a streamed result share a single run of its query
+        (see RowStream.fan_out), instead of each running it, and its rows are
+        never all held in memory.
+        """
+        if outcome.skipped_reason is not None:
+            return [
+                verification.skip(outcome.skipped_reason)
+                for verification in verifications
+            ]
+        if outcome.timed_out:
+            return [verification.timeout() for verification in verifications]
+        if is_row_stream(outcome.result):
+            return outcome.result.fan_out(
+                [
+                    partial(self._run_verification, execution, verification)
+                    for verification in verifications
+                ]
+            )
+        return [
+            self._run_verification(execution, verification, outcome.result)
+            for verification in verifications
+        ]
+
+    def _run_verification(self, execution, verification, result):
+        if self.tracer is None:
+            return verification.run(result)
+        with self.tracer.span(
+            "verify", step=execution.name, method=verification.method.method_type
+        ) as span:
+            verification_result = verification.run(result)
+            span.set(success=bool(verification_result["success"]))
+        return verification_result
+
+    def _persist(self):
+        """Persist stage, writes whatever results are queued in one batch"""
+        buffer = self.results_buffer
+        if buffer is None:
+            buffer = VerificationResultBuffer(self.protocol_run_id)
+        try:
+            done = False
+            held = False
+            while not done:
+                items = [self._get(self._to_persist)]
+                # Take everything already queued, up to the batch size
+                while len(items) < buffer.batch_size:
+                    try:
+                        items.append(self._to_persist.get_nowait())
+                    except queue.Empty:
+                        break
+
+                for item in items:
+                    if item is _DONE:
+                        done = True
+                        continue
+                    execution, step_results, last = item
+                    for method, result in step_results:
+                        buffer.add(execution, method, result)
+                    # The caller writes the results of the last step with the run
+                    held = last and buffer is self.results_buffer
+                if len(buffer) and not held:
+                    self._write(buffer)
+        except PipelineAborted:
+            pass
+        except BaseException as e:
+            logger.error(f"Failed to persist verification results: {str(e)}")
+            self._persist_error = e
+            self._stopped.set()
+        finally:
+            connections.close_all()
+
+    def _write(self, buffer):
+        if self.tracer is None:
+            self.persisted += buffer.flush()
+            return
+        with self.tracer.span("persist_results", results=len(buffer)):
+            self.persisted += buffer.flush()
+
+    def _put(self, stage_queue, item):
+        while True:
+            if self._stopped.is_set():
+                raise PipelineAborted()
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _get(self, stage_queue):
+        while True:
+            try:
+                return stage_queue.get(timeout=0.1)
+            except queue.Empty:
+                if self._stopped.is_set():
+                    raise PipelineAborted()
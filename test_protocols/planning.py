@@ -0,0 +1,315 @@
+# test_protocols/planning.py
+import heapq
+import statistics
+
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from test_protocols.models import ProtocolRun
+
+# Orders in which the protocols of a suite can run
+SUITE_ORDERINGS = ("order_index", "failures_first")
+
+
+def _recent_runs(protocol_ids, window, *fields):
+    """The most recent ``window`` completed runs of each protocol, newest first"""
+    return (
+        ProtocolRun.objects.filter(protocol_id__in=protocol_ids, status="completed")
+        .annotate(
+            recency=Window(
+                RowNumber(),
+                partition_by=F("protocol_id"),
+                order_by=F("started_at").desc(),
+            )
+        )
+        .filter(recency__lte=window)
+        .order_by("protocol_id", "recency")
+        .values_list("protocol_id", *fields)
+    )
+
+
+class DurationEstimate:
+    """Expected duration of a protocol, from its recent completed runs"""
+
+    __slots__ = ("median", "p90", "samples")
+
+    def __init__(self, median, p90, samples):
+        self.median = median
+        self.p90 = p90
+        self.samples = samples
+
+    @classmethod
+    def from_durations(cls, durations):
+        durations = sorted(durations)
+        # Nearest-rank 90th percentile
+        p90 = durations[max(0, -(-len(durations) * 9 // 10) - 1)]
+        return cls(statistics.median(durations), p90, len(durations))
+
+    @property
+    def has_history(self):
+        return self.samples > 0
+
+
+def estimate_durations(protocols, window=None, default=None):
+    """
+    Estimate the duration of protocols from their most recent completed runs.
+
+    Args:
+        protocols: The TestProtocol instances to estimate
+        window: Number of recent runs per protocol to use
+            (default: settings.PLANNING_HISTORY_WINDOW)
+        default: Duration in seconds assumed for protocols without history
+            (default: the median of the other estimates, or
+            settings.PLANNING_DEFAULT_DURATION if no protocol has history)
+
+    Returns:
+        dict: Protocol ID -> DurationEstimate
+    """
+    window = window or settings.PLANNING_HISTORY_WINDOW
+    protocol_ids = [protocol.pk for protocol in protocols]
+
+    durations = {}
+    for protocol_id, duration in _recent_runs(protocol_ids, window, "duration_seconds"):
+        if duration is not None:
+            durations.setdefault(protocol_id, []).append(duration)
+
+    estimates = {
+        protocol_id: DurationEstimate.from_durations(values)
+        for protocol_id, values in durations.items()
+    }
+
+    if default is None:
+        default = (
+            statistics.median(estimate.median for estimate in estimates.values())
+            if estimates
+            else settings.PLANNING_DEFAULT_DURATION
+        )
+    for protocol_id in protocol_ids:
+        estimates.setdefault(protocol_id, DurationEstimate(default, default, 0))
+    return estimates
+
+
+def failure_scores(protocols, window=None):
+    """
+    Score how likely protocols are to fail, from their most recent completed runs.
+
+    The score adds up whether the last run failed, the share of failed runs and
+    how often the result flipped between pass and fail (flakiness).
+
+    Args:
+        protocols: The TestProtocol instances to score
+        window: Number of recent runs per protocol to use
+            (default: settings.PLANNING_HISTORY_WINDOW)
+
+    Returns:
+        dict: Protocol ID -> score between 0 and 3, 0 without history
+    """
+    window = window or settings.PLANNING_HISTORY_WINDOW
+    outcomes = {}
+    for protocol_id, result_status in _recent_runs(
+        [protocol.pk for protocol in protocols], window, "result_status"
+    ):
+        outcomes.setdefault(protocol_id, []).append(result_status != "pass")
+
+    scores = {}
+    for protocol in protocols:
+        failed = outcomes.get(protocol.pk)
+        if not failed:
+            scores[protocol.pk] = 0.0
+            continue
+        flips = sum(1 for newer, older in zip(failed, failed[1:]) if newer != older)
+        scores[protocol.pk] = (
+            float(failed[0])
+            + sum(failed) / len(failed)
+            + (flips / (len(failed) - 1) if len(failed) > 1 else 0.0)
+        )
+    return scores
+
+
+def order_protocols(protocols, ordering=None, window=None):
+    """
+    Order the protocols of a suite for a run.
+
+    Args:
+        protocols: TestProtocol instances, in suite order
+        ordering: One of SUITE_ORDERINGS. "order_index" keeps the suite order,
+            "failures_first" runs gate protocols first, then the protocols most
+            likely to fail (see failure_scores)
+        window: Number of recent runs per protocol used for the scores
+
+    Returns:
+        list: The ordered protocols
+
+    Raises:
+        ValueError: If the ordering is not supported
+    """
+    protocols = list(protocols)
+    ordering = ordering or "order_index"
+    if ordering not in SUITE_ORDERINGS:
+        raise ValueError(f"Unsupported suite ordering: {ordering}")
+    if ordering == "order_index":
+        return protocols
+
+    scores = failure_scores(protocols, window)
+    order = {protocol.pk: index for index, protocol in enumerate(protocols)}
+    return sorted(
+        protocols,
+        key=lambda protocol: (
+            not protocol.is_gate,
+            -scores[protocol.pk],
+            order[protocol.pk],
+        ),
+    )
+
+
+def shard_protocols(protocols, estimates, shard_count):
+    """
+    Split protocols into shards of similar estimated duration.
+
+    Uses longest-processing-time-first: protocols are taken from the longest to
+    the shortest estimated median, each going to the shard finishing first.
+    Protocols keep their suite order within a shard.
+
+    Args:
+        protocols: TestProtocol instances, in suite order
+        estimates: Protocol ID -> DurationEstimate
+        shard_count: Number of shards to fill
+
+    Returns:
+        list: Non-empty lists of protocols, longest shard first
+    """
+    shard_count = max(1, min(shard_count, len(protocols)))
+    order = {protocol.pk: index for index, protocol in enumerate(protocols)}
+    longest_first = sorted(
+        protocols,
+        key=lambda protocol: (-estimates[protocol.pk].median, order[protocol.pk]),
+    )
+
+    shards = [[] for _ in range(shard_count)]
+    # (estimated seconds, shard index) of every shard, the least loaded on top
+    loads = [(0.0, index) for index in range(shard_count)]
+    for protocol in longest_first:
+        load, index = heapq.heappop(loads)
+        shards[index].append(protocol)
+        heapq.heappush(loads, (load + estimates[protocol.pk].median, index))
+
+    shards = [
+        sorted(shard, key=lambda protocol: order[protocol.pk])
+        for shard in shards
+        if shard
+    ]
+    shards.sort(
+        key=lambda shard: -sum(estimates[protocol.pk].median for protocol in shard)
+    )
+    return shards
+
+
+class SuitePlan:
+    """
+    How a parallel run of a suite would be dispatched, with its estimated duration.
+
+    Each dependency stage (see TestSuite.get_protocol_stages) is sharded over
+    the workers; a stage lasts as long as its longest shard. Within a shard,
+    protocols run in the requested ordering (see order_protocols).
+    """
+
+    def __init__(self, suite, workers=None, window=None, ordering=None):
+        """
+        Args:
+            suite: The TestSuite to plan
+            workers: Number of protocols of the suite running at once
+                (default: settings.SUITE_MAX_CONCURRENCY)
+            window: Number of recent runs per protocol used for the estimates
+            ordering: One of SUITE_ORDERINGS (default: "order_index")
+
+        Raises:
+            ValueError: If the protocol dependencies form a cycle or the
+                ordering is not supported
+        """
+        self.suite = suite
+        self.workers = max(1, workers or settings.SUITE_MAX_CONCURRENCY)
+        stages = [
+            order_protocols(stage, ordering, window)
+            for stage in suite.get_protocol_stages()
+        ]
+        self.estimates = estimate_durations(
+            [protocol for stage in stages for protocol in stage], window
+        )
+        self.stages = [
+            [
+                self._describe_shard(shard)
+                for shard in shard_protocols(stage, self.estimates, self.workers)
+            ]
+            for stage in stages
+        ]
+
+    def _describe_shard(self, protocols):
+        return {
+            "protocols": [
+                {"protocol": protocol, "estimate": self.estimates[protocol.pk]}
+                for protocol in protocols
+            ],
+            "median": sum(self.estimates[protocol.pk].median for protocol in protocols),
+            "p90": sum(self.estimates[protocol.pk].p90 for protocol in protocols),
+        }
+
+    @property
+    def shards(self):
+        """The protocols of each shard of each stage, as dispatched"""
+        return [
+            [[item["protocol"] for item in shard["protocols"]] for shard in stage]
+            for stage in self.stages
+        ]
+
+    @property
+    def estimated_median(self):
+        """Estimated wall-clock seconds of the suite run, from the median durations"""
+        return sum(max(shard["median"] for shard in stage) for stage in self.stages)
+
+    @property
+    def estimated_p90(self):
+        """Pessimistic estimate, from the 90th percentile durations"""
+        return sum(max(shard["p90"] for shard in stage) for stage in self.stages)
+
+    @property
+    def protocols_without_history(self):
+        return [
+            item["protocol"]
+            for stage in self.stages
+            for shard in stage
+            for item in shard["protocols"]
+            if not item["estimate"].has_history
+        ]
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON serializable description of the plan
+        """
+        return {
+            "suite_id": str(self.suite.pk),
+            "workers": self.workers,
+            "estimated_median": self.estimated_median,
+            "estimated_p90": self.estimated_p90,
+            "stages": [
+                [
+                    {
+                        "median": shard["median"],
+                        "p90": shard["p90"],
+                        "protocols": [
+                            {
+                                "protocol_id": str(item["protocol"].pk),
+                                "name": item["protocol"].name,
+                                "median": item["estimate"].median,
+                                "p90": item["estimate"].p90,
+                                "samples": item["estimate"].samples,
+                            }
+                            for item in shard["protocols"]
+                        ],
+                    }
+                    for shard in stage
+                ]
+                for stage in self.stages
+            ],
+        }
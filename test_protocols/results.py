@@ -0,0 +1,97 @@
+# test_protocols/results.py
+import logging
+
+from django.conf import settings
+from django.db import transaction
+
+from test_protocols.models import VerificationResult
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationResultBuffer:
+    """
+    Collects verification results in memory and writes them with bulk inserts,
+    optionally together with the state of their protocol run.
+    """
+
+    def __init__(self, protocol_run_id=None, batch_size=None):
+        """
+        Args:
+            protocol_run_id: ID of the ProtocolRun the results belong to
+            batch_size: Number of rows per INSERT statement
+                (default: settings.VERIFICATION_RESULT_BATCH_SIZE)
+        """
+        self.protocol_run_id = protocol_run_id
+        self.batch_size = batch_size or settings.VERIFICATION_RESULT_BATCH_SIZE
+        self.pending = []
+
+    def __len__(self):
+        return len(self.pending)
+
+    def add(self, step, method, result):
+        """
+        Buffer the result of a verification method.
+
+        Args:
+            step: The ExecutionStep (or StepSnapshot) whose outcome was verified
+            method: The VerificationMethod (or VerificationSnapshot) that
+                produced the result
+            result: The result dictionary returned by VerificationMethod.verify
+        """
+        self.pending.append(
+            VerificationResult(
+                protocol_run_id=self.protocol_run_id,
+                execution_step_id=step.pk,
+                verification_step_id=method.pk,
+                success=bool(result["success"]),
+                status=result.get("status")
+                or ("pass" if result["success"] else "fail"),
+                actual_value=result["actual_value"],
+                expected_value=result["expected_value"],
+                message=result["message"],
+                error_message=result.get("error", ""),
+                result_data=result,
+            )
+        )
+
+    def flush(self, protocol_run=None):
+        """
+        Write the buffered results in a single transaction.
+
+        Args:
+            protocol_run: Optional ProtocolRun saved in the same transaction,
+                so the run state and its results are committed together
+
+        Returns:
+            int: Number of results written
+        """
+        pending, self.pending = self.pending, []
+        with transaction.atomic():
+            VerificationResult.objects.bulk_create(pending, batch_size=self.batch_size)
+            if protocol_run is not None:
+                protocol_run.save()
+
+        logger.debug(f"Wrote {len(pending)} verification results")
+        return len(pending)
+
+
+def discard_partial_results(protocol_run_ids):
+    """
+    Delete the verification results of runs that did not complete.
+
+    The pipeline writes results as the steps are verified, so a run that fails,
+    times out or is aborted has some of them only. Call it in the transaction
+    that records the final state of the runs, so the results and the state are
+    committed together.
+
+    Args:
+        protocol_run_ids: IDs of the ProtocolRuns
+
+    Returns:
+        int: Number of results deleted
+    """
+    deleted, _ = VerificationResult.objects.filter(
+        protocol_run_id__in=protocol_run_ids
+    ).delete()
+    return deleted
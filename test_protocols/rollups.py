@@ -0,0 +1,234 @@
+# test_protocols/rollups.py
+import logging
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from test_protocols.models import ProtocolRun, ProtocolRunRollup, TestProtocol
+from test_protocols.trends import FINISHED_STATUSES, record_finished_run
+from utils.cache import bump_versions, listing_namespace, object_namespace
+
+logger = logging.getLogger(__name__)
+
+# Fields of a run that select its rollup bucket and trends
+RUN_STATE_FIELDS = (
+    "status",
+    "result_status",
+    "started_at",
+    "protocol__suite__project_id",
+    "protocol__suite_id",
+)
+
+
+def rollup_bucket(project_id, started_at, status, result_status):
+    """
+    Returns:
+        tuple: The (project_id, day, status, result_status) key of the
+        ProtocolRunRollup counting a run
+    """
+    return (project_id, timezone.localdate(started_at), status, result_status or "")
+
+
+def apply_rollup_deltas(deltas, create=True):
+    """
+    Add to the counters of rollup buckets, creating the missing ones.
+
+    Args:
+        deltas: Bucket key (see rollup_bucket) -> number of runs to add,
+            negative for runs that left the bucket
+        create: Whether to create missing buckets, off while the project
+            may be being deleted
+    """
+    for (project_id, day, status, result_status), delta in deltas.items():
+        if not delta:
+            continue
+        bucket = ProtocolRunRollup.objects.filter(
+            project_id=project_id, day=day, status=status, result_status=result_status
+        )
+        if (
+            bucket.update(count=F("count") + delta, updated_at=timezone.now())
+            or not create
+        ):
+            continue
+        try:
+            with transaction.atomic():
+                ProtocolRunRollup.objects.create(
+                    project_id=project_id,
+                    day=day,
+                    status=status,
+                    result_status=result_status,
+                    count=delta,
+                )
+        except IntegrityError:
+            # Created by another worker meanwhile
+            bucket.update(count=F("count") + delta, updated_at=timezone.now())
+
+
+def _invalidate_cached_runs(protocol_ids, run_ids=()):
+    """Bump the cache namespaces of runs written without signals"""
+    bump_versions(
+        [listing_namespace(ProtocolRun)]
+        + [listing_namespace(ProtocolRun, protocol=pk) for pk in set(protocol_ids)]
+        + [object_namespace(ProtocolRun, pk) for pk in run_ids]
+    )
+
+
+def record_new_runs(protocol_runs):
+    """
+    Count runs inserted without signals, such as with bulk_create, and drop
+    the cached listings of their protocols.
+
+    Args:
+        protocol_runs: The saved ProtocolRun instances
+    """
+    protocol_ids = {protocol_run.protocol_id for protocol_run in protocol_runs}
+    project_ids = dict(
+        TestProtocol.objects.filter(pk__in=protocol_ids).values_list(
+            "pk", "suite__project_id"
+        )
+    )
+    apply_rollup_deltas(
+        Counter(
+            rollup_bucket(
+                project_ids[protocol_run.protocol_id],
+                protocol_run.started_at,
+                protocol_run.status,
+                protocol_run.result_status,
+            )
+            for protocol_run in protocol_runs
+        )
+    )
+    _invalidate_cached_runs(protocol_ids)
+
+
+def transition_runs(queryset, **changes):
+    """
+    queryset.update(**changes), moving the updated runs to their new rollup
+    buckets and counting the runs it finishes in the trends, in the same
+    transaction, and dropping the cached values built from them.
+
+    Use it instead of update() whenever status or result_status change.
+
+    Args:
+        queryset: The ProtocolRuns to update
+        **changes: Field values, as for QuerySet.update
+
+    Returns:
+        int: Number of runs updated
+    """
+    with transaction.atomic():
+        runs = list(
+            queryset.order_by()
+            .select_for_update(of=("self",))
+            .values_list("pk", "protocol_id", "duration_seconds", *RUN_STATE_FIELDS)
+        )
+        if not runs:
+            return 0
+        updated = ProtocolRun.objects.filter(pk__in=[run[0] for run in runs]).update(
+            **changes
+        )
+
+        deltas = Counter()
+        for (
+            _,
+            protocol_id,
+            duration,
+            status,
+            result_status,
+            started_at,
+            project_id,
+            suite_id,
+        ) in runs:
+            new_status = changes.get("status", status)
+            new_result_status = changes.get("result_status", result_status)
+            if (new_status, new_result_status) == (status, result_status):
+                continue
+            deltas[rollup_bucket(project_id, started_at, status, result_status)] -= 1
+            deltas[
+                rollup_bucket(project_id, started_at, new_status, new_result_status)
+            ] += 1
+            if new_status in FINISHED_STATUSES and status not in FINISHED_STATUSES:
+                record_finished_run(
+                    project_id,
+                    suite_id,
+                    protocol_id,
+                    started_at,
+                    new_result_status,
+                    changes.get("duration_seconds", duration),
+                )
+        apply_rollup_deltas(deltas)
+        _invalidate_cached_runs([run[1] for run in runs], [run[0] for run in runs])
+    return updated
+
+
+def reconcile_run_rollups(days=None):
+    """
+    Recount the rollups from the runs, fixing any drift.
+
+    Incremental updates miss runs changed with a plain QuerySet.update() or
+    raw SQL, and race with concurrent writers.
+
+    Args:
+        days: Number of days to recount, up to today. None recounts every day.
+
+    Returns:
+        int: Number of rollup buckets fixed
+    """
+    runs = ProtocolRun.objects.order_by()
+    rollups = ProtocolRunRollup.objects.all()
+    if days is not None:
+        since = timezone.localdate() - timedelta(days=days - 1)
+        runs = runs.filter(
+            started_at__gte=timezone.make_aware(datetime.combine(since, time.min))
+        )
+        rollups = rollups.filter(day__gte=since)
+
+    with transaction.atomic():
+        stored = {
+            (rollup.project_id, rollup.day, rollup.status, rollup.result_status): rollup
+            for rollup in rollups.select_for_update()
+        }
+        actual = {
+            (project_id, day, status, result_status or ""): count
+            for project_id, day, status, result_status, count in runs.annotate(
+                day=TruncDate("started_at")
+            )
+            .values_list(
+                "protocol__suite__project_id", "day", "status", "result_status"
+            )
+            .annotate(count=Count("id"))
+        }
+
+        stale = []
+        missing = []
+        for key, count in actual.items():
+            rollup = stored.pop(key, None)
+            if rollup is None:
+                project_id, day, status, result_status = key
+                missing.append(
+                    ProtocolRunRollup(
+                        project_id=project_id,
+                        day=day,
+                        status=status,
+                        result_status=result_status,
+                        count=count,
+                    )
+                )
+            elif rollup.count != count:
+                rollup.count = count
+                stale.append(rollup)
+        # Buckets left have no runs any more
+        empty = [rollup.pk for rollup in stored.values() if rollup.count]
+
+        ProtocolRunRollup.objects.bulk_update(stale, ["count"])
+        ProtocolRunRollup.objects.filter(pk__in=empty).update(count=0)
+        ProtocolRunRollup.objects.bulk_create(missing, ignore_conflicts=True)
+
+    fixed = len(stale) + len(missing) + len(empty)
+    if fixed:
+        logger.warning(f"Reconciled {fixed} protocol run rollups")
+    return fixed
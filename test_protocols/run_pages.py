@@ -0,0 +1,98 @@
+# test_protocols/run_pages.py
+import hashlib
+
+from django.contrib.messages import get_messages
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+
+from test_protocols.models import ProtocolRun, VerificationResult
+from test_protocols.trends import FINISHED_STATUSES
+from utils.cache import cached, object_namespace
+
+RUN_CONTENT_TEMPLATE = "test_protocols/run_detail_content.html"
+
+# Bump when RUN_CONTENT_TEMPLATE or what it shows changes, so that the pages
+# cached and the ETags sent before are not reused
+RUN_PAGE_VERSION = 1
+
+
+def run_content_context(run):
+    """
+    Get the context of RUN_CONTENT_TEMPLATE: the steps of the protocol with
+    their verification methods, and the results of the run.
+
+    Args:
+        run: The ProtocolRun, with its protocol and suite selected
+
+    Returns:
+        dict: The context
+    """
+    prefetch_related_objects(
+        [run], "protocol__steps", "protocol__steps__verification_methods"
+    )
+    # Results of this run only, one query on the (run, step, method) index
+    verification_results = VerificationResult.objects.filter(
+        protocol_run=run
+    ).order_by()
+    return {
+        "run": run,
+        "execution_steps": run.protocol.steps.all(),
+        # Keyed by verification method, for the lookups of the template
+        "verification_results_dict": {
+            vr.verification_step_id: vr for vr in verification_results
+        },
+    }
+
+
+def render_run_content(run):
+    """
+    Render the results of a finished run.
+
+    They never change once the run is over, so the rendered fragment is
+    cached without expiry, until the run is saved again.
+
+    Args:
+        run: The finished ProtocolRun
+
+    Returns:
+        str: The safe HTML
+    """
+    return cached(
+        "run_content",
+        [run.pk, run.updated_at.timestamp(), RUN_PAGE_VERSION],
+        [object_namespace(ProtocolRun, run.pk)],
+        lambda: render_to_string(RUN_CONTENT_TEMPLATE, run_content_context(run)),
+        timeout=None,
+    )
+
+
+def run_page_validators(request, run_id):
+    """
+    Get the validators of the detail page of a run, for conditional GETs.
+
+    Only finished runs have them: the page of a pending or running run
+    changes as it executes. Neither does a page with messages to show once.
+
+    Args:
+        request: The request for the page
+        run_id: The ID of the ProtocolRun
+
+    Returns:
+        tuple: (ETag, Last-Modified timestamp), (None, None) without them
+    """
+    if len(get_messages(request)):
+        return None, None
+    state = (
+        ProtocolRun.objects.filter(pk=run_id)
+        .values_list("status", "updated_at")
+        .first()
+    )
+    if state is None or state[0] not in FINISHED_STATUSES:
+        return None, None
+
+    _, updated_at = state
+    # The page shows who is signed in, so each user gets their own ETag
+    user = getattr(request, "user", None)
+    version = f"{run_id}:{updated_at.isoformat()}:{RUN_PAGE_VERSION}:{user and user.pk}"
+    etag = hashlib.sha256(version.encode()).hexdigest()[:32]
+    return f'"{etag}"', int(updated_at.timestamp())
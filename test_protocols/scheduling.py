@@ -0,0 +1,245 @@
+# test_protocols/scheduling.py
+import logging
+import time
+from datetime import timedelta
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from projects.models import Project
+from test_protocols.models import ProtocolRun
+from test_protocols.planning import DurationEstimate
+from test_protocols.rollups import transition_runs
+
+logger = logging.getLogger(__name__)
+
+# Celery queue of each lane. Interactive runs are started by a user waiting on
+# the result and have their own workers, so they never queue behind suite runs.
+LANE_QUEUES = {
+    "interactive": "protocol_interactive",
+    "batch": "protocol_queue",
+}
+
+
+def lane_queue(lane):
+    """
+    Returns:
+        str: The Celery queue of a lane
+
+    Raises:
+        ValueError: If the lane is not supported
+    """
+    try:
+        return LANE_QUEUES[lane]
+    except KeyError:
+        raise ValueError(f"Unsupported lane: {lane}")
+
+
+def _active_weights():
+    """Scheduling weight of each project with batch runs queued or running"""
+    return dict(
+        ProtocolRun.objects.filter(lane="batch", status__in=["pending", "running"])
+        .values_list(
+            "protocol__suite__project_id",
+            "protocol__suite__project__scheduling_weight",
+        )
+        .order_by()
+        .distinct()
+    )
+
+
+def fair_share(project, active_weights=None, capacity=None):
+    """
+    Number of batch runs a project may have running at once.
+
+    The batch workers are shared between the projects with batch runs queued
+    or running, in proportion to their scheduling weight. A project never gets
+    less than one slot, nor more than its max_concurrent_runs.
+
+    Args:
+        project: The Project to compute the share of
+        active_weights: Project ID -> scheduling weight of the competing projects
+        capacity: Total number of batch runs running at once
+            (default: settings.SCHEDULER_BATCH_CAPACITY)
+
+    Returns:
+        int: The number of slots of the project
+    """
+    capacity = capacity or settings.SCHEDULER_BATCH_CAPACITY
+    weights = dict(_active_weights() if active_weights is None else active_weights)
+    weights[project.pk] = project.scheduling_weight
+    total = sum(weights.values())
+    share = max(1, capacity * project.scheduling_weight // total) if total else 1
+    if project.max_concurrent_runs is not None:
+        share = min(share, project.max_concurrent_runs)
+    return share
+
+
+def try_admit(protocol_run_id):
+    """
+    Admit a queued batch run if its project is under its share of the workers.
+
+    Admitted runs are marked running, so they count against the share of
+    their project from now on. Runs that are not pending any more (aborted,
+    already admitted) are admitted as is, the task decides what to do with them.
+
+    Args:
+        protocol_run_id: The ID of the pending ProtocolRun
+
+    Returns:
+        bool: Whether the run may start
+    """
+    project_id = (
+        ProtocolRun.objects.filter(pk=protocol_run_id, status="pending")
+        .values_list("protocol__suite__project_id", flat=True)
+        .first()
+    )
+    if project_id is None:
+        return True
+
+    with transaction.atomic():
+        # Serializes the admissions of a project, so that two workers cannot
+        # both take its last slot
+        project = Project.objects.select_for_update().get(pk=project_id)
+        running = dict(
+            ProtocolRun.objects.filter(
+                status="running", protocol__suite__project_id=project_id
+            )
+            .values_list("lane")
+            .order_by()
+            .annotate(count=Count("id"))
+        )
+        if running.get("batch", 0) >= fair_share(project) or (
+            project.max_concurrent_runs is not None
+            and sum(running.values()) >= project.max_concurrent_runs
+        ):
+            return False
+
+        transition_runs(
+            ProtocolRun.objects.filter(pk=protocol_run_id, status="pending"),
+            status="running",
+            admitted_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+    return True
+
+
+def admission_deadline(protocol_run_id, deadline_at=None):
+    """
+    Epoch timestamp by which a queued batch run must have been admitted.
+
+    That is the deadline of its suite run, if any, and at the latest
+    settings.SUITE_RUN_TIMEOUT after the run was queued, when reap_stale_runs
+    times out the runs that never started.
+
+    Args:
+        protocol_run_id: The ID of the pending ProtocolRun
+        deadline_at: Optional epoch timestamp of the deadline of its suite run
+
+    Returns:
+        float: The epoch timestamp
+    """
+    queued_at = (
+        ProtocolRun.objects.filter(pk=protocol_run_id)
+        .values_list("started_at", flat=True)
+        .first()
+    )
+    limit = (
+        queued_at.timestamp() + settings.SUITE_RUN_TIMEOUT
+        if queued_at is not None
+        else time.time()
+    )
+    return limit if deadline_at is None else min(limit, deadline_at)
+
+
+def _broker_depth(queue_name):
+    """Number of messages waiting in a queue of the broker, None if unknown"""
+    try:
+        with current_app.connection_for_read() as connection:
+            connection.ensure_connection(max_retries=1)
+            return connection.default_channel.queue_declare(
+                queue=queue_name, passive=True
+            ).message_count
+    except Exception as e:
+        logger.debug(f"Could not read the depth of queue {queue_name}: {str(e)}")
+        return None
+
+
+def queue_status(window=None):
+    """
+    Depth and wait times of each lane, and the share of each competing project.
+
+    Args:
+        window: Number of seconds of admitted runs used for the wait times
+            (default: settings.SCHEDULER_STATS_WINDOW)
+
+    Returns:
+        dict: JSON serializable status of the lanes and projects
+    """
+    window = window or settings.SCHEDULER_STATS_WINDOW
+    now = timezone.now()
+
+    counts = {}
+    oldest = {}
+    for lane, status, count, queued_since in (
+        ProtocolRun.objects.filter(status__in=["pending", "running"])
+        .values_list("lane", "status")
+        .order_by()
+        .annotate(count=Count("id"), queued_since=Min("started_at"))
+    ):
+        counts[(lane, status)] = count
+        if status == "pending":
+            oldest[lane] = (now - queued_since).total_seconds()
+
+    waits = {}
+    for lane, queued_at, admitted_at in ProtocolRun.objects.filter(
+        admitted_at__gte=now - timedelta(seconds=window)
+    ).values_list("lane", "started_at", "admitted_at"):
+        waits.setdefault(lane, []).append((admitted_at - queued_at).total_seconds())
+
+    lanes = {}
+    for lane, queue_name in LANE_QUEUES.items():
+        wait = DurationEstimate.from_durations(waits[lane]) if lane in waits else None
+        lanes[lane] = {
+            "queue": queue_name,
+            "broker_depth": _broker_depth(queue_name),
+            "pending": counts.get((lane, "pending"), 0),
+            "running": counts.get((lane, "running"), 0),
+            "oldest_pending_wait": oldest.get(lane),
+            "admitted": wait.samples if wait else 0,
+            "wait_median": wait.median if wait else None,
+            "wait_p90": wait.p90 if wait else None,
+        }
+
+    active_weights = _active_weights()
+    project_runs = {}
+    for project_id, status, count in (
+        ProtocolRun.objects.filter(lane="batch", status__in=["pending", "running"])
+        .values_list("protocol__suite__project_id", "status")
+        .order_by()
+        .annotate(count=Count("id"))
+    ):
+        project_runs.setdefault(project_id, {})[status] = count
+
+    projects = [
+        {
+            "project_id": str(project.pk),
+            "name": project.name,
+            "scheduling_weight": project.scheduling_weight,
+            "max_concurrent_runs": project.max_concurrent_runs,
+            "fair_share": fair_share(project, active_weights),
+            "pending": project_runs[project.pk].get("pending", 0),
+            "running": project_runs[project.pk].get("running", 0),
+        }
+        for project in Project.objects.filter(pk__in=project_runs).order_by("name")
+    ]
+
+    return {
+        "batch_capacity": settings.SCHEDULER_BATCH_CAPACITY,
+        "window": window,
+        "lanes": lanes,
+        "projects": projects,
+    }
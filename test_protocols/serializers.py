@@ -0,0 +1,39 @@
+from rest_framework import serializers
+
+from .models import ProtocolRun, TestSuite
+
+
+class ProtocolRunLaunchSerializer(serializers.Serializer):
+    """
+    Serializer for launching the runs of many protocols at once.
+    """
+
+    protocol_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, required=False
+    )
+    suite = serializers.UUIDField(required=False)
+    lane = serializers.ChoiceField(choices=ProtocolRun.LANE_CHOICES, default="batch")
+    executed_by = serializers.CharField(max_length=100, required=False)
+
+    def validate(self, data):
+        """
+        Validate that the protocols are given either by ID or by suite.
+        """
+        if ("protocol_ids" in data) == ("suite" in data):
+            raise serializers.ValidationError("Provide either protocol_ids or suite.")
+        if "suite" in data and not TestSuite.objects.filter(pk=data["suite"]).exists():
+            raise serializers.ValidationError({"suite": "Test suite not found."})
+        return data
+
+    def get_protocols(self):
+        """
+        Returns:
+            The protocol IDs, or the active protocols of the suite in order
+        """
+        if "protocol_ids" in self.validated_data:
+            return self.validated_data["protocol_ids"]
+        return (
+            TestSuite.objects.get(pk=self.validated_data["suite"])
+            .protocols.filter(status="active")
+            .order_by("order_index")
+        )
@@ -1,15 +1,29 @@
 # test_protocols/services.py
 import logging
+from uuid import UUID
+
+from celery import current_app
+from django.conf import settings
+from django.db import transaction
+from django.db.models import QuerySet
 from django.utils import timezone
 from django.contrib.auth.models import User
 
 from test_protocols.models import ProtocolRun, TestProtocol, TestSuite
-from test_protocols.tasks import run_test_protocol, run_test_suite
+from test_protocols.tasks import (
+    publish_protocol_runs,
+    run_test_protocol,
+    run_suite_protocol,
+    run_test_suite,
+)
+from test_protocols.rollups import record_new_runs
+from test_protocols.scheduling import lane_queue
+from test_protocols.snapshot import load_protocol_snapshot
 
 logger = logging.getLogger(__name__)
 
 
-def run_protocol(protocol_id, user=None, executed_by=None):
+def run_protocol(protocol_id, user=None, executed_by=None, lane="interactive"):
     """
     Create a protocol run and send a message to RabbitMQ for Celery to process.
 
@@ -17,6 +31,9 @@ def run_protocol(protocol_id, user=None, executed_by=None):
         protocol_id: The UUID of the protocol to run
         user: The user who is initiating the run (optional)
         executed_by: String describing who/what executed the protocol (optional)
+        lane: "interactive" (default) for runs someone is waiting on, which
+            have their own workers, or "batch" for runs that share the protocol
+            workers fairly between projects (see test_protocols.scheduling)
 
     Returns:
         ProtocolRun: The created protocol run object
@@ -36,9 +53,11 @@ def run_protocol(protocol_id, user=None, executed_by=None):
     elif executed_by is None:
         executed_by = "system"
 
+    queue = lane_queue(lane)
+
     # Create the protocol run
     protocol_run = ProtocolRun.objects.create(
-        protocol=protocol, status="pending", executed_by=executed_by
+        protocol=protocol, status="pending", executed_by=executed_by, lane=lane
     )
 
     logger.info(f"Created ProtocolRun with ID: {protocol_run.id}")
@@ -46,23 +65,123 @@ def run_protocol(protocol_id, user=None, executed_by=None):
     # Determine the username for the task
     username = user.username if user else "system"
 
-    # Send task to Celery via RabbitMQ with protocol UUID
-    run_test_protocol.delay(protocol_run.id, username)
+    # Send task to Celery via RabbitMQ with protocol UUID. Batch runs go
+    # through admission control, interactive runs start right away, with the
+    # protocol definition in the message so the worker does not load it
+    if lane == "batch":
+        run_suite_protocol.apply_async(args=[protocol_run.id, username], queue=queue)
+    else:
+        run_test_protocol.apply_async(
+            args=[protocol_run.id, username],
+            kwargs={"snapshot": load_protocol_snapshot(protocol.id).to_dict()},
+            queue=queue,
+        )
 
     logger.info(
-        f"Sent message to RabbitMQ for protocol run: {protocol_run.id}, protocol: {protocol.id}"
+        f"Sent message to RabbitMQ for protocol run: {protocol_run.id}, protocol: {protocol.id} "
+        f"(lane: {lane})"
     )
 
     return protocol_run
 
 
-def run_suite(suite_id, user=None):
+def launch_protocol_runs(protocols, user=None, executed_by=None, lane="batch"):
+    """
+    Create the runs of many protocols at once and send them to Celery.
+
+    The runs are inserted with bulk_create in a single transaction. Once it
+    commits, the run IDs are handed to publish_protocol_runs in messages of
+    settings.BULK_LAUNCH_BATCH_SIZE runs, all sent over one broker connection,
+    and that task, sent to the queue of the lane, publishes the task of each
+    run. The caller does not wait for one publish per run.
+
+    Args:
+        protocols: A TestProtocol queryset, or an iterable of protocol IDs
+        user: The user who is initiating the runs (optional)
+        executed_by: String describing who/what executed the protocols (optional)
+        lane: "batch" (default) or "interactive", see run_protocol
+
+    Returns:
+        list: The IDs of the created protocol runs, in protocol order
+
+    Raises:
+        ValueError: If a protocol does not exist or the lane is not supported
+    """
+    queue = lane_queue(lane)
+    batch_size = settings.BULK_LAUNCH_BATCH_SIZE
+
+    if isinstance(protocols, QuerySet):
+        protocol_ids = list(protocols.values_list("pk", flat=True))
+    else:
+        protocol_ids = [UUID(str(protocol_id)) for protocol_id in protocols]
+        found = set()
+        for start in range(0, len(protocol_ids), batch_size):
+            found.update(
+                TestProtocol.objects.filter(
+                    pk__in=protocol_ids[start : start + batch_size]
+                ).values_list("pk", flat=True)
+            )
+        missing = [str(pk) for pk in protocol_ids if pk not in found]
+        if missing:
+            raise ValueError(f"Protocols not found: {', '.join(missing)}")
+
+    if not protocol_ids:
+        return []
+
+    if executed_by is None:
+        executed_by = user.username if user is not None else "system"
+    username = user.username if user else "system"
+
+    protocol_runs = [
+        ProtocolRun(
+            protocol_id=protocol_id,
+            status="pending",
+            executed_by=executed_by,
+            lane=lane,
+        )
+        for protocol_id in protocol_ids
+    ]
+    run_ids = [str(protocol_run.pk) for protocol_run in protocol_runs]
+
+    def publish():
+        with current_app.producer_or_acquire() as producer:
+            for start in range(0, len(run_ids), batch_size):
+                publish_protocol_runs.apply_async(
+                    args=[run_ids[start : start + batch_size], username, lane],
+                    queue=queue,
+                    producer=producer,
+                )
+
+    with transaction.atomic():
+        ProtocolRun.objects.bulk_create(protocol_runs, batch_size=batch_size)
+        record_new_runs(protocol_runs)
+        # Workers must not pick up runs before they are committed
+        transaction.on_commit(publish)
+
+    logger.info(f"Launched {len(run_ids)} protocol runs (lane: {lane})")
+
+    return run_ids
+
+
+def run_suite(
+    suite_id,
+    user=None,
+    parallel=False,
+    max_concurrency=None,
+    fail_fast=False,
+    ordering=None,
+):
     """
     Run all active protocols in a test suite.
 
     Args:
         suite_id: The UUID of the test suite
         user: The user who is initiating the runs
+        parallel: Fan the protocols out onto the protocol queue instead of
+            running them in sequence on the suite worker
+        max_concurrency: Per-suite cap on protocols running at once in parallel mode
+        fail_fast: Abort the suite as soon as a gate protocol fails
+        ordering: Order in which the protocols run, see run_test_suite
 
     Returns:
         list: The created protocol run objects
@@ -80,8 +199,13 @@ def run_suite(suite_id, user=None):
     username = user.username if user else "system"
 
     # Send the entire suite to the suite queue
-    run_test_suite.delay(test_suite.id, username)
-    logger.info(f"Sent test suite {test_suite.id} to suite queue")
+    run_test_suite.delay(
+        test_suite.id, username, parallel, max_concurrency, fail_fast, ordering
+    )
+    logger.info(
+        f"Sent test suite {test_suite.id} to suite queue "
+        f"(parallel: {parallel}, fail fast: {fail_fast})"
+    )
 
     # For backward compatibility, return empty list
     # (actual runs will be created by the task)
@@ -91,14 +215,14 @@ def run_suite(suite_id, user=None):
 def run_protocols_in_suite(suite_id, user=None):
     """
     Individually run all active protocols in a test suite.
-    This is the original implementation that schedules each protocol separately.
+    Each protocol gets a run of its own on the batch lane, see launch_protocol_runs.
 
     Args:
         suite_id: The UUID of the test suite
         user: The user who is initiating the runs
 
     Returns:
-        list: The created protocol run objects
+        list: The IDs of the created protocol runs
     """
     logger.info(f"Running protocols in test suite with ID: {suite_id}")
 
@@ -116,18 +240,9 @@ def run_protocols_in_suite(suite_id, user=None):
         logger.warning(f"No active protocols found in test suite: {test_suite.name}")
         return []
 
-    # Run each protocol
-    protocol_runs = []
-    for protocol in protocols:
-        try:
-            protocol_run = run_protocol(protocol.id, user)
-            protocol_runs.append(protocol_run)
-            logger.info(
-                f"Scheduled protocol {protocol.name} (ID: {protocol.id}) in suite {test_suite.name} (ID: {test_suite.id})"
-            )
-        except Exception as e:
-            logger.error(
-                f"Failed to schedule protocol {protocol.name} (ID: {protocol.id}): {str(e)}"
-            )
+    run_ids = launch_protocol_runs(protocols, user, lane="batch")
+    logger.info(
+        f"Scheduled {len(run_ids)} protocols in suite {test_suite.name} (ID: {test_suite.id})"
+    )
 
-    return protocol_runs
+    return run_ids
@@ -0,0 +1,108 @@
+# test_protocols/signals.py
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from test_protocols.models import ProtocolRun, TestProtocol, TestSuite
+from test_protocols.rollups import (
+    RUN_STATE_FIELDS,
+    apply_rollup_deltas,
+    rollup_bucket,
+)
+from test_protocols.trends import FINISHED_STATUSES, record_finished_run
+from utils.cache import register_cached_model
+
+register_cached_model(TestSuite, parents=("project",))
+register_cached_model(TestProtocol, parents=("suite",))
+register_cached_model(ProtocolRun, parents=("protocol",))
+
+
+def _scope_ids(protocol_id):
+    """(project ID, suite ID) of a protocol, None if it is gone"""
+    return (
+        TestProtocol.objects.filter(pk=protocol_id)
+        .values_list("suite__project_id", "suite_id")
+        .first()
+    )
+
+
+@receiver(pre_save, sender=ProtocolRun)
+def protocol_run_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the stored state of a run, the instance may be out of date."""
+    instance._rollup_previous = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"status", "result_status"} & set(
+        update_fields
+    ):
+        return
+    instance._rollup_previous = (
+        ProtocolRun.objects.filter(pk=instance.pk)
+        .values_list(*RUN_STATE_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=ProtocolRun)
+def protocol_run_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the run to the rollup bucket of its new state, and count it in the
+    trends once it finishes.
+    """
+    previous = instance.__dict__.pop("_rollup_previous", None)
+    if raw:
+        return
+    deltas = Counter()
+    if created:
+        scope_ids = _scope_ids(instance.protocol_id)
+        if scope_ids is None:
+            return
+        project_id, suite_id = scope_ids
+        status = None
+        started_at = instance.started_at
+    elif previous is not None:
+        status, result_status, started_at, project_id, suite_id = previous
+        if (status, result_status or "") == (
+            instance.status,
+            instance.result_status or "",
+        ):
+            return
+        deltas[rollup_bucket(project_id, started_at, status, result_status)] -= 1
+    else:
+        return
+    deltas[
+        rollup_bucket(project_id, started_at, instance.status, instance.result_status)
+    ] += 1
+    apply_rollup_deltas(deltas)
+
+    if instance.status in FINISHED_STATUSES and status not in FINISHED_STATUSES:
+        record_finished_run(
+            project_id,
+            suite_id,
+            instance.protocol_id,
+            started_at,
+            instance.result_status,
+            instance.duration_seconds,
+        )
+
+
+@receiver(post_delete, sender=ProtocolRun)
+def protocol_run_deleted(sender, instance, **kwargs):
+    """Remove the run from its rollup bucket."""
+    scope_ids = _scope_ids(instance.protocol_id)
+    if scope_ids is None:
+        return
+    project_id, _ = scope_ids
+    # The rollups of the project may be deleted along with it, never recreate them
+    apply_rollup_deltas(
+        {
+            rollup_bucket(
+                project_id,
+                instance.started_at,
+                instance.status,
+                instance.result_status,
+            ): -1
+        },
+        create=False,
+    )
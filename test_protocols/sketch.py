@@ -0,0 +1,91 @@
+# test_protocols/sketch.py
+import math
+
+# Quantiles are within 2% of the actual value
+RELATIVE_ACCURACY = 0.02
+# Values below this, in seconds, are counted as zero
+MIN_VALUE = 0.001
+
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class DurationSketch:
+    """
+    Mergeable quantile sketch of durations (DDSketch).
+
+    Values are counted in logarithmic bins, so any quantile is known within
+    RELATIVE_ACCURACY of its value, and two sketches merge by adding up their
+    bins. Durations from a millisecond to a day fit in under 500 bins.
+    """
+
+    __slots__ = ("bins", "zeros")
+
+    def __init__(self, bins=None, zeros=0):
+        """
+        Args:
+            bins: Bin index -> number of values
+            zeros: Number of values below MIN_VALUE
+        """
+        self.bins = bins or {}
+        self.zeros = zeros
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data: A dict returned by to_dict, possibly through JSON
+
+        Returns:
+            DurationSketch: The sketch
+        """
+        data = data or {}
+        return cls(
+            {int(index): count for index, count in data.get("bins", {}).items()},
+            data.get("zeros", 0),
+        )
+
+    def to_dict(self):
+        return {
+            "bins": {str(index): count for index, count in self.bins.items()},
+            "zeros": self.zeros,
+        }
+
+    @property
+    def count(self):
+        return self.zeros + sum(self.bins.values())
+
+    def add(self, value, count=1):
+        if value < MIN_VALUE:
+            self.zeros += count
+            return
+        index = math.ceil(math.log(value) / _LOG_GAMMA)
+        self.bins[index] = self.bins.get(index, 0) + count
+
+    def merge(self, other):
+        """Add the values of another sketch to this one"""
+        self.zeros += other.zeros
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def quantile(self, q):
+        """
+        Args:
+            q: The quantile, between 0 and 1
+
+        Returns:
+            float: The estimated value, None if the sketch is empty
+        """
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                # Middle of the bin, in relative terms
+                return 2 * _GAMMA**index / (_GAMMA + 1)
+        return 2 * _GAMMA ** max(self.bins) / (_GAMMA + 1)
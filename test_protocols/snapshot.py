@@ -0,0 +1,254 @@
+# test_protocols/snapshot.py
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+from django.db.models import Count, Max
+
+from test_protocols.models import (
+    ConnectionConfig,
+    ExecutionStep,
+    TestProtocol,
+    VerificationMethod,
+)
+
+logger = logging.getLogger(__name__)
+
+# Snapshots are kept for the most recently run protocols only
+MAX_CACHED_SNAPSHOTS = 256
+
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class ConnectionSnapshot:
+    """The ConnectionConfig of a protocol, see create_connection"""
+
+    id: str
+    config_type: str
+    timeout_seconds: int
+    retry_attempts: int
+    config_data: dict
+
+
+@dataclass(frozen=True)
+class VerificationSnapshot:
+    """A VerificationMethod of an execution step"""
+
+    pk: str
+    name: str
+    method_type: str
+    supports_comparison: bool
+    comparison_method: str
+    expected_result: dict
+    config_schema: dict
+
+
+@dataclass(frozen=True)
+class StepSnapshot:
+    """An ExecutionStep, with the IDs of the steps it depends on"""
+
+    pk: str
+    name: Optional[str]
+    kwargs: dict
+    timeout_seconds: Optional[int]
+    depends_on: Tuple[str, ...]
+    verification_methods: Tuple[VerificationSnapshot, ...]
+
+
+@dataclass(frozen=True)
+class ProtocolSnapshot:
+    """
+    Everything a run executes: the connection config, steps and verifications
+    of a protocol, as they were at ``version``.
+
+    Snapshots are shared by the runs of a worker, the dicts they hold must not
+    be changed. They are JSON serializable with to_dict, so they can be sent in
+    a task message.
+    """
+
+    pk: str
+    name: str
+    project_id: str
+    version: str
+    connection: Optional[ConnectionSnapshot]
+    steps: Tuple[StepSnapshot, ...]
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Args:
+            data: A dict returned by to_dict, possibly through JSON
+
+        Returns:
+            ProtocolSnapshot: The snapshot
+        """
+        connection = data["connection"]
+        return cls(
+            pk=data["pk"],
+            name=data["name"],
+            project_id=data["project_id"],
+            version=data["version"],
+            connection=ConnectionSnapshot(**connection) if connection else None,
+            steps=tuple(
+                StepSnapshot(
+                    pk=step["pk"],
+                    name=step["name"],
+                    kwargs=step["kwargs"],
+                    timeout_seconds=step["timeout_seconds"],
+                    depends_on=tuple(step["depends_on"]),
+                    verification_methods=tuple(
+                        VerificationSnapshot(**method)
+                        for method in step["verification_methods"]
+                    ),
+                )
+                for step in data["steps"]
+            ),
+        )
+
+
+def get_snapshot_version(protocol_id):
+    """
+    Get the version of the definition of a protocol.
+
+    The version changes whenever the protocol, its connection config, or one
+    of its steps or verification methods is saved, added or deleted, and
+    whenever a dependency between its steps is added or removed (these do not
+    touch the updated_at of the steps).
+
+    Returns:
+        str: The version
+
+    Raises:
+        TestProtocol.DoesNotExist: If the protocol does not exist
+    """
+    latest = TestProtocol.objects.filter(pk=protocol_id).aggregate(
+        protocol_updated_at=Max("updated_at"),
+        connection_updated_at=Max("connection_config__updated_at"),
+        step_updated_at=Max("steps__updated_at"),
+        verification_updated_at=Max("steps__verification_methods__updated_at"),
+        step_count=Count("steps", distinct=True),
+        verification_count=Count("steps__verification_methods", distinct=True),
+    )
+    if latest["protocol_updated_at"] is None:
+        raise TestProtocol.DoesNotExist(f"Protocol with ID {protocol_id} not found")
+
+    updated_at = max(
+        value
+        for key, value in latest.items()
+        if key.endswith("_updated_at") and value is not None
+    )
+    edges = list(
+        ExecutionStep.depends_on.through.objects.filter(
+            from_executionstep__test_protocol_id=protocol_id
+        )
+        .order_by("from_executionstep_id", "to_executionstep_id")
+        .values_list("from_executionstep_id", "to_executionstep_id")
+    )
+    edges_hash = hashlib.sha256(
+        ";".join(f"{from_id}>{to_id}" for from_id, to_id in edges).encode()
+    ).hexdigest()[:12]
+    return (
+        f"{updated_at:%Y%m%d%H%M%S%f}"
+        f"-{latest['step_count']}-{latest['verification_count']}"
+        f"-{len(edges)}-{edges_hash}"
+    )
+
+
+def _build_snapshot(protocol_id, version):
+    protocol = TestProtocol.objects.select_related("suite", "connection_config").get(
+        pk=protocol_id
+    )
+    try:
+        connection_config = protocol.connection_config
+        connection = ConnectionSnapshot(
+            id=str(connection_config.pk),
+            config_type=connection_config.config_type,
+            timeout_seconds=connection_config.timeout_seconds,
+            retry_attempts=connection_config.retry_attempts,
+            config_data=connection_config.config_data or {},
+        )
+    except ConnectionConfig.DoesNotExist:
+        connection = None
+
+    steps = list(ExecutionStep.objects.filter(test_protocol_id=protocol_id))
+    methods = {}
+    for method in VerificationMethod.objects.filter(
+        execution_step__test_protocol_id=protocol_id
+    ):
+        methods.setdefault(method.execution_step_id, []).append(
+            VerificationSnapshot(
+                pk=str(method.pk),
+                name=method.name,
+                method_type=method.method_type,
+                supports_comparison=method.supports_comparison,
+                comparison_method=method.comparison_method,
+                expected_result=method.expected_result or {},
+                config_schema=method.config_schema or {},
+            )
+        )
+    dependencies = {}
+    for from_id, to_id in ExecutionStep.depends_on.through.objects.filter(
+        from_executionstep__test_protocol_id=protocol_id
+    ).values_list("from_executionstep_id", "to_executionstep_id"):
+        dependencies.setdefault(from_id, []).append(str(to_id))
+
+    return ProtocolSnapshot(
+        pk=str(protocol.pk),
+        name=protocol.name,
+        project_id=str(protocol.suite.project_id),
+        version=version,
+        connection=connection,
+        steps=tuple(
+            StepSnapshot(
+                pk=str(step.pk),
+                name=step.name,
+                kwargs=step.kwargs,
+                timeout_seconds=step.timeout_seconds,
+                depends_on=tuple(dependencies.get(step.pk, ())),
+                verification_methods=tuple(methods.get(step.pk, ())),
+            )
+            for step in steps
+        ),
+    )
+
+
+def load_protocol_snapshot(protocol_id):
+    """
+    Get the snapshot of the current definition of a protocol.
+
+    Snapshots are cached in this process under the version of the protocol,
+    so a protocol that did not change since its last run costs one query.
+
+    Args:
+        protocol_id: The ID of the TestProtocol
+
+    Returns:
+        ProtocolSnapshot: The snapshot
+
+    Raises:
+        TestProtocol.DoesNotExist: If the protocol does not exist
+    """
+    protocol_id = str(protocol_id)
+    version = get_snapshot_version(protocol_id)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(protocol_id)
+        if snapshot is not None and snapshot.version == version:
+            _snapshots.move_to_end(protocol_id)
+            return snapshot
+
+    snapshot = _build_snapshot(protocol_id, version)
+    logger.debug(f"Loaded snapshot {version} of protocol {protocol_id}")
+    with _snapshots_lock:
+        _snapshots[protocol_id] = snapshot
+        _snapshots.move_to_end(protocol_id)
+        while len(_snapshots) > MAX_CACHED_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+    return snapshot
@@ -1,9 +1,13 @@
-from celery import shared_task
+from celery import current_app, shared_task, group, chain
+from celery.exceptions import Retry
+from celery.signals import worker_process_shutdown
 import time
 import logging
 import json
-from datetime import datetime
-from uuid import UUID
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 from test_protocols.models import (
     TestProtocol,
@@ -14,7 +18,22 @@ from test_protocols.models import (
     ExecutionStep,
     VerificationResult,
 )
-from environments.models import Environment
+from test_protocols.tracing import RunTracer
+from test_protocols.executor import StepGraphExecutor, StepOutcome
+from test_protocols.pipeline import ProtocolPipeline
+from test_protocols.results import VerificationResultBuffer, discard_partial_results
+from test_protocols.planning import SuitePlan, order_protocols
+from test_protocols.rollups import reconcile_run_rollups, transition_runs
+from test_protocols.cancellation import (
+    ProtocolRunAborted,
+    ProtocolRunTimedOut,
+    RunCancellation,
+    abort_suite_run,
+)
+from test_protocols.scheduling import admission_deadline, lane_queue, try_admit
+from test_protocols.snapshot import ProtocolSnapshot, load_protocol_snapshot
+from test_protocols.verifiers import VerificationPlan
+from environments.services import EnvironmentResolver
 
 # Import Pangolin SDK modules
 from pangolin_sdk.constants import (
@@ -32,9 +51,23 @@ from pangolin_sdk.constants import (
 # Import connection classes
 from pangolin_sdk.connections.database import DatabaseConnection
 from pangolin_sdk.connections.api import APIConnection
+from pangolin_sdk.connections.async_api import AsyncAPIConnection
 from pangolin_sdk.connections.ssh import SSHConnection
 from pangolin_sdk.connections.kubernetes import KubernetesConnection
 from pangolin_sdk.connections.aws import AWSConnection
+from pangolin_sdk.connections.pool import ConnectionPool
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.connections.breaker import (
+    CircuitBreaker,
+    LocalCircuitBreakerStore,
+    RedisCircuitBreakerStore,
+)
+from pangolin_sdk.connections.ratelimit import (
+    LocalRateLimitStore,
+    RateLimit,
+    RateLimiter,
+    RedisRateLimitStore,
+)
 
 # Import configuration classes
 from pangolin_sdk.configs.database import DatabaseConnectionConfig
@@ -50,37 +83,86 @@ from pangolin_sdk.exceptions import (
     DatabaseConnectionError,
     APIConnectionError,
     SSHConnectionError,
+    DeadlineExceededError,
 )
 
 logger = logging.getLogger(__name__)
 
+# Connections are shared by every protocol run handled by this worker process
+connection_pool = ConnectionPool(
+    max_per_host=settings.CONNECTION_POOL_MAX_PER_HOST,
+    idle_ttl=settings.CONNECTION_POOL_IDLE_TTL,
+    checkout_timeout=settings.CONNECTION_POOL_CHECKOUT_TIMEOUT,
+)
+
+
+# Rate limits are shared by every worker using the same store. Without a shared
+# store, each worker process enforces them on its own
+rate_limiter = RateLimiter(
+    store=(
+        RedisRateLimitStore.from_url(settings.RATE_LIMIT_REDIS_URL)
+        if settings.RATE_LIMIT_REDIS_URL
+        else LocalRateLimitStore()
+    ),
+    timeout=settings.RATE_LIMIT_TIMEOUT,
+)
+
+# Targets failing to accept connections are not retried until their circuit
+# half-opens. Without a shared store, each worker process has its own circuits
+circuit_breaker = CircuitBreaker(
+    store=(
+        RedisCircuitBreakerStore.from_url(settings.CIRCUIT_BREAKER_REDIS_URL)
+        if settings.CIRCUIT_BREAKER_REDIS_URL
+        else LocalCircuitBreakerStore()
+    ),
+    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT,
+    key_secret=settings.SECRET_KEY.encode("utf-8"),
+)
 
-def create_connection(connection_config):
+
+@worker_process_shutdown.connect
+def close_connection_pool(**kwargs):
+    """Close the pooled connections when the worker process exits."""
+    connection_pool.close_all()
+
+
+def create_connection(connection_config, resolver=None, deadline=None):
     """
     Create a connection object based on the ConnectionConfig model.
 
     Args:
-        connection_config: The ConnectionConfig model instance containing configuration details
+        connection_config: The ConnectionConfig model instance containing configuration details,
+            or the ConnectionSnapshot of a protocol snapshot
+        resolver: Optional EnvironmentResolver used to resolve Environment references,
+            shared between the protocols of a suite run. Required with a ConnectionSnapshot
+        deadline: Optional Deadline of the run, bounding the connects, retries
+            and executions of the connection
+
+    The connection is rate limited by the limits under "rate_limit" in the
+    config data (rate, burst, max_concurrent, per_connection_type), shared
+    with every connection to the same host, see pangolin_sdk.connections.ratelimit.
 
     Returns:
         A connection object for the appropriate service type
 
     Raises:
-        ValueError: If connection type is not supported
+        ValueError: If connection type is not supported or the rate limits are invalid
     """
-    # Get environment variables from the ConnectionConfig
+    if resolver is None:
+        resolver = EnvironmentResolver(connection_config.protocol.suite.project_id)
 
-    # Get custom config data for each connection type
-    config_data = connection_config.config_data or {}
-    for key in config_data:
-        try:
-            environment_pk = UUID(config_data[key])
-            environment = Environment.objects.get(pk=environment_pk)
-            value = environment.get_actual_value()
-            if value:
-                config_data[key] = value
-        except (ValueError, AttributeError, TypeError):
-            continue
+    # Get custom config data for each connection type, with environments resolved
+    config_data = resolver.resolve(connection_config.config_data or {})
+    connection = circuit_breaker.attach(_new_connection(connection_config, config_data))
+    connection.deadline = deadline
+    return rate_limiter.attach(
+        connection, RateLimit.from_dict(config_data.get("rate_limit"))
+    )
+
+
+def _new_connection(connection_config, config_data):
+    """Create the SDK connection of a ConnectionConfig from its resolved config data"""
     if connection_config.config_type == "database":
         # Create database connection
         db_type = config_data.get("database_type", "postgresql")
@@ -96,8 +178,8 @@ def create_connection(connection_config):
 
         db_config = DatabaseConnectionConfig(
             name=f"db_connection_{connection_config.id}",
-            host=connection_config.host,
-            port=connection_config.port,
+            host=config_data.get("host"),
+            port=config_data.get("port"),
             database=config_data.get("database"),
             username=config_data.get("username"),
             password=config_data.get("password"),
@@ -127,8 +209,7 @@ def create_connection(connection_config):
 
         api_config = APIConfig(
             name=f"api_connection_{connection_config.id}",
-            host=connection_config.host,
-            port=connection_config.port,
+            host=config_data.get("host"),
             username=config_data.get("username"),
             password=config_data.get("password"),
             auth_method=auth_method_map.get(auth_method_str, AuthMethod.NONE),
@@ -142,6 +223,15 @@ def create_connection(connection_config):
             default_headers=config_data.get("default_headers", {}),
         )
 
+        if config_data.get("async"):
+            # Independent steps are sent concurrently over a shared HTTP client
+            return AsyncAPIConnection(
+                api_config,
+                max_in_flight=config_data.get(
+                    "max_in_flight", settings.API_MAX_IN_FLIGHT
+                ),
+            )
+
         return APIConnection(api_config)
 
     elif connection_config.config_type == "ssh":
@@ -151,7 +241,12 @@ def create_connection(connection_config):
         ssh_config = SSHConnectionConfig.from_dict(config_data)
         ssh_config.get_info()
         # Map string to SSHAuthMethod enum
-        return SSHConnection(ssh_config)
+        # In batch mode independent commands run concurrently on one connection
+        return SSHConnection(
+            ssh_config,
+            batch_execution=bool(config_data.get("batch")),
+            max_channels=config_data.get("max_channels", settings.SSH_MAX_CHANNELS),
+        )
 
     elif connection_config.config_type == "kubernetes":
         # Create Kubernetes connection
@@ -167,8 +262,8 @@ def create_connection(connection_config):
 
         k8s_config = KubernetesConnectionConfig(
             name=f"k8s_connection_{connection_config.id}",
-            host=connection_config.host,
-            port=connection_config.port,
+            host=config_data.get("host"),
+            port=config_data.get("port"),
             username=config_data.get("username"),
             password=config_data.get("password"),
             auth_method=auth_method_map.get(
@@ -217,7 +312,7 @@ def create_connection(connection_config):
 
         aws_config = AWSConnectionConfig(
             name=f"aws_connection_{connection_config.id}",
-            host=connection_config.host,
+            host=config_data.get("host"),
             auth_method=auth_method_map.get(auth_method_str, AWSAuthMethod.ACCESS_KEY),
             service=service_map.get(service_str, AWSService.S3),
             region=region_map.get(region_str, AWSRegion.US_EAST_1),
@@ -237,14 +332,24 @@ def create_connection(connection_config):
 
 
 @shared_task(queue="protocol_queue")
-def run_test_protocol(protocol_run_id, user_id=None):
+def run_test_protocol(protocol_run_id, user_id=None, deadline_at=None, snapshot=None):
     """
     Runs a single test protocol.
     This task is processed by the protocol worker.
 
+    The run has a deadline, settings.PROTOCOL_RUN_TIMEOUT (or the "run_timeout"
+    of the connection config data) from its start, or the deadline of its suite
+    run if that comes first. Connects, retries and step executions are bounded
+    by it, and the run stops with the "timeout" status once it has passed.
+
+    The run executes a snapshot of the protocol (see test_protocols.snapshot),
+    the one sent with the task or else the current one, and records its version.
+
     Args:
         protocol_run_id: UUID of the TestProtocol to run
         user_id: Optional user ID who initiated the run
+        deadline_at: Optional epoch timestamp of the deadline of the suite run
+        snapshot: Optional ProtocolSnapshot.to_dict() of the protocol to run
 
     Returns:
         Dictionary containing run results
@@ -253,68 +358,158 @@ def run_test_protocol(protocol_run_id, user_id=None):
         # Get the protocol
         protocol_run_uuid = UUID(str(protocol_run_id))
         protocol_run = ProtocolRun.objects.get(pk=protocol_run_uuid)
-        execution_steps = ExecutionStep.objects.filter(
-            test_protocol=protocol_run.protocol
-        ).prefetch_related("verification_methods")
-        # verification_methods = VerificationMethod.objects.filter(test_protocol=protocol, e)
-        # Create a run record
+        snapshot = (
+            ProtocolSnapshot.from_dict(snapshot)
+            if snapshot
+            else load_protocol_snapshot(protocol_run.protocol_id)
+        )
+        # Mark the run as running, unless its suite run was aborted meanwhile
+        protocol_run.admitted_at = protocol_run.admitted_at or timezone.now()
+        protocol_run.snapshot_version = snapshot.version
+        started = transition_runs(
+            ProtocolRun.objects.filter(pk=protocol_run.pk).exclude(
+                status__in=["aborted", "timeout"]
+            ),
+            status="running",
+            admitted_at=protocol_run.admitted_at,
+            snapshot_version=snapshot.version,
+            updated_at=timezone.now(),
+        )
+        if not started:
+            logger.info(f"Skipping aborted test protocol run: {protocol_run.pk}")
+            return {
+                "protocol_id": str(protocol_run.protocol_id),
+                "run_id": str(protocol_run.pk),
+                "success": False,
+                "aborted": True,
+                "error_message": protocol_run.error_message,
+            }
         protocol_run.status = "running"
-        protocol_run.save()
 
         logger.info(
-            f"Starting test protocol run: {protocol_run.protocol.name} (ID: {protocol_run.pk})"
+            f"Starting test protocol run: {snapshot.name} (ID: {protocol_run.pk}, "
+            f"version {snapshot.version})"
         )
         start_time = time.time()
+        connection_config = snapshot.connection
+        run_deadline = Deadline(deadline_at).shorten(
+            (connection_config.config_data if connection_config else {}).get(
+                "run_timeout", settings.PROTOCOL_RUN_TIMEOUT
+            )
+        )
+        cancellation = RunCancellation(protocol_run.pk, deadline=run_deadline)
 
         # Initialize variables to store execution results
         test_results = {}
         connection = None
         success = False
+        aborted = False
+        timed_out = False
         error_message = None
         result_data = {}
         result_text = ""
+        tracer = RunTracer(protocol=snapshot.name, run_id=str(protocol_run.pk))
+        # Holds the last verification results until the run is saved
+        results_buffer = VerificationResultBuffer(protocol_run.pk)
 
         try:
-            # Check if protocol has a connection configuration
-            try:
-                connection_config = protocol_run.protocol.connection_config
-
-                # Create connection object from the configuration
-                connection = create_connection(connection_config)
-
-                # Establish connection
-                connection.connect()
-
+            if connection_config is None:
+                raise ValueError("No connection configuration found")
+            with tracer.span(
+                "resolve_config", config_type=connection_config.config_type
+            ):
+                # Resolve verifiers and expected values once for the whole run
+                verification_plan = VerificationPlan(snapshot.steps)
+                # Protocols of the same suite run share the resolved environments
+                resolver = EnvironmentResolver(
+                    UUID(snapshot.project_id),
+                    scope=protocol_run.suite_run_id,
+                )
+                candidate = create_connection(connection_config, resolver, run_deadline)
+
+            # Lease a connection to the target, reusing an idle one when possible
+            connect_span = tracer.start_span("connect")
+            with connection_pool.lease(candidate) as connection:
+                tracer.end_span(
+                    connect_span,
+                    reused=connection is not candidate,
+                    status=str(connection.get_status()),
+                    retries=connection.metrics.total_retries,
+                    avg_connection_time=connection.metrics.avg_connection_time,
+                )
+                if connection.get_status() == ConnectionStatus.CIRCUIT_OPEN:
+                    raise ConnectionError(
+                        f"Circuit open for {connection_config.config_type} service, "
+                        "not connecting until it recovers"
+                    )
                 if connection.get_status() != ConnectionStatus.CONNECTED:
+                    cancellation.check()
                     raise ConnectionError(
                         f"Failed to connect to {connection_config.config_type} service"
                     )
 
                 # Execute the test - this will depend on the connection type
-                verification_results = []
-                for execution in execution_steps:
-                    # Execute the step
-                    connection.execute(*execution.args, **execution.kwargs)
-                    # Apply verification methods if configured
-                    last_result = connection.get_last_result()
-                    verification_methods = execution.verification_methods.all()
-                    for method in verification_methods:
-                        expected_result = method.expected_result
-                        config_schema = method.config_schema
-                        result = method.verify(
-                            last_result, expected_result, config_schema
-                        )
-                        VerificationResult.objects.create(
-                            verification_step=method,
-                            success=True if result["success"] else False,
-                            status=result["message"],
-                            actual_value=result["actual_value"],
-                            expected_value=result["expected_value"],
-                            message=result["message"],
-                            error_message=result.get("error", ""),
-                            result_data=json.dumps(result),
+                if (
+                    connection.supports_batch_execution
+                    and not verification_plan.has_dependencies
+                    and not any(
+                        step.timeout_seconds
+                        for step in verification_plan.execution_steps
+                    )
+                ):
+
+                    def execute_steps(on_outcome):
+                        # The steps are independent, run them all concurrently
+                        errors = len(connection.get_errors())
+                        with tracer.span("execute_batch", steps=len(verification_plan)):
+                            results = connection.execute_many(
+                                [
+                                    step.kwargs
+                                    for step in verification_plan.execution_steps
+                                ]
+                            )
+                        timed_out = any(
+                            isinstance(error, DeadlineExceededError)
+                            for error in connection.get_errors()[errors:]
                         )
-                        verification_results.append(result)
+                        for index, result in enumerate(results):
+                            on_outcome(
+                                index,
+                                StepOutcome(result, timed_out=timed_out and not result),
+                            )
+
+                else:
+                    # Run the step graph, independent steps on their own connections
+                    executor = StepGraphExecutor(
+                        verification_plan.execution_steps,
+                        connection,
+                        lambda: connection_pool.lease(
+                            create_connection(connection_config, resolver, run_deadline)
+                        ),
+                        max_workers=min(
+                            connection_config.config_data.get(
+                                "step_concurrency", settings.PROTOCOL_STEP_CONCURRENCY
+                            ),
+                            connection_pool.max_per_host,
+                        ),
+                        deadline=run_deadline,
+                    )
+
+                    def execute_steps(on_outcome):
+                        executor.run(tracer, on_outcome=on_outcome)
+
+                # Verify and persist each step while the next ones execute
+                verification_results = ProtocolPipeline(
+                    verification_plan,
+                    execute_steps,
+                    tracer=tracer,
+                    cancellation=cancellation,
+                    protocol_run_id=protocol_run.pk,
+                    results_buffer=results_buffer,
+                ).run()
+                if run_deadline.expired:
+                    # The last steps ran out of the time of the run
+                    raise ProtocolRunTimedOut("The protocol run passed its deadline")
                 all_verifications_passed = all(
                     vr["success"] for vr in verification_results
                 )
@@ -324,66 +519,92 @@ def run_test_protocol(protocol_run_id, user_id=None):
                     # Without verifications, just mark as success if we got this far
                     success = False
 
-            except ConnectionError as e:
-                # Handle connection errors
-                error_message = f"Connection error: {str(e)}"
-                success = False
-                result_text = f"Failed to connect to {connection_config.config_type} service: {str(e)}"
-                logger.error(error_message)
-
-            except Exception as e:
-                # Handle all other errors during execution
-                error_message = f"Execution error: {str(e)}"
-                success = False
-                result_text = f"Error during test execution: {str(e)}"
-                logger.error(error_message)
-
-        finally:
-            # Close connection if it was opened
-            if connection and connection.get_status() == ConnectionStatus.CONNECTED:
-                try:
-                    connection.disconnect()
-                except Exception as e:
-                    logger.warning(f"Error disconnecting: {str(e)}")
+        except ProtocolRunTimedOut as e:
+            # The run passed its deadline, the remaining steps were not run
+            timed_out = True
+            error_message = f"Timed out: {str(e)}"
+            success = False
+            logger.warning(error_message)
+
+        except ProtocolRunAborted as e:
+            # The suite run was aborted, the remaining steps were not run
+            aborted = True
+            error_message = f"Aborted: {str(e)}"
+            success = False
+            logger.warning(error_message)
+
+        except (ConnectionError, BaseConnectionError) as e:
+            # Handle connection errors
+            error_message = f"Connection error: {str(e)}"
+            success = False
+            result_text = f"Failed to connect to {connection_config.config_type} service: {str(e)}"
+            logger.error(error_message)
+
+        except Exception as e:
+            # Handle all other errors during execution
+            error_message = f"Execution error: {str(e)}"
+            success = False
+            result_text = f"Error during test execution: {str(e)}"
+            logger.error(error_message)
 
         # Calculate duration
         end_time = time.time()
         duration = end_time - start_time
         # Update the run record
-        protocol_run.status = "completed"
-        protocol_run.result_status = "pass" if success else "fail"
+        if timed_out:
+            protocol_run.status = "timeout"
+            protocol_run.result_status = "error"
+        elif aborted:
+            protocol_run.status = "aborted"
+            protocol_run.result_status = "inconclusive"
+        else:
+            protocol_run.status = "completed"
+            protocol_run.result_status = "pass" if success else "fail"
         protocol_run.completed_at = timezone.now()
         protocol_run.duration_seconds = duration
         protocol_run.error_message = error_message
-        protocol_run.save()
+        protocol_run.trace = tracer.to_dict()
+        with tracer.span("persist"), transaction.atomic():
+            if error_message is None:
+                # The last results are committed with the final state of the run
+                results_buffer.flush(protocol_run)
+            else:
+                # Only a run that completed keeps the results persisted so far
+                discard_partial_results([protocol_run.pk])
+                protocol_run.save()
+        # The persist span only ends once the run is saved, store it separately
+        protocol_run.trace = tracer.to_dict()
+        ProtocolRun.objects.filter(pk=protocol_run.pk).update(trace=protocol_run.trace)
 
         logger.info(
-            f"Completed test protocol run: {protocol_run.protocol.name} in {duration:.2f}s - Success: {success}"
+            f"Completed test protocol run: {snapshot.name} in {duration:.2f}s - Success: {success}"
         )
 
         return {
-            "protocol_id": str(protocol_run.protocol.pk),
+            "protocol_id": str(protocol_run.protocol_id),
             "run_id": str(protocol_run.pk),
             "success": success,
+            "aborted": aborted,
+            "timed_out": timed_out,
             "duration": duration,
             "error_message": error_message,
         }
 
     except Exception as e:
-        logger.error(
-            f"Error running test protocol {protocol_run.protocol.pk}: {str(e)}"
-        )
+        logger.error(f"Error running test protocol run {protocol_run_id}: {str(e)}")
 
         # If we already created a run record, update it with the error
         try:
-            if "run" in locals():
+            if "protocol_run" in locals():
                 protocol_run.status = "error"
                 protocol_run.result_status = "error"
                 protocol_run.error_message = str(e)
                 protocol_run.completed_at = timezone.now()
                 if "start_time" in locals():
                     protocol_run.duration_seconds = time.time() - start_time
-                protocol_run.save()
+                with transaction.atomic():
+                    discard_partial_results([protocol_run.pk])
+                    protocol_run.save()
 
         except Exception as inner_e:
             logger.error(f"Error updating run record: {str(inner_e)}")
@@ -392,47 +613,392 @@ def run_test_protocol(protocol_run_id, user_id=None):
         raise
 
 
+@shared_task(queue="protocol_queue", bind=True, max_retries=None)
+def run_suite_protocol(
+    self, protocol_run_id, user_id=None, fail_fast=False, deadline_at=None
+):
+    """
+    Runs a single protocol as part of a parallel test suite run.
+
+    Errors are logged and reported in the return value instead of being
+    raised, so that one failing protocol does not break the chord that
+    dispatched the rest of the suite.
+
+    The run only starts once its project is under its share of the batch
+    workers (see test_protocols.scheduling). Until then the task is put back
+    at the end of the queue, behind the runs of the other projects, and the
+    run times out once it would not be admitted by its admission_deadline.
+
+    Args:
+        protocol_run_id: UUID of the ProtocolRun to execute
+        user_id: Optional user ID who initiated the run
+        fail_fast: Abort the rest of the suite run if this protocol is a gate
+            and does not pass
+        deadline_at: Optional epoch timestamp of the deadline of the suite run,
+            runs that have not started by then time out without running
+
+    Returns:
+        Dictionary containing run results
+    """
+    if deadline_at is not None and time.time() >= deadline_at:
+        _time_out_pending_run(
+            protocol_run_id,
+            "Timed out: the suite run passed its deadline before the protocol started",
+        )
+        return {"run_id": str(protocol_run_id), "success": False, "timed_out": True}
+
+    if not try_admit(protocol_run_id):
+        retry_delay = settings.SCHEDULER_ADMISSION_RETRY_DELAY
+        if time.time() + retry_delay >= admission_deadline(
+            protocol_run_id, deadline_at
+        ):
+            _time_out_pending_run(
+                protocol_run_id,
+                "Timed out: the protocol was not admitted before its deadline",
+            )
+            return {
+                "run_id": str(protocol_run_id),
+                "success": False,
+                "timed_out": True,
+            }
+        raise self.retry(countdown=retry_delay)
+
+    try:
+        result = run_test_protocol(protocol_run_id, user_id, deadline_at)
+    except Exception as e:
+        logger.error(f"Error running protocol run {protocol_run_id}: {str(e)}")
+        result = {"run_id": str(protocol_run_id), "success": False, "error": str(e)}
+
+    if (
+        fail_fast
+        and not result["success"]
+        and not result.get("aborted")
+        and not result.get("timed_out")
+    ):
+        gate = (
+            ProtocolRun.objects.filter(pk=protocol_run_id, protocol__is_gate=True)
+            .values_list("suite_run_id", "protocol__name")
+            .first()
+        )
+        if gate is not None:
+            suite_run_id, protocol_name = gate
+            abort_suite_run(suite_run_id, f"Gate protocol {protocol_name} failed")
+
+    return result
+
+
+def _time_out_pending_run(protocol_run_id, error_message):
+    """Mark a run that never started as timed out"""
+    transition_runs(
+        ProtocolRun.objects.filter(pk=protocol_run_id, status="pending"),
+        status="timeout",
+        result_status="error",
+        error_message=error_message,
+        completed_at=timezone.now(),
+        updated_at=timezone.now(),
+    )
+
+
+@shared_task(queue="protocol_queue")
+def publish_protocol_runs(protocol_run_ids, user_id=None, lane="batch"):
+    """
+    Sends the task of each protocol run launched by launch_protocol_runs.
+
+    The tasks are published over one broker connection and channel. This task
+    is sent to the queue of the lane of the runs, so that publishing does not
+    wait behind the long tasks of the suite worker.
+
+    Args:
+        protocol_run_ids: UUIDs of the pending ProtocolRuns
+        user_id: Optional user ID who initiated the runs
+        lane: Lane of the runs, batch runs go through admission control
+
+    Returns:
+        int: Number of tasks sent
+    """
+    task = run_suite_protocol if lane == "batch" else run_test_protocol
+    queue = lane_queue(lane)
+    with current_app.producer_or_acquire() as producer:
+        for protocol_run_id in protocol_run_ids:
+            task.apply_async(
+                args=[protocol_run_id, user_id], queue=queue, producer=producer
+            )
+    return len(protocol_run_ids)
+
+
 @shared_task(queue="suite_queue")
-def run_test_suite(suite_id, user_id=None):
+def finalize_test_suite(suite_id, suite_run_id, start_time):
+    """
+    Aggregates the results of a parallel test suite run.
+    This task is the chord callback of dispatch_parallel_suite.
+
+    Args:
+        suite_id: UUID of the TestSuite that was run
+        suite_run_id: UUID grouping the protocol runs of this suite run
+        start_time: Epoch timestamp at which the suite run was dispatched
+
+    Returns:
+        Dictionary containing run results summary
+    """
+    protocol_runs = ProtocolRun.objects.filter(suite_run_id=suite_run_id)
+
+    results = {
+        "total": len(protocol_runs),
+        "succeeded": 0,
+        "failed": 0,
+        "errors": 0,
+        "aborted": 0,
+        "timed_out": 0,
+        "protocol_results": [],
+    }
+    for protocol_run in protocol_runs:
+        if protocol_run.status == "completed" and protocol_run.result_status == "pass":
+            results["succeeded"] += 1
+        elif protocol_run.status == "completed":
+            results["failed"] += 1
+        elif protocol_run.status == "aborted":
+            results["aborted"] += 1
+        elif protocol_run.status == "timeout":
+            results["timed_out"] += 1
+        else:
+            results["errors"] += 1
+
+        results["protocol_results"].append(
+            {
+                "protocol_id": str(protocol_run.protocol_id),
+                "run_id": str(protocol_run.pk),
+                "success": protocol_run.result_status == "pass",
+                "duration": protocol_run.duration_seconds,
+                "error_message": protocol_run.error_message,
+            }
+        )
+
+    duration = time.time() - start_time
+    results["duration"] = duration
+
+    logger.info(
+        f"Completed parallel test suite run {suite_run_id} (suite {suite_id}) in {duration:.2f}s - "
+        f"Success: {results['succeeded']}/{results['total']}"
+    )
+
+    return results
+
+
+def dispatch_parallel_suite(
+    suite, user_id=None, max_concurrency=None, fail_fast=False, ordering=None
+):
+    """
+    Dispatch all protocols of a suite onto the protocol queue as a Celery canvas.
+
+    Protocols are grouped into dependency stages (see TestSuite.get_protocol_stages).
+    Each stage is split into at most ``max_concurrency`` lanes that run in parallel,
+    every lane running its protocols one after another. Lanes are balanced on the
+    durations of past runs (see SuitePlan), so that they finish together. Stages
+    are chained, and finalize_test_suite aggregates the results once the last
+    stage is done.
+
+    In fail-fast mode, a failing gate protocol aborts the runs that have not
+    finished yet: queued runs are skipped when their task starts and running
+    protocols stop before their next step. Aborted tasks are not revoked, as a
+    revoked task would prevent finalize_test_suite from running.
+
+    The suite run has a deadline, settings.SUITE_RUN_TIMEOUT from its dispatch.
+    Protocols running then stop with the "timeout" status, those not started
+    yet time out without running.
+
+    Args:
+        suite: The TestSuite instance to run
+        user_id: Optional user ID who initiated the run
+        max_concurrency: Maximum number of protocols of this suite running at once
+            (default: settings.SUITE_MAX_CONCURRENCY)
+        fail_fast: Abort the suite run as soon as a gate protocol fails
+        ordering: Order of the protocols within a lane, see order_protocols
+
+    Returns:
+        Dictionary describing the dispatched suite run
+    """
+    max_concurrency = max(1, max_concurrency or settings.SUITE_MAX_CONCURRENCY)
+    suite_run_id = uuid4()
+    start_time = time.time()
+    deadline_at = start_time + settings.SUITE_RUN_TIMEOUT
+
+    plan = SuitePlan(suite, workers=max_concurrency, ordering=ordering)
+    stages = plan.shards
+    total = 0
+    canvas = []
+    for lanes in stages:
+        lane_runs = [
+            [
+                ProtocolRun.objects.create(
+                    protocol=protocol,
+                    status="pending",
+                    executed_by=user_id,
+                    suite_run_id=suite_run_id,
+                )
+                for protocol in lane
+            ]
+            for lane in lanes
+        ]
+        total += sum(len(lane) for lane in lane_runs)
+
+        canvas.append(
+            group(
+                chain(
+                    run_suite_protocol.si(
+                        str(protocol_run.id), user_id, fail_fast, deadline_at
+                    )
+                    for protocol_run in lane
+                )
+                for lane in lane_runs
+            )
+        )
+
+    canvas.append(finalize_test_suite.si(str(suite.id), str(suite_run_id), start_time))
+    async_result = chain(*canvas).apply_async()
+
+    logger.info(
+        f"Dispatched {total} protocols of suite {suite.name} in {len(stages)} stages "
+        f"(suite run {suite_run_id}, max concurrency {max_concurrency}, "
+        f"estimated {plan.estimated_median:.0f}s)"
+    )
+
+    return {
+        "suite_run_id": str(suite_run_id),
+        "task_id": async_result.id,
+        "total": total,
+        "stages": len(stages),
+        "max_concurrency": max_concurrency,
+        "estimated_duration": plan.estimated_median,
+        "fail_fast": fail_fast,
+    }
+
+
+@shared_task(queue="suite_queue", bind=True, max_retries=None)
+def run_test_suite(
+    self,
+    suite_id,
+    user_id=None,
+    parallel=False,
+    max_concurrency=None,
+    fail_fast=False,
+    ordering=None,
+    progress=None,
+):
     """
     Runs all protocols in a test suite.
     This task is processed by the suite worker.
 
+    In sequential mode, a protocol whose project is over its share of the batch
+    workers is not waited for on the worker: the task is retried with its
+    progress once settings.SCHEDULER_ADMISSION_RETRY_DELAY has passed, and
+    resumes with that protocol. Protocols not admitted by the deadline of the
+    suite run time out without running.
+
     Args:
         suite_id: UUID of the TestSuite to run
         user_id: Optional user ID who initiated the run
+        parallel: Fan the protocols out onto the protocol queue instead of
+            running them in sequence on this worker
+        max_concurrency: Per-suite cap on protocols running at once in parallel mode
+        fail_fast: Stop the suite as soon as a gate protocol fails
+        ordering: Order in which the protocols run, "order_index" (default) or
+            "failures_first" to run gates, then recently failing and flaky
+            protocols first
+        progress: State of a sequential suite run resumed by a retry
 
     Returns:
-        Dictionary containing run results summary
+        Dictionary containing run results summary. In parallel mode the summary
+        is returned by finalize_test_suite, and this returns the dispatch details.
     """
     try:
         # Get the suite
         suite_id_uuid = UUID(str(suite_id))
         suite = TestSuite.objects.get(pk=suite_id_uuid)
 
-        logger.info(f"Starting test suite: {suite.name} (ID: {suite_id})")
-        start_time = time.time()
-
-        # Get ordered protocols in the suite
-        protocols = suite.get_ordered_protocols()
-
-        # Track results
-        results = {
-            "total": len(protocols),
-            "succeeded": 0,
-            "failed": 0,
-            "errors": 0,
-            "protocol_results": [],
-        }
+        if parallel:
+            return dispatch_parallel_suite(
+                suite, user_id, max_concurrency, fail_fast, ordering
+            )
+
+        if progress is None:
+            logger.info(f"Starting test suite: {suite.name} (ID: {suite_id})")
+            # Get ordered protocols in the suite
+            protocols = order_protocols(suite.get_ordered_protocols(), ordering)
+            progress = {
+                # Group the runs so they share per-run caches such as resolved environments
+                "suite_run_id": str(uuid4()),
+                "start_time": time.time(),
+                "deadline_at": time.time() + settings.SUITE_RUN_TIMEOUT,
+                "protocol_ids": [str(protocol.pk) for protocol in protocols],
+                # Index of the next protocol, and its run once created
+                "next": 0,
+                "run_id": None,
+                # Track results
+                "results": {
+                    "total": len(protocols),
+                    "succeeded": 0,
+                    "failed": 0,
+                    "errors": 0,
+                    "aborted": 0,
+                    "timed_out": 0,
+                    "protocol_results": [],
+                },
+            }
+        else:
+            # Protocols deleted since the suite run started are reported as errors
+            protocols_by_id = TestProtocol.objects.in_bulk(progress["protocol_ids"])
+            protocols = [
+                protocols_by_id.get(UUID(protocol_id))
+                for protocol_id in progress["protocol_ids"]
+            ]
+
+        results = progress["results"]
+        suite_deadline = Deadline(progress["deadline_at"])
 
         # Run each protocol in sequence - directly call the function instead of using apply_async
-        for protocol in protocols:
+        while progress["next"] < len(protocols):
+            index = progress["next"]
+            protocol = protocols[index]
+            if suite_deadline.expired:
+                # The remaining protocols are not run at all
+                results["timed_out"] = len(protocols) - index
+                if progress["run_id"] is not None:
+                    _time_out_pending_run(
+                        progress["run_id"],
+                        "Timed out: the protocol was not admitted before the "
+                        "suite run passed its deadline",
+                    )
+                logger.warning(
+                    f"Test suite {suite.name} passed its deadline "
+                    f"({results['timed_out']} protocols not run)"
+                )
+                break
             try:
+                if protocol is None:
+                    raise TestProtocol.DoesNotExist(
+                        f"Protocol {progress['protocol_ids'][index]} was deleted"
+                    )
+                if progress["run_id"] is None:
+                    protocol_run = ProtocolRun.objects.create(
+                        protocol=protocol,
+                        status="pending",
+                        executed_by=user_id,
+                        suite_run_id=UUID(progress["suite_run_id"]),
+                    )
+                    progress["run_id"] = str(protocol_run.id)
+                if not try_admit(progress["run_id"]):
+                    # Free the worker, the task resumes with this protocol
+                    raise self.retry(
+                        countdown=min(
+                            settings.SCHEDULER_ADMISSION_RETRY_DELAY,
+                            suite_deadline.remaining(),
+                        ),
+                        kwargs={**self.request.kwargs, "progress": progress},
+                    )
                 # Call the function directly (still goes through Celery's task system)
-                protocol_run = ProtocolRun.objects.create(
-                    protocol=protocol, status="pending", executed_by=user_id
+                protocol_result = run_test_protocol(
+                    progress["run_id"], user_id, suite_deadline.expires_at
                 )
-                protocol_result = run_test_protocol(str(protocol_run.id), user_id)
 
                 # Track success/failure
                 if protocol_result["success"]:
@@ -442,17 +1008,43 @@ def run_test_suite(suite_id, user_id=None):
 
                 results["protocol_results"].append(protocol_result)
 
+            except Retry:
+                raise
+
             except Exception as e:
                 logger.error(
-                    f"Error running protocol {protocol.id} in suite {suite_id}: {str(e)}"
+                    f"Error running protocol {progress['protocol_ids'][index]} "
+                    f"in suite {suite_id}: {str(e)}"
                 )
                 results["errors"] += 1
                 results["protocol_results"].append(
-                    {"protocol_id": str(protocol.id), "success": False, "error": str(e)}
+                    {
+                        "protocol_id": progress["protocol_ids"][index],
+                        "success": False,
+                        "error": str(e),
+                    }
                 )
+                protocol_result = {"success": False}
+
+            progress["next"] = index + 1
+            progress["run_id"] = None
+
+            if (
+                fail_fast
+                and protocol is not None
+                and protocol.is_gate
+                and not protocol_result["success"]
+            ):
+                # The remaining protocols are not run at all
+                results["aborted"] = len(protocols) - index - 1
+                logger.warning(
+                    f"Gate protocol {protocol.name} failed, aborting test suite {suite.name} "
+                    f"({results['aborted']} protocols not run)"
+                )
+                break
 
         # Calculate duration
-        duration = time.time() - start_time
+        duration = time.time() - progress["start_time"]
         results["duration"] = duration
 
         logger.info(
@@ -462,6 +1054,81 @@ def run_test_suite(suite_id, user_id=None):
 
         return results
 
+    except Retry:
+        raise
+
     except Exception as e:
         logger.error(f"Error running test suite {suite_id}: {str(e)}")
         raise
+
+
+@shared_task(queue="suite_queue")
+def reap_stale_runs():
+    """
+    Mark the runs that never finished as timed out.
+
+    A run whose worker died or hung stays "running" forever. Runs still running
+    STALE_RUN_GRACE seconds past their deadline are marked as timed out, as
+    are runs still queued that long past the deadline of a suite run.
+    Scheduled by celery beat, see CELERY_BEAT_SCHEDULE.
+
+    Returns:
+        int: Number of runs marked as timed out
+    """
+    now = timezone.now()
+    grace = timedelta(seconds=settings.STALE_RUN_GRACE)
+    stale = []
+    for pk, admitted_at, config_data in ProtocolRun.objects.filter(
+        status="running", admitted_at__lt=now - grace
+    ).values_list("pk", "admitted_at", "protocol__connection_config__config_data"):
+        run_timeout = (config_data or {}).get(
+            "run_timeout", settings.PROTOCOL_RUN_TIMEOUT
+        )
+        if admitted_at + timedelta(seconds=run_timeout) + grace < now:
+            stale.append(pk)
+
+    with transaction.atomic():
+        reaped = transition_runs(
+            ProtocolRun.objects.filter(pk__in=stale, status="running"),
+            status="timeout",
+            result_status="error",
+            error_message="Timed out: the run never finished, its worker was lost",
+            completed_at=now,
+            updated_at=now,
+        )
+        # The lost worker may have persisted the results of some steps
+        discard_partial_results(
+            ProtocolRun.objects.filter(
+                pk__in=stale, status="timeout", completed_at=now
+            ).values("pk")
+        )
+    reaped += transition_runs(
+        ProtocolRun.objects.filter(
+            status="pending",
+            started_at__lt=now - grace - timedelta(seconds=settings.SUITE_RUN_TIMEOUT),
+        ),
+        status="timeout",
+        result_status="error",
+        error_message="Timed out: the run never started",
+        completed_at=now,
+        updated_at=now,
+    )
+    if reaped:
+        logger.warning(f"Marked {reaped} stale protocol runs as timed out")
+    return reaped
+
+
+@shared_task(queue="suite_queue")
+def reconcile_protocol_run_rollups(days=None):
+    """
+    Recount the dashboard rollups of the last RUN_ROLLUP_RECONCILE_DAYS days.
+    Scheduled by celery beat, see CELERY_BEAT_SCHEDULE.
+
+    Args:
+        days: Number of days to recount, 0 for every day
+
+    Returns:
+        int: Number of rollup buckets fixed
+    """
+    days = settings.RUN_ROLLUP_RECONCILE_DAYS if days is None else days
+    return reconcile_run_rollups(days or None)
@@ -1,3 +1,1799 @@
-from django.test import TestCase
+import json
+import random
+import threading
+import time
+from contextlib import nullcontext
+from unittest import mock
+from datetime import timedelta
+from uuid import UUID, uuid4
 
-# Create your tests here.
+from celery.exceptions import Retry
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from pangolin_sdk.connections.deadline import Deadline
+from pangolin_sdk.connections.results import ColumnarResult, RowStream
+from pangolin_sdk.exceptions import BaseExecutionError
+from pangolin_sdk.tests.helpers import (
+    CountingRowStream,
+    FakeConnection,
+    make_database,
+)
+from projects.models import Project
+from test_protocols import tasks
+from test_protocols.cancellation import (
+    ProtocolRunAborted,
+    ProtocolRunTimedOut,
+    RunCancellation,
+    abort_suite_run,
+)
+from test_protocols.executor import (
+    StepGraphExecutor,
+    StepOutcome,
+    get_step_dependencies,
+)
+from test_protocols.forms import ExecutionStepForm, TestProtocolForm
+from test_protocols.models import (
+    DailyRunTrend,
+    ExecutionStep,
+    ProtocolRun,
+    ProtocolRunRollup,
+    TestProtocol,
+    TestSuite,
+    VerificationMethod,
+    VerificationResult,
+)
+from test_protocols.pipeline import ProtocolPipeline
+from test_protocols.planning import (
+    DurationEstimate,
+    SuitePlan,
+    estimate_durations,
+    failure_scores,
+    order_protocols,
+    shard_protocols,
+)
+from test_protocols.results import VerificationResultBuffer
+from test_protocols.rollups import (
+    reconcile_run_rollups,
+    record_new_runs,
+    transition_runs,
+)
+from test_protocols.run_pages import render_run_content
+from test_protocols.scheduling import (
+    admission_deadline,
+    fair_share,
+    lane_queue,
+    try_admit,
+)
+from test_protocols.services import launch_protocol_runs
+from test_protocols.sketch import RELATIVE_ACCURACY, DurationSketch
+from test_protocols.snapshot import (
+    ProtocolSnapshot,
+    StepSnapshot,
+    get_snapshot_version,
+    load_protocol_snapshot,
+)
+from test_protocols.tracing import RunTracer, to_chrome_trace, to_otel_json
+from test_protocols.trends import get_run_trend, rebuild_run_trends
+from test_protocols.verifiers import VerificationFactory, VerificationPlan
+from test_protocols.verifiers.base import COMPARISON_OPERATORS
+from test_protocols.verifiers.db_verifiers import (
+    DbQueryResultVerifier,
+    DbRowCountVerifier,
+)
+from test_protocols.verifiers.list_verifiers import (
+    ListAllMatchVerifier,
+    ListSortedVerifier,
+    ListUniqueVerifier,
+)
+from test_protocols.verifiers.numeric_verifiers import (
+    NumericEqualVerifier,
+    NumericRangeVerifier,
+    NumericThresholdVerifier,
+)
+from utils.fixtures import ProtocolFixtures, ProtocolTestCase
+
+
+class ProtocolStagesTests(ProtocolTestCase):
+    def test_protocols_run_after_their_dependencies(self):
+        first = self.create_protocol("first", order_index=1)
+        second = self.create_protocol("second", order_index=2)
+        third = self.create_protocol("third", order_index=3)
+        independent = self.create_protocol("independent", order_index=4)
+        third.depends_on.add(second)
+        second.depends_on.add(first)
+
+        self.assertEqual(
+            self.suite.get_protocol_stages(),
+            [[first, independent], [second], [third]],
+        )
+
+    def test_inactive_dependencies_are_ignored(self):
+        first = self.create_protocol("first", order_index=1, status="deprecated")
+        second = self.create_protocol("second", order_index=2)
+        second.depends_on.add(first)
+
+        self.assertEqual(self.suite.get_protocol_stages(), [[second]])
+
+    def test_circular_dependencies_are_rejected(self):
+        first = self.create_protocol("first")
+        second = self.create_protocol("second")
+        first.depends_on.add(second)
+        second.depends_on.add(first)
+
+        with self.assertRaises(ValueError):
+            self.suite.get_protocol_stages()
+
+
+class TestProtocolFormTests(ProtocolFixtures, TestCase):
+    def form(self, protocol, depends_on):
+        return TestProtocolForm(
+            data={
+                "suite": protocol.suite_id,
+                "name": protocol.name,
+                "status": protocol.status,
+                "order_index": protocol.order_index,
+                "depends_on": [dependency.pk for dependency in depends_on],
+            },
+            instance=protocol,
+        )
+
+    def test_dependencies_are_limited_to_the_suite(self):
+        protocol = self.create_protocol("protocol")
+        sibling = self.create_protocol("sibling")
+        other_suite = TestSuite.objects.create(name="Other", project=self.project)
+        TestProtocol.objects.create(suite=other_suite, name="elsewhere")
+
+        self.assertEqual(
+            list(self.form(protocol, []).fields["depends_on"].queryset), [sibling]
+        )
+
+    def test_circular_dependencies_are_rejected(self):
+        first = self.create_protocol("first")
+        second = self.create_protocol("second")
+        second.depends_on.add(first)
+
+        form = self.form(first, [second])
+        self.assertFalse(form.is_valid())
+        self.assertIn("depends_on", form.errors)
+        self.assertTrue(self.form(second, [first]).is_valid())
+
+
+class ExecutionStepFormTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol", steps=3)
+        self.first, self.second, self.third = self.protocol.steps.order_by("created_at")
+
+    def form(self, step, depends_on):
+        return ExecutionStepForm(
+            data={
+                "test_protocol": step.test_protocol_id,
+                "name": step.name,
+                "depends_on": [dependency.pk for dependency in depends_on],
+                "kwargs": json.dumps(step.kwargs),
+            },
+            instance=step,
+        )
+
+    def test_dependencies_are_limited_to_the_protocol(self):
+        self.create_protocol("other")
+
+        self.assertEqual(
+            list(self.form(self.first, []).fields["depends_on"].queryset),
+            [self.second, self.third],
+        )
+
+    def test_circular_dependencies_are_rejected(self):
+        self.second.depends_on.add(self.first)
+        self.third.depends_on.add(self.second)
+
+        form = self.form(self.first, [self.third])
+        self.assertFalse(form.is_valid())
+        self.assertIn("depends_on", form.errors)
+        self.assertTrue(self.form(self.third, [self.first]).is_valid())
+
+    def test_step_views_reject_steps_of_other_protocols(self):
+        elsewhere = self.create_protocol("other").steps.get()
+        self.client.force_login(self.user)
+
+        with mock.patch("builtins.print"):
+            response = self.client.post(
+                reverse(
+                    "testsuite:protocol_step_create",
+                    kwargs={"protocol_id": self.protocol.pk},
+                ),
+                {
+                    "name": "query 3",
+                    "depends_on": [elsewhere.pk],
+                    "kwargs": json.dumps({"key": 3}),
+                },
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("depends_on", response.context["form"].errors)
+
+        response = self.client.post(
+            reverse("testsuite:step_update", kwargs={"pk": self.third.pk}),
+            {
+                "name": self.third.name,
+                "depends_on": [self.first.pk, self.second.pk],
+                "kwargs": json.dumps(self.third.kwargs),
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(set(self.third.depends_on.all()), {self.first, self.second})
+
+
+class ParallelSuiteRunTests(ProtocolTestCase):
+    def test_runs_every_protocol_under_one_suite_run(self):
+        first = self.create_protocol("first", order_index=1)
+        self.create_protocol("second", order_index=2, passing=False)
+        self.create_protocol("third", order_index=3).depends_on.add(first)
+
+        dispatch = tasks.run_test_suite(
+            str(self.suite.pk), parallel=True, max_concurrency=2
+        )
+        self.assertEqual((dispatch["total"], dispatch["stages"]), (3, 2))
+
+        runs = ProtocolRun.objects.filter(suite_run_id=dispatch["suite_run_id"])
+        self.assertEqual(
+            dict(runs.values_list("protocol__name", "result_status")),
+            {"first": "pass", "second": "fail", "third": "pass"},
+        )
+        summary = tasks.finalize_test_suite(
+            str(self.suite.pk), dispatch["suite_run_id"], 0
+        )
+        self.assertEqual(
+            (summary["total"], summary["succeeded"], summary["failed"]), (3, 2, 1)
+        )
+
+
+class VerificationResultBufferTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol", steps=3)
+        self.protocol_run = ProtocolRun.objects.create(
+            protocol=self.protocol, status="running"
+        )
+
+    def buffer_results(self, buffer):
+        for method in VerificationMethod.objects.filter(
+            execution_step__test_protocol=self.protocol
+        ):
+            buffer.add(
+                method.execution_step,
+                method,
+                {
+                    "success": True,
+                    "actual_value": ["key"],
+                    "expected_value": ["key"],
+                    "message": "Found",
+                },
+            )
+
+    def test_flush_writes_every_result_in_batches(self):
+        buffer = VerificationResultBuffer(self.protocol_run.pk, batch_size=2)
+        self.buffer_results(buffer)
+        self.assertEqual(len(buffer), 3)
+
+        self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(len(buffer), 0)
+        results = VerificationResult.objects.filter(protocol_run=self.protocol_run)
+        self.assertEqual(results.count(), 3)
+        self.assertEqual(set(results.values_list("status", flat=True)), {"pass"})
+
+    def test_flush_saves_the_run_with_its_results(self):
+        buffer = VerificationResultBuffer(self.protocol_run.pk)
+        self.buffer_results(buffer)
+        self.protocol_run.status = "completed"
+
+        with mock.patch.object(
+            ProtocolRun, "save", side_effect=RuntimeError("Lost the database")
+        ):
+            with self.assertRaises(RuntimeError):
+                buffer.flush(self.protocol_run)
+        self.assertFalse(VerificationResult.objects.exists())
+
+        buffer = VerificationResultBuffer(self.protocol_run.pk)
+        self.buffer_results(buffer)
+        buffer.flush(self.protocol_run)
+        self.protocol_run.refresh_from_db()
+        self.assertEqual(self.protocol_run.status, "completed")
+        self.assertEqual(VerificationResult.objects.count(), 3)
+
+
+class ProtocolRunResultsTests(ProtocolTestCase):
+    def test_results_of_every_step_are_stored_with_the_run(self):
+        protocol = self.create_protocol("protocol", steps=3)
+
+        result, protocol_run = self.run_protocol(protocol)
+        self.assertTrue(result["success"])
+        self.assertEqual(
+            (protocol_run.status, protocol_run.result_status), ("completed", "pass")
+        )
+        results = VerificationResult.objects.filter(protocol_run=protocol_run)
+        self.assertEqual(results.count(), 3)
+        self.assertEqual(
+            set(results.values_list("execution_step_id", flat=True)),
+            set(protocol.steps.values_list("pk", flat=True)),
+        )
+
+
+class VerificationPlanTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol", steps=2)
+        step = self.protocol.steps.get(name="query 1")
+        VerificationMethod.objects.create(
+            execution_step=step,
+            name="count",
+            method_type="numeric_equal",
+            expected_result={"result": "42"},
+            supports_comparison=True,
+            comparison_method="gte",
+        )
+
+    def compile(self):
+        return VerificationPlan(load_protocol_snapshot(self.protocol.pk).steps)
+
+    def verification(self, plan, name):
+        return next(
+            verification
+            for _, verifications in plan
+            for verification in verifications
+            if verification.method.name == name
+        )
+
+    def test_steps_are_compiled_once_in_order(self):
+        plan = self.compile()
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(
+            [
+                (
+                    step.name,
+                    [verification.method.name for verification in verifications],
+                )
+                for step, verifications in plan
+            ],
+            [("query 0", ["has key"]), ("query 1", ["count", "has key"])],
+        )
+
+        count = self.verification(plan, "count")
+        self.assertEqual(count.expected_value, 42)
+        self.assertEqual(count.comparison_method, "gte")
+        with self.assertNumQueries(0):
+            self.assertTrue(count.run(50)["success"])
+            self.assertFalse(count.run(41)["success"])
+            self.assertTrue(
+                self.verification(plan, "has key").run({"key": 1})["success"]
+            )
+
+    def test_verifiers_are_shared(self):
+        self.assertIs(
+            VerificationFactory.create_verifier("numeric_equal"),
+            VerificationFactory.create_verifier("numeric_precision"),
+        )
+        with self.assertRaises(ValueError):
+            VerificationFactory.create_verifier("numeric_magic")
+
+    def test_unsupported_method_fails_the_compilation(self):
+        VerificationMethod.objects.filter(name="count").update(method_type="magic")
+        with self.assertRaises(ValueError):
+            self.compile()
+
+    def test_verifier_errors_fail_the_verification(self):
+        count = self.verification(self.compile(), "count")
+        with mock.patch.object(
+            NumericEqualVerifier, "verify", side_effect=TypeError("Bad value")
+        ):
+            result = count.run(50)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Bad value")
+        self.assertEqual(result["method"], "numeric_equal")
+
+    def test_comparison_operators_are_bound_once(self):
+        plan = self.compile()
+        count = self.verification(plan, "count")
+        self.assertIs(count.operator, COMPARISON_OPERATORS["gte"])
+
+        with mock.patch.object(
+            NumericEqualVerifier, "get_comparison_operator"
+        ) as get_comparison_operator:
+            self.assertTrue(count.run(42)["success"])
+        get_comparison_operator.assert_not_called()
+
+        # Verifications without a comparison get the default of their verifier
+        method = VerificationMethod.objects.get(name="count")
+        method.supports_comparison = False
+        method.save()
+        count = self.verification(self.compile(), "count")
+        self.assertIs(count.operator, COMPARISON_OPERATORS["eq"])
+        self.assertFalse(count.run(50)["success"])
+
+    def test_verifier_errors_summarize_columnar_results(self):
+        count = self.verification(self.compile(), "count")
+        columnar = ColumnarResult.from_rows(["id"], [(1,), (2,)])
+        with mock.patch.object(
+            NumericEqualVerifier, "verify", side_effect=TypeError("Bad value")
+        ):
+            result = count.run(columnar)
+        self.assertEqual(result["actual_value"], columnar.describe())
+        json.dumps(result)
+
+
+class StreamedResultVerifierTests(SimpleTestCase):
+    def setUp(self):
+        self.engine = make_database(10)
+        self.addCleanup(self.engine.dispose)
+
+    def stream(self, sql="SELECT id, name FROM items ORDER BY id"):
+        return CountingRowStream(self.engine, sql, batch_size=3)
+
+    def test_row_count_is_counted_batch_by_batch(self):
+        stream = self.stream()
+        result = DbRowCountVerifier().verify(stream, {"min": 5, "max": 10})
+        self.assertTrue(result["success"])
+        self.assertEqual(stream.batches, 4)
+        self.assertEqual(result["actual_value"], 10)
+
+    def test_contains_row_stops_at_the_first_match(self):
+        stream = self.stream()
+        verifier = DbQueryResultVerifier()
+
+        result = verifier.verify(stream, {"type": "contains_row", "row": {"id": 4}})
+        self.assertTrue(result["success"])
+        self.assertEqual(stream.batches, 2)
+        # Streams are stored as their description, never as rows
+        self.assertEqual(result["actual_value"]["batch_size"], 3)
+        self.assertIsNone(result["actual_value"]["row_count"])
+
+        result = verifier.verify(stream, {"type": "contains_row", "row": {"id": 42}})
+        self.assertFalse(result["success"])
+
+    def test_no_rows_fetches_one_batch(self):
+        stream = self.stream()
+        verifier = DbQueryResultVerifier()
+        self.assertFalse(verifier.verify(stream, {"type": "no_rows"})["success"])
+        self.assertEqual(stream.batches, 1)
+
+        empty = self.stream("SELECT id FROM items WHERE id < 0")
+        self.assertTrue(verifier.verify(empty, {"type": "no_rows"})["success"])
+
+    def test_exact_match_reads_every_row(self):
+        stream = self.stream("SELECT id FROM items WHERE id < 2 ORDER BY id")
+        result = DbQueryResultVerifier().verify(
+            stream, {"type": "exact_match", "value": [{"id": 0}, {"id": 1}]}
+        )
+        self.assertTrue(result["success"])
+
+    def test_unique_rows(self):
+        verifier = ListUniqueVerifier()
+        self.assertTrue(verifier.verify(self.stream(), None)["success"])
+
+        duplicated = self.stream(
+            "SELECT name FROM items UNION ALL SELECT name FROM items WHERE id = 7"
+        )
+        result = verifier.verify(duplicated, None)
+        self.assertFalse(result["success"])
+
+
+class ColumnarResultVerifierTests(SimpleTestCase):
+    def setUp(self):
+        self.result = ColumnarResult.from_rows(
+            ["id", "score", "name"],
+            [(0, 10, "a"), (1, 20, "b"), (2, 20, "c"), (3, 40, "a")],
+        )
+
+    def test_numeric_columns_are_checked_as_vectors(self):
+        verifier = ListUniqueVerifier()
+        result = verifier.verify(self.result, None, config={"column": "score"})
+        self.assertFalse(result["success"])
+        self.assertEqual(result["duplicate_elements"], [20])
+        self.assertEqual(result["duplicate_count"], 1)
+        # Columnar results are stored as their description, never as rows
+        self.assertEqual(result["actual_value"]["row_count"], 4)
+
+        result = verifier.verify(self.result, None, config={"column": "id"})
+        self.assertTrue(result["success"])
+
+    def test_other_columns_use_the_generic_checks(self):
+        result = ListUniqueVerifier().verify(
+            self.result, None, config={"column": "name"}
+        )
+        self.assertFalse(result["success"])
+
+    def test_sorted_column(self):
+        verifier = ListSortedVerifier()
+        result = verifier.verify(self.result, "ascending", config={"column": "score"})
+        self.assertTrue(result["success"])
+
+        result = verifier.verify(self.result, "descending", config={"column": "id"})
+        self.assertFalse(result["success"])
+        self.assertIn("indices 0 and 1", result["message"])
+
+    def test_all_match_lists_the_non_matching_values(self):
+        result = ListAllMatchVerifier().verify(
+            self.result, 20, config={"column": "score"}
+        )
+        self.assertFalse(result["success"])
+        self.assertEqual(result["non_matching_elements"], [10, 40])
+
+    @mock.patch("test_protocols.verifiers.list_verifiers.SAMPLE_SIZE", 2)
+    def test_failing_elements_are_counted_with_a_capped_sample(self):
+        result = ColumnarResult.from_rows(
+            ["score", "name"], [(index % 3, str(index % 3)) for index in range(12)]
+        )
+        for column in ("score", "name"):
+            with self.subTest(column=column):
+                unique = ListUniqueVerifier().verify(
+                    result, None, config={"column": column}
+                )
+                self.assertFalse(unique["success"])
+                self.assertEqual(unique["duplicate_count"], 9)
+                self.assertEqual(len(unique["duplicate_elements"]), 2)
+
+        all_match = ListAllMatchVerifier().verify(result, 0, config={"column": "score"})
+        self.assertEqual(all_match["non_matching_count"], 8)
+        self.assertEqual(all_match["non_matching_elements"], [1, 2])
+        self.assertIn("(8 non-matching elements)", all_match["message"])
+
+        all_match = ListAllMatchVerifier().verify(list(range(12)), 0)
+        self.assertEqual(all_match["non_matching_count"], 11)
+        self.assertEqual(all_match["non_matching_elements"], [1, 2])
+
+    def test_range_counts_the_values_outside(self):
+        verifier = NumericRangeVerifier()
+        result = verifier.verify(
+            self.result, {"min": 15, "max": 40}, config={"column": "score"}
+        )
+        self.assertFalse(result["success"])
+        self.assertEqual(result["outside_count"], 1)
+
+        result = verifier.verify(self.result, {"min": 0, "max": 40})
+        self.assertFalse(result["success"])
+        self.assertIn("set 'column'", result["message"])
+
+    def test_threshold_counts_the_failing_values(self):
+        verifier = NumericThresholdVerifier()
+        result = verifier.verify(
+            self.result, 20, comparison_method="lte", config={"column": "score"}
+        )
+        self.assertFalse(result["success"])
+        self.assertEqual(result["failing_count"], 1)
+
+        result = verifier.verify(
+            self.result, 3, comparison_method="lte", config={"column": "id"}
+        )
+        self.assertTrue(result["success"])
+
+    def test_contains_row_combines_the_column_masks(self):
+        verifier = DbQueryResultVerifier()
+        expected = {"type": "contains_row", "row": {"id": 3, "score": 40}}
+        self.assertTrue(verifier.verify(self.result, expected)["success"])
+
+        expected = {"type": "contains_row", "row": {"id": 3, "score": 20}}
+        self.assertFalse(verifier.verify(self.result, expected)["success"])
+
+        expected = {"type": "contains_row", "row": {"missing": 1}}
+        self.assertFalse(verifier.verify(self.result, expected)["success"])
+
+
+class RunTracerTests(SimpleTestCase):
+    def test_spans_nest_within_their_thread(self):
+        tracer = RunTracer(protocol="protocol")
+
+        def trace_thread():
+            with tracer.span("thread"):
+                pass
+
+        with tracer.span("run") as run:
+            with tracer.span("step") as step:
+                pass
+            worker = threading.Thread(target=trace_thread)
+            worker.start()
+            worker.join()
+
+        spans = {span.name: span for span in tracer.spans}
+        self.assertIsNone(run.parent_id)
+        self.assertEqual(step.parent_id, run.span_id)
+        self.assertIsNone(spans["thread"].parent_id)
+        self.assertGreaterEqual(run.end_ns, step.end_ns)
+
+    def test_failed_span_records_the_error(self):
+        tracer = RunTracer()
+        with self.assertRaises(ValueError):
+            with tracer.span("connect"):
+                raise ValueError("Refused")
+
+        span = tracer.spans[0]
+        self.assertEqual(span.attributes["error"], "Refused")
+        self.assertIsNotNone(span.end_ns)
+
+    def test_exports(self):
+        tracer = RunTracer(protocol="protocol")
+        with tracer.span("run", steps=2):
+            with self.assertRaises(ValueError), tracer.span("step"):
+                raise ValueError("Refused")
+        trace = tracer.to_dict()
+        run, step = trace["spans"]
+
+        chrome = to_chrome_trace(trace)
+        self.assertEqual(
+            [event["name"] for event in chrome["traceEvents"]], ["run", "step"]
+        )
+        self.assertEqual(
+            chrome["traceEvents"][0]["dur"], (run["end_ns"] - run["start_ns"]) / 1000
+        )
+        self.assertEqual(chrome["otherData"], {"protocol": "protocol"})
+
+        otel = to_otel_json(trace)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual(otel[1]["parentSpanId"], run["span_id"])
+        self.assertEqual(otel[0]["status"], {"code": 1})
+        self.assertEqual(otel[1]["status"], {"code": 2, "message": "Refused"})
+        self.assertIn(
+            {"key": "steps", "value": {"intValue": "2"}}, otel[0]["attributes"]
+        )
+
+
+class ProtocolRunTraceTests(ProtocolTestCase):
+    def test_run_records_the_phases(self):
+        _, protocol_run = self.run_protocol(self.create_protocol("protocol", steps=2))
+
+        names = [span["name"] for span in protocol_run.trace["spans"]]
+        for phase in ("resolve_config", "connect", "execute", "verify", "persist"):
+            self.assertIn(phase, names)
+        self.assertEqual(names.count("execute"), 2)
+        self.assertTrue(
+            all(span["end_ns"] is not None for span in protocol_run.trace["spans"])
+        )
+
+    def test_trace_export(self):
+        _, protocol_run = self.run_protocol(self.create_protocol("protocol"))
+        url = reverse("testsuite:run_trace", args=[protocol_run.pk])
+
+        response = self.client.get(url, {"format": "otel"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("resourceSpans", response.json())
+        self.assertEqual(self.client.get(url, {"format": "xml"}).status_code, 400)
+
+        ProtocolRun.objects.filter(pk=protocol_run.pk).update(trace={})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+def make_step(name, depends_on=(), **kwargs):
+    return StepSnapshot(
+        pk=name,
+        name=name,
+        kwargs={"step": name, **kwargs},
+        timeout_seconds=None,
+        depends_on=tuple(depends_on),
+        verification_methods=(),
+    )
+
+
+class StepGraphExecutorTests(SimpleTestCase):
+    def setUp(self):
+        self.connection = FakeConnection()
+        self.connection.connect()
+        self.opened = []
+
+    def open_connection(self):
+        connection = FakeConnection()
+        connection.on_execute = self.connection.on_execute
+        connection.connect()
+        self.opened.append(connection)
+        return nullcontext(connection)
+
+    def executor(self, steps, max_workers=1):
+        return StepGraphExecutor(
+            steps, self.connection, self.open_connection, max_workers=max_workers
+        )
+
+    def test_dependencies_ignore_steps_of_other_protocols(self):
+        steps = [make_step("a"), make_step("b", ["a", "elsewhere"])]
+        self.assertEqual(get_step_dependencies(steps), {"a": [], "b": ["a"]})
+
+    def test_cycles_are_detected(self):
+        steps = [
+            make_step("a"),
+            make_step("b", ["a", "c"]),
+            make_step("c", ["b"]),
+        ]
+        with self.assertRaises(ValueError):
+            get_step_dependencies(steps)
+        with self.assertRaises(ValueError):
+            self.executor(steps)
+
+    def test_steps_run_after_their_dependencies(self):
+        steps = [make_step("c", ["b"]), make_step("b", ["a"]), make_step("a")]
+        reported = []
+
+        outcomes = self.executor(steps).run(
+            on_outcome=lambda index, outcome: reported.append(index)
+        )
+        self.assertEqual(
+            [call["step"] for call in self.connection.execute_calls], ["a", "b", "c"]
+        )
+        self.assertEqual(reported, [2, 1, 0])
+        self.assertEqual(
+            [outcome.result["step"] for outcome in outcomes], ["c", "b", "a"]
+        )
+
+    def test_dependents_of_a_failed_step_are_skipped(self):
+        def on_execute(kwargs):
+            if kwargs["step"] == "a":
+                raise BaseExecutionError(message="Query failed")
+
+        self.connection.on_execute = on_execute
+        steps = [
+            make_step("a"),
+            make_step("b", ["a"]),
+            make_step("c", ["b"]),
+            make_step("d"),
+        ]
+
+        with self.assertLogs("pangolin.tests", "ERROR"):
+            outcomes = self.executor(steps).run()
+        self.assertTrue(outcomes[0].failed)
+        self.assertIsNone(outcomes[0].skipped_reason)
+        self.assertEqual(outcomes[1].skipped_reason, "dependency a failed")
+        self.assertEqual(outcomes[2].skipped_reason, "dependency b failed")
+        self.assertFalse(outcomes[3].failed)
+        self.assertEqual(
+            [call["step"] for call in self.connection.execute_calls], ["a", "d"]
+        )
+
+    def test_independent_steps_run_concurrently_on_their_own_connections(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def on_execute(kwargs):
+            barrier.wait()
+
+        self.connection.on_execute = on_execute
+        steps = [make_step("a"), make_step("b"), make_step("c")]
+
+        outcomes = self.executor(steps, max_workers=3).run()
+        self.assertFalse(any(outcome.failed for outcome in outcomes))
+        self.assertEqual(len(self.opened), 2)
+        executed = self.connection.execute_calls + [
+            call for connection in self.opened for call in connection.execute_calls
+        ]
+        self.assertEqual(len(executed), 3)
+
+
+class ProtocolPipelineTests(ProtocolTestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol", steps=4)
+        self.protocol_run = ProtocolRun.objects.create(
+            protocol=self.protocol, status="running"
+        )
+        self.plan = VerificationPlan(load_protocol_snapshot(self.protocol.pk).steps)
+
+    def pipeline(self, execute_steps):
+        return ProtocolPipeline(
+            self.plan,
+            execute_steps,
+            queue_size=1,
+            protocol_run_id=self.protocol_run.pk,
+        )
+
+    def test_results_are_verified_in_step_order_and_persisted(self):
+        def execute_steps(on_outcome):
+            # Last step first, as a step graph may finish them
+            for index in reversed(range(len(self.plan))):
+                on_outcome(index, StepOutcome({"key": index}))
+
+        pipeline = self.pipeline(execute_steps)
+        results = pipeline.run()
+        self.assertEqual([result["success"] for result in results], [True] * 4)
+        self.assertEqual(pipeline.persisted, 4)
+        self.assertEqual(
+            VerificationResult.objects.filter(protocol_run=self.protocol_run).count(),
+            4,
+        )
+
+    def test_last_results_stay_in_the_results_buffer(self):
+        def execute_steps(on_outcome):
+            for index in range(len(self.plan)):
+                on_outcome(index, StepOutcome({"key": index}))
+
+        results_buffer = VerificationResultBuffer(self.protocol_run.pk)
+        pipeline = ProtocolPipeline(
+            self.plan,
+            execute_steps,
+            queue_size=1,
+            protocol_run_id=self.protocol_run.pk,
+            results_buffer=results_buffer,
+        )
+        pipeline.run()
+        self.assertGreater(len(results_buffer), 0)
+        self.assertEqual(pipeline.persisted + len(results_buffer), 4)
+        results = VerificationResult.objects.filter(protocol_run=self.protocol_run)
+        self.assertEqual(results.count(), pipeline.persisted)
+
+        self.protocol_run.status = "completed"
+        results_buffer.flush(self.protocol_run)
+        self.assertEqual(results.count(), 4)
+
+    def test_last_results_are_committed_with_the_run(self):
+        flush = VerificationResultBuffer.flush
+        flushed_with_run = []
+
+        def record_flush(buffer, protocol_run=None):
+            if protocol_run is not None:
+                flushed_with_run.append((len(buffer), protocol_run.status))
+                self.assertTrue(connection.in_atomic_block)
+            return flush(buffer, protocol_run)
+
+        with mock.patch.object(VerificationResultBuffer, "flush", record_flush):
+            result, protocol_run = self.run_protocol(self.protocol)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(len(flushed_with_run), 1)
+        self.assertGreater(flushed_with_run[0][0], 0)
+        self.assertEqual(flushed_with_run[0][1], "completed")
+        self.assertEqual(
+            VerificationResult.objects.filter(protocol_run=protocol_run).count(), 4
+        )
+
+    def test_streamed_results_are_read_once_and_never_materialized(self):
+        step = self.protocol.steps.get(name="query 0")
+        VerificationMethod.objects.filter(execution_step=step).delete()
+        for name, method_type, expected in (
+            ("row count", "db_row_count", {"min": 10, "max": 10}),
+            ("has row", "db_query_result", {"type": "contains_row", "row": {"id": 3}}),
+            ("unique", "list_unique", None),
+        ):
+            VerificationMethod.objects.create(
+                execution_step=step,
+                name=name,
+                method_type=method_type,
+                expected_result={"result": expected},
+            )
+        engine = make_database(10)
+        self.addCleanup(engine.dispose)
+        streams = []
+
+        def on_execute(kwargs):
+            if kwargs["key"] == 0:
+                streams.append(
+                    CountingRowStream(
+                        engine, "SELECT id, name FROM items ORDER BY id", batch_size=3
+                    )
+                )
+                return streams[-1]
+
+        self.connection_hooks["on_execute"] = on_execute
+        with mock.patch.object(
+            RowStream, "to_columnar", side_effect=AssertionError("Materialized")
+        ):
+            result, protocol_run = self.run_protocol(self.protocol)
+
+        self.assertTrue(result["success"])
+        self.assertEqual((streams[0].queries, streams[0].batches), (1, 4))
+        results = VerificationResult.objects.filter(
+            protocol_run=protocol_run, execution_step=step
+        )
+        self.assertEqual(
+            {result.verification_step.name: result.success for result in results},
+            {"row count": True, "has row": True, "unique": True},
+        )
+        # Streams are stored as their description
+        self.assertEqual(
+            results.get(verification_step__name="row count").actual_value,
+            10,
+        )
+
+    def test_skipped_steps_are_verified_as_skipped(self):
+        def execute_steps(on_outcome):
+            on_outcome(0, StepOutcome({"key": 0}))
+            for index in range(1, len(self.plan)):
+                on_outcome(index, StepOutcome(None, "dependency query 0 failed"))
+
+        results = self.pipeline(execute_steps).run()
+        self.assertTrue(results[0]["success"])
+        self.assertEqual({result["status"] for result in results[1:]}, {"skipped"})
+
+    def test_execution_errors_stop_the_pipeline(self):
+        def execute_steps(on_outcome):
+            on_outcome(0, StepOutcome({"key": 0}))
+            raise RuntimeError("Worker lost")
+
+        with self.assertRaisesMessage(RuntimeError, "Worker lost"):
+            self.pipeline(execute_steps).run()
+
+    def test_persist_errors_stop_the_pipeline(self):
+        def execute_steps(on_outcome):
+            for index in range(len(self.plan)):
+                on_outcome(index, StepOutcome({"key": index}))
+
+        with mock.patch.object(
+            VerificationResultBuffer,
+            "flush",
+            side_effect=RuntimeError("Lost the database"),
+        ):
+            with self.assertLogs("test_protocols.pipeline", "ERROR"):
+                with self.assertRaisesMessage(RuntimeError, "Lost the database"):
+                    self.pipeline(execute_steps).run()
+
+    def test_failed_run_discards_its_partial_results(self):
+        def on_execute(kwargs):
+            if kwargs["key"] == 3:
+                raise RuntimeError("Worker lost")
+
+        self.connection_hooks["on_execute"] = on_execute
+        with self.assertLogs("test_protocols.tasks", "ERROR"):
+            result, protocol_run = self.run_protocol(self.protocol)
+
+        self.assertFalse(result["success"])
+        self.assertIn("Worker lost", protocol_run.error_message)
+        self.assertFalse(
+            VerificationResult.objects.filter(protocol_run=protocol_run).exists()
+        )
+
+
+class SuitePlanningTests(ProtocolFixtures, TestCase):
+    def record_runs(self, protocol, durations, status="completed"):
+        for duration in durations:
+            ProtocolRun.objects.create(
+                protocol=protocol,
+                status=status,
+                result_status="pass",
+                duration_seconds=duration,
+            )
+
+    def test_duration_estimate(self):
+        estimate = DurationEstimate.from_durations([5, 1, 3, 2, 4, 10, 6, 7, 8, 9])
+        self.assertEqual(
+            (estimate.median, estimate.p90, estimate.samples), (5.5, 9, 10)
+        )
+
+    def test_estimates_use_the_recent_completed_runs(self):
+        protocol = self.create_protocol("protocol")
+        self.record_runs(protocol, [100, 100])
+        self.record_runs(protocol, [10, 20, 30])
+        self.record_runs(protocol, [1000], status="error")
+
+        estimate = estimate_durations([protocol], window=3)[protocol.pk]
+        self.assertEqual((estimate.median, estimate.samples), (20, 3))
+
+    def test_protocols_without_history_get_the_median_estimate(self):
+        protocols = [self.create_protocol(name) for name in ("a", "b", "c", "new")]
+        for protocol, duration in zip(protocols, (10, 20, 60)):
+            self.record_runs(protocol, [duration])
+
+        estimates = estimate_durations(protocols)
+        self.assertEqual(estimates[protocols[3].pk].median, 20)
+        self.assertFalse(estimates[protocols[3].pk].has_history)
+        with self.settings(PLANNING_DEFAULT_DURATION=42):
+            self.assertEqual(estimate_durations(protocols[3:])[protocols[3].pk].p90, 42)
+
+    def test_shards_are_balanced_on_the_estimates(self):
+        protocols = [
+            self.create_protocol(f"p{index}", order_index=index) for index in range(5)
+        ]
+        estimates = {
+            protocol.pk: DurationEstimate(duration, duration, 1)
+            for protocol, duration in zip(protocols, (4, 10, 2, 8, 6))
+        }
+
+        shards = shard_protocols(protocols, estimates, 2)
+        self.assertEqual(
+            [[protocol.name for protocol in shard] for shard in shards],
+            [["p0", "p1", "p2"], ["p3", "p4"]],
+        )
+        self.assertEqual(len(shard_protocols(protocols, estimates, 10)), 5)
+
+    def test_plan_estimates_the_longest_shard_of_each_stage(self):
+        first = self.create_protocol("first", order_index=1)
+        second = self.create_protocol("second", order_index=2)
+        third = self.create_protocol("third", order_index=3)
+        third.depends_on.add(first)
+        for protocol, duration in ((first, 30), (second, 50), (third, 20)):
+            self.record_runs(protocol, [duration])
+
+        plan = SuitePlan(self.suite, workers=2)
+        self.assertEqual(plan.shards, [[[second], [first]], [[third]]])
+        self.assertEqual(plan.estimated_median, 70)
+        self.assertEqual(
+            plan.to_dict()["stages"][1][0]["protocols"][0]["name"], "third"
+        )
+
+
+class CancellationTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol")
+        self.suite_run_id = uuid4()
+
+    def create_run(self, status):
+        return ProtocolRun.objects.create(
+            protocol=self.protocol, status=status, suite_run_id=self.suite_run_id
+        )
+
+    def test_abort_suite_run_aborts_the_unfinished_runs(self):
+        pending, running, completed = (
+            self.create_run(status) for status in ("pending", "running", "completed")
+        )
+        other = ProtocolRun.objects.create(protocol=self.protocol, status="pending")
+
+        with self.assertLogs("test_protocols.cancellation", "WARNING"):
+            self.assertEqual(abort_suite_run(self.suite_run_id, "Gate failed"), 2)
+        for protocol_run, status in (
+            (pending, "aborted"),
+            (running, "aborted"),
+            (completed, "completed"),
+            (other, "pending"),
+        ):
+            protocol_run.refresh_from_db()
+            self.assertEqual(protocol_run.status, status)
+        self.assertEqual(pending.error_message, "Gate failed")
+
+    def test_cancellation_reads_the_run_status_once_per_interval(self):
+        protocol_run = self.create_run("running")
+        cancellation = RunCancellation(protocol_run.pk, interval=60)
+
+        cancellation.check()
+        ProtocolRun.objects.filter(pk=protocol_run.pk).update(
+            status="aborted", error_message="Gate failed"
+        )
+        with self.assertNumQueries(0):
+            cancellation.check()
+
+        cancellation.interval = 0
+        with self.assertRaisesMessage(ProtocolRunAborted, "Gate failed"):
+            cancellation.check()
+
+    def test_cancellation_after_the_deadline(self):
+        protocol_run = self.create_run("running")
+        cancellation = RunCancellation(protocol_run.pk, deadline=Deadline.after(-1))
+
+        with self.assertRaises(ProtocolRunTimedOut):
+            cancellation.check()
+
+
+class FailuresFirstOrderingTests(ProtocolFixtures, TestCase):
+    def record_results(self, protocol, results):
+        """Record completed runs, ``results`` from the oldest to the newest"""
+        for result_status in results:
+            ProtocolRun.objects.create(
+                protocol=protocol, status="completed", result_status=result_status
+            )
+
+    def test_failure_scores(self):
+        stable, failing, flaky, new = (
+            self.create_protocol(name) for name in ("stable", "failing", "flaky", "new")
+        )
+        self.record_results(stable, ["pass", "pass"])
+        self.record_results(failing, ["pass", "fail", "fail"])
+        self.record_results(flaky, ["fail", "pass", "fail", "pass"])
+
+        scores = failure_scores([stable, failing, flaky, new])
+        self.assertEqual(scores[stable.pk], 0)
+        self.assertAlmostEqual(scores[failing.pk], 1 + 2 / 3 + 1 / 2)
+        self.assertAlmostEqual(scores[flaky.pk], 0 + 1 / 2 + 1)
+        self.assertEqual(scores[new.pk], 0)
+
+    def test_gates_then_likely_failures_run_first(self):
+        stable = self.create_protocol("stable", order_index=1)
+        failing = self.create_protocol("failing", order_index=2)
+        gate = self.create_protocol("gate", order_index=3, is_gate=True)
+        self.record_results(stable, ["pass"])
+        self.record_results(failing, ["fail"])
+        protocols = [stable, failing, gate]
+
+        self.assertEqual(order_protocols(protocols), protocols)
+        self.assertEqual(
+            order_protocols(protocols, "failures_first"), [gate, failing, stable]
+        )
+        with self.assertRaises(ValueError):
+            order_protocols(protocols, "random")
+
+
+class FailFastSuiteRunTests(ProtocolTestCase):
+    def setUp(self):
+        super().setUp()
+        self.gate = self.create_protocol(
+            "gate", order_index=1, passing=False, is_gate=True
+        )
+        self.after = self.create_protocol("after", order_index=2)
+        self.after.depends_on.add(self.gate)
+
+    def test_sequential_run_stops_after_a_failed_gate(self):
+        with self.assertLogs("test_protocols.tasks", "WARNING"):
+            results = tasks.run_test_suite(str(self.suite.pk), fail_fast=True)
+
+        self.assertEqual((results["failed"], results["aborted"]), (1, 1))
+        self.assertFalse(self.after.runs.exists())
+
+    def test_parallel_run_aborts_the_runs_after_a_failed_gate(self):
+        with self.assertLogs("test_protocols.cancellation", "WARNING"):
+            dispatch = tasks.run_test_suite(
+                str(self.suite.pk), parallel=True, fail_fast=True
+            )
+
+        summary = tasks.finalize_test_suite(
+            str(self.suite.pk), dispatch["suite_run_id"], 0
+        )
+        self.assertEqual((summary["failed"], summary["aborted"]), (1, 1))
+        self.assertEqual(self.after.runs.get().status, "aborted")
+        self.assertFalse(
+            VerificationResult.objects.filter(
+                protocol_run__protocol=self.after
+            ).exists()
+        )
+
+
+class SchedulingTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol")
+        other_project = Project.objects.create(name="Other", owner=self.user)
+        other_suite = TestSuite.objects.create(name="Other", project=other_project)
+        self.other_protocol = TestProtocol.objects.create(
+            suite=other_suite, name="other"
+        )
+
+    def create_run(self, protocol, status="pending", lane="batch"):
+        return ProtocolRun.objects.create(protocol=protocol, status=status, lane=lane)
+
+    def test_fair_share_follows_the_scheduling_weights(self):
+        self.project.scheduling_weight = 3
+        other = self.other_protocol.suite.project
+        self.assertEqual(fair_share(self.project, {other.pk: 1}, capacity=8), 6)
+        self.assertEqual(fair_share(other, {self.project.pk: 3}, capacity=8), 2)
+        # Never less than one slot, nor more than the project limit
+        self.assertEqual(fair_share(other, {self.project.pk: 30}, capacity=8), 1)
+        self.project.max_concurrent_runs = 4
+        self.assertEqual(fair_share(self.project, {other.pk: 1}, capacity=8), 4)
+
+    def test_fair_share_counts_the_projects_with_queued_batch_runs(self):
+        self.create_run(self.other_protocol)
+        self.create_run(self.other_protocol, lane="interactive")
+        with self.settings(SCHEDULER_BATCH_CAPACITY=4):
+            self.assertEqual(fair_share(self.project), 2)
+
+            self.other_protocol.runs.update(status="completed")
+            self.assertEqual(fair_share(self.project), 4)
+
+    def test_runs_over_the_share_of_their_project_wait(self):
+        self.create_run(self.other_protocol)
+        running = self.create_run(self.protocol, status="running")
+        queued = self.create_run(self.protocol)
+
+        with self.settings(SCHEDULER_BATCH_CAPACITY=2):
+            self.assertFalse(try_admit(queued.pk))
+            running.status = "completed"
+            running.save()
+            self.assertTrue(try_admit(queued.pk))
+
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, "running")
+        self.assertIsNotNone(queued.admitted_at)
+
+    def test_project_limit_counts_the_interactive_runs(self):
+        self.project.max_concurrent_runs = 1
+        self.project.save()
+        self.create_run(self.protocol, status="running", lane="interactive")
+
+        self.assertFalse(try_admit(self.create_run(self.protocol).pk))
+
+    def test_runs_that_are_not_pending_are_admitted_as_is(self):
+        aborted = self.create_run(self.protocol, status="aborted")
+        self.assertTrue(try_admit(aborted.pk))
+        aborted.refresh_from_db()
+        self.assertEqual(aborted.status, "aborted")
+
+    def test_admission_deadline_is_the_earliest_limit(self):
+        run = self.create_run(self.protocol)
+        queued_at = run.started_at.timestamp()
+        with self.settings(SUITE_RUN_TIMEOUT=600):
+            self.assertEqual(admission_deadline(run.pk), queued_at + 600)
+            self.assertEqual(admission_deadline(run.pk, queued_at + 60), queued_at + 60)
+            self.assertEqual(
+                admission_deadline(run.pk, queued_at + 6000), queued_at + 600
+            )
+
+    def test_runs_not_admitted_by_their_deadline_time_out(self):
+        run = self.create_run(self.protocol)
+        with (
+            self.settings(SCHEDULER_ADMISSION_RETRY_DELAY=5),
+            mock.patch.object(tasks, "try_admit", return_value=False),
+        ):
+            with mock.patch.object(
+                tasks.run_suite_protocol, "retry", side_effect=Retry
+            ) as retry:
+                tasks.run_suite_protocol.apply(
+                    args=[str(run.pk)], kwargs={"deadline_at": time.time() + 60}
+                )
+            retry.assert_called_once_with(countdown=5)
+
+            result = tasks.run_suite_protocol.apply(
+                args=[str(run.pk)], kwargs={"deadline_at": time.time() + 1}
+            ).get()
+
+        self.assertTrue(result["timed_out"])
+        run.refresh_from_db()
+        self.assertEqual((run.status, run.result_status), ("timeout", "error"))
+
+    def test_sequential_suite_runs_resume_once_admitted(self):
+        self.create_protocol("second", order_index=1)
+        with (
+            mock.patch.object(tasks, "try_admit", return_value=False),
+            mock.patch.object(
+                tasks.run_test_suite, "retry", side_effect=Retry
+            ) as retry,
+        ):
+            tasks.run_test_suite.apply(kwargs={"suite_id": str(self.suite.pk)})
+        # The worker is freed instead of waiting for the admission
+        progress = retry.call_args.kwargs["kwargs"]["progress"]
+        self.assertEqual((progress["next"], progress["results"]["total"]), (0, 2))
+        waiting = ProtocolRun.objects.get(pk=progress["run_id"])
+        self.assertEqual(waiting.status, "pending")
+
+        with (
+            mock.patch.object(tasks, "try_admit", return_value=True),
+            mock.patch.object(
+                tasks, "run_test_protocol", return_value={"success": True}
+            ) as run_test_protocol,
+        ):
+            summary = tasks.run_test_suite.apply(
+                kwargs={"suite_id": str(self.suite.pk), "progress": progress}
+            ).get()
+
+        self.assertEqual(run_test_protocol.call_args_list[0].args[0], str(waiting.pk))
+        self.assertEqual(
+            (summary["total"], summary["succeeded"], summary["timed_out"]), (2, 2, 0)
+        )
+        self.assertEqual(ProtocolRun.objects.count(), 2)
+
+    def test_lanes_have_their_own_queues(self):
+        self.assertEqual(lane_queue("interactive"), "protocol_interactive")
+        with self.assertRaises(ValueError):
+            lane_queue("urgent")
+
+
+class LaunchProtocolRunsTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocols = [
+            self.create_protocol(f"p{index}", order_index=index) for index in range(5)
+        ]
+        patcher = mock.patch.object(tasks.publish_protocol_runs, "apply_async")
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def published(self):
+        """Run IDs of each publish_protocol_runs message"""
+        return [call.kwargs["args"][0] for call in self.publish.call_args_list]
+
+    def test_runs_are_created_in_bulk_and_handed_over_in_batches(self):
+        with self.settings(BULK_LAUNCH_BATCH_SIZE=2):
+            with self.captureOnCommitCallbacks() as callbacks:
+                run_ids = launch_protocol_runs(
+                    self.suite.protocols.order_by("order_index"), self.user
+                )
+            # Nothing is sent before the runs are committed
+            self.publish.assert_not_called()
+            for callback in callbacks:
+                callback()
+
+        self.assertEqual([len(ids) for ids in self.published()], [2, 2, 1])
+        self.assertEqual(sum(self.published(), []), run_ids)
+        runs = ProtocolRun.objects.in_bulk(run_ids)
+        self.assertEqual(
+            [runs[UUID(run_id)].protocol for run_id in run_ids], self.protocols
+        )
+        self.assertEqual(
+            {(run.status, run.lane, run.executed_by) for run in runs.values()},
+            {("pending", "batch", "tester")},
+        )
+
+    def test_runs_are_published_from_the_queue_of_their_lane(self):
+        for lane, queue in (
+            ("batch", "protocol_queue"),
+            ("interactive", "protocol_interactive"),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                launch_protocol_runs([self.protocols[0].pk], lane=lane)
+            self.assertEqual(self.publish.call_args.kwargs["queue"], queue)
+            self.assertEqual(self.publish.call_args.kwargs["args"][2], lane)
+
+    def test_unknown_protocols_launch_nothing(self):
+        protocol_ids = [self.protocols[0].pk, uuid4()]
+
+        with self.assertRaisesMessage(ValueError, str(protocol_ids[1])):
+            launch_protocol_runs(protocol_ids)
+        self.assertFalse(ProtocolRun.objects.exists())
+
+    def test_publish_sends_the_task_of_the_lane(self):
+        run_ids = [str(uuid4()), str(uuid4())]
+        for task, lane, queue in (
+            (tasks.run_suite_protocol, "batch", "protocol_queue"),
+            (tasks.run_test_protocol, "interactive", "protocol_interactive"),
+        ):
+            with mock.patch.object(task, "apply_async") as apply_async:
+                self.assertEqual(
+                    tasks.publish_protocol_runs(run_ids, "tester", lane), 2
+                )
+            self.assertEqual(
+                [call.kwargs["args"] for call in apply_async.call_args_list],
+                [[run_id, "tester"] for run_id in run_ids],
+            )
+            self.assertEqual(apply_async.call_args.kwargs["queue"], queue)
+
+    def test_launch_view(self):
+        url = reverse("testsuite:protocol_run_launch")
+        self.client.force_login(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                url, {"suite": str(self.suite.pk)}, content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["count"], 5)
+        self.assertEqual(len(self.published()), 1)
+
+        response = self.client.post(
+            url,
+            {"suite": str(self.suite.pk), "protocol_ids": [str(uuid4())]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class ProtocolSnapshotTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol", steps=2)
+        self.first, self.second = self.protocol.steps.order_by("name")
+        self.second.depends_on.add(self.first)
+
+    def test_snapshot_holds_the_definition(self):
+        snapshot = load_protocol_snapshot(self.protocol.pk)
+
+        self.assertEqual(snapshot.name, "protocol")
+        self.assertEqual(snapshot.project_id, str(self.project.pk))
+        self.assertEqual(snapshot.connection.config_type, "database")
+        steps = {step.name: step for step in snapshot.steps}
+        self.assertEqual(steps["query 1"].kwargs, {"key": 1})
+        self.assertEqual(steps["query 1"].depends_on, (str(self.first.pk),))
+        self.assertEqual(
+            [method.method_type for method in steps["query 0"].verification_methods],
+            ["dict_has_keys"],
+        )
+
+    def test_snapshot_is_cached_until_the_protocol_changes(self):
+        snapshot = load_protocol_snapshot(self.protocol.pk)
+        # Only the version is read
+        with self.assertNumQueries(2):
+            self.assertIs(load_protocol_snapshot(self.protocol.pk), snapshot)
+
+        self.first.kwargs = {"key": "changed"}
+        self.first.save()
+        changed = load_protocol_snapshot(self.protocol.pk)
+        self.assertNotEqual(changed.version, snapshot.version)
+        self.assertIn({"key": "changed"}, [step.kwargs for step in changed.steps])
+
+        VerificationMethod.objects.filter(execution_step=self.second).delete()
+        self.assertNotEqual(get_snapshot_version(self.protocol.pk), changed.version)
+
+    def test_snapshot_follows_the_step_dependencies(self):
+        snapshot = load_protocol_snapshot(self.protocol.pk)
+
+        self.second.depends_on.remove(self.first)
+        changed = load_protocol_snapshot(self.protocol.pk)
+        self.assertNotEqual(changed.version, snapshot.version)
+        self.assertEqual([step.depends_on for step in changed.steps], [(), ()])
+
+        # Another graph with as many edges is another version
+        self.first.depends_on.add(self.second)
+        reversed_graph = get_snapshot_version(self.protocol.pk)
+        self.assertNotEqual(reversed_graph, snapshot.version)
+        self.assertNotEqual(reversed_graph, changed.version)
+
+    def test_snapshot_survives_a_task_message(self):
+        snapshot = load_protocol_snapshot(self.protocol.pk)
+        message = json.loads(json.dumps(snapshot.to_dict()))
+        self.assertEqual(ProtocolSnapshot.from_dict(message), snapshot)
+
+    def test_unknown_protocol(self):
+        with self.assertRaises(TestProtocol.DoesNotExist):
+            load_protocol_snapshot(uuid4())
+
+
+class ProtocolRunSnapshotTests(ProtocolTestCase):
+    def test_run_records_the_version_it_executed(self):
+        protocol = self.create_protocol("protocol")
+        result, protocol_run = self.run_protocol(protocol)
+
+        self.assertTrue(result["success"])
+        self.assertEqual(
+            protocol_run.snapshot_version, get_snapshot_version(protocol.pk)
+        )
+
+    def test_run_executes_the_snapshot_it_is_given(self):
+        protocol = self.create_protocol("protocol")
+        snapshot = load_protocol_snapshot(protocol.pk).to_dict()
+        protocol.steps.update(kwargs={"key": "changed"})
+
+        self.run_protocol(protocol, snapshot=snapshot)
+        self.assertEqual(self.connections[0].execute_calls, [{"key": 0}])
+
+
+class BackfillVerificationResultRunTests(TransactionTestCase):
+    # Historical models only have the fields of the target migrations, and
+    # Project rows need the fields projects 0002 added to the table
+    projects = ("projects", "0002_project_max_concurrent_runs_and_more")
+    migrate_from = [
+        projects,
+        ("test_protocols", "0022_verificationresult_protocol_run"),
+    ]
+    migrate_to = [projects, ("test_protocols", "0023_backfill_verificationresult_run")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(
+            lambda: self.migrate(
+                MigrationExecutor(connection).loader.graph.leaf_nodes()
+            )
+        )
+        apps = self.migrate(self.migrate_from)
+
+        user = apps.get_model("auth", "User").objects.create(username="tester")
+        project = apps.get_model("projects", "Project").objects.create(
+            name="Project", owner_id=user.pk
+        )
+        suite = apps.get_model("test_protocols", "TestSuite").objects.create(
+            name="Suite", project=project
+        )
+        protocol = apps.get_model("test_protocols", "TestProtocol").objects.create(
+            suite=suite, name="protocol"
+        )
+        self.step = apps.get_model("test_protocols", "ExecutionStep").objects.create(
+            test_protocol=protocol, name="query"
+        )
+        method = apps.get_model("test_protocols", "VerificationMethod").objects.create(
+            execution_step=self.step, name="has key", method_type="dict_has_keys"
+        )
+
+        ProtocolRun = apps.get_model("test_protocols", "ProtocolRun")
+        VerificationResult = apps.get_model("test_protocols", "VerificationResult")
+        start = timezone.now() - timedelta(hours=1)
+        self.runs = []
+        for minutes in (0, 10):
+            protocol_run = ProtocolRun.objects.create(protocol=protocol)
+            ProtocolRun.objects.filter(pk=protocol_run.pk).update(
+                started_at=start + timedelta(minutes=minutes)
+            )
+            self.runs.append(protocol_run.pk)
+        # Before the first run, during the first run and during the second one
+        self.results = []
+        for minutes in (-1, 1, 11):
+            result = VerificationResult.objects.create(verification_step=method)
+            VerificationResult.objects.filter(pk=result.pk).update(
+                verification_time=start + timedelta(minutes=minutes)
+            )
+            self.results.append(result.pk)
+
+    def test_results_are_linked_to_the_run_started_last_before_them(self):
+        apps = self.migrate(self.migrate_to)
+
+        VerificationResult = apps.get_model("test_protocols", "VerificationResult")
+        results = VerificationResult.objects.in_bulk(self.results)
+        self.assertEqual(
+            [results[pk].protocol_run_id for pk in self.results],
+            [None] + self.runs,
+        )
+        self.assertEqual(
+            {result.execution_step_id for result in results.values()}, {self.step.pk}
+        )
+
+
+class ProtocolRunDetailTests(ProtocolTestCase):
+    def test_shows_the_results_of_the_run_only(self):
+        protocol = self.create_protocol("protocol", steps=2)
+        # Results of an earlier run share the verification methods
+        self.run_protocol(protocol)
+        _, protocol_run = self.run_protocol(protocol)
+        self.client.force_login(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("testsuite:run_detail", args=[protocol_run.pk])
+            )
+        self.assertEqual(response.status_code, 200)
+        results = response.context["verification_results_dict"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual(
+            {result.protocol_run_id for result in results.values()},
+            {protocol_run.pk},
+        )
+        result_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if 'FROM "test_protocols_verificationresult"' in query["sql"]
+        ]
+        self.assertEqual(len(result_queries), 1)
+        self.assertIn(str(protocol_run.pk).replace("-", ""), result_queries[0])
+
+
+class RunRollupTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.protocol = self.create_protocol("protocol")
+
+    def rollup_counts(self):
+        return {
+            (rollup.status, rollup.result_status): rollup.count
+            for rollup in ProtocolRunRollup.objects.filter(project=self.project)
+            if rollup.count
+        }
+
+    def assertReconciled(self, expected):
+        """The counts kept incrementally are the ones recounted from the runs"""
+        self.assertEqual(self.rollup_counts(), expected)
+        self.assertEqual(reconcile_run_rollups(), 0)
+        self.assertEqual(self.rollup_counts(), expected)
+
+    def test_saved_runs(self):
+        first = ProtocolRun.objects.create(protocol=self.protocol)
+        second = ProtocolRun.objects.create(protocol=self.protocol)
+        self.assertReconciled({("running", ""): 2})
+
+        first.status = "completed"
+        first.result_status = "pass"
+        first.save()
+        second.status = "failed"
+        second.result_status = "fail"
+        second.save(update_fields=["status", "result_status"])
+        self.assertReconciled({("completed", "pass"): 1, ("failed", "fail"): 1})
+
+        # Saving other fields keeps the buckets
+        first.error_message = "None"
+        first.save(update_fields=["error_message"])
+        second.delete()
+        self.assertReconciled({("completed", "pass"): 1})
+
+    def test_transitioned_runs(self):
+        for _ in range(3):
+            ProtocolRun.objects.create(protocol=self.protocol)
+        runs = ProtocolRun.objects.filter(protocol=self.protocol)
+
+        self.assertEqual(
+            transition_runs(runs.filter(pk=runs.first().pk), status="error"), 1
+        )
+        self.assertEqual(
+            transition_runs(
+                runs.filter(status="running"), status="completed", result_status="pass"
+            ),
+            2,
+        )
+        # Runs already in their new state are left in their bucket
+        self.assertEqual(transition_runs(runs, status="completed"), 3)
+        self.assertReconciled({("completed", "pass"): 2, ("completed", ""): 1})
+
+    def test_bulk_created_runs(self):
+        runs = ProtocolRun.objects.bulk_create(
+            [
+                ProtocolRun(protocol=self.protocol, status="created", lane="batch")
+                for _ in range(2)
+            ]
+        )
+        record_new_runs(runs)
+        self.assertReconciled({("created", ""): 2})
+
+    def test_reconcile_fixes_drift(self):
+        ProtocolRun.objects.create(protocol=self.protocol)
+        ProtocolRun.objects.create(protocol=self.protocol)
+        # Plain updates bypass the incremental counts
+        ProtocolRun.objects.update(status="aborted")
+        ProtocolRunRollup.objects.create(
+            project=self.project, day="2020-01-01", status="running", count=4
+        )
+
+        with self.assertLogs("test_protocols.rollups", "WARNING"):
+            self.assertEqual(reconcile_run_rollups(), 3)
+        self.assertReconciled({("aborted", ""): 2})
+
+        # Days before the recount window are left alone
+        ProtocolRunRollup.objects.filter(day="2020-01-01").update(count=4)
+        self.assertEqual(reconcile_run_rollups(days=7), 0)
+        self.assertEqual(self.rollup_counts()[("running", "")], 4)
+
+
+class DurationSketchTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.lognormvariate(2, 1.5) for _ in range(5000)]
+
+    def assertQuantiles(self, sketch, values):
+        values = sorted(values)
+        for q in (0, 0.1, 0.5, 0.9, 0.95, 0.99, 1):
+            actual = values[int(q * (len(values) - 1))]
+            self.assertLessEqual(
+                abs(sketch.quantile(q) - actual), RELATIVE_ACCURACY * actual, q
+            )
+
+    def test_quantiles_within_the_relative_accuracy(self):
+        sketch = DurationSketch()
+        for value in self.values:
+            sketch.add(value)
+        self.assertEqual(sketch.count, len(self.values))
+        self.assertQuantiles(sketch, self.values)
+
+    def test_small_values_count_as_zero(self):
+        sketch = DurationSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+        sketch.add(0)
+        sketch.add(0.0001)
+        sketch.add(10)
+        self.assertEqual(sketch.quantile(0.5), 0.0)
+        self.assertAlmostEqual(sketch.quantile(1), 10, delta=10 * RELATIVE_ACCURACY)
+
+    def test_merged_sketches_are_the_sketch_of_all_values(self):
+        whole = DurationSketch()
+        parts = [DurationSketch() for _ in range(3)]
+        for index, value in enumerate(self.values):
+            whole.add(value)
+            parts[index % 3].add(value)
+
+        merged = DurationSketch()
+        for part in parts:
+            # As stored in the trends
+            merged.merge(
+                DurationSketch.from_dict(json.loads(json.dumps(part.to_dict())))
+            )
+        self.assertEqual(merged.bins, whole.bins)
+        self.assertQuantiles(merged, self.values)
+
+
+class RunTrendTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.protocol = self.create_protocol("protocol")
+
+    def finish_runs(self, results):
+        """Finish a run per (result, duration), on alternate trend shards"""
+        shards = iter(range(len(results)))
+        with mock.patch("test_protocols.trends.trend_shard", lambda: next(shards) % 2):
+            for result_status, duration in results:
+                run = ProtocolRun.objects.create(protocol=self.protocol)
+                run.status = "completed" if result_status == "pass" else "failed"
+                run.result_status = result_status
+                run.duration_seconds = duration
+                run.save()
+
+    def test_shards_add_up_to_the_rebuilt_trends(self):
+        self.finish_runs(
+            [
+                ("pass", 1.5),
+                ("pass", 4.0),
+                ("fail", 0.25),
+                ("error", None),
+                ("pass", 8.0),
+            ]
+        )
+        self.assertEqual(DailyRunTrend.objects.filter(scope="project").count(), 2)
+        trends = {
+            (scope, scope_id, granularity): get_run_trend(scope, scope_id, granularity)
+            for scope, scope_id in (
+                ("project", self.project.pk),
+                ("suite", self.suite.pk),
+                ("protocol", self.protocol.pk),
+            )
+            for granularity in ("day", "hour")
+        }
+        summary = trends["project", self.project.pk, "day"]["summary"]
+        self.assertEqual(
+            (summary["runs"], summary["passed"], summary["failed"], summary["errors"]),
+            (5, 3, 1, 1),
+        )
+        self.assertEqual(summary["pass_rate"], 0.6)
+        self.assertEqual(summary["duration_avg"], 13.75 / 4)
+        self.assertEqual((summary["duration_min"], summary["duration_max"]), (0.25, 8))
+
+        self.assertEqual(rebuild_run_trends(), 5)
+        self.assertEqual(DailyRunTrend.objects.filter(scope="project").count(), 1)
+        for (scope, scope_id, granularity), trend in trends.items():
+            self.assertEqual(get_run_trend(scope, scope_id, granularity), trend)
+
+    def test_unfinished_and_unknown_runs_are_not_counted(self):
+        ProtocolRun.objects.create(protocol=self.protocol)
+        self.assertEqual(get_run_trend("project", self.project.pk)["points"], [])
+        with self.assertRaises(ValueError):
+            get_run_trend("project", self.project.pk, "week")
+        with self.assertRaises(ValueError):
+            get_run_trend("team", self.project.pk)
+
+    def test_view(self):
+        self.finish_runs([("pass", 2.0)])
+        url = reverse("testsuite:run_trends")
+
+        response = self.client.get(
+            url, {"scope": "suite", "id": self.suite.pk, "granularity": "hour"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["summary"]["runs"], 1)
+
+        for params in (
+            {"id": "project"},
+            {"id": self.project.pk, "days": "week"},
+            {"id": self.project.pk, "scope": "team"},
+            {"id": self.project.pk, "granularity": "week"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+
+class RunPageTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.run = ProtocolRun.objects.create(
+            protocol=self.create_protocol("protocol"),
+            status="completed",
+            result_status="pass",
+        )
+        self.url = reverse("testsuite:run_detail", args=[self.run.pk])
+
+    def test_finished_run_is_revalidated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+        # Saving the run changes the page
+        self.run.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_running_run_has_no_validators(self):
+        self.run.status = "running"
+        self.run.result_status = None
+        self.run.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_each_user_has_their_own_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_content_is_rendered_once_per_version(self):
+        with mock.patch(
+            "test_protocols.run_pages.render_to_string", return_value="content"
+        ) as render:
+            self.assertEqual(render_run_content(self.run), "content")
+            self.assertEqual(render_run_content(self.run), "content")
+            self.assertEqual(render.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.run.save()
+            render_run_content(self.run)
+            self.assertEqual(render.call_count, 2)
@@ -0,0 +1,222 @@
+# test_protocols/tracing.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+def _new_id(size):
+    return os.urandom(size).hex()
+
+
+class Span:
+    """A timed phase of a protocol run"""
+
+    __slots__ = (
+        "span_id",
+        "parent_id",
+        "name",
+        "start_ns",
+        "end_ns",
+        "thread_id",
+        "attributes",
+    )
+
+    def __init__(self, name, parent_id=None, attributes=None):
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.thread_id = threading.get_native_id()
+        self.attributes = dict(attributes or {})
+
+    def set(self, **attributes):
+        """Add attributes to the span"""
+        self.attributes.update(attributes)
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "thread_id": self.thread_id,
+            "attributes": self.attributes,
+        }
+
+
+class RunTracer:
+    """
+    Records how long each phase of a protocol run takes.
+
+    Spans started while another span of the same thread is open become its
+    children, so phases running on worker threads are recorded too. The trace is
+    stored on ProtocolRun.trace as a plain dict (see to_dict) and can be
+    exported with to_chrome_trace or to_otel_json.
+    """
+
+    def __init__(self, **attributes):
+        """
+        Args:
+            **attributes: Attributes describing the whole run (e.g. protocol name)
+        """
+        self.trace_id = _new_id(16)
+        self.attributes = attributes
+        self.spans = []
+        self._local = threading.local()
+
+    @property
+    def _open(self):
+        """Spans currently open in the calling thread"""
+        if not hasattr(self._local, "open"):
+            self._local.open = []
+        return self._local.open
+
+    def start_span(self, name, **attributes):
+        """
+        Start a span, to be ended with end_span.
+
+        Use this when the phase does not fit a with block, otherwise prefer span().
+        """
+        parent_id = self._open[-1].span_id if self._open else None
+        span = Span(name, parent_id, attributes)
+        self.spans.append(span)
+        self._open.append(span)
+        return span
+
+    def end_span(self, span, **attributes):
+        """End a span started with start_span"""
+        span.end_ns = time.time_ns()
+        span.set(**attributes)
+        if span in self._open:
+            self._open.remove(span)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Time the enclosed block.
+
+        The span is marked as failed, with the error message, if the block raises.
+        """
+        span = self.start_span(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=str(e))
+            raise
+        finally:
+            self.end_span(span)
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: JSON serializable trace, as stored on ProtocolRun.trace
+        """
+        return {
+            "trace_id": self.trace_id,
+            "attributes": self.attributes,
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+def _span_duration_ns(span):
+    end_ns = span["end_ns"] if span["end_ns"] is not None else span["start_ns"]
+    return end_ns - span["start_ns"]
+
+
+def to_chrome_trace(trace):
+    """
+    Export a stored trace in the Chrome trace event format.
+
+    The result can be loaded in chrome://tracing or https://ui.perfetto.dev.
+
+    Args:
+        trace: A trace dict, as returned by RunTracer.to_dict
+
+    Returns:
+        dict: The trace events
+    """
+    events = [
+        {
+            "name": span["name"],
+            "cat": "protocol_run",
+            "ph": "X",
+            "ts": span["start_ns"] / 1000,
+            "dur": _span_duration_ns(span) / 1000,
+            "pid": 1,
+            "tid": span.get("thread_id", 1),
+            "args": span["attributes"],
+        }
+        for span in trace.get("spans", [])
+    ]
+    return {
+        "traceEvents": events,
+        "displayTimeUnit": "ms",
+        "otherData": trace.get("attributes", {}),
+    }
+
+
+def _otel_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otel_attributes(attributes):
+    return [
+        {"key": key, "value": _otel_value(value)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+
+def to_otel_json(trace, service_name="pangolin-compliance-suite"):
+    """
+    Export a stored trace as OpenTelemetry (OTLP/JSON) spans.
+
+    Args:
+        trace: A trace dict, as returned by RunTracer.to_dict
+        service_name: Value of the service.name resource attribute
+
+    Returns:
+        dict: An OTLP ExportTraceServiceRequest body
+    """
+    spans = []
+    for span in trace.get("spans", []):
+        end_ns = span["start_ns"] + _span_duration_ns(span)
+        otel_span = {
+            "traceId": trace["trace_id"],
+            "spanId": span["span_id"],
+            "name": span["name"],
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span["start_ns"]),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _otel_attributes(span["attributes"]),
+            "status": (
+                {"code": 2, "message": span["attributes"]["error"]}
+                if span["attributes"].get("error")
+                else {"code": 1}
+            ),
+        }
+        if span["parent_id"]:
+            otel_span["parentSpanId"] = span["parent_id"]
+        spans.append(otel_span)
+
+    resource_attributes = {"service.name": service_name}
+    resource_attributes.update(trace.get("attributes", {}))
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": _otel_attributes(resource_attributes)},
+                "scopeSpans": [
+                    {"scope": {"name": "test_protocols.tracing"}, "spans": spans}
+                ],
+            }
+        ]
+    }
@@ -0,0 +1,346 @@
+# test_protocols/trends.py
+import logging
+import os
+from datetime import datetime, time
+from itertools import groupby
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from test_protocols.models import DailyRunTrend, HourlyRunTrend, ProtocolRun
+from test_protocols.sketch import DurationSketch
+
+logger = logging.getLogger(__name__)
+
+# Statuses of the runs that are over
+FINISHED_STATUSES = ("completed", "failed", "error", "aborted", "timeout")
+
+GRANULARITIES = {
+    "hour": HourlyRunTrend,
+    "day": DailyRunTrend,
+}
+
+# Counter of each result, the other results are only counted in runs
+RESULT_COUNTERS = {"pass": "passed", "fail": "failed", "error": "errors"}
+
+# Quantiles of the durations reported for each period
+TREND_QUANTILES = {"p50": 0.5, "p95": 0.95}
+
+
+def trend_periods(started_at):
+    """
+    Returns:
+        list: (trend model, start of the period) of each granularity, in
+        local time, for a run started at ``started_at``
+    """
+    local = timezone.localtime(started_at)
+    return [
+        (HourlyRunTrend, local.replace(minute=0, second=0, microsecond=0)),
+        (
+            DailyRunTrend,
+            timezone.make_aware(datetime.combine(local.date(), time.min)),
+        ),
+    ]
+
+
+def trend_shard():
+    """
+    Returns:
+        int: The shard of the trend rows this worker process adds its runs to
+    """
+    return os.getpid() % max(settings.RUN_TREND_SHARDS, 1)
+
+
+def _add_to_trend(model, scope, scope_id, period_start, shard, result_status, duration):
+    trends = model.objects.filter(
+        scope=scope, scope_id=scope_id, period_start=period_start, shard=shard
+    )
+    increments = {"runs": F("runs") + 1}
+    counter = RESULT_COUNTERS.get(result_status)
+    if counter is not None:
+        increments[counter] = F(counter) + 1
+
+    locked = False
+    while True:
+        current = (
+            (trends.select_for_update() if locked else trends)
+            .values(
+                "pk", "timed_runs", "duration_min", "duration_max", "duration_sketch"
+            )
+            .first()
+        )
+        if current is None:
+            trend = model(
+                scope=scope, scope_id=scope_id, period_start=period_start, shard=shard
+            )
+            trend.record(result_status, duration)
+            try:
+                with transaction.atomic():
+                    trend.save(force_insert=True)
+                return
+            except IntegrityError:
+                # Created by another thread of this worker meanwhile
+                continue
+
+        if duration is None:
+            model.objects.filter(pk=current["pk"]).update(**increments)
+            return
+
+        # The sketch is rewritten whole, so only if no other duration was
+        # added since it was read
+        sketch = DurationSketch.from_dict(current["duration_sketch"])
+        sketch.add(duration)
+        updated = model.objects.filter(
+            pk=current["pk"], timed_runs=current["timed_runs"]
+        ).update(
+            **increments,
+            timed_runs=F("timed_runs") + 1,
+            duration_sum=F("duration_sum") + duration,
+            duration_min=min(
+                d for d in (current["duration_min"], duration) if d is not None
+            ),
+            duration_max=max(
+                d for d in (current["duration_max"], duration) if d is not None
+            ),
+            duration_sketch=sketch.to_dict(),
+        )
+        if updated:
+            return
+        # Raced with another thread, whose transaction may hide its update
+        # from a plain read, so the row is locked from now on
+        locked = True
+
+
+def record_finished_run(
+    project_id, suite_id, protocol_id, started_at, result_status, duration=None
+):
+    """
+    Count a finished run in the trends of its project, suite and protocol.
+
+    The run is added to the shard of this worker, with increments rather
+    than row locks, so that workers finishing runs of the same project at
+    once do not wait on each other.
+
+    Args:
+        project_id: The ID of the run's project
+        suite_id: The ID of the run's suite
+        protocol_id: The ID of the run's protocol
+        started_at: When the run started, selects the periods
+        result_status: The result of the run
+        duration: The duration of the run in seconds, if known
+    """
+    scopes = (
+        ("project", project_id),
+        ("suite", suite_id),
+        ("protocol", protocol_id),
+    )
+    shard = trend_shard()
+    # Always updated in the same order, so that concurrent runs cannot deadlock
+    with transaction.atomic():
+        for model, period_start in trend_periods(started_at):
+            for scope, scope_id in scopes:
+                _add_to_trend(
+                    model,
+                    scope,
+                    scope_id,
+                    period_start,
+                    shard,
+                    result_status,
+                    duration,
+                )
+
+
+def rebuild_run_trends(since=None):
+    """
+    Recompute the trends from the finished runs, such as to fill them in for
+    the runs that finished before they were recorded.
+
+    The runs are read in the order they started and the trends are written
+    day by day, so only the trends of one day are held in memory.
+
+    Args:
+        since: Optional date, only the periods from then on are rebuilt
+
+    Returns:
+        int: Number of runs counted
+    """
+    runs = ProtocolRun.objects.filter(status__in=FINISHED_STATUSES).order_by(
+        "started_at"
+    )
+    if since is not None:
+        since = timezone.make_aware(datetime.combine(since, time.min))
+        runs = runs.filter(started_at__gte=since)
+
+    rows = runs.values_list(
+        "protocol__suite__project_id",
+        "protocol__suite_id",
+        "protocol_id",
+        "started_at",
+        "result_status",
+        "duration_seconds",
+    )
+    counted = 0
+    with transaction.atomic():
+        for model in GRANULARITIES.values():
+            stale = model.objects.all()
+            if since is not None:
+                stale = stale.filter(period_start__gte=since)
+            stale.delete()
+
+        # Days are contiguous in the order the runs started
+        days = groupby(
+            rows.iterator(chunk_size=2000),
+            key=lambda row: timezone.localtime(row[3]).date(),
+        )
+        for _, day_rows in days:
+            counted += _rebuild_day_trends(day_rows)
+
+    logger.info(f"Rebuilt the run trends of {counted} runs")
+    return counted
+
+
+def _rebuild_day_trends(rows):
+    # Trend and sketch of each period, the sketches are serialized once at the end
+    trends = {}
+    counted = 0
+    for (
+        project_id,
+        suite_id,
+        protocol_id,
+        started_at,
+        result_status,
+        duration,
+    ) in rows:
+        for model, period_start in trend_periods(started_at):
+            for scope, scope_id in (
+                ("project", project_id),
+                ("suite", suite_id),
+                ("protocol", protocol_id),
+            ):
+                key = (model, scope, scope_id, period_start)
+                if key not in trends:
+                    trends[key] = (
+                        model(
+                            scope=scope, scope_id=scope_id, period_start=period_start
+                        ),
+                        DurationSketch(),
+                    )
+                trend, sketch = trends[key]
+                trend.record(result_status, duration, sketch=sketch)
+        counted += 1
+
+    for trend, sketch in trends.values():
+        trend.duration_sketch = sketch.to_dict()
+    for model in GRANULARITIES.values():
+        model.objects.bulk_create(
+            [trend for key, (trend, _) in trends.items() if key[0] is model],
+            batch_size=1000,
+        )
+    return counted
+
+
+def get_run_trend(scope, scope_id, granularity="day", since=None, until=None):
+    """
+    Pass rate and durations of the runs of a project, suite or protocol,
+    period by period.
+
+    Args:
+        scope: "project", "suite" or "protocol"
+        scope_id: The ID of the project, suite or protocol
+        granularity: "day" or "hour"
+        since: Optional datetime, first period included
+        until: Optional datetime, periods starting from then on are excluded
+
+    Returns:
+        dict: JSON serializable points of each period with runs, and the
+        summary of the whole range
+
+    Raises:
+        ValueError: If the scope or granularity is not supported
+    """
+    model = GRANULARITIES.get(granularity)
+    if model is None:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+    if scope not in dict(model.SCOPE_CHOICES):
+        raise ValueError(f"Unsupported scope: {scope}")
+
+    trends = model.objects.filter(scope=scope, scope_id=scope_id)
+    if since is not None:
+        trends = trends.filter(period_start__gte=since)
+    if until is not None:
+        trends = trends.filter(period_start__lt=until)
+
+    points = []
+    total = model(scope=scope, scope_id=scope_id)
+    total_sketch = DurationSketch()
+    # Only the fields shown, as named tuples, to keep 12 months of days cheap
+    rows = trends.order_by("period_start", "shard").values_list(
+        "period_start",
+        "runs",
+        "passed",
+        "failed",
+        "errors",
+        "timed_runs",
+        "duration_sum",
+        "duration_min",
+        "duration_max",
+        "duration_sketch",
+        named=True,
+    )
+    # The shards of a period are added up into a single point
+    for period_start, shards in groupby(rows, key=lambda row: row.period_start):
+        period = model(scope=scope, scope_id=scope_id, period_start=period_start)
+        sketch = DurationSketch()
+        for shard in shards:
+            _add_trend(period, shard)
+            sketch.merge(DurationSketch.from_dict(shard.duration_sketch))
+        points.append(_trend_point(period, sketch))
+
+        _add_trend(total, period)
+        total_sketch.merge(sketch)
+
+    return {
+        "scope": scope,
+        "scope_id": str(scope_id),
+        "granularity": granularity,
+        "points": points,
+        "summary": _trend_point(total, total_sketch),
+    }
+
+
+def _add_trend(total, trend):
+    """Add the counts and durations of a trend to another one"""
+    for field in ("runs", "passed", "failed", "errors", "timed_runs"):
+        setattr(total, field, getattr(total, field) + getattr(trend, field))
+    total.duration_sum += trend.duration_sum
+    if trend.duration_min is not None and (
+        total.duration_min is None or trend.duration_min < total.duration_min
+    ):
+        total.duration_min = trend.duration_min
+    if trend.duration_max is not None and (
+        total.duration_max is None or trend.duration_max > total.duration_max
+    ):
+        total.duration_max = trend.duration_max
+
+
+def _trend_point(trend, sketch):
+    point = {
+        "period_start": (
+            trend.period_start.isoformat() if trend.period_start else None
+        ),
+        "runs": trend.runs,
+        "passed": trend.passed,
+        "failed": trend.failed,
+        "errors": trend.errors,
+        "pass_rate": trend.passed / trend.runs if trend.runs else None,
+        "duration_avg": (
+            trend.duration_sum / trend.timed_runs if trend.timed_runs else None
+        ),
+        "duration_min": trend.duration_min,
+        "duration_max": trend.duration_max,
+    }
+    for name, q in TREND_QUANTILES.items():
+        point[f"duration_{name}"] = sketch.quantile(q)
+    return point
@@ -12,6 +12,19 @@ urlpatterns = [
         "<uuid:pk>/edit/", views.TestSuiteUpdateView.as_view(), name="testsuite_update"
     ),
     path("<uuid:pk>/run/", views.RunTestSuiteView.as_view(), name="testsuite_run"),
+    path("<uuid:pk>/plan/", views.TestSuitePlanView.as_view(), name="testsuite_plan"),
+    path("queues/", views.QueueStatusView.as_view(), name="queue_status"),
+    path("runs/trends/", views.RunTrendView.as_view(), name="run_trends"),
+    path(
+        "runs/launch/",
+        views.ProtocolRunLaunchView.as_view(),
+        name="protocol_run_launch",
+    ),
+    path(
+        "circuits/",
+        views.CircuitBreakerStateView.as_view(),
+        name="circuit_breaker_state",
+    ),
     # TestProtocol URLs
     path("protocols/", views.TestProtocolListView.as_view(), name="protocol_list"),
     path(
@@ -63,6 +76,9 @@ urlpatterns = [
     path(
         "runs/<uuid:pk>/edit/", views.ProtocolRunUpdateView.as_view(), name="run_update"
     ),
+    path(
+        "runs/<uuid:pk>/trace/", views.ProtocolRunTraceView.as_view(), name="run_trace"
+    ),
     path(
         "protocols/<uuid:protocol_id>/runs/new/",
         views.ProtocolRunCreateView.as_view(),
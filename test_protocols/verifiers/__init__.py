@@ -1,6 +1,7 @@
 # test_protocols/verifiers/__init__.py
 from .factory import VerificationFactory
 from .base import BaseVerifier
+from .plan import VerificationPlan
 
 # Export classes for easier imports
-__all__ = ["VerificationFactory", "BaseVerifier"]
+__all__ = ["VerificationFactory", "BaseVerifier", "VerificationPlan"]
@@ -3,7 +3,14 @@ from .base import BaseVerifier
 
 
 class ApiStatusCodeVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is an integer or can be converted to one
             try:
@@ -42,7 +49,9 @@ class ApiStatusCodeVerifier(BaseVerifier):
 
                 # Use comparison operator if provided, otherwise check for equality
                 if comparison_method:
-                    operator = self.get_comparison_operator(comparison_method)
+                    operator = operator or self.get_comparison_operator(
+                        comparison_method
+                    )
                     if not operator:
                         return self.format_result(
                             success=False,
@@ -83,7 +92,14 @@ class ApiStatusCodeVerifier(BaseVerifier):
 
 
 class ApiResponseTimeVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is a number or can be converted to one
             try:
@@ -116,7 +132,7 @@ class ApiResponseTimeVerifier(BaseVerifier):
 
             # Use comparison operator if provided, otherwise check if response_time <= expected_time
             if comparison_method:
-                operator = self.get_comparison_operator(comparison_method)
+                operator = operator or self.get_comparison_operator(comparison_method)
                 if not operator:
                     return self.format_result(
                         success=False,
@@ -157,7 +173,14 @@ class ApiResponseTimeVerifier(BaseVerifier):
 
 
 class ApiHeadersVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is a dict or can be accessed as one
             headers = None
@@ -234,7 +257,14 @@ class ApiHeadersVerifier(BaseVerifier):
 
 
 class ApiContentTypeVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Extract content type from actual_value
             content_type = None
@@ -1,10 +1,98 @@
 # test_protocols/verifiers/base.py
+import re
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, verifiers fall back to pure Python
+    np = None
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern):
+    """Compile a regex pattern, reusing the compiled object for repeated patterns"""
+    return re.compile(pattern)
+
+
+def _regex_match(value, pattern):
+    """Helper for regex matching"""
+    try:
+        return bool(compile_pattern(pattern).match(value))
+    except Exception as e:
+        return False
+
+
+def is_row_stream(value):
+    """Whether a value is a streamed query result that yields its rows in batches"""
+    return hasattr(value, "iter_batches")
+
+
+def is_columnar(value):
+    """Whether a value is a columnar query result holding one array per column"""
+    return hasattr(value, "column_names")
+
+
+def select_column(value, config=None):
+    """
+    Pick the column of a columnar result that a value check applies to.
+
+    The column is named by config["column"]; results with a single column
+    don't need it. Returns None when no column can be picked.
+    """
+    name = config.get("column") if isinstance(config, dict) else None
+    if name is None and len(value.column_names) == 1:
+        name = value.column_names[0]
+    if name is None or name not in value.column_names:
+        return None
+    return value.column(name)
+
+
+def as_vector(column):
+    """Return a column as a numeric NumPy array for vectorized checks, or None"""
+    if np is not None and isinstance(column, np.ndarray) and column.dtype.kind in "iuf":
+        return column
+    return None
+
+
+def column_to_list(column):
+    """Convert a column to a list of plain Python values"""
+    return column.tolist() if hasattr(column, "tolist") else list(column)
+
+
+# Map of comparison operators to functions
+COMPARISON_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+    "contains": lambda a, b: b in a,
+    "not_contains": lambda a, b: b not in a,
+    "starts_with": lambda a, b: (
+        a.startswith(b) if hasattr(a, "startswith") else False
+    ),
+    "ends_with": lambda a, b: (a.endswith(b) if hasattr(a, "endswith") else False),
+    "matches": _regex_match,
+    "in": lambda a, b: a in b,
+    "not_in": lambda a, b: a not in b,
+}
 
 
 class BaseVerifier:
     """Base class for all verification methods"""
 
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    # Comparison method applied when a verification sets none
+    default_comparison = None
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         """
         Verify the actual value against expected value.
 
@@ -13,6 +101,9 @@ class BaseVerifier:
             expected_value: The expected value to verify against
             comparison_method: The comparison method to use (if applicable)
             config: Additional configuration parameters
+            operator: The comparison operator bound when the verification was
+                compiled (see bind_comparison_operator), looked up from the
+                comparison method when None
 
         Returns:
             dict: Verification result containing success flag, message, etc.
@@ -24,42 +115,40 @@ class BaseVerifier:
         if not comparison_method:
             return None
 
-        # Map of comparison operators to functions
-        operators = {
-            "eq": lambda a, b: a == b,
-            "neq": lambda a, b: a != b,
-            "gt": lambda a, b: a > b,
-            "gte": lambda a, b: a >= b,
-            "lt": lambda a, b: a < b,
-            "lte": lambda a, b: a <= b,
-            "contains": lambda a, b: b in a,
-            "not_contains": lambda a, b: b not in a,
-            "starts_with": lambda a, b: (
-                a.startswith(b) if hasattr(a, "startswith") else False
-            ),
-            "ends_with": lambda a, b: (
-                a.endswith(b) if hasattr(a, "endswith") else False
-            ),
-            "matches": self._regex_match,
-            "in": lambda a, b: a in b,
-            "not_in": lambda a, b: a not in b,
-        }
+        return COMPARISON_OPERATORS.get(comparison_method)
 
-        return operators.get(comparison_method)
+    def bind_comparison_operator(self, comparison_method):
+        """
+        Resolve the comparison operator of a verification once, when it is
+        compiled, so that verify does not look it up for every result.
+
+        Returns:
+            callable: The operator, None without a comparison or if it is unknown
+        """
+        return self.get_comparison_operator(
+            comparison_method or self.default_comparison
+        )
+
+    def prepare_expected_value(self, expected_value, config=None):
+        """
+        Parse the expected value once, before it is verified many times.
+
+        Subclasses can override this to convert or validate the expected value
+        up front. The returned value is passed to verify as expected_value.
+        """
+        return expected_value
 
     def _regex_match(self, value, pattern):
         """Helper for regex matching"""
-        import re
-
-        try:
-            return bool(re.match(pattern, value))
-        except Exception as e:
-            return False
+        return _regex_match(value, pattern)
 
     def format_result(
         self, success, message, actual_value, expected_value, method, **kwargs
     ):
         """Format the verification result"""
+        # Streams and columnar results are summarized, their rows are never stored
+        if is_row_stream(actual_value) or is_columnar(actual_value):
+            actual_value = actual_value.describe()
         result = {
             "success": success,
             "message": message,
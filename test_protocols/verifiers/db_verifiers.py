@@ -1,13 +1,23 @@
 # test_protocols/verifiers/db_verifiers.py
-from .base import BaseVerifier
+from .base import BaseVerifier, is_columnar, is_row_stream, np
 
 
 class DbRowCountVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value can be interpreted as a row count
             try:
-                if isinstance(actual_value, list):
+                if is_row_stream(actual_value):
+                    # Counted batch by batch, without loading the rows
+                    row_count = actual_value.count()
+                elif isinstance(actual_value, list):
                     row_count = len(actual_value)
                 elif hasattr(actual_value, "__len__"):
                     row_count = len(actual_value)
@@ -53,7 +63,9 @@ class DbRowCountVerifier(BaseVerifier):
 
                 # Use comparison operator if provided, otherwise check for equality
                 if comparison_method:
-                    operator = self.get_comparison_operator(comparison_method)
+                    operator = operator or self.get_comparison_operator(
+                        comparison_method
+                    )
                     if not operator:
                         return self.format_result(
                             success=False,
@@ -94,7 +106,14 @@ class DbRowCountVerifier(BaseVerifier):
 
 
 class DbColumnExistsVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Expected value is the column name or list of column names to check
             if isinstance(expected_value, str):
@@ -167,7 +186,33 @@ class DbColumnExistsVerifier(BaseVerifier):
 
 
 class DbQueryResultVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def _columnar_contains_row(self, query_result, expected_row):
+        """Whether a columnar result has a row with the expected column values"""
+        if not isinstance(expected_row, dict) or any(
+            key not in query_result.column_names for key in expected_row
+        ):
+            return False
+
+        columns = [query_result.column(key) for key in expected_row]
+        if np is not None and all(isinstance(c, np.ndarray) for c in columns):
+            # Vectorized: combine one equality mask per expected column
+            mask = np.ones(len(query_result), dtype=bool)
+            for column, value in zip(columns, expected_row.values()):
+                mask &= np.asarray(column == value, dtype=bool)
+            return bool(mask.any())
+
+        return any(
+            all(row[k] == v for k, v in expected_row.items()) for row in query_result
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Actual value is the query result
             # Expected value can be a dict with criteria for checking results
@@ -208,7 +253,13 @@ class DbQueryResultVerifier(BaseVerifier):
                     )
 
                 expected_result = expected_value["value"]
-                success = query_result == expected_result
+                if is_columnar(query_result):
+                    success = query_result.to_rows() == expected_result
+                elif is_row_stream(query_result):
+                    # An exact match needs every row
+                    success = list(query_result) == expected_result
+                else:
+                    success = query_result == expected_result
 
                 if success:
                     message = "Query result exactly matches expected value"
@@ -229,7 +280,15 @@ class DbQueryResultVerifier(BaseVerifier):
                 expected_row = expected_value["row"]
 
                 # Check if any row matches the expected row
-                if isinstance(query_result, list) and all(
+                if is_columnar(query_result):
+                    success = self._columnar_contains_row(query_result, expected_row)
+                elif is_row_stream(query_result):
+                    # Stops reading as soon as a matching row is found
+                    success = any(
+                        all(k in row and row[k] == v for k, v in expected_row.items())
+                        for row in query_result
+                    )
+                elif isinstance(query_result, list) and all(
                     isinstance(row, dict) for row in query_result
                 ):
                     # If query_result is a list of dicts
@@ -255,7 +314,10 @@ class DbQueryResultVerifier(BaseVerifier):
 
             elif verification_type == "no_rows":
                 # Check if the query returned no rows
-                if isinstance(query_result, list):
+                if is_row_stream(query_result):
+                    # Only the first batch is fetched
+                    success = next(iter(query_result), None) is None
+                elif isinstance(query_result, list):
                     success = len(query_result) == 0
                 else:
                     success = not query_result
@@ -303,7 +365,14 @@ class DbQueryResultVerifier(BaseVerifier):
 
 
 class DbExecutionTimeVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value can be interpreted as a execution time (in seconds)
             try:
@@ -331,7 +400,7 @@ class DbExecutionTimeVerifier(BaseVerifier):
 
             # Use comparison operator if provided, otherwise check if execution_time <= max_time
             if comparison_method:
-                operator = self.get_comparison_operator(comparison_method)
+                operator = operator or self.get_comparison_operator(comparison_method)
                 if not operator:
                     return self.format_result(
                         success=False,
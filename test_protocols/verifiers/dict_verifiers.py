@@ -4,7 +4,14 @@ from .base import BaseVerifier
 
 
 class DictHasKeysVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is a dictionary
             if not isinstance(actual_value, dict):
@@ -51,7 +58,14 @@ class DictHasKeysVerifier(BaseVerifier):
 
 
 class DictSchemaVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is a dictionary
             if not isinstance(actual_value, dict):
@@ -117,7 +131,14 @@ class DictSchemaVerifier(BaseVerifier):
 
 
 class DictSubsetVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is a dictionary
             if not isinstance(actual_value, dict):
@@ -1,9 +1,38 @@
 # test_protocols/verifiers/list_verifiers.py
-from .base import BaseVerifier
+import hashlib
+
+from .base import (
+    BaseVerifier,
+    as_vector,
+    column_to_list,
+    is_columnar,
+    is_row_stream,
+    np,
+    select_column,
+)
+
+# Failing elements kept in a result as examples, the rest are only counted
+SAMPLE_SIZE = 100
+
+
+def row_digest(row):
+    """Digest identifying a streamed row by its column values"""
+    return hashlib.blake2b(
+        repr(sorted(row.items())).encode("utf-8"), digest_size=16
+    ).digest()
 
 
 class ListLengthVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    default_comparison = "eq"
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is iterable
             try:
@@ -21,8 +50,8 @@ class ListLengthVerifier(BaseVerifier):
             if isinstance(expected_value, (int, float)):
                 # Single value - exact length check
                 expected_length = int(expected_value)
-                comparison = comparison_method if comparison_method else "eq"
-                operator = self.get_comparison_operator(comparison)
+                comparison = comparison_method or self.default_comparison
+                operator = operator or self.get_comparison_operator(comparison)
 
                 if not operator:
                     return self.format_result(
@@ -84,7 +113,14 @@ class ListLengthVerifier(BaseVerifier):
 
 
 class ListContainsVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Check if actual_value is iterable
             try:
@@ -147,12 +183,56 @@ class ListContainsVerifier(BaseVerifier):
 
 
 class ListUniqueVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def _verify_vector(self, actual_value, vector, expected_value):
+        """Uniqueness check over a numeric column"""
+        values, counts = np.unique(vector, return_counts=True)
+        repeated = counts > 1
+        extra = counts[repeated] - 1
+        duplicate_count = int(extra.sum())
+        duplicates = np.repeat(values[repeated][:SAMPLE_SIZE], extra[:SAMPLE_SIZE])
+        duplicates = duplicates[:SAMPLE_SIZE].tolist()
+        success = duplicate_count == 0
+
+        if success:
+            message = "List contains only unique elements"
+        else:
+            message = f"List contains duplicate elements"
+
+        return self.format_result(
+            success=success,
+            message=message,
+            actual_value=actual_value,
+            expected_value=expected_value,  # Not used for this verifier
+            method="list_unique",
+            duplicate_elements=duplicates,
+            duplicate_count=duplicate_count,
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
+            if is_columnar(actual_value):
+                column = select_column(actual_value, config)
+                vector = as_vector(column)
+                if vector is not None:
+                    return self._verify_vector(actual_value, vector, expected_value)
+                if column is not None:
+                    actual_value = column_to_list(column)
+
             # Check if actual_value is iterable
             try:
-                # Convert to list to ensure we can iterate multiple times
-                actual_list = list(actual_value)
+                if is_row_stream(actual_value):
+                    # Consumed batch by batch, only the seen rows are kept
+                    actual_list = actual_value
+                else:
+                    # Convert to list to ensure we can iterate multiple times
+                    actual_list = list(actual_value)
             except (TypeError, AttributeError):
                 return self.format_result(
                     success=False,
@@ -165,6 +245,8 @@ class ListUniqueVerifier(BaseVerifier):
             # Find duplicate elements
             seen = set()
             duplicates = []
+            duplicate_count = 0
+            streamed = is_row_stream(actual_list)
 
             for item in actual_list:
                 # Try to make the item hashable if it's not already
@@ -174,16 +256,21 @@ class ListUniqueVerifier(BaseVerifier):
                         hashable_item = tuple(item)
                     elif isinstance(item, dict):
                         hashable_item = frozenset(item.items())
+                    if streamed:
+                        # Keep a compact digest of each row instead of the row
+                        hashable_item = row_digest(item)
 
-                    if hashable_item in seen:
-                        duplicates.append(item)
-                    else:
+                    if hashable_item not in seen:
                         seen.add(hashable_item)
+                        continue
                 except TypeError:
                     # If item cannot be made hashable
+                    pass
+                duplicate_count += 1
+                if len(duplicates) < SAMPLE_SIZE:
                     duplicates.append(item)
 
-            success = len(duplicates) == 0
+            success = duplicate_count == 0
 
             if success:
                 message = "List contains only unique elements"
@@ -197,6 +284,7 @@ class ListUniqueVerifier(BaseVerifier):
                 expected_value=expected_value,  # Not used for this verifier
                 method="list_unique",
                 duplicate_elements=duplicates,
+                duplicate_count=duplicate_count,
             )
         except Exception as e:
             return self.format_result(
@@ -210,8 +298,50 @@ class ListUniqueVerifier(BaseVerifier):
 
 
 class ListSortedVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def _verify_vector(self, actual_value, vector, expected_value):
+        """Sortedness check over a numeric column"""
+        sort_order = expected_value if isinstance(expected_value, str) else "ascending"
+        steps = np.diff(vector)
+        if sort_order.lower() in ("desc", "descending", "reverse"):
+            unsorted = np.flatnonzero(steps > 0)
+            order_text = "descending"
+        else:
+            unsorted = np.flatnonzero(steps < 0)
+            order_text = "ascending"
+        is_sorted = unsorted.size == 0
+
+        if is_sorted:
+            message = f"List is sorted in {order_text} order"
+        else:
+            i = int(unsorted[0])
+            message = f"List is not sorted in {order_text} order (first unsorted elements at indices {i} and {i + 1})"
+
+        return self.format_result(
+            success=is_sorted,
+            message=message,
+            actual_value=actual_value,
+            expected_value=sort_order,
+            method="list_sorted",
+            sort_order=order_text,
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
+            if is_columnar(actual_value):
+                column = select_column(actual_value, config)
+                vector = as_vector(column)
+                if vector is not None:
+                    return self._verify_vector(actual_value, vector, expected_value)
+                if column is not None:
+                    actual_value = column_to_list(column)
+
             # Check if actual_value is iterable
             try:
                 # Convert to list to ensure we can iterate multiple times
@@ -293,8 +423,49 @@ class ListSortedVerifier(BaseVerifier):
 
 
 class ListAllMatchVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def _verify_vector(self, actual_value, vector, expected_value):
+        """Equality check of every value of a numeric column"""
+        if isinstance(expected_value, dict):
+            # Predicates are handled (and rejected) by the generic path
+            return self.verify(column_to_list(vector), expected_value)
+
+        mismatches = vector != expected_value
+        non_matching_count = int(np.count_nonzero(mismatches))
+        non_matching = vector[mismatches][:SAMPLE_SIZE].tolist()
+        all_match = non_matching_count == 0
+
+        if all_match:
+            message = f"All list elements match the expected value"
+        else:
+            message = f"Not all list elements match the expected value ({non_matching_count} non-matching elements)"
+
+        return self.format_result(
+            success=all_match,
+            message=message,
+            actual_value=actual_value,
+            expected_value=expected_value,
+            method="list_all_match",
+            non_matching_elements=non_matching,
+            non_matching_count=non_matching_count,
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
+            if is_columnar(actual_value):
+                column = select_column(actual_value, config)
+                vector = as_vector(column)
+                if vector is not None:
+                    return self._verify_vector(actual_value, vector, expected_value)
+                if column is not None:
+                    actual_value = column_to_list(column)
+
             # Check if actual_value is iterable
             try:
                 # Convert to list to ensure we can iterate multiple times
@@ -332,15 +503,19 @@ class ListAllMatchVerifier(BaseVerifier):
             else:
                 # Simple equality-based matching
                 # Check if all elements match the expected value
-                all_match = all(item == expected_value for item in actual_list)
+                non_matching = []
+                non_matching_count = 0
+                for item in actual_list:
+                    if item != expected_value:
+                        non_matching_count += 1
+                        if len(non_matching) < SAMPLE_SIZE:
+                            non_matching.append(item)
+                all_match = non_matching_count == 0
 
                 if all_match:
                     message = f"All list elements match the expected value"
                 else:
-                    non_matching = [
-                        item for item in actual_list if item != expected_value
-                    ]
-                    message = f"Not all list elements match the expected value ({len(non_matching)} non-matching elements)"
+                    message = f"Not all list elements match the expected value ({non_matching_count} non-matching elements)"
 
                 return self.format_result(
                     success=all_match,
@@ -348,7 +523,8 @@ class ListAllMatchVerifier(BaseVerifier):
                     actual_value=actual_list,
                     expected_value=expected_value,
                     method="list_all_match",
-                    non_matching_elements=[] if all_match else non_matching,
+                    non_matching_elements=non_matching,
+                    non_matching_count=non_matching_count,
                 )
         except Exception as e:
             return self.format_result(
@@ -1,9 +1,34 @@
 # test_protocols/verifiers/numeric_verifiers.py
-from .base import BaseVerifier
+from .base import BaseVerifier, as_vector, is_columnar, np, select_column
+
+
+def parse_number(value):
+    """Parse numeric strings into int or float, leaving other values untouched"""
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            try:
+                return float(value)
+            except ValueError:
+                return value
+    return value
 
 
 class NumericEqualVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    default_comparison = "eq"
+
+    def prepare_expected_value(self, expected_value, config=None):
+        return parse_number(expected_value)
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Convert values to numeric if they're not already
             try:
@@ -23,9 +48,8 @@ class NumericEqualVerifier(BaseVerifier):
                 actual_num = int(actual_num)
                 expected_num = int(expected_num)
 
-            # Use comparison method if provided, otherwise default to equality
-            comparison = comparison_method if comparison_method else "eq"
-            operator = self.get_comparison_operator(comparison)
+            comparison = comparison_method or self.default_comparison
+            operator = operator or self.get_comparison_operator(comparison)
 
             if not operator:
                 return self.format_result(
@@ -63,8 +87,65 @@ class NumericEqualVerifier(BaseVerifier):
 
 
 class NumericRangeVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def _verify_column(self, actual_value, expected_value, config):
+        """Range check of every value of a column of a columnar result"""
+        column = select_column(actual_value, config)
+        if column is None:
+            return self.format_result(
+                success=False,
+                message="Could not pick the column to check, set 'column' in the config",
+                actual_value=actual_value,
+                expected_value=expected_value,
+                method="numeric_range",
+            )
+        if (
+            not isinstance(expected_value, dict)
+            or "min" not in expected_value
+            or "max" not in expected_value
+        ):
+            return self.format_result(
+                success=False,
+                message="Expected value must be a dict with 'min' and 'max' keys",
+                actual_value=actual_value,
+                expected_value=expected_value,
+                method="numeric_range",
+            )
+
+        min_value = float(expected_value["min"])
+        max_value = float(expected_value["max"])
+        vector = as_vector(column)
+        if vector is not None:
+            outside = int(np.count_nonzero((vector < min_value) | (vector > max_value)))
+        else:
+            outside = sum(1 for value in column if not min_value <= value <= max_value)
+        success = outside == 0
+
+        if success:
+            message = f"All {len(actual_value)} values are in range [{min_value}, {max_value}]"
+        else:
+            message = f"{outside} of {len(actual_value)} values are outside range [{min_value}, {max_value}]"
+
+        return self.format_result(
+            success=success,
+            message=message,
+            actual_value=actual_value,
+            expected_value=expected_value,
+            method="numeric_range",
+            outside_count=outside,
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
+            if is_columnar(actual_value):
+                return self._verify_column(actual_value, expected_value, config)
+
             # Convert actual value to numeric
             try:
                 actual_num = float(actual_value)
@@ -132,8 +213,74 @@ class NumericRangeVerifier(BaseVerifier):
 
 
 class NumericThresholdVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    default_comparison = "lte"
+
+    def prepare_expected_value(self, expected_value, config=None):
+        return parse_number(expected_value)
+
+    def _verify_column(
+        self, actual_value, expected_value, comparison_method, config, operator
+    ):
+        """Threshold check of every value of a column of a columnar result"""
+        column = select_column(actual_value, config)
+        if column is None:
+            return self.format_result(
+                success=False,
+                message="Could not pick the column to check, set 'column' in the config",
+                actual_value=actual_value,
+                expected_value=expected_value,
+                method="numeric_threshold",
+            )
+
+        threshold = float(expected_value)
+        comparison = comparison_method or self.default_comparison
+        operator = operator or self.get_comparison_operator(comparison)
+        if not operator:
+            return self.format_result(
+                success=False,
+                message=f"Invalid comparison method: {comparison}",
+                actual_value=actual_value,
+                expected_value=threshold,
+                method="numeric_threshold",
+            )
+
+        vector = as_vector(column)
+        if vector is not None:
+            passing = np.asarray(operator(vector, threshold), dtype=bool)
+            failing = int(passing.size - np.count_nonzero(passing))
+        else:
+            failing = sum(1 for value in column if not operator(value, threshold))
+        success = failing == 0
+
+        if success:
+            message = f"All {len(actual_value)} values meet the threshold condition ({comparison} {threshold})"
+        else:
+            message = f"{failing} of {len(actual_value)} values do not meet the threshold condition ({comparison} {threshold})"
+
+        return self.format_result(
+            success=success,
+            message=message,
+            actual_value=actual_value,
+            expected_value=threshold,
+            method="numeric_threshold",
+            comparison=comparison,
+            failing_count=failing,
+        )
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
+            if is_columnar(actual_value):
+                return self._verify_column(
+                    actual_value, expected_value, comparison_method, config, operator
+                )
+
             # Convert actual value to numeric
             try:
                 actual_num = float(actual_value)
@@ -158,11 +305,10 @@ class NumericThresholdVerifier(BaseVerifier):
                     method="numeric_threshold",
                 )
 
-            # Use comparison method to determine which threshold check to apply
-            comparison = (
-                comparison_method if comparison_method else "lte"
-            )  # Default to less than or equal
-            operator = self.get_comparison_operator(comparison)
+            # Use comparison method to determine which threshold check to apply,
+            # less than or equal by default
+            comparison = comparison_method or self.default_comparison
+            operator = operator or self.get_comparison_operator(comparison)
 
             if not operator:
                 return self.format_result(
@@ -0,0 +1,129 @@
+# test_protocols/verifiers/plan.py
+from .factory import VerificationFactory
+
+
+class CompiledVerification:
+    """A verification method resolved once, ready to be applied to step results"""
+
+    __slots__ = (
+        "method",
+        "verifier",
+        "expected_value",
+        "comparison_method",
+        "operator",
+        "config",
+    )
+
+    def __init__(self, method):
+        """
+        Args:
+            method: The VerificationSnapshot to compile
+        """
+        self.method = method
+        self.verifier = VerificationFactory.create_verifier(method.method_type)
+        self.config = method.config_schema
+        self.comparison_method = (
+            method.comparison_method if method.supports_comparison else None
+        )
+        self.operator = self.verifier.bind_comparison_operator(self.comparison_method)
+        expected_result = method.expected_result or {}
+        self.expected_value = self.verifier.prepare_expected_value(
+            expected_result.get("result"), self.config
+        )
+
+    def run(self, actual_value):
+        """
+        Verify a step result.
+
+        Returns:
+            dict: The verification result, see VerificationMethod.verify
+        """
+        try:
+            return self.verifier.verify(
+                actual_value=actual_value,
+                expected_value=self.expected_value,
+                comparison_method=self.comparison_method,
+                config=self.config,
+                operator=self.operator,
+            )
+        except Exception as e:
+            # Summarizes streamed and columnar results, like the verifiers do
+            return self.verifier.format_result(
+                success=False,
+                message=f"Verification error: {str(e)}",
+                actual_value=actual_value,
+                expected_value=self.expected_value,
+                method=self.method.method_type,
+                error=str(e),
+            )
+
+    def skip(self, reason):
+        """
+        Build the result of a verification whose step was not executed.
+
+        Returns:
+            dict: A failed verification result with the "skipped" status
+        """
+        return {
+            "success": False,
+            "status": "skipped",
+            "message": f"Step skipped: {reason}",
+            "actual_value": None,
+            "expected_value": self.expected_value,
+            "method": self.method.method_type,
+        }
+
+    def timeout(self):
+        """
+        Build the result of a verification whose step ran out of time.
+
+        Returns:
+            dict: A failed verification result with the "timeout" status
+        """
+        return {
+            "success": False,
+            "status": "timeout",
+            "message": "Step timed out",
+            "actual_value": None,
+            "expected_value": self.expected_value,
+            "method": self.method.method_type,
+        }
+
+
+class VerificationPlan:
+    """
+    The verifications of every execution step of a protocol, compiled once per run.
+
+    Iterating the plan yields (execution_step, verifications) pairs in step order.
+    """
+
+    def __init__(self, execution_steps):
+        """
+        Args:
+            execution_steps: StepSnapshots of the protocol
+
+        Raises:
+            ValueError: If a verification method type is not supported
+        """
+        self.steps = [
+            (
+                step,
+                [CompiledVerification(method) for method in step.verification_methods],
+            )
+            for step in execution_steps
+        ]
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    @property
+    def execution_steps(self):
+        return [step for step, _ in self.steps]
+
+    @property
+    def has_dependencies(self):
+        """Whether any step depends on another"""
+        return any(step.depends_on for step, _ in self.steps)
@@ -1,10 +1,17 @@
 # test_protocols/verifiers/string_verifiers.py
 import re
-from .base import BaseVerifier
+from .base import BaseVerifier, compile_pattern
 
 
 class StringExactMatchVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Convert values to strings if they're not already
             actual_str = str(actual_value) if actual_value is not None else ""
@@ -36,7 +43,14 @@ class StringExactMatchVerifier(BaseVerifier):
 
 
 class StringContainsVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Convert values to strings if they're not already
             actual_str = str(actual_value) if actual_value is not None else ""
@@ -68,7 +82,22 @@ class StringContainsVerifier(BaseVerifier):
 
 
 class StringRegexMatchVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    def prepare_expected_value(self, expected_value, config=None):
+        # Compile the pattern up front; invalid patterns are reported by verify
+        try:
+            compile_pattern(expected_value)
+        except (re.error, TypeError):
+            pass
+        return expected_value
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Convert actual value to string if it's not already
             actual_str = str(actual_value) if actual_value is not None else ""
@@ -77,7 +106,7 @@ class StringRegexMatchVerifier(BaseVerifier):
             pattern = expected_value
 
             try:
-                match = re.search(pattern, actual_str)
+                match = compile_pattern(pattern).search(actual_str)
                 success = bool(match)
             except re.error as regex_error:
                 return self.format_result(
@@ -114,7 +143,16 @@ class StringRegexMatchVerifier(BaseVerifier):
 
 
 class StringLengthVerifier(BaseVerifier):
-    def verify(self, actual_value, expected_value, comparison_method=None, config=None):
+    default_comparison = "eq"
+
+    def verify(
+        self,
+        actual_value,
+        expected_value,
+        comparison_method=None,
+        config=None,
+        operator=None,
+    ):
         try:
             # Convert actual value to string if it's not already
             actual_str = str(actual_value) if actual_value is not None else ""
@@ -124,8 +162,8 @@ class StringLengthVerifier(BaseVerifier):
             if isinstance(expected_value, (int, float)):
                 # Single value - exact length check
                 expected_length = int(expected_value)
-                comparison = comparison_method if comparison_method else "eq"
-                operator = self.get_comparison_operator(comparison)
+                comparison = comparison_method or self.default_comparison
+                operator = operator or self.get_comparison_operator(comparison)
 
                 if not operator:
                     return self.format_result(
@@ -1,5 +1,7 @@
 import json
 import yaml
+from datetime import timedelta
+from uuid import UUID
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import ListView, DetailView, CreateView, UpdateView
 from django.urls import reverse_lazy, reverse
@@ -10,6 +12,10 @@ from django.shortcuts import redirect, get_object_or_404
 from django.contrib import messages
 from django.urls import reverse
 from django.http import HttpResponseRedirect
+from django.utils import timezone
+from django.forms import modelform_factory
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.utils.safestring import mark_safe
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.generic import (
@@ -24,6 +30,7 @@ from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http import JsonResponse, HttpResponseRedirect, HttpResponseForbidden
 from django.contrib import messages
+from django.conf import settings
 from django.db import transaction
 from .models import (
     TestProtocol,
@@ -33,6 +40,7 @@ from .models import (
 )
 from environments.models import Environment
 from .models import ExecutionStep, TestProtocol, ProtocolRun
+from .forms import ExecutionStepForm, TestProtocolForm
 from .models import (
     TestSuite,
     TestProtocol,
@@ -41,7 +49,24 @@ from .models import (
     VerificationMethod,
     ExecutionStep,
 )
-from test_protocols.services import run_protocol, run_suite
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from test_protocols.serializers import ProtocolRunLaunchSerializer
+from test_protocols.services import launch_protocol_runs, run_protocol, run_suite
+from test_protocols.tracing import to_chrome_trace, to_otel_json
+from test_protocols.planning import SuitePlan
+from test_protocols.scheduling import queue_status
+from test_protocols.tasks import circuit_breaker
+from pangolin_sdk.connections.breaker import describe_circuit_key
+from test_protocols.run_pages import (
+    render_run_content,
+    run_content_context,
+    run_page_validators,
+)
+from test_protocols.trends import FINISHED_STATUSES, get_run_trend
+from utils.cache import cached, listing_namespace
 
 
 # TestSuite Views
@@ -63,6 +88,26 @@ class TestSuiteDetailView(DetailView):
         return context
 
 
+class TestSuitePlanView(DetailView):
+    """Dry run of a parallel suite run: how it is sharded and how long it should take"""
+
+    model = TestSuite
+    template_name = "test_protocols/testsuite_plan.html"
+    context_object_name = "testsuite"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            workers = int(self.request.GET.get("workers", 0))
+        except ValueError:
+            workers = 0
+        try:
+            context["plan"] = SuitePlan(self.object, workers=workers)
+        except ValueError as e:
+            messages.error(self.request, f"Failed to plan test suite: {str(e)}")
+        return context
+
+
 class TestSuiteCreateView(CreateView):
     model = TestSuite
     template_name = "test_protocols/testsuite_form.html"
@@ -96,7 +141,12 @@ class TestProtocolDetailView(DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["runs"] = self.object.runs.all().order_by("-started_at")[:5]
+        context["runs"] = cached(
+            "protocol_runs",
+            [self.object.pk],
+            [listing_namespace(ProtocolRun, protocol=self.object.pk)],
+            lambda: list(self.object.runs.all().order_by("-started_at")[:5]),
+        )
         try:
             context["connection_config"] = self.object.connection_config
         except ConnectionConfig.DoesNotExist:
@@ -104,10 +154,34 @@ class TestProtocolDetailView(DetailView):
         return context
 
 
-class TestProtocolCreateView(CreateView):
+class TestProtocolFormMixin:
+    """Builds the protocol forms on TestProtocolForm, limited to self.fields"""
+
+    def get_form_class(self):
+        return modelform_factory(
+            TestProtocol, form=TestProtocolForm, fields=self.fields
+        )
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        suite_id = self.kwargs.get("suite_id")
+        if suite_id:
+            kwargs["suite"] = get_object_or_404(TestSuite, pk=suite_id)
+        return kwargs
+
+
+class TestProtocolCreateView(TestProtocolFormMixin, CreateView):
     model = TestProtocol
     template_name = "test_protocols/protocol_form.html"
-    fields = ["suite", "name", "description", "status", "order_index"]
+    fields = [
+        "suite",
+        "name",
+        "description",
+        "status",
+        "order_index",
+        "is_gate",
+        "depends_on",
+    ]
 
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
@@ -137,7 +211,7 @@ class TestProtocolCreateView(CreateView):
 
 
 class TestProtocolCreateFromSuiteView(TestProtocolCreateView):
-    fields = ["name", "description", "status", "order_index"]
+    fields = ["name", "description", "status", "order_index", "is_gate", "depends_on"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -154,10 +228,18 @@ class TestProtocolCreateFromSuiteView(TestProtocolCreateView):
         return super().get_success_url()
 
 
-class TestProtocolUpdateView(UpdateView):
+class TestProtocolUpdateView(TestProtocolFormMixin, UpdateView):
     model = TestProtocol
     template_name = "test_protocols/protocol_form.html"
-    fields = ["name", "description", "status", "order_index", "suite"]
+    fields = [
+        "name",
+        "description",
+        "status",
+        "order_index",
+        "is_gate",
+        "depends_on",
+        "suite",
+    ]
 
     def get_success_url(self):
         return reverse("testsuite:protocol_detail", kwargs={"pk": self.object.pk})
@@ -359,46 +441,165 @@ class ProtocolRunDetailView(DetailView):
     template_name = "test_protocols/run_detail.html"
     context_object_name = "run"
 
+    def get(self, request, *args, **kwargs):
+        # Finished runs never change, browsers and nginx revalidate their pages
+        etag, last_modified = run_page_validators(request, kwargs["pk"])
+        if etag is None:
+            return super().get(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ) or super().get(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
     def get_queryset(self):
-        # Use prefetch_related and select_related to efficiently load all related data
-        queryset = ProtocolRun.objects.select_related(
+        return ProtocolRun.objects.select_related(
             "protocol",  # Load the protocol
             "protocol__suite",  # Load the suite
-        ).prefetch_related(
-            "protocol__steps",  # Load all execution steps
-            "protocol__steps__verification_methods",  # Load verification methods for each step
+            "protocol__connection_config",  # Load the connection shown
         )
-        return queryset
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        if self.object.status in FINISHED_STATUSES:
+            context["run_content"] = render_run_content(self.object)
+        else:
+            context.update(run_content_context(self.object))
+        return context
 
-        # Get all verification results related to this run's protocol's execution steps
-        from test_protocols.models import VerificationResult
 
-        # Get all execution steps for this protocol
-        execution_steps = self.object.protocol.steps.all()
+class ProtocolRunTraceView(View):
+    """
+    Export the phase timings of a run.
 
-        # Get all verification methods associated with these steps
-        verification_methods = []
-        for step in execution_steps:
-            verification_methods.extend(step.verification_methods.all())
+    ?format=chrome (default) returns Chrome trace events, loadable in
+    chrome://tracing or Perfetto; ?format=otel returns OTLP/JSON spans.
+    """
 
-        # Get verification results for these methods
-        verification_results = VerificationResult.objects.filter(
-            verification_step__in=verification_methods
-        ).select_related("verification_step")
+    exporters = {"chrome": to_chrome_trace, "otel": to_otel_json}
 
-        # Create a dict mapping verification_method_id to result for easy lookup in template
-        verification_results_dict = {
-            vr.verification_step_id: vr for vr in verification_results
-        }
-        context["verification_results_dict"] = verification_results_dict
+    def get(self, request, pk):
+        run = get_object_or_404(ProtocolRun.objects.only("id", "trace"), pk=pk)
+        trace_format = request.GET.get("format", "chrome")
+        exporter = self.exporters.get(trace_format)
+        if exporter is None:
+            return JsonResponse(
+                {"error": f"Unsupported trace format: {trace_format}"}, status=400
+            )
+        if not run.trace:
+            return JsonResponse({"error": "No trace recorded for this run"}, status=404)
 
-        # Add execution steps to context
-        context["execution_steps"] = execution_steps
+        response = JsonResponse(exporter(run.trace))
+        response["Content-Disposition"] = (
+            f'attachment; filename="run-{run.pk}-{trace_format}.json"'
+        )
+        return response
 
-        return context
+
+class QueueStatusView(LoginRequiredMixin, View):
+    """
+    Depth and wait times of the interactive and batch lanes, and how the batch
+    workers are shared between projects. ?window= sets the number of seconds
+    of admitted runs used for the wait times.
+    """
+
+    def get(self, request):
+        try:
+            window = int(request.GET.get("window") or 0) or None
+        except ValueError:
+            return JsonResponse(
+                {"error": "window must be a number of seconds"}, status=400
+            )
+        return JsonResponse(queue_status(window))
+
+
+class RunTrendView(LoginRequiredMixin, View):
+    """
+    Pass rate and durations over time of the runs of a project, suite or
+    protocol, read from the trend rollups (see test_protocols.trends).
+
+    ?scope= is project (default), suite or protocol and ?id= its ID.
+    ?granularity= is day (default) or hour, ?days= the number of days shown
+    up to now (default: 365 by day, 7 by hour).
+    """
+
+    default_days = {"day": 365, "hour": 7}
+
+    def get(self, request):
+        scope = request.GET.get("scope", "project")
+        granularity = request.GET.get("granularity", "day")
+        try:
+            scope_id = UUID(request.GET.get("id", ""))
+        except ValueError:
+            return JsonResponse({"error": "id must be a UUID"}, status=400)
+        try:
+            days = int(request.GET.get("days") or self.default_days.get(granularity, 0))
+        except ValueError:
+            return JsonResponse({"error": "days must be a number"}, status=400)
+
+        since = timezone.localtime() - timedelta(days=days)
+        if granularity == "day":
+            since = since.replace(hour=0, minute=0, second=0, microsecond=0)
+        try:
+            trend = get_run_trend(scope, scope_id, granularity, since=since)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse(trend)
+
+
+class CircuitBreakerStateView(LoginRequiredMixin, View):
+    """
+    State and counters of the circuit of each connection target.
+
+    Circuits live in the workers: without a shared store (see
+    CIRCUIT_BREAKER_REDIS_URL) this only shows the circuits of the web process.
+    Circuits are identified by connection type, target and an opaque ID, their
+    keys are derived from the connection configuration.
+    """
+
+    def get(self, request):
+        return JsonResponse(
+            {
+                "shared": bool(settings.CIRCUIT_BREAKER_REDIS_URL),
+                "failure_threshold": circuit_breaker.failure_threshold,
+                "reset_timeout": circuit_breaker.reset_timeout,
+                "circuits": [
+                    {**describe_circuit_key(key), **record}
+                    for key, record in sorted(circuit_breaker.get_info().items())
+                ],
+            }
+        )
+
+
+class ProtocolRunLaunchView(APIView):
+    """
+    Launch the runs of many protocols at once, given by ID (protocol_ids) or
+    as the active protocols of a suite (suite). Responds with the IDs of the
+    created runs, their tasks are sent once the runs are committed.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = ProtocolRunLaunchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            run_ids = launch_protocol_runs(
+                serializer.get_protocols(),
+                user=request.user,
+                executed_by=serializer.validated_data.get("executed_by"),
+                lane=serializer.validated_data["lane"],
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"run_ids": run_ids, "count": len(run_ids)},
+            status=status.HTTP_202_ACCEPTED,
+        )
 
 
 class ProtocolRunCreateView(CreateView):
@@ -558,7 +759,17 @@ class RunTestSuiteView(View):
             suite = TestSuite.objects.get(pk=pk)
             protocols = suite.get_ordered_protocols()
             if protocols:
-                run_suite(pk, request.user)
+                run_suite(
+                    pk,
+                    request.user,
+                    parallel=request.POST.get("parallel") == "on",
+                    fail_fast=request.POST.get("fail_fast") == "on",
+                    ordering=(
+                        "failures_first"
+                        if request.POST.get("failures_first") == "on"
+                        else None
+                    ),
+                )
                 messages.success(
                     request,
                     f"Successfully started {len(protocols)} protocols in the test suite.",
@@ -595,12 +806,28 @@ class ExecutionStepListView(ListView):
         return context
 
 
-class ExecutionStepCreateView(LoginRequiredMixin, CreateView):
+class ExecutionStepFormMixin:
+    """Builds the step forms on ExecutionStepForm, limited to self.fields"""
+
+    def get_form_class(self):
+        return modelform_factory(
+            ExecutionStep, form=ExecutionStepForm, fields=self.fields
+        )
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        protocol_id = self.kwargs.get("protocol_id")
+        if protocol_id:
+            kwargs["protocol"] = get_object_or_404(TestProtocol, pk=protocol_id)
+        return kwargs
+
+
+class ExecutionStepCreateView(LoginRequiredMixin, ExecutionStepFormMixin, CreateView):
     """View for creating a new execution step"""
 
     model = ExecutionStep
     template_name = "test_protocols/execution_step_form.html"
-    fields = ["name", "kwargs"]  # This looks correct
+    fields = ["name", "depends_on", "timeout_seconds", "kwargs"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -641,12 +868,12 @@ class ExecutionStepDetailView(DetailView):
         return context
 
 
-class ExecutionStepUpdateView(LoginRequiredMixin, UpdateView):
+class ExecutionStepUpdateView(LoginRequiredMixin, ExecutionStepFormMixin, UpdateView):
     """View for updating an execution step"""
 
     model = ExecutionStep
     template_name = "test_protocols/execution_step_form.html"
-    fields = ["name", "kwargs"]
+    fields = ["name", "depends_on", "timeout_seconds", "kwargs"]
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
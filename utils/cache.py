@@ -0,0 +1,160 @@
+# utils/cache.py
+"""
+Cache of the web tier, with versioned invalidation.
+
+Cached values depend on namespaces: one per object ("projects.project:<id>")
+and one per listing of a model, optionally under a parent
+("test_protocols.testsuite:list:project=<id>"). Each namespace has a version
+number stored in the cache, and the key of a value embeds the versions of the
+namespaces it depends on. Saving or deleting an object of a registered model
+bumps the versions of its namespaces, so the values built from it are never
+read again and expire on their own.
+"""
+
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+_MISSING = object()
+
+# Hits and misses of each cached value name, in this process
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def object_namespace(model, pk):
+    """Namespace of the values built from one object"""
+    return f"{_label(model)}:{pk}"
+
+
+def listing_namespace(model, **parent):
+    """
+    Namespace of the values built from a listing of a model, such as
+    listing_namespace(TestSuite, project=project_id) for the suites of a
+    project, or listing_namespace(Project) for all the projects.
+    """
+    namespace = f"{_label(model)}:list"
+    for field, value in sorted(parent.items()):
+        namespace += f":{field}={value}"
+    return namespace
+
+
+def _version_key(namespace):
+    return f"version:{namespace}"
+
+
+def get_versions(namespaces):
+    """
+    Returns:
+        list: The current version of each namespace
+    """
+    keys = [_version_key(namespace) for namespace in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock, so a version lost to eviction is never
+            # reused for different data
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(namespaces):
+    """
+    Make every value cached under these namespaces stale, once the current
+    transaction commits so that no reader caches the old data again.
+    """
+    namespaces = list(namespaces)
+
+    def bump():
+        for namespace in namespaces:
+            key = _version_key(namespace)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def cached(name, key_parts, namespaces, compute, timeout=DEFAULT_TIMEOUT):
+    """
+    Get a value from the cache, computing and storing it on a miss.
+
+    Args:
+        name: Name of the value, the hits and misses are counted under it
+        key_parts: What the value depends on besides the namespaces, such as
+            the ID of the object it is about
+        namespaces: The namespaces the value depends on
+        compute: Callable returning the value, which must be picklable
+        timeout: Seconds the value is kept (default: CACHE_TIMEOUT)
+
+    Returns:
+        The value
+    """
+    versions = get_versions(namespaces)
+    key = ":".join([name, *map(str, key_parts), *map(str, versions)])
+    value = cache.get(key, _MISSING)
+    hit = value is not _MISSING
+    with _stats_lock:
+        _stats[(name, hit)] += 1
+    if hit:
+        return value
+
+    value = compute()
+    cache.set(key, value, timeout)
+    return value
+
+
+def cache_stats():
+    """
+    Returns:
+        dict: Value name -> hits, misses and hit rate, in this process
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    names = sorted({name for name, _ in stats})
+    result = {}
+    for name in names:
+        hits = stats.get((name, True), 0)
+        misses = stats.get((name, False), 0)
+        result[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+        }
+    return result
+
+
+def register_cached_model(model, parents=()):
+    """
+    Invalidate the namespaces of the objects of a model when they are saved
+    or deleted: their object namespace, the listing of the model, and its
+    listings under each parent.
+
+    Args:
+        model: The model class
+        parents: Names of the foreign keys the model is listed under
+    """
+
+    def invalidate(sender, instance, **kwargs):
+        if kwargs.get("raw"):
+            return
+        namespaces = [object_namespace(model, instance.pk), listing_namespace(model)]
+        for field in parents:
+            parent_id = getattr(instance, f"{field}_id")
+            namespaces.append(listing_namespace(model, **{field: parent_id}))
+        bump_versions(namespaces)
+
+    uid = f"cache-invalidation:{_label(model)}"
+    post_save.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(invalidate, sender=model, weak=False, dispatch_uid=uid)
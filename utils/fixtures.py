@@ -0,0 +1,108 @@
+# utils/fixtures.py
+"""
+Fixtures shared by the tests of the apps: a project with a test suite, its
+protocols, and runs of those protocols against an in-memory FakeConnection
+(see pangolin_sdk.tests.helpers).
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from pangolin_compliance_suite.celery import app
+from pangolin_sdk.tests.helpers import FakeConnection, make_config
+from environments.models import Environment
+from projects.models import Project
+from test_protocols import tasks
+from test_protocols.models import (
+    ConnectionConfig,
+    ExecutionStep,
+    ProtocolRun,
+    TestProtocol,
+    TestSuite,
+    VerificationMethod,
+)
+
+
+class ProtocolFixtures:
+    """Creates a user, their project and a suite to add protocols to"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.user = User.objects.create_user(username="tester")
+        self.project = Project.objects.create(name="Project", owner=self.user)
+        self.suite = TestSuite.objects.create(name="Suite", project=self.project)
+
+    def create_protocol(self, name, passing=True, order_index=0, steps=1, **kwargs):
+        """
+        Create an active protocol with ``steps`` steps, whose verifications
+        pass unless ``passing`` is False
+        """
+        protocol = TestProtocol.objects.create(
+            suite=self.suite, name=name, order_index=order_index, **kwargs
+        )
+        ConnectionConfig.objects.create(
+            protocol=protocol, config_type="database", retry_attempts=0
+        )
+        for index in range(steps):
+            step = ExecutionStep.objects.create(
+                test_protocol=protocol, name=f"query {index}", kwargs={"key": index}
+            )
+            VerificationMethod.objects.create(
+                execution_step=step,
+                name="has key",
+                method_type="dict_has_keys",
+                expected_result={"result": ["key" if passing else "missing"]},
+            )
+        return protocol
+
+    def create_environment(self, key, value, variable_type="text", project=None):
+        """Create an environment variable of the project, encrypting its value"""
+        environment = Environment(
+            project=project or self.project, key=key, variable_type=variable_type
+        )
+        environment.set_value(value)
+        environment.save()
+        return environment
+
+
+class ProtocolTestCase(ProtocolFixtures, TransactionTestCase):
+    """
+    Base of the tests running protocols, which connect to an in-memory
+    FakeConnection and run their Celery tasks eagerly. Runs persist their
+    results from a thread of their own, so the tests cannot hold them in a
+    transaction
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.connections = []
+        # Attributes set on every FakeConnection created for the runs
+        self.connection_hooks = {}
+        patcher = mock.patch.object(tasks, "_new_connection", self._new_connection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(tasks.connection_pool.close_all)
+
+        celery_conf = {"task_always_eager": True, "task_eager_propagates": True}
+        self.addCleanup(app.conf.update, {key: app.conf[key] for key in celery_conf})
+        app.conf.update(celery_conf)
+
+    def _new_connection(self, connection_config, config_data):
+        connection = FakeConnection(
+            make_config(host=config_data.get("host", "service.local"))
+        )
+        for name, value in self.connection_hooks.items():
+            setattr(connection, name, value)
+        self.connections.append(connection)
+        return connection
+
+    def run_protocol(self, protocol, **kwargs):
+        """Run a protocol, returns the result of run_test_protocol and the run"""
+        protocol_run = ProtocolRun.objects.create(protocol=protocol, status="pending")
+        result = tasks.run_test_protocol(str(protocol_run.pk), **kwargs)
+        protocol_run.refresh_from_db()
+        return result, protocol_run
@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from projects.models import Project
+from test_protocols.models import TestSuite
+from utils.cache import (
+    bump_versions,
+    cache_stats,
+    cached,
+    get_versions,
+    listing_namespace,
+    object_namespace,
+)
+from utils.fixtures import ProtocolFixtures
+
+
+class CachedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Statistics are kept per process, each test counts under its own name
+        self.name = f"value-{uuid4()}"
+        self.computed = []
+
+    def get(self, namespaces, key_parts=()):
+        def compute():
+            self.computed.append(key_parts)
+            return len(self.computed)
+
+        return cached(self.name, key_parts, namespaces, compute)
+
+    def test_value_is_computed_once(self):
+        self.assertEqual(self.get(["a"]), 1)
+        self.assertEqual(self.get(["a"]), 1)
+        self.assertEqual(self.get(["a"], key_parts=[2]), 2)
+        self.assertEqual(self.get(["a"], key_parts=[2]), 2)
+        self.assertEqual(
+            cache_stats()[self.name], {"hits": 2, "misses": 2, "hit_rate": 0.5}
+        )
+
+    def test_bump_makes_the_values_stale_on_commit(self):
+        self.assertEqual(self.get(["a", "b"]), 1)
+        self.assertEqual(self.get(["b"]), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(["a"])
+            # Readers before the commit may still see the old data
+            self.assertEqual(self.get(["a", "b"]), 1)
+        self.assertEqual(self.get(["a", "b"]), 3)
+        self.assertEqual(self.get(["b"]), 2)
+
+    def test_lost_version_is_never_reused(self):
+        (before,) = get_versions(["a"])
+        self.assertEqual(self.get(["a"]), 1)
+        cache.delete("version:a")
+        (after,) = get_versions(["a"])
+        self.assertNotEqual(after, before)
+        self.assertEqual(self.get(["a"]), 2)
+
+
+class RegisteredModelTests(ProtocolFixtures, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_project = Project.objects.create(name="Other", owner=self.user)
+
+    def namespaces(self):
+        return [
+            object_namespace(TestSuite, self.suite.pk),
+            listing_namespace(TestSuite),
+            listing_namespace(TestSuite, project=self.project.pk),
+            listing_namespace(TestSuite, project=self.other_project.pk),
+            object_namespace(Project, self.project.pk),
+        ]
+
+    def assertBumped(self, before, expected):
+        after = get_versions(self.namespaces())
+        self.assertEqual([old != new for old, new in zip(before, after)], expected)
+
+    def test_save_bumps_the_object_and_its_listings(self):
+        before = get_versions(self.namespaces())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suite.name = "Renamed"
+            self.suite.save()
+        self.assertBumped(before, [True, True, True, False, False])
+
+    def test_delete_bumps_the_object_and_its_listings(self):
+        before = get_versions(self.namespaces())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.suite.delete()
+        self.assertBumped(before, [True, True, True, False, False])
+
+    def test_listing_is_cached_until_a_suite_changes(self):
+        def suites():
+            return cached(
+                "suites",
+                [self.project.pk],
+                [listing_namespace(TestSuite, project=self.project.pk)],
+                lambda: list(self.project.test_suite.values_list("name", flat=True)),
+            )
+
+        self.assertEqual(suites(), ["Suite"])
+        with self.assertNumQueries(0):
+            self.assertEqual(suites(), ["Suite"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TestSuite.objects.create(name="Second", project=self.project)
+        self.assertEqual(sorted(suites()), ["Second", "Suite"])